@@ -1,38 +1,35 @@
 import mysql.connector
-import os
-from dotenv import load_dotenv
+from db_pool import connect
+from db_procs import Procedure
+from db_retry import Retrier
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Establish a connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",       # Your MySQL server
-    user=os.getenv("MYSQL_USER"),  # MySQL username from .env
-    password=os.getenv("MYSQL_PASSWORD"),  # MySQL password from .env
-    database="Database1"    # The database you're using
-)
+# Get a pooled MySQL connection (see db_pool.py)
+conn = connect(database="Database1")
 
 # Create a cursor object using the connection
 cursor = conn.cursor()
 
 try:
-    # 1. Calling the stored procedure with parameters
-    call_procedure_query = """
-    CALL AddEmployee('Alice Green', 'HR', 4500.00);
-    CALL AddEmployee('Bob Brown', 'IT', 5000.00);
-    CALL AddEmployee('Charlie White', 'HR', 6000.00);
-    """
-    cursor.execute(call_procedure_query)
-
-    # 2. Consume any remaining result sets (if the stored procedure returns any result)
-    while cursor.nextset():
-        pass  # This ensures all result sets are consumed
-
-    # 3. Now, commit changes (if necessary)
-    conn.commit()
-
-    # 4. Verify that the employee was added
+    # 1. Calling the stored procedure with bound parameters; the calls are
+    #    pipelined and their result sets consumed (see db_procs.py)
+    # 2. Now, commit changes. The calls and the commit are one transaction,
+    #    replayed with backoff after a deadlock, lock wait timeout or lost
+    #    connection (see db_retry.py)
+    def add_employees(conn):
+        return Procedure(conn, "AddEmployee").call_many([
+            ("Alice Green", "HR", 4500.00),
+            ("Bob Brown", "IT", 5000.00),
+            ("Charlie White", "HR", 6000.00),
+        ])
+
+    retrier = Retrier(conn, database="Database1")
+    stats = retrier.transaction(add_employees)
+    print(stats)
+    cursor.close()
+    conn = retrier.conn  # a new pooled connection if the old one was lost
+    cursor = conn.cursor()
+
+    # 3. Verify that the employee was added
     cursor.execute("SELECT * FROM employees")
     result = cursor.fetchall()
 
@@ -47,6 +44,6 @@ except mysql.connector.Error as err:
     print(f"Error: {err}")
 
 finally:
-    # 5. Close the cursor and connection
+    # 4. Close the cursor and connection
     cursor.close()
     conn.close()
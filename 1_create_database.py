@@ -1,15 +1,7 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from db_pool import connect
 
-# Connect to MySQL
-conn = mysql.connector.connect(
-    host="localhost",
-    user=os.getenv('user'),      # Change if you have a different user
-    password=os.getenv('password'),  # Replace with your MySQL password
-    
-)
+# Get a pooled MySQL connection (see db_pool.py)
+conn = connect()
 
 # Create a cursor object
 cursor = conn.cursor()
@@ -1,14 +1,7 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from db_pool import connect
 
-# Establish a connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",       # Your MySQL server
-    user=os.getenv('user'),            # Your MySQL username
-    password=os.getenv('password')     # Your MySQL password
-)
+# Get a pooled MySQL connection (see db_pool.py)
+conn = connect()
 
 # Create a cursor object using the connection
 cursor = conn.cursor()
@@ -1,17 +1,8 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
-load_dotenv()
-
-# Establish a connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",       # Your MySQL server
-    user=os.getenv('user'),            # Your MySQL username
-    password=os.getenv("password"),    # Your MySQL password
-    database="Database1"   # The database where the table will be created
-)
-
+from db_pool import connect
+from db_stream import stream_rows
 
+# Get a pooled MySQL connection (see db_pool.py)
+conn = connect(database="Database1")
 
 # Create a cursor object
 cursor = conn.cursor()
@@ -59,9 +50,7 @@ cursor.executemany(insert_data_query, data)
 conn.commit()
 
 # Step 3: Verify data insertion
-cursor.execute("SELECT * FROM employees")
-result = cursor.fetchall()
-for row in result:
+for row in stream_rows(conn, "SELECT * FROM employees"):
     print(row)
 
 # Step 4: Drop the table
@@ -1,17 +1,10 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
+from db_batch import batch_delete, batch_update
+from db_online_ddl import online_alter
+from db_pool import connect
+from db_stream import stream_rows
 
-# Load environment variables
-load_dotenv()
-
-# Establish a connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",
-    user=os.getenv("user"),  # Corrected environment variable names
-    password=os.getenv("password"),
-    database="Database1"
-)
+# Get a pooled MySQL connection (see db_pool.py)
+conn = connect(database="Database1")
 
 # Create a cursor object
 cursor = conn.cursor()
@@ -45,76 +38,47 @@ conn.commit()
 print("✅ Data with NULL values inserted.")
 
 # Verify the results
-cursor.execute("SELECT * FROM employees")
 print("🔹 Employees Data After Insert:")
-for row in cursor.fetchall():
+for row in stream_rows(conn, "SELECT * FROM employees"):
     print(row)
 
 # Step 3: UPDATE Statement (Changing department)
-update_query = """
-UPDATE employees 
-SET department = %s 
-WHERE name = %s
-"""
-cursor.execute(update_query, ("Sales", "Alice Green"))
-conn.commit()
-print("✅ Updated Alice Green’s department to 'Sales'.")
+# Applied one primary-key chunk at a time, each in its own short transaction (see db_batch.py)
+stats = batch_update(conn, "employees", "department = %s", ("Sales",),
+                     where="name = %s", where_params=("Alice Green",))
+print(f"✅ Updated Alice Green’s department to 'Sales' ({stats.rows_affected} row(s)).")
 
 # Verify the results
-cursor.execute("SELECT * FROM employees")
 print("🔹 Employees Data After Update:")
-for row in cursor.fetchall():
+for row in stream_rows(conn, "SELECT * FROM employees"):
     print(row)
 
 # Step 4: DELETE Statement (Deleting an employee)
-delete_query = """
-DELETE FROM employees 
-WHERE name = %s
-"""
-cursor.execute(delete_query, ("Bob Brown",))
-conn.commit()
-print("✅ Deleted Bob Brown from employees.")
-for row in cursor.fetchall():
-    print(row)
+stats = batch_delete(conn, "employees", where="name = %s", where_params=("Bob Brown",))
+print(f"✅ Deleted Bob Brown from employees ({stats.rows_affected} row(s)).")
 
 # Verify the results
-cursor.execute("SELECT * FROM employees")
 print("🔹 Employees Data After Delete:")
-for row in cursor.fetchall():
+for row in stream_rows(conn, "SELECT * FROM employees"):
     print(row)
 
+# Steps 5-7 run through online_alter() (see db_online_ddl.py), which uses
+# ALGORITHM=INSTANT/INPLACE when possible and an online shadow copy otherwise.
+
 # Step 5: ALTER TABLE - Add a New Column
-alter_add_column_query = """
-ALTER TABLE employees 
-ADD COLUMN email VARCHAR(255) DEFAULT NULL
-"""
-cursor.execute(alter_add_column_query)
-conn.commit()
+alter_add_column_clause = "ADD COLUMN email VARCHAR(255) DEFAULT NULL"
+online_alter(conn, "employees", alter_add_column_clause)
 print("✅ Added 'email' column to employees table.")
-for row in cursor.fetchall():
-    print(row)
 
 # Step 6: ALTER TABLE - Modify Existing Column (Change 'salary' to NOT NULL)
-alter_modify_column_query = """
-ALTER TABLE employees 
-MODIFY COLUMN salary DECIMAL(10,2) NOT NULL
-"""
-cursor.execute(alter_modify_column_query)
-conn.commit()
+alter_modify_column_clause = "MODIFY COLUMN salary DECIMAL(10,2) NOT NULL"
+online_alter(conn, "employees", alter_modify_column_clause)
 print("✅ Modified 'salary' column to NOT NULL.")
-for row in cursor.fetchall():
-    print(row)
 
 # Step 7: ALTER TABLE - Drop Column
-alter_drop_column_query = """
-ALTER TABLE employees 
-DROP COLUMN email
-"""
-cursor.execute(alter_drop_column_query)
-conn.commit()
+alter_drop_column_clause = "DROP COLUMN email"
+online_alter(conn, "employees", alter_drop_column_clause)
 print("✅ Dropped 'email' column from employees table.")
-for row in cursor.fetchall():
-    print(row)
 
 # Close the cursor and connection
 cursor.close()
@@ -1,17 +1,10 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
+from db_bulk import bulk_insert
+from db_pool import connect
+from db_stream import stream_rows
+from db_unit_of_work import UnitOfWork
 
-# Load environment variables (if using .env file)
-load_dotenv()
-
-# Establish a connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",
-    user=os.getenv("MYSQL_USER"),  # Replace with your MySQL username
-    password=os.getenv("MYSQL_PASSWORD"),  # Replace with your MySQL password
-    database="test_db"
-)
+# Get a pooled MySQL connection (see db_pool.py)
+conn = connect(database="test_db")
 
 # Create a cursor object
 cursor = conn.cursor()
@@ -33,66 +26,41 @@ cursor.execute(create_table_query)
 conn.commit()
 print("✅ Table 'employees' created successfully.")
 
-# Step 2: Insert Valid Data
-insert_valid_query = """
-INSERT INTO employees (name, email, age, department, salary, manager_id)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
+# Step 2: Insert Valid Data (streamed in multi-row INSERTs, see db_bulk.py)
 valid_data = [
     ("John Doe", "john@example.com", 30, "IT", 50000, None),
     ("Jane Smith", "jane@example.com", 28, "HR", 60000, 1)  # Refers to John as manager
 ]
 
-cursor.executemany(insert_valid_query, valid_data)
-conn.commit()
+bulk_insert(conn, "employees", ["name", "email", "age", "department", "salary", "manager_id"], valid_data)
 print("✅ Valid data inserted successfully.")
 
 # Step 3: Insert Invalid Data (To Test Constraints)
-try:
+# The five INSERTs run in one transaction with a savepoint each, so every
+# violation is rolled back on its own and there is a single commit at the end
+# (see db_unit_of_work.py). The INSERT is prepared once on the server (see db_prepared.py).
+insert_query = "INSERT INTO employees (name, email, age, department, salary, manager_id) VALUES (%s, %s, %s, %s, %s, %s)"
+invalid_data = [
     # 1. Violating NOT NULL (Name is NULL)
-    cursor.execute("INSERT INTO employees (name, email, age, department, salary, manager_id) VALUES (%s, %s, %s, %s, %s, %s)", 
-                   (None, "invalid@example.com", 25, "Marketing", 50000, None))
-    conn.commit()
-except mysql.connector.Error as err:
-    print(f"❌ NOT NULL Constraint Violation: {err}")
-
-try:
+    ("NOT NULL Constraint Violation", (None, "invalid@example.com", 25, "Marketing", 50000, None)),
     # 2. Violating UNIQUE (Duplicate email)
-    cursor.execute("INSERT INTO employees (name, email, age, department, salary, manager_id) VALUES (%s, %s, %s, %s, %s, %s)", 
-                   ("Alice Brown", "john@example.com", 29, "Finance", 55000, None))
-    conn.commit()
-except mysql.connector.Error as err:
-    print(f"❌ UNIQUE Constraint Violation: {err}")
-
-try:
+    ("UNIQUE Constraint Violation", ("Alice Brown", "john@example.com", 29, "Finance", 55000, None)),
     # 3. Violating CHECK (Age < 18)
-    cursor.execute("INSERT INTO employees (name, email, age, department, salary, manager_id) VALUES (%s, %s, %s, %s, %s, %s)", 
-                   ("Bob Young", "bob@example.com", 17, "IT", 60000, None))
-    conn.commit()
-except mysql.connector.Error as err:
-    print(f"❌ CHECK Constraint Violation (Age < 18): {err}")
-
-try:
+    ("CHECK Constraint Violation (Age < 18)", ("Bob Young", "bob@example.com", 17, "IT", 60000, None)),
     # 4. Violating CHECK (Salary < 30,000)
-    cursor.execute("INSERT INTO employees (name, email, age, department, salary, manager_id) VALUES (%s, %s, %s, %s, %s, %s)", 
-                   ("Charlie Green", "charlie@example.com", 26, "IT", 20000, None))
-    conn.commit()
-except mysql.connector.Error as err:
-    print(f"❌ CHECK Constraint Violation (Salary < 30,000): {err}")
-
-try:
+    ("CHECK Constraint Violation (Salary < 30,000)", ("Charlie Green", "charlie@example.com", 26, "IT", 20000, None)),
     # 5. Violating FOREIGN KEY (Non-existing Manager ID)
-    cursor.execute("INSERT INTO employees (name, email, age, department, salary, manager_id) VALUES (%s, %s, %s, %s, %s, %s)", 
-                   ("David White", "david@example.com", 32, "Sales", 70000, 999))  # No manager with ID 999
-    conn.commit()
-except mysql.connector.Error as err:
-    print(f"❌ FOREIGN KEY Constraint Violation: {err}")
+    ("FOREIGN KEY Constraint Violation", ("David White", "david@example.com", 32, "Sales", 70000, 999)),  # No manager with ID 999
+]
+
+with UnitOfWork(conn, prepared=True) as unit:
+    for label, row in invalid_data:
+        if unit.execute(insert_query, row) is None:
+            print(f"❌ {label}: {unit.failures[-1].error}")
 
 # Step 4: Fetch and Display Data
-cursor.execute("SELECT * FROM employees")
-employees = cursor.fetchall()
 print("\n✅ Employees Table Data:")
-for emp in employees:
+for emp in stream_rows(conn, "SELECT * FROM employees"):
     print(emp)
 
 # Close Connection
@@ -1,18 +1,8 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
-import time
+from bench_common import summarize, time_calls
+from db_pool import connect
 
-# Load environment variables (if using .env file)
-load_dotenv()
-
-# Establish connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",
-    user=os.getenv("MYSQL_USER"),  # Replace with your MySQL username
-    password=os.getenv("MYSQL_PASSWORD"),  # Replace with your MySQL password
-    database="test_db"
-)
+# Get a pooled MySQL connection (see db_pool.py)
+conn = connect(database="test_db")
 cursor = conn.cursor()
 
 # Step 1: Create Table with Indexes
@@ -53,23 +43,25 @@ print("✅ Index 'idx_department' created on department column.")
 # Step 4: Measure Query Performance Before and After Index
 search_query = "SELECT * FROM employees WHERE department = 'IT'"
 
+
+def run_search_query():
+    cursor.execute(search_query)
+    cursor.fetchall()
+
+
+# Timings on a 4-row table are mostly noise; see bench_indexes.py for
+# repeatable numbers at realistic table sizes.
 # Without Index
 cursor.execute("DROP INDEX idx_department ON employees")  # Remove Index
 conn.commit()
-start_time = time.time()
-cursor.execute(search_query)
-result = cursor.fetchall()
-end_time = time.time()
-print(f"⏳ Query without index took: {end_time - start_time:.5f} seconds")
+timing = summarize(time_calls(run_search_query, repeat=50, warmup=5))
+print(f"⏳ Query without index: p50 {timing['p50_ms']:.3f} ms, p95 {timing['p95_ms']:.3f} ms (50 runs)")
 
 # With Index
 cursor.execute(create_index_query)  # Re-create Index
 conn.commit()
-start_time = time.time()
-cursor.execute(search_query)
-result = cursor.fetchall()
-end_time = time.time()
-print(f"🚀 Query with index took: {end_time - start_time:.5f} seconds")
+timing = summarize(time_calls(run_search_query, repeat=50, warmup=5))
+print(f"🚀 Query with index: p50 {timing['p50_ms']:.3f} ms, p95 {timing['p95_ms']:.3f} ms (50 runs)")
 
 # Step 5: Drop Index
 drop_index_query = "DROP INDEX idx_department ON employees"
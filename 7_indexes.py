@@ -1,18 +1,10 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
-import time
+from bench_common import summarize, time_calls
+from db_pool import connect
+from db_profiler import QueryProfiler
+from db_search import FullTextSearch
 
-# Load environment variables (if using .env file)
-load_dotenv()
-
-# Establish connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",
-    user=os.getenv("MYSQL_USER"),  # Replace with your MySQL username
-    password=os.getenv("MYSQL_PASSWORD"),  # Replace with your MySQL password
-    database="test_db"
-)
+# Get a pooled MySQL connection (see db_pool.py)
+conn = connect(database="test_db")
 cursor = conn.cursor()
 
 # Step 1: Create Table with Indexes
@@ -53,36 +45,43 @@ cursor.execute(create_fulltext_index_query)
 print("✅ FULLTEXT Index 'idx_fulltext_description' created on 'description' column.")
 
 # Step 4: Measure Query Performance Before and After Index
-search_query = "SELECT * FROM employees WHERE description LIKE '%engineer%'"
+# FullTextSearch (see db_search.py) issues MATCH ... AGAINST while the FULLTEXT
+# index exists and falls back to a `LIKE '%engineer%'` scan when it doesn't.
+search = FullTextSearch(conn, "employees", ["description"])
+
+
+def run_search_query():
+    search.search("engineer")
+
 
+# Timings on a 4-row table are mostly noise; see bench_indexes.py for
+# repeatable numbers at realistic table sizes.
 # Without FULLTEXT Index
 cursor.execute("DROP INDEX idx_fulltext_description ON employees")  # Remove FULLTEXT Index
 conn.commit()
-start_time = time.time()
-cursor.execute(search_query)
-result = cursor.fetchall()
-end_time = time.time()
-print(f"⏳ Query without FULLTEXT index took: {end_time - start_time:.5f} seconds")
+search.refresh_index()
+timing = summarize(time_calls(run_search_query, repeat=50, warmup=5))
+print(f"⏳ Query without FULLTEXT index: p50 {timing['p50_ms']:.3f} ms, p95 {timing['p95_ms']:.3f} ms (50 runs)")
 
 # With FULLTEXT Index
 cursor.execute(create_fulltext_index_query)  # Re-create FULLTEXT Index
 conn.commit()
-start_time = time.time()
-cursor.execute(search_query)
-result = cursor.fetchall()
-end_time = time.time()
-print(f"🚀 Query with FULLTEXT index took: {end_time - start_time:.5f} seconds")
+search.refresh_index()
+timing = summarize(time_calls(run_search_query, repeat=50, warmup=5))
+print(f"🚀 Query with FULLTEXT index: p50 {timing['p50_ms']:.3f} ms, p95 {timing['p95_ms']:.3f} ms (50 runs)")
+for row, score in search.search("software engineer").scored():
+    print(f"🔎 {score:.4f} {row}")
 
 # Step 5: Using COMPOSITE INDEX on 'age' and 'salary' columns
 search_composite_query = "SELECT * FROM employees WHERE age > 30 AND salary > 50000"
 
-# Using EXPLAIN ANALYZE to analyze performance of the query
-explain_query = f"EXPLAIN ANALYZE {search_composite_query}"
-cursor.execute(explain_query)
-explain_result = cursor.fetchall()
+# Using EXPLAIN FORMAT=JSON and EXPLAIN ANALYZE to analyze the query (see db_profiler.py)
+profiler = QueryProfiler(conn, analyze=True)
+profiler.register("composite_age_salary", search_composite_query, expect_index="idx_age_salary")
+plan = profiler.profile("composite_age_salary")
 print("📊 EXPLAIN ANALYZE output for the composite index query:")
-for row in explain_result:
-    print(row)
+print(plan.analyze_text)
+print(f"📊 Plan summary: {plan.summary()}")
 
 # Step 6: Drop Indexes
 cursor.execute("DROP INDEX idx_fulltext_description ON employees")  # Drop FULLTEXT index
@@ -1,17 +1,10 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
+from db_bulk import bulk_insert
+from db_router import connect
+from db_stream import stream_rows
 
-# Load environment variables
-load_dotenv()
-
-# Establish a connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",       # Your MySQL server
-    user=os.getenv("MYSQL_USER"),  # MySQL username from .env
-    password=os.getenv("MYSQL_PASSWORD"),  # MySQL password from .env
-    database="Database1"    # The database you're using
-)
+# Get a pooled MySQL connection; with MYSQL_REPLICAS set, reads go to the
+# replicas and writes to the primary (see db_router.py)
+conn = connect(database="Database1")
 
 # Create a cursor object using the connection
 cursor = conn.cursor()
@@ -34,33 +27,24 @@ CREATE TABLE IF NOT EXISTS sales (
 cursor.execute(create_employee_table)
 cursor.execute(create_sales_table)
 
-# 2. Insert Sample Data into Tables
-insert_employee_data = """
-INSERT INTO employees (name, department) VALUES (%s, %s)
-"""
+# 2. Insert Sample Data into Tables (streamed in multi-row INSERTs, see db_bulk.py)
 employee_data = [
     ("John Doe", "Sales"),
     ("Jane Smith", "Marketing"),
     ("Emily Johnson", "Sales")
 ]
-cursor.executemany(insert_employee_data, employee_data)
+bulk_insert(conn, "employees", ["name", "department"], employee_data)
 
-insert_sales_data = """
-INSERT INTO sales (employee_id, sales_amount) VALUES (%s, %s)
-"""
 sales_data = [
     (1, 1500.50),  # John Doe's sales
     (2, 3000.00),  # Jane Smith's sales
     (3, 1200.75)   # Emily Johnson's sales
 ]
-cursor.executemany(insert_sales_data, sales_data)
-
-# Commit the changes
-conn.commit()
+bulk_insert(conn, "sales", ["employee_id", "sales_amount"], sales_data)
 
-# 3. Create a View (Virtual Table)
+# 3. Create a View (Virtual Table); OR REPLACE keeps reruns from failing
 create_view_query = """
-CREATE VIEW employee_sales AS
+CREATE OR REPLACE VIEW employee_sales AS
 SELECT employees.name, employees.department, SUM(sales.sales_amount) AS total_sales
 FROM employees
 JOIN sales ON employees.id = sales.employee_id
@@ -73,9 +57,7 @@ print("View 'employee_sales' created successfully.")
 
 # 4. Query the View
 print("\nQuerying the 'employee_sales' view:")
-cursor.execute("SELECT * FROM employee_sales")
-result = cursor.fetchall()
-for row in result:
+for row in stream_rows(conn, "SELECT * FROM employee_sales"):
     print(row)
 
 # 5. Drop the View
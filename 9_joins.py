@@ -1,17 +1,11 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Establish a connection to MySQL
-conn = mysql.connector.connect(
-    host="localhost",       # Your MySQL server
-    user=os.getenv("MYSQL_USER"),  # MySQL username from .env
-    password=os.getenv("MYSQL_PASSWORD"),  # MySQL password from .env
-    database="Database1"    # The database you're using
-)
+from db_bulk import bulk_insert
+from db_router import connect
+from db_retry import Retrier
+from db_stream import stream_rows
+
+# Get a pooled MySQL connection; with MYSQL_REPLICAS set, reads go to the
+# replicas and writes to the primary (see db_router.py)
+conn = connect(database="Database1")
 
 # Create a cursor object using the connection
 cursor = conn.cursor()
@@ -34,10 +28,9 @@ CREATE TABLE IF NOT EXISTS sales (
 cursor.execute(create_employee_table)
 cursor.execute(create_sales_table)
 
-# 2. Insert Sample Data into Tables
-insert_employee_data = """
-INSERT INTO employees (name, department) VALUES (%s, %s)
-"""
+# 2. Insert Sample Data into Tables (streamed in multi-row INSERTs, see db_bulk.py)
+# Both inserts form one transaction, replayed with backoff after a deadlock,
+# lock wait timeout or lost connection (see db_retry.py)
 employee_data = [
     ("John Doe", "Sales"),
     ("Jane Smith", "Marketing"),
@@ -45,76 +38,67 @@ employee_data = [
     ("Michael Brown", "Marketing"),
     ("Sarah White", "HR")
 ]
-cursor.executemany(insert_employee_data, employee_data)
-
-insert_sales_data = """
-INSERT INTO sales (employee_id, sales_amount) VALUES (%s, %s)
-"""
 sales_data = [
     (1, 1500.50),  # John Doe's sales
     (2, 3000.00),  # Jane Smith's sales
     (3, 1200.75)   # Emily Johnson's sales
 ]
-cursor.executemany(insert_sales_data, sales_data)
 
-# Commit the changes
-conn.commit()
+
+def insert_sample_data(conn):
+    bulk_insert(conn, "employees", ["name", "department"], employee_data, commit_every=None)
+    bulk_insert(conn, "sales", ["employee_id", "sales_amount"], sales_data, commit_every=None)
+
+
+retrier = Retrier(conn, database="Database1", connect=connect)
+retrier.transaction(insert_sample_data)
+cursor.close()
+conn = retrier.conn  # a new (routed) connection if the old one was lost
+cursor = conn.cursor()
 
 # Display the tables
 print("Employees Table:")
-cursor.execute("SELECT * FROM employees")
-result = cursor.fetchall()
-for row in result:
+for row in stream_rows(conn, "SELECT * FROM employees"):
     print(row)
 
 print("\nSales Table:")
-cursor.execute("SELECT * FROM sales")
-result = cursor.fetchall()
-for row in result:
+for row in stream_rows(conn, "SELECT * FROM sales"):
     print(row)
 
 # 3. INNER JOIN - Fetching employees with their sales
 print("INNER JOIN Result (Employees with Sales):")
-cursor.execute("""
+for row in stream_rows(conn, """
     SELECT employees.name, employees.department, sales.sales_amount
     FROM employees
     INNER JOIN sales ON employees.id = sales.employee_id
-""")
-result = cursor.fetchall()
-for row in result:
+"""):
     print(row)
 
 # 4. LEFT JOIN - Fetching all employees and their sales (including those without sales)
 print("\nLEFT JOIN Result (All Employees with Sales, including those without sales):")
-cursor.execute("""
+for row in stream_rows(conn, """
     SELECT employees.name, employees.department, sales.sales_amount
     FROM employees
     LEFT JOIN sales ON employees.id = sales.employee_id
-""")
-result = cursor.fetchall()
-for row in result:
+"""):
     print(row)
 
 # 5. RIGHT JOIN - Fetching all sales and the corresponding employees
 print("\nRIGHT JOIN Result (All Sales with Corresponding Employees):")
-cursor.execute("""
+for row in stream_rows(conn, """
     SELECT employees.name, employees.department, sales.sales_amount
     FROM employees
     RIGHT JOIN sales ON employees.id = sales.employee_id
-""")
-result = cursor.fetchall()
-for row in result:
+"""):
     print(row)
 
 # 6. CROSS JOIN - All possible combinations of employees and sales (use carefully)
 print("\nCROSS JOIN Result (All combinations of Employees and Sales):")
-cursor.execute("""
+for row in stream_rows(conn, """
     SELECT employees.name, sales.sales_amount
     FROM employees
     CROSS JOIN sales
-""")
-result = cursor.fetchall()
-for row in result:
+"""):
     print(row)
 
 # Close the cursor and connection
@@ -0,0 +1,124 @@
+"""
+Concurrent department lookups: asyncio (db_async) vs one thread per connection.
+
+Issues --queries `SELECT ... FROM employees WHERE department = %s` lookups
+with --concurrency of them in flight at a time, first from a thread pool
+where every worker holds its own blocking connection, then from a single
+event loop sharing an AsyncPool of the same size. Reports per-query
+latency, total throughput and peak Python memory for each.
+
+    python bench_async.py --concurrency 10 100 1000 --queries 5000
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+from bench_common import DEPARTMENTS, ensure_employees, measure_peak_memory, print_summary, summarize
+from db_async import AsyncDB
+from db_pool import connection_config
+
+TABLE = "bench_async_employees"
+QUERY = f"SELECT id, name, salary FROM `{TABLE}` WHERE department = %s LIMIT 50"
+
+
+def departments(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(DEPARTMENTS) for _ in range(count)]
+
+
+def run_threads(database, workload, concurrency):
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+
+    def lookup(department):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = mysql.connector.connect(**connection_config(database))
+            with lock:
+                connections.append(conn)
+        start = time.perf_counter_ns()
+        cursor = conn.cursor()
+        cursor.execute(QUERY, (department,))
+        cursor.fetchall()
+        cursor.close()
+        return time.perf_counter_ns() - start
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            start = time.perf_counter()
+            samples = list(executor.map(lookup, workload))
+            elapsed = time.perf_counter() - start
+    finally:
+        for conn in connections:
+            conn.close()
+    return samples, elapsed
+
+
+async def _run_async(database, workload, concurrency):
+    db = await AsyncDB.create(database=database, size=concurrency)
+    queue = list(reversed(workload))
+    samples = []
+
+    async def worker():
+        while queue:
+            department = queue.pop()
+            start = time.perf_counter_ns()
+            await db.fetchall(QUERY, (department,))
+            samples.append(time.perf_counter_ns() - start)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await db.close()
+    return samples, elapsed
+
+
+def run_async(database, workload, concurrency):
+    return asyncio.run(_run_async(database, workload, concurrency))
+
+
+def report(label, result, peak):
+    samples, elapsed = result
+    print_summary(label, summarize(samples))
+    print(f"{'':<40} {len(samples) / elapsed:.1f} queries/s overall, "
+          f"peak Python memory {peak / 1024 / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--database", default="Database1")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**connection_config(args.database))
+    ensure_employees(conn, TABLE, args.rows)
+    cursor = conn.cursor()
+    cursor.execute(f"SHOW INDEX FROM `{TABLE}` WHERE Key_name = 'idx_department'")
+    if not cursor.fetchall():
+        cursor.execute(f"CREATE INDEX idx_department ON `{TABLE}` (department)")
+    cursor.close()
+    conn.close()
+
+    workload = departments(args.queries)
+    for concurrency in args.concurrency:
+        print(f"\n--- {concurrency} concurrent lookups ---")
+        result, peak = measure_peak_memory(
+            lambda: run_threads(args.database, workload, concurrency))
+        report(f"threads ({concurrency} connections)", result, peak)
+        result, peak = measure_peak_memory(
+            lambda: run_async(args.database, workload, concurrency))
+        report(f"asyncio (pool of {concurrency})", result, peak)
+
+
+if __name__ == "__main__":
+    main()
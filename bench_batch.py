@@ -0,0 +1,102 @@
+"""
+Lock impact of a broad UPDATE: one statement vs db_batch's chunked version.
+
+While the mutation runs, a background writer keeps updating random rows of
+the same table on its own connection. The benchmark reports how long the
+mutation took and how long the writer's statements waited: per-statement
+latency percentiles plus the server's Innodb_row_lock_time delta.
+
+    python bench_batch.py --rows 1000000
+"""
+import argparse
+import random
+import threading
+import time
+
+import mysql.connector
+
+from bench_common import ensure_employees, print_summary, summarize
+from db_batch import batch_update
+from db_pool import backend_connect, connection_config
+
+TABLE = "bench_batch_employees"
+
+
+def row_lock_time_ms(conn):
+    cursor = conn.cursor()
+    cursor.execute("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock_time'")
+    value = int(cursor.fetchone()[1])
+    cursor.close()
+    return value
+
+
+def writer(config, rows, stop, samples):
+    conn = backend_connect()(**config)
+    cursor = conn.cursor()
+    rng = random.Random(1)
+    while not stop.is_set():
+        start = time.perf_counter_ns()
+        try:
+            cursor.execute(f"UPDATE `{TABLE}` SET age = age WHERE id = %s",
+                           (rng.randint(1, rows),))
+            conn.commit()
+        except mysql.connector.Error:
+            conn.rollback()
+        samples.append(time.perf_counter_ns() - start)
+    cursor.close()
+    conn.close()
+
+
+def run(config, rows, label, mutate):
+    conn = backend_connect()(**config)
+    before = row_lock_time_ms(conn)
+    stop = threading.Event()
+    samples = []
+    thread = threading.Thread(target=writer, args=(config, rows, stop, samples))
+    thread.start()
+    time.sleep(0.5)
+    start = time.perf_counter()
+    affected = mutate(conn)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    waited = row_lock_time_ms(conn) - before
+    conn.close()
+    print(f"{label}: {affected} rows in {elapsed:.2f} s, Innodb_row_lock_time +{waited} ms")
+    print_summary("  concurrent writer latency", summarize(samples))
+
+
+def single_statement(conn, salary_from):
+    cursor = conn.cursor()
+    cursor.execute(f"UPDATE `{TABLE}` SET salary = salary + 1 WHERE salary > %s",
+                   (salary_from,))
+    affected = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    return affected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--database", default="Database1")
+    args = parser.parse_args()
+
+    config = connection_config(args.database)
+    conn = backend_connect()(**config)
+    ensure_employees(conn, TABLE, args.rows)
+    conn.close()
+
+    # Matches roughly half of the table.
+    salary_from = 115000
+    run(config, args.rows, "single UPDATE",
+        lambda c: single_statement(c, salary_from))
+    run(config, args.rows, f"batch_update(chunk_size={args.chunk_size})",
+        lambda c: batch_update(c, TABLE, "salary = salary + 1", where="salary > %s",
+                               where_params=(salary_from,),
+                               chunk_size=args.chunk_size).rows_affected)
+
+
+if __name__ == "__main__":
+    main()
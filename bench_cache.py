@@ -0,0 +1,102 @@
+"""
+Dashboard-style read load on employee_sales, with and without db_cache.
+
+Runs --reads queries against the employee_sales view (from 8_views.py),
+with one INSERT into sales every --write-every reads, directly and then
+through CachedConnection. Reports latency percentiles and cache metrics.
+
+    python bench_cache.py --reads 5000 --write-every 100
+"""
+import argparse
+
+from bench_common import print_summary, summarize, time_calls
+from db_cache import CachedConnection, QueryCache
+from db_pool import open_connection
+
+VIEW_QUERY = "SELECT * FROM employee_sales ORDER BY total_sales DESC"
+
+
+def setup(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS employees (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            department VARCHAR(100)
+        )""")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sales (
+            employee_id INT,
+            sales_amount DECIMAL(10, 2),
+            FOREIGN KEY (employee_id) REFERENCES employees(id)
+        )""")
+    cursor.execute("""
+        CREATE OR REPLACE VIEW employee_sales AS
+        SELECT employees.name, employees.department, SUM(sales.sales_amount) AS total_sales
+        FROM employees
+        JOIN sales ON employees.id = sales.employee_id
+        GROUP BY employees.name, employees.department""")
+    cursor.execute("SELECT MIN(id) FROM employees")
+    employee_id = cursor.fetchone()[0]
+    if employee_id is None:
+        cursor.execute("INSERT INTO employees (name, department) VALUES ('Bench', 'Sales')")
+        employee_id = cursor.lastrowid
+    conn.commit()
+    cursor.close()
+    return employee_id
+
+
+def workload(read, write, reads, write_every):
+    counter = [0]
+
+    def step():
+        counter[0] += 1
+        if write_every and counter[0] % write_every == 0:
+            write()
+        read()
+
+    return time_calls(step, reads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reads", type=int, default=5000)
+    parser.add_argument("--write-every", type=int, default=100)
+    parser.add_argument("--database", default="Database1")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    employee_id = setup(conn)
+    insert = "INSERT INTO sales (employee_id, sales_amount) VALUES (%s, %s)"
+
+    def direct_read():
+        cursor = conn.cursor()
+        cursor.execute(VIEW_QUERY)
+        cursor.fetchall()
+        cursor.close()
+
+    def direct_write():
+        cursor = conn.cursor()
+        cursor.execute(insert, (employee_id, 1))
+        conn.commit()
+        cursor.close()
+
+    print_summary("direct", summarize(
+        workload(direct_read, direct_write, args.reads, args.write_every)))
+
+    cache = QueryCache(ttl=60)
+    cache.load_views(conn)
+    db = CachedConnection(conn, cache)
+
+    def cached_write():
+        db.execute(insert, (employee_id, 1))
+        db.commit()
+
+    print_summary("CachedConnection", summarize(
+        workload(lambda: db.query(VIEW_QUERY), cached_write, args.reads, args.write_every)))
+    print(f"Cache metrics: {cache.metrics()}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
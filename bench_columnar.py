@@ -0,0 +1,103 @@
+"""
+Rows/sec and bytes/row: tuple fetch vs db_columnar on a multi-million-row sales table.
+
+Fills a sales table (employee_id INT, sales_amount DECIMAL(10,2), region
+VARCHAR) with --rows synthetic rows, then reads it whole:
+  * tuples      -- cursor.fetchmany() into a list of (int, Decimal, str) tuples
+  * columnar    -- fetch_columnar(), DECIMAL as scaled int64
+  * columnar f8 -- fetch_columnar(decimal="float64")
+  * streamed    -- stream_columnar() chunks, summed and dropped (bounded memory)
+Time is measured without tracing; bytes/row is the tracemalloc peak of a
+second, traced run divided by the row count.
+
+    python bench_columnar.py --rows 5000000 --chunk-size 65536
+"""
+import argparse
+import random
+import time
+
+from bench_common import measure_peak_memory, write_json
+from db_bulk import bulk_insert
+from db_columnar import fetch_columnar, stream_columnar
+from db_pool import open_connection
+
+TABLE = "bench_columnar_sales"
+QUERY = f"SELECT employee_id, sales_amount, region FROM `{TABLE}`"
+REGIONS = ["North", "South", "East", "West", "Central", "Northeast", "Southwest"]
+
+
+def setup(conn, rows):
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS `{TABLE}` (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            employee_id INT,
+            sales_amount DECIMAL(10, 2),
+            region VARCHAR(20)
+        )""")
+    cursor.execute(f"SELECT COUNT(*) FROM `{TABLE}`")
+    existing = cursor.fetchone()[0]
+    cursor.close()
+    if existing < rows:
+        print(f"Loading {rows - existing} sales rows...")
+        rng = random.Random(17)
+        bulk_insert(conn, TABLE, ["employee_id", "sales_amount", "region"],
+                    ((rng.randint(1, 100_000), round(rng.uniform(1, 5000), 2), rng.choice(REGIONS))
+                     for _ in range(rows - existing)))
+    return max(existing, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--output", default="bench_columnar.json")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    setup(conn, args.rows)
+
+    def tuples():
+        cursor = conn.cursor()
+        cursor.execute(QUERY)
+        rows = []
+        while True:
+            chunk = cursor.fetchmany(args.chunk_size)
+            if not chunk:
+                break
+            rows.extend(chunk)
+        cursor.close()
+        return len(rows)
+
+    def columnar():
+        return fetch_columnar(conn, QUERY, chunk_size=args.chunk_size).num_rows
+
+    def columnar_float():
+        return fetch_columnar(conn, QUERY, chunk_size=args.chunk_size, decimal="float64").num_rows
+
+    def streamed():
+        count, total = 0, 0
+        for chunk in stream_columnar(conn, QUERY, chunk_size=args.chunk_size):
+            count += chunk.num_rows
+            total += sum(chunk["sales_amount"].values)
+        return count
+
+    results = {}
+    for label, func in [("tuples", tuples), ("columnar", columnar),
+                        ("columnar f8", columnar_float), ("streamed", streamed)]:
+        start = time.perf_counter()
+        rows = func()
+        elapsed = time.perf_counter() - start
+        _, peak = measure_peak_memory(func)
+        results[label] = {"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed,
+                          "bytes_per_row": peak / rows if rows else 0.0}
+        print(f"{label:<14} {elapsed:8.3f} s  {rows / elapsed:12.1f} rows/s  "
+              f"{results[label]['bytes_per_row']:8.1f} bytes/row")
+
+    conn.close()
+    write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
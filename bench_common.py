@@ -0,0 +1,122 @@
+"""
+Small helpers shared by the bench_*.py scripts: synthetic employees data,
+timing, percentiles, memory measurement and report output.
+"""
+import json
+import random
+import time
+import tracemalloc
+
+from db_bulk import bulk_insert
+
+DEPARTMENTS = ["IT", "HR", "Finance", "Marketing", "Sales", "Operations", "Legal", "Support"]
+_WORDS = [
+    "software", "engineer", "manages", "operations", "financial", "analyst",
+    "leads", "marketing", "team", "support", "customer", "sales", "senior",
+    "junior", "data", "platform", "security", "reports", "budget", "hiring",
+]
+
+# Superset of the employees schemas used by the numbered scripts (7_indexes.py).
+EMPLOYEES_DDL = """
+CREATE TABLE IF NOT EXISTS `{table}` (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE,
+    age INT,
+    department VARCHAR(100),
+    salary DECIMAL(10,2),
+    description TEXT
+)
+"""
+EMPLOYEE_COLUMNS = ["name", "email", "age", "department", "salary", "description"]
+
+
+def employee_rows(count, seed=0, start=0):
+    """Generate `count` synthetic employees rows (EMPLOYEE_COLUMNS order) lazily."""
+    rng = random.Random(seed)
+    for i in range(start, start + count):
+        words = " ".join(rng.choice(_WORDS) for _ in range(8))
+        yield (
+            f"Employee {i}",
+            f"employee{i}@example.com",
+            rng.randint(18, 65),
+            rng.choice(DEPARTMENTS),
+            round(rng.uniform(30001, 200000), 2),
+            f"Employee {i} {words}.",
+        )
+
+
+def ensure_employees(conn, table, rows, seed=0):
+    """Create `table` if needed and top it up to at least `rows` synthetic rows."""
+    cursor = conn.cursor()
+    cursor.execute(EMPLOYEES_DDL.format(table=table))
+    cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
+    existing = cursor.fetchone()[0]
+    cursor.close()
+    if existing < rows:
+        print(f"Loading {rows - existing} synthetic rows into {table}...")
+        stats = bulk_insert(conn, table, EMPLOYEE_COLUMNS,
+                            employee_rows(rows - existing, seed=seed, start=existing))
+        print(f"Loaded at {stats.rows_per_sec:.0f} rows/s")
+    return max(existing, rows)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (pct in 0-100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples_ns):
+    """Summarize a list of nanosecond timings in milliseconds."""
+    count = len(samples_ns)
+    total = sum(samples_ns)
+    return {
+        "count": count,
+        "mean_ms": total / count / 1e6 if count else 0.0,
+        "p50_ms": percentile(samples_ns, 50) / 1e6,
+        "p95_ms": percentile(samples_ns, 95) / 1e6,
+        "p99_ms": percentile(samples_ns, 99) / 1e6,
+        "ops_per_sec": count / (total / 1e9) if total else 0.0,
+    }
+
+
+def time_calls(func, repeat, warmup=0):
+    """Call func() warmup + repeat times and return the timed samples in ns."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def measure_peak_memory(func):
+    """Run func() under tracemalloc and return (result, peak_bytes)."""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def print_summary(label, summary):
+    print(
+        f"{label:<40} p50 {summary['p50_ms']:9.3f} ms  "
+        f"p95 {summary['p95_ms']:9.3f} ms  p99 {summary['p99_ms']:9.3f} ms  "
+        f"{summary['ops_per_sec']:12.1f} ops/s"
+    )
+
+
+def write_json(path, results):
+    """Write benchmark results to `path` so runs can be diffed across commits."""
+    with open(path, "w") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True, default=str)
+    print(f"Results written to {path}")
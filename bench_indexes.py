@@ -0,0 +1,131 @@
+"""
+Reproducible index benchmark for the queries in 6_indexes_1.py and 7_indexes.py.
+
+For each requested scale a synthetic employees table is filled (and kept
+between runs), then every scenario is timed without and with its index:
+warmup runs first, then repeated trials measured with perf_counter_ns.
+Results (p50/p95/p99 latency and throughput) are printed and written as
+JSON so runs can be compared across commits.
+
+    python bench_indexes.py --scales 10000 1000000 --trials 50 --output bench_indexes.json
+"""
+import argparse
+import datetime
+import subprocess
+
+from bench_common import ensure_employees, print_summary, summarize, time_calls, write_json
+from db_pool import open_connection
+from db_schema import drop_index_if_exists, server_version
+
+SCENARIOS = [
+    {
+        "name": "department_lookup",
+        "index": "idx_department",
+        "create": "CREATE INDEX idx_department ON `{table}`(department)",
+        "query": "SELECT COUNT(*), AVG(salary) FROM `{table}` WHERE department = 'IT'",
+    },
+    {
+        # 7_indexes.py's `age > 30 AND salary > 50000` matches most of the
+        # table, so the optimizer rightly ignores the index; an equality on
+        # the leading column is what idx_age_salary is for.
+        "name": "age_salary_range",
+        "index": "idx_age_salary",
+        "create": "CREATE INDEX idx_age_salary ON `{table}`(age, salary)",
+        "query": "SELECT COUNT(*), AVG(salary) FROM `{table}` WHERE age = 30 AND salary > 150000",
+    },
+    {
+        # Without the FULLTEXT index only the LIKE scan is possible.
+        "name": "description_search",
+        "index": "idx_fulltext_description",
+        "create": "CREATE FULLTEXT INDEX idx_fulltext_description ON `{table}`(description)",
+        "query": "SELECT COUNT(*) FROM `{table}` WHERE description LIKE '%engineer%'",
+        "indexed_query": "SELECT COUNT(*) FROM `{table}` WHERE MATCH(description) AGAINST ('engineer')",
+    },
+]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_query(conn, query):
+    cursor = conn.cursor()
+    cursor.execute(query)
+    cursor.fetchall()
+    cursor.close()
+
+
+def run_scale(conn, rows, scenarios, trials, warmup):
+    table = f"bench_idx_employees_{rows}"
+    ensure_employees(conn, table, rows)
+    for scenario in SCENARIOS:
+        drop_index_if_exists(conn, table, scenario["index"])
+
+    results = []
+    for scenario in scenarios:
+        fmt = {"table": table}
+        for indexed in (False, True):
+            if indexed:
+                cursor = conn.cursor()
+                cursor.execute(scenario["create"].format(**fmt))
+                cursor.execute(f"ANALYZE TABLE `{table}`")
+                cursor.fetchall()
+                cursor.close()
+                query = scenario.get("indexed_query", scenario["query"]).format(**fmt)
+            else:
+                query = scenario["query"].format(**fmt)
+            samples = time_calls(lambda: run_query(conn, query), trials, warmup)
+            summary = summarize(samples)
+            label = f"{rows:>9} {scenario['name']} ({'with' if indexed else 'without'} index)"
+            print_summary(label, summary)
+            results.append({
+                "rows": rows,
+                "scenario": scenario["name"],
+                "index": scenario["index"],
+                "indexed": indexed,
+                "query": query,
+                "samples_ns": samples,
+                **summary,
+            })
+        drop_index_if_exists(conn, table, scenario["index"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 1_000_000],
+                        help="table sizes to test, e.g. 10000 1000000 10000000")
+    parser.add_argument("--scenarios", nargs="+", choices=[s["name"] for s in SCENARIOS],
+                        default=[s["name"] for s in SCENARIOS])
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--database", default="test_db")
+    parser.add_argument("--output", default="bench_indexes.json")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    scenarios = [s for s in SCENARIOS if s["name"] in args.scenarios]
+    results = []
+    for rows in args.scales:
+        results.extend(run_scale(conn, rows, scenarios, args.trials, args.warmup))
+
+    write_json(args.output, {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "server_version": ".".join(map(str, server_version(conn))),
+            "trials": args.trials,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    })
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+employee_sales: plain view vs MaterializedEmployeeSales as `sales` grows.
+
+At each size step the sales table is grown with synthetic rows, then:
+  * point reads of one employee's total from the view and from the summary
+  * the cost of an incremental refresh after --delta new sales
+  * the cost of a full refresh, for comparison
+
+    python bench_matview.py --steps 1000000 10000000 30000000 --delta 10000
+"""
+import argparse
+import random
+import time
+
+from bench_common import print_summary, summarize, time_calls
+from db_bulk import bulk_insert
+from db_matview import MaterializedEmployeeSales
+from db_pool import open_connection
+
+EMPLOYEES = "bench_mv_employees"
+SALES = "bench_mv_sales"
+
+
+def setup(conn, employees):
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS `{EMPLOYEES}` (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            department VARCHAR(100)
+        )""")
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS `{SALES}` (
+            employee_id INT,
+            sales_amount DECIMAL(10, 2),
+            INDEX idx_employee_id (employee_id)
+        )""")
+    cursor.execute(f"SELECT COUNT(*) FROM `{EMPLOYEES}`")
+    existing = cursor.fetchone()[0]
+    cursor.close()
+    if existing < employees:
+        bulk_insert(conn, EMPLOYEES, ["name", "department"],
+                    ((f"Employee {i}", f"Dept {i % 20}") for i in range(existing, employees)))
+
+
+def sales_rows(count, employees, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield (rng.randint(1, employees), round(rng.uniform(1, 5000), 2))
+
+
+def sales_count(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM `{SALES}`")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--steps", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--delta", type=int, default=10_000)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--database", default="Database1")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    setup(conn, args.employees)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE OR REPLACE VIEW bench_mv_employee_sales AS
+        SELECT e.id, e.name, e.department, SUM(s.sales_amount) AS total_sales
+        FROM `{EMPLOYEES}` e JOIN `{SALES}` s ON e.id = s.employee_id
+        GROUP BY e.id, e.name, e.department""")
+    cursor.close()
+
+    mv = MaterializedEmployeeSales(conn, name="bench_mv_summary", employees=EMPLOYEES, sales=SALES)
+    mv.install()
+    rng = random.Random(7)
+
+    for step, target in enumerate(args.steps):
+        missing = target - sales_count(conn)
+        if missing > 0:
+            bulk_insert(conn, SALES, ["employee_id", "sales_amount"],
+                        sales_rows(missing, args.employees, seed=step))
+            mv.refresh()
+        print(f"\n--- sales rows: {sales_count(conn)} ---")
+
+        def read_view():
+            c = conn.cursor()
+            c.execute("SELECT total_sales FROM bench_mv_employee_sales WHERE id = %s",
+                      (rng.randint(1, args.employees),))
+            c.fetchall()
+            c.close()
+
+        print_summary("view point read", summarize(time_calls(read_view, min(args.reads, 20), 2)))
+        print_summary("materialized point read", summarize(time_calls(
+            lambda: mv.read_employee(rng.randint(1, args.employees)), args.reads, 10)))
+
+        bulk_insert(conn, SALES, ["employee_id", "sales_amount"],
+                    sales_rows(args.delta, args.employees, seed=1000 + step))
+        start = time.perf_counter()
+        result = mv.refresh("incremental")
+        print(f"incremental refresh of {result['changes']} changes: "
+              f"{time.perf_counter() - start:.3f} s")
+        start = time.perf_counter()
+        mv.refresh("full")
+        print(f"full refresh: {time.perf_counter() - start:.3f} s")
+        print(f"staleness after refresh: {mv.staleness()}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Page latency by depth: LIMIT/OFFSET vs db_paginate keyset paging.
+
+Fills an employees table (with idx_department) to --rows rows and times
+fetching page 1 and page --deep-page of --page-size rows, ordered by id and
+by (department, id), both with OFFSET and with a Paginator token. OFFSET
+cost grows with the page number; the keyset pages should stay flat.
+
+    python bench_paginate.py --rows 1000000 --page-size 50 --deep-page 10000
+"""
+import argparse
+
+from bench_common import ensure_employees, print_summary, summarize, time_calls, write_json
+from db_paginate import Paginator
+from db_pool import open_connection
+
+TABLE = "bench_paginate_employees"
+COLUMNS = ["id", "name", "department", "salary"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=600_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--deep-page", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--output", default="bench_paginate.json")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    rows = ensure_employees(conn, TABLE, args.rows)
+    if (args.deep_page - 1) * args.page_size >= rows:
+        raise SystemExit(f"--deep-page {args.deep_page} is past the end of {rows} rows")
+    cursor = conn.cursor(buffered=True)
+    cursor.execute("SELECT COUNT(*) FROM information_schema.STATISTICS "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = 'idx_department'",
+                   (TABLE,))
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"CREATE INDEX idx_department ON `{TABLE}` (department)")
+    cursor.close()
+
+    results = {}
+    for key in [("id",), ("department", "id")]:
+        order_by = ", ".join(key)
+        listing = Paginator(conn, TABLE, key=key, columns=COLUMNS, page_size=args.page_size)
+        for page_number in (1, args.deep_page):
+            offset = (page_number - 1) * args.page_size
+            offset_sql = (f"SELECT {', '.join(COLUMNS)} FROM `{TABLE}` ORDER BY {order_by} "
+                          f"LIMIT {args.page_size} OFFSET {offset}")
+            token = None
+            if page_number > 1:
+                # The key of the last row on the previous page (untimed setup).
+                c = conn.cursor(buffered=True)
+                c.execute(f"SELECT {order_by} FROM `{TABLE}` ORDER BY {order_by} LIMIT 1 OFFSET {offset - 1}")
+                token = listing.token_after(c.fetchone())
+                c.close()
+
+            def by_offset():
+                c = conn.cursor()
+                c.execute(offset_sql)
+                c.fetchall()
+                c.close()
+
+            expected = listing.page(token).rows
+            c = conn.cursor(buffered=True)
+            c.execute(offset_sql)
+            if c.fetchall() != expected:
+                raise SystemExit(f"OFFSET and keyset disagree on page {page_number} by ({order_by})")
+            c.close()
+
+            for method, func in [("OFFSET", by_offset), ("keyset", lambda: listing.page(token))]:
+                label = f"({order_by}) page {page_number}, {method}"
+                summary = summarize(time_calls(func, args.repeat, warmup=3))
+                print_summary(label, summary)
+                results[label] = summary
+
+    conn.close()
+    write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Per-department sales report: one query vs db_parallel across 1..N worker processes.
+
+Fills an employees/sales pair (the 9_joins.py schema) with --employees and
+--sales synthetic rows, then times the report
+    SELECT department, SUM(sales_amount), COUNT(*), MIN(...), MAX(...)
+    FROM employees JOIN sales ... GROUP BY department
+as a single statement and as a ParallelQuery split by employee_id range,
+for each --workers count. Every parallel result is checked against the
+single-query one.
+
+    python bench_parallel.py --sales 20000000 --workers 1 2 4 8 16
+"""
+import argparse
+import random
+import time
+
+from bench_common import DEPARTMENTS, write_json
+from db_bulk import bulk_insert
+from db_parallel import ParallelQuery
+from db_pool import open_connection
+
+EMPLOYEES = "bench_par_employees"
+SALES = "bench_par_sales"
+REPORT = (f"SELECT e.department, SUM(s.sales_amount), COUNT(*), MIN(s.sales_amount), MAX(s.sales_amount) "
+          f"FROM `{EMPLOYEES}` e JOIN `{SALES}` s ON e.id = s.employee_id "
+          f"WHERE {{partition}} GROUP BY e.department")
+MERGE = ("key", "sum", "sum", "min", "max")
+
+
+def setup(conn, employees, sales):
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS `{EMPLOYEES}` (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            department VARCHAR(100)
+        )""")
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS `{SALES}` (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            employee_id INT,
+            sales_amount DECIMAL(10, 2),
+            INDEX idx_employee_id (employee_id)
+        )""")
+    cursor.execute(f"SELECT COUNT(*) FROM `{EMPLOYEES}`")
+    existing_employees = cursor.fetchone()[0]
+    cursor.execute(f"SELECT COUNT(*) FROM `{SALES}`")
+    existing_sales = cursor.fetchone()[0]
+    cursor.close()
+    rng = random.Random(11)
+    if existing_employees < employees:
+        bulk_insert(conn, EMPLOYEES, ["name", "department"],
+                    ((f"Employee {i}", rng.choice(DEPARTMENTS))
+                     for i in range(existing_employees, employees)))
+    if existing_sales < sales:
+        print(f"Loading {sales - existing_sales} sales rows...")
+        bulk_insert(conn, SALES, ["employee_id", "sales_amount"],
+                    ((rng.randint(1, employees), round(rng.uniform(1, 5000), 2))
+                     for _ in range(sales - existing_sales)))
+
+
+def single_query(conn):
+    cursor = conn.cursor()
+    cursor.execute(REPORT.replace("{partition}", "TRUE"))
+    rows = sorted(cursor.fetchall())
+    cursor.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--sales", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--output", default="bench_parallel.json")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    setup(conn, args.employees, args.sales)
+
+    single_query(conn)     # warm the buffer pool so both sides read from memory
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        expected = single_query(conn)
+        timings.append(time.perf_counter() - start)
+    baseline = min(timings)
+    print(f"{'single query':<24} {baseline:8.3f} s")
+    results = {"single_query_s": baseline, "parallel": {}}
+
+    for workers in args.workers:
+        with ParallelQuery(REPORT, "s.employee_id", MERGE, workers=workers,
+                           database=args.database) as query:
+            ranges = query.ranges(EMPLOYEES)
+            query.run(ranges=ranges)        # start the workers and open their connections
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                rows = query.run(ranges=ranges)
+                timings.append(time.perf_counter() - start)
+            if rows != expected:
+                raise SystemExit(f"{workers} workers: merged result differs from the single query")
+            best = min(timings)
+            print(f"{f'{workers} workers':<24} {best:8.3f} s  speedup {baseline / best:5.2f}x  "
+                  f"{query.stats}")
+            results["parallel"][workers] = {"seconds": best, "speedup": baseline / best,
+                                            "skew": query.stats.skew}
+    conn.close()
+    write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
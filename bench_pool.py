@@ -0,0 +1,75 @@
+"""
+Handshake cost per run: direct mysql.connector.connect() vs the shared pool.
+
+Replays the connection pattern of scripts 1-12 (connect, one statement,
+close) several times, first opening a fresh connection per script as the
+scripts used to, then checking connections out of db_pool.
+
+    python bench_pool.py --runs 20
+"""
+import argparse
+import time
+
+from bench_common import print_summary, summarize
+from db_pool import ConnectionPool, connection_config, open_connection
+
+# The database each numbered script connects to, in order.
+SCRIPT_DATABASES = [None, None] + ["Database1"] * 2 + ["test_db"] * 3 + ["Database1"] * 5
+
+
+def run_direct():
+    handshake_ns = 0
+    for database in SCRIPT_DATABASES:
+        start = time.perf_counter_ns()
+        conn = open_connection(database)
+        handshake_ns += time.perf_counter_ns() - start
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+    return handshake_ns
+
+
+def run_pooled(pool):
+    checkout_ns = 0
+    for database in SCRIPT_DATABASES:
+        start = time.perf_counter_ns()
+        conn = pool.acquire(database)
+        checkout_ns += time.perf_counter_ns() - start
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+    return checkout_ns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    # Both databases must exist for the replay to connect.
+    conn = open_connection()
+    cursor = conn.cursor()
+    cursor.execute("CREATE DATABASE IF NOT EXISTS Database1")
+    cursor.execute("CREATE DATABASE IF NOT EXISTS test_db")
+    cursor.close()
+    conn.close()
+
+    direct = [run_direct() for _ in range(args.runs)]
+
+    pool = ConnectionPool(size=args.pool_size, **connection_config())
+    pooled = [run_pooled(pool) for _ in range(args.runs)]
+    pool.close()
+
+    print(f"Connection cost per run of {len(SCRIPT_DATABASES)} scripts:")
+    print_summary("direct connect()", summarize(direct))
+    print_summary("pooled acquire()", summarize(pooled))
+    print(f"Pool stats: {pool.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Statements/sec for hot INSERT and point-SELECT paths, with and without db_prepared.
+
+Runs the 5_constraints.py INSERT and a SELECT by primary key --ops times
+each, first through a plain cursor (client-side interpolation, full parse
+on the server every time) and then through the connection's StatementCache.
+
+    python bench_prepared.py --ops 20000 --pure
+"""
+import argparse
+import random
+
+from bench_common import EMPLOYEE_COLUMNS, employee_rows, ensure_employees, print_summary, summarize, time_calls
+from db_pool import open_connection
+from db_prepared import statement_cache
+
+TABLE = "bench_prepared_employees"
+INSERT = (f"INSERT INTO `{TABLE}` ({', '.join(EMPLOYEE_COLUMNS)}) "
+          f"VALUES ({', '.join(['%s'] * len(EMPLOYEE_COLUMNS))})")
+SELECT = f"SELECT * FROM `{TABLE}` WHERE id = %s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=10_000)
+    parser.add_argument("--pure", action="store_true", help="use the pure-Python protocol")
+    parser.add_argument("--database", default="Database1")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database, use_pure=args.pure)
+    rows = ensure_employees(conn, TABLE, args.rows)
+    conn.autocommit = True
+    rng = random.Random(3)
+    # Fresh emails for every INSERT so the UNIQUE key never rejects one.
+    warmup = min(100, args.ops)
+    new_rows = employee_rows(2 * (args.ops + warmup), seed=5, start=rows + 1_000_000)
+
+    cursor = conn.cursor()
+
+    def plain_insert():
+        cursor.execute(INSERT, next(new_rows))
+
+    def plain_select():
+        cursor.execute(SELECT, (rng.randint(1, rows),))
+        cursor.fetchall()
+
+    statements = statement_cache(conn)
+
+    def prepared_insert():
+        statements.execute(INSERT, next(new_rows))
+
+    def prepared_select():
+        statements.query(SELECT, (rng.randint(1, rows),))
+
+    for label, func in [
+        ("INSERT, client-side interpolation", plain_insert),
+        ("INSERT, prepared (cached)", prepared_insert),
+        ("point SELECT, client-side interpolation", plain_select),
+        ("point SELECT, prepared (cached)", prepared_select),
+    ]:
+        print_summary(label, summarize(time_calls(func, args.ops, warmup)))
+
+    print(f"Statement cache: {statements.stats}, size {len(statements)}/{statements.max_size}")
+    cursor.close()
+    statements.clear()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
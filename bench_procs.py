@@ -0,0 +1,115 @@
+"""
+Calls/sec for an AddEmployee-style procedure: per-row CALLs vs pipelining.
+
+Inserts --rows employees through a copy of AddEmployee in each of these
+ways, on a scratch table, and reports calls per second:
+  * one CALL statement per row
+  * literal multi-statement CALL strings (11_Call_Stored_Procedure.py)
+  * Procedure.call_many(): bound parameters, pipelined
+  * a plain multi-row INSERT (db_bulk), as the upper bound
+
+    python bench_procs.py --rows 20000 --pipeline-size 200
+"""
+import argparse
+import random
+import time
+
+from bench_common import DEPARTMENTS
+from db_bulk import bulk_insert
+from db_pool import open_connection
+from db_procs import Procedure, run_multi
+
+TABLE = "bench_proc_employees"
+PROCEDURE = "bench_add_employee"
+
+
+def setup(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS `{TABLE}` (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            department VARCHAR(100),
+            salary DECIMAL(10, 2)
+        )""")
+    cursor.execute(f"DROP PROCEDURE IF EXISTS `{PROCEDURE}`")
+    cursor.execute(f"""
+        CREATE PROCEDURE `{PROCEDURE}`(IN emp_name VARCHAR(100), IN emp_department VARCHAR(100),
+                                       IN emp_salary DECIMAL(10,2))
+        BEGIN
+            INSERT INTO `{TABLE}` (name, department, salary)
+            VALUES (emp_name, emp_department, emp_salary);
+        END""")
+    cursor.close()
+
+
+def rows(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        (f"Employee {i}", rng.choice(DEPARTMENTS), round(rng.uniform(3000, 9000), 2))
+        for i in range(count)
+    ]
+
+
+def per_row(conn, data, _):
+    cursor = conn.cursor()
+    for row in data:
+        run_multi(cursor, f"CALL `{PROCEDURE}`(%s, %s, %s)", row)
+    cursor.close()
+
+
+def literal_multi(conn, data, batch):
+    # The synthetic names contain no quotes, so pasting them in is safe here.
+    cursor = conn.cursor()
+    for i in range(0, len(data), batch):
+        run_multi(cursor, "; ".join(
+            f"CALL `{PROCEDURE}`('{name}', '{department}', {salary:.2f})"
+            for name, department, salary in data[i:i + batch]
+        ))
+    cursor.close()
+
+
+def pipelined(conn, data, batch):
+    Procedure(conn, PROCEDURE, pipeline_size=batch).call_many(data)
+
+
+def multi_row_insert(conn, data, batch):
+    bulk_insert(conn, TABLE, ["name", "department", "salary"], data,
+                commit_every=len(data) + 1, max_rows=batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--pipeline-size", type=int, default=200)
+    parser.add_argument("--database", default="Database1")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    setup(conn)
+    data = rows(args.rows)
+    modes = [
+        ("one CALL per row", per_row),
+        ("literal multi-statement CALLs", literal_multi),
+        ("Procedure.call_many", pipelined),
+        ("multi-row INSERT", multi_row_insert),
+    ]
+    for label, run in modes:
+        cursor = conn.cursor()
+        cursor.execute(f"TRUNCATE TABLE `{TABLE}`")
+        cursor.close()
+        start = time.perf_counter()
+        run(conn, data, args.pipeline_size)
+        conn.commit()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<40} {elapsed:8.3f} s  {len(data) / elapsed:12.1f} calls/s")
+
+    cursor = conn.cursor()
+    cursor.execute(f"DROP PROCEDURE IF EXISTS `{PROCEDURE}`")
+    cursor.execute(f"DROP TABLE IF EXISTS `{TABLE}`")
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Throughput under contention: no retries vs db_retry.Retrier.
+
+--threads workers each run short transactions for --seconds. Every
+transaction moves salary between two random rows of a --hot-rows table,
+locking them in random order, so workers deadlock (1213) or time out
+waiting (1205, with innodb_lock_wait_timeout set to --lock-wait). With
+--kill-every a chaos thread KILLs a random worker's connection at that
+interval, so the workers also lose their session (2013). Without retries a
+worker stops at its first error, as the numbered scripts do. With a Retrier
+it backs off and carries on.
+
+    python bench_retry.py --threads 8 --seconds 10 --hot-rows 16 --kill-every 1
+"""
+import argparse
+import random
+import threading
+import time
+
+import mysql.connector
+
+from bench_common import write_json
+from db_pool import open_connection
+from db_retry import Retrier, RetryPolicy
+
+TABLE = "bench_retry_accounts"
+
+
+def setup(database, rows):
+    conn = open_connection(database)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{TABLE}`")
+    cursor.execute(f"CREATE TABLE `{TABLE}` (id INT PRIMARY KEY, salary DECIMAL(12,2) NOT NULL)")
+    cursor.executemany(f"INSERT INTO `{TABLE}` (id, salary) VALUES (%s, %s)",
+                       [(i, 100000) for i in range(1, rows + 1)])
+    conn.commit()
+    cursor.close()
+    return conn
+
+
+def move_salary(conn, rng, rows):
+    a, b = rng.sample(range(1, rows + 1), 2)
+    cursor = conn.cursor()
+    cursor.execute(f"UPDATE `{TABLE}` SET salary = salary - 1 WHERE id = %s", (a,))
+    cursor.execute(f"UPDATE `{TABLE}` SET salary = salary + 1 WHERE id = %s", (b,))
+    cursor.close()
+
+
+def worker(args, seed, retry, deadline, counts, sessions):
+    conn = open_connection(args.database)
+    rng = random.Random(seed)
+    retrier = Retrier(conn, policy=RetryPolicy(attempts=args.attempts)) if retry else None
+
+    def session(conn):
+        conn.cmd_query(f"SET SESSION innodb_lock_wait_timeout = {args.lock_wait}")
+        sessions[seed] = conn.connection_id
+
+    session(conn)
+    try:
+        while time.perf_counter() < deadline:
+            if retrier is None:
+                move_salary(conn, rng, args.hot_rows)
+                conn.commit()
+            else:
+                before = retrier.stats.reconnects
+                retrier.transaction(move_salary, rng, args.hot_rows)
+                if retrier.stats.reconnects != before:
+                    session(retrier.conn)
+            counts["committed"] += 1
+    except mysql.connector.Error as err:
+        counts["errors"][err.errno] = counts["errors"].get(err.errno, 0) + 1
+    finally:
+        sessions.pop(seed, None)
+        try:
+            (retrier.conn if retrier else conn).close()
+        except mysql.connector.Error:
+            pass
+        if retrier is not None:
+            counts["retry_stats"].append(retrier.stats.as_dict())
+
+
+def chaos(database, every, deadline, sessions, counts):
+    conn = open_connection(database)
+    cursor = conn.cursor()
+    while time.perf_counter() + every < deadline:
+        time.sleep(every)
+        victims = list(sessions.values())
+        if victims:
+            try:
+                cursor.execute(f"KILL {random.choice(victims)}")
+                counts["kills"] += 1
+            except mysql.connector.Error:
+                pass    # already gone
+    cursor.close()
+    conn.close()
+
+
+def run(args, retry):
+    counts = {"committed": 0, "errors": {}, "kills": 0, "retry_stats": []}
+    sessions = {}
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    threads = [threading.Thread(target=worker, args=(args, seed, retry, deadline, counts, sessions))
+               for seed in range(args.threads)]
+    if args.kill_every:
+        threads.append(threading.Thread(target=chaos, args=(args.database, args.kill_every,
+                                                            deadline, sessions, counts)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    retries = sum(s["retries"] for s in counts["retry_stats"])
+    reconnects = sum(s["reconnects"] for s in counts["retry_stats"])
+    return {"committed": counts["committed"], "seconds": elapsed,
+            "commits_per_sec": counts["committed"] / elapsed,
+            "workers_failed": sum(counts["errors"].values()), "errors": counts["errors"],
+            "kills": counts["kills"], "retries": retries, "reconnects": reconnects}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--hot-rows", type=int, default=16)
+    parser.add_argument("--lock-wait", type=int, default=1, help="innodb_lock_wait_timeout, seconds")
+    parser.add_argument("--kill-every", type=float, default=0, help="seconds between KILLs; 0 for none")
+    parser.add_argument("--attempts", type=int, default=8)
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--output", default="bench_retry.json")
+    args = parser.parse_args()
+
+    conn = setup(args.database, args.hot_rows)
+    results = {}
+    for label, retry in [("no retry", False), ("Retrier", True)]:
+        result = results[label] = run(args, retry)
+        print(f"{label:<10} {result['commits_per_sec']:10.1f} commits/s  "
+              f"committed {result['committed']:7d}  workers failed {result['workers_failed']:2d}/"
+              f"{args.threads}  retries {result['retries']:5d}  reconnects {result['reconnects']:3d}  "
+              f"errors {result['errors']}")
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT SUM(salary) FROM `{TABLE}`")
+    total = cursor.fetchone()[0]
+    print(f"Salary total {total} (expected {100000 * args.hot_rows}: every move is all-or-nothing)")
+    cursor.execute(f"DROP TABLE IF EXISTS `{TABLE}`")
+    cursor.close()
+    conn.close()
+    write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
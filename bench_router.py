@@ -0,0 +1,132 @@
+"""
+Read throughput: everything on the primary vs reads spread over replicas.
+
+--threads workers run the 9_joins.py INNER JOIN and point SELECTs against
+an employees/sales data set for --seconds. Every --write-every'th operation
+is an INSERT followed by a read of the row it wrote, which exercises
+read-your-writes: a GTID wait on a replica, or the primary with gtid_mode
+OFF. The first run sends everything to the primary through db_pool; the
+second goes through a Router over MYSQL_REPLICAS (or --replicas).
+
+    python bench_router.py --replicas 127.0.0.1:3307,127.0.0.1:3308 --threads 16
+
+Start the replicas as described under "Read/Write Splitting" in the README.
+The data set is created on the primary; wait for it to reach the replicas
+(--settle seconds) before the timed runs.
+"""
+import argparse
+import os
+import random
+import threading
+import time
+
+from bench_common import DEPARTMENTS, write_json
+from db_bulk import bulk_insert
+from db_pool import connect as pool_connect
+from db_router import Router, replica_addresses
+
+EMPLOYEES = "bench_router_employees"
+SALES = "bench_router_sales"
+JOIN = (f"SELECT e.name, e.department, s.sales_amount FROM {EMPLOYEES} e "
+        f"INNER JOIN {SALES} s ON e.id = s.employee_id WHERE e.department = %s")
+
+
+def setup(database, employees):
+    conn = pool_connect(database)
+    cursor = conn.cursor()
+    for table in (SALES, EMPLOYEES):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(f"CREATE TABLE {EMPLOYEES} (id INT AUTO_INCREMENT PRIMARY KEY, "
+                   f"name VARCHAR(100) NOT NULL, department VARCHAR(100), KEY (department))")
+    cursor.execute(f"CREATE TABLE {SALES} (employee_id INT, sales_amount DECIMAL(10, 2), "
+                   f"KEY (employee_id))")
+    cursor.close()
+    rng = random.Random(0)
+    bulk_insert(conn, EMPLOYEES, ["name", "department"],
+                ((f"Employee {i}", rng.choice(DEPARTMENTS)) for i in range(employees)))
+    bulk_insert(conn, SALES, ["employee_id", "sales_amount"],
+                ((rng.randint(1, employees), round(rng.uniform(100, 5000), 2)) for _ in range(employees * 3)))
+    conn.close()
+
+
+def worker(connect, args, seed, deadline, counts, lock):
+    conn = connect(args.database)
+    cursor = conn.cursor()
+    rng = random.Random(seed)
+    done = 0
+    stale = 0
+    while time.perf_counter() < deadline:
+        done += 1
+        if args.write_every and done % args.write_every == 0:
+            cursor.execute(f"INSERT INTO {EMPLOYEES} (name, department) VALUES (%s, %s)",
+                           (f"Hire {seed}-{done}", "Sales"))
+            new_id = cursor.lastrowid
+            conn.commit()
+            cursor.execute(f"SELECT id FROM {EMPLOYEES} WHERE id = %s", (new_id,))
+            if not cursor.fetchall():
+                stale += 1
+        elif rng.random() < 0.5:
+            cursor.execute(JOIN, (rng.choice(DEPARTMENTS),))
+            cursor.fetchall()
+        else:
+            cursor.execute(f"SELECT * FROM {EMPLOYEES} WHERE id = %s", (rng.randint(1, args.employees),))
+            cursor.fetchall()
+    cursor.close()
+    conn.close()
+    with lock:
+        counts["operations"] += done
+        counts["stale_reads"] += stale
+
+
+def run(connect, args):
+    counts = {"operations": 0, "stale_reads": 0}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    threads = [threading.Thread(target=worker, args=(connect, args, seed, deadline, counts, lock))
+               for seed in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {**counts, "seconds": elapsed, "ops_per_sec": counts["operations"] / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--replicas", default=None, help="host:port,... (default: MYSQL_REPLICAS)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--employees", type=int, default=20000)
+    parser.add_argument("--write-every", type=int, default=50, help="0 for a read-only run")
+    parser.add_argument("--settle", type=float, default=2.0)
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--output", default="bench_router.json")
+    args = parser.parse_args()
+
+    addresses = replica_addresses(args.replicas)
+    if not addresses:
+        parser.error("no replicas: pass --replicas or set MYSQL_REPLICAS")
+    # One primary session per worker (db_pool reads the size when it creates the pool).
+    os.environ["MYSQL_POOL_SIZE"] = str(max(int(os.getenv("MYSQL_POOL_SIZE", "5")), args.threads))
+    setup(args.database, args.employees)
+    time.sleep(args.settle)
+
+    router = Router([{"host": host, "port": port} for host, port in addresses],
+                    pool_size=args.threads)
+    results = {}
+    for label, connect in [("primary only", pool_connect), ("router", router.connect)]:
+        result = results[label] = run(connect, args)
+        print(f"{label:<14} {result['ops_per_sec']:10.1f} ops/s  operations {result['operations']:8d}  "
+              f"stale reads {result['stale_reads']}")
+    metrics = results["router"]["metrics"] = router.metrics()
+    print(f"Router: { {k: v for k, v in metrics.items() if k != 'replicas'} }")
+    for name, replica in metrics["replicas"].items():
+        print(f"  {name}: {replica}")
+    router.close()
+    write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
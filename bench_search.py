@@ -0,0 +1,81 @@
+"""
+Search latency on 1M+ descriptions: LIKE '%term%' scans vs MATCH ... AGAINST.
+
+Fills an employees table to --rows rows (descriptions are eight random words
+from a small vocabulary), adds a FULLTEXT index on description, then times,
+for each --terms entry:
+  * the 7_indexes.py query: SELECT ... WHERE description LIKE '%term%' LIMIT n
+  * FullTextSearch.search(term), natural language mode, first page
+  * FullTextSearch.search(+term +other, mode="boolean")
+  * the natural-mode search again through a QueryCache
+
+    python bench_search.py --rows 2000000 --terms engineer "financial analyst"
+"""
+import argparse
+
+from bench_common import ensure_employees, print_summary, summarize, time_calls, write_json
+from db_cache import QueryCache
+from db_pool import open_connection
+from db_search import FullTextSearch
+
+TABLE = "bench_search_employees"
+INDEX = "idx_fulltext_description"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--terms", nargs="+", default=["engineer", "financial analyst"])
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--output", default="bench_search.json")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    ensure_employees(conn, TABLE, args.rows)
+    columns = ["id", "name", "description"]
+    search = FullTextSearch(conn, TABLE, ["description"], columns=columns, page_size=args.page_size)
+    if search.refresh_index() is None:
+        print(f"Building FULLTEXT index {INDEX}...")
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE FULLTEXT INDEX {INDEX} ON `{TABLE}` (description)")
+        cursor.close()
+        search.refresh_index()
+    cached = FullTextSearch(conn, TABLE, ["description"], columns=columns,
+                            page_size=args.page_size, cache=QueryCache(ttl=300))
+
+    results = {}
+    for term in args.terms:
+        words = term.split()
+        like_sql = (f"SELECT {', '.join(columns)} FROM `{TABLE}` WHERE "
+                    + " AND ".join(["description LIKE %s"] * len(words))
+                    + f" LIMIT {args.page_size}")
+        like_params = tuple(f"%{w}%" for w in words)
+
+        def like_scan():
+            cursor = conn.cursor()
+            cursor.execute(like_sql, like_params)
+            cursor.fetchall()
+            cursor.close()
+
+        boolean = " ".join(f"+{w}" for w in words)
+        for label, func, repeat in [
+            ("LIKE scan", like_scan, max(3, args.repeat // 5)),
+            ("MATCH natural", lambda: search.search(term), args.repeat),
+            ("MATCH boolean", lambda: search.search(boolean, mode="boolean"), args.repeat),
+            ("MATCH natural, cached", lambda: cached.search(term), args.repeat),
+        ]:
+            summary = summarize(time_calls(func, repeat, warmup=1))
+            print_summary(f"{term!r}: {label}", summary)
+            results[f"{term}: {label}"] = summary
+        top = search.search(term)
+        print(f"  {top}; best score {top.rows[0][-1] if top.rows else None}")
+
+    print(f"Cache: {cached.cache.metrics()}")
+    conn.close()
+    write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
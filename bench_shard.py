@@ -0,0 +1,137 @@
+"""
+Throughput as the employees/sales data set is spread over more shards.
+
+For each --counts entry N, the first N --shards are emptied and loaded with
+--employees employees and their sales through db_shard. Then --threads
+workers run a mix of shard-local operations for --seconds: the 9_joins.py
+INNER JOIN for one employee, and a new sale for an employee (every
+--write-every'th operation). The employee_sales aggregate is then timed as
+a scatter-gather over all N shards. With --reshard, a final run adds the
+next shard from the list under the same load, and reports how many
+employees moved and the throughput while they did.
+
+    python bench_shard.py --shards 127.0.0.1:3306/shard0,127.0.0.1:3307/shard1,\\
+127.0.0.1:3308/shard2,127.0.0.1:3309/shard3,127.0.0.1:3310/shard4 --counts 1 2 4 --reshard
+
+Shards that are schemas on one server (the default shard0..shard4) share
+its CPU and disk. Put them on separate mysqld instances to see the scaling.
+The README's "Sharding" section shows how to start them.
+"""
+import argparse
+import random
+import threading
+import time
+
+from bench_common import DEPARTMENTS, write_json
+from db_shard import Resharder, ShardedDatabase, shard_names
+
+JOIN = ("SELECT e.name, e.department, s.sales_amount FROM employees e "
+        "INNER JOIN sales s ON e.id = s.employee_id WHERE e.id = %s")
+
+
+def load(cluster, employees, chunk=5000):
+    cluster.create_tables()     # creates the shard databases on a first run
+    for shard in cluster.shards.values():
+        conn = shard.pool.acquire()
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS sales")
+        cursor.execute("DROP TABLE IF EXISTS employees")
+        cursor.execute("DROP TABLE IF EXISTS shard_sequence")
+        cursor.close()
+        conn.close()
+    cluster.create_tables()
+    rng = random.Random(0)
+    ids = []
+    for start in range(0, employees, chunk):
+        batch = cluster.add_employees((f"Employee {i}", rng.choice(DEPARTMENTS))
+                                      for i in range(start, min(start + chunk, employees)))
+        cluster.add_sales((key, round(rng.uniform(100, 5000), 2)) for key in batch for _ in range(2))
+        ids.extend(batch)
+    return ids
+
+
+def worker(cluster, ids, args, seed, stop, counts, lock):
+    rng = random.Random(seed)
+    done = 0
+    while not stop.is_set():
+        done += 1
+        key = rng.choice(ids)
+        if args.write_every and done % args.write_every == 0:
+            cluster.add_sales([(key, round(rng.uniform(100, 5000), 2))])
+        else:
+            cluster.query(key, JOIN, (key,))
+    with lock:
+        counts["operations"] += done
+
+
+def run(cluster, ids, args, during=None):
+    """Run the workload for --seconds, or for as long as during() takes."""
+    counts = {"operations": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    threads = [threading.Thread(target=worker, args=(cluster, ids, args, seed, stop, counts, lock))
+               for seed in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    result = during() if during else time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {**counts, "seconds": elapsed, "ops_per_sec": counts["operations"] / elapsed}, result
+
+
+def time_scatter(cluster, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        rows = cluster.employee_sales()
+    return (time.perf_counter() - start) / runs, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shards", default="shard0,shard1,shard2,shard3,shard4",
+                        help="shard names, in the order they are added")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--write-every", type=int, default=5, help="0 for a read-only run")
+    parser.add_argument("--scatter-runs", type=int, default=5)
+    parser.add_argument("--reshard", action="store_true",
+                        help="then add the next shard under load with Resharder")
+    parser.add_argument("--output", default="bench_shard.json")
+    args = parser.parse_args()
+
+    names = shard_names(args.shards)
+    if max(args.counts) + args.reshard > len(names):
+        parser.error(f"--counts {max(args.counts)}{' plus --reshard' if args.reshard else ''} "
+                     f"needs more than the {len(names)} --shards given")
+    results = {}
+    for count in args.counts:
+        with ShardedDatabase(names[:count], pool_size=args.threads) as cluster:
+            ids = load(cluster, args.employees)
+            result, _ = run(cluster, ids, args)
+            result["scatter_seconds"], groups = time_scatter(cluster, args.scatter_runs)
+            results[f"{count} shards"] = result
+            print(f"{count} shards  {result['ops_per_sec']:10.1f} ops/s  operations {result['operations']:8d}  "
+                  f"employee_sales over {groups} groups {result['scatter_seconds'] * 1000:8.1f} ms")
+
+            if args.reshard and count == max(args.counts):
+                target = names[:count + 1]
+                result, stats = run(cluster, ids, args, during=Resharder(cluster, target).run)
+                result["moved_employees"] = stats.employees
+                result["moved_fraction"] = stats.employees / args.employees
+                result["pause_seconds"] = stats.pause_seconds
+                results[f"resharding {count} -> {count + 1}"] = result
+                print(f"resharding {count} -> {count + 1}  {result['ops_per_sec']:10.1f} ops/s during "
+                      f"{result['seconds']:.2f} s  moved {stats.employees} employees "
+                      f"({result['moved_fraction']:.1%}, ideal {1 / (count + 1):.1%})  "
+                      f"final pause {stats.pause_seconds * 1000:.1f} ms")
+                print("  " + "  ".join(f"{name} {employees}" for name, (employees, _) in cluster.counts().items()))
+    write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
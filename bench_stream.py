@@ -0,0 +1,73 @@
+"""
+Peak memory and time for reading a whole employees table: fetchall() vs the
+streaming helpers in db_stream.py.
+
+The table is created and filled with synthetic rows on first use (10M rows
+by default, which takes a while; pass --rows to use a smaller table). The
+connection uses the pure-Python protocol so that tracemalloc sees every
+allocation the driver makes.
+
+    python bench_stream.py --rows 10000000
+"""
+import argparse
+import time
+
+from bench_common import ensure_employees, measure_peak_memory
+from db_pool import open_connection
+from db_stream import keyset_pages, stream_batches, stream_rows
+
+TABLE = "bench_stream_employees"
+
+
+def read_fetchall(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM `{TABLE}`")
+    count = len(cursor.fetchall())
+    cursor.close()
+    return count
+
+
+def read_stream_rows(conn):
+    return sum(1 for _ in stream_rows(conn, f"SELECT * FROM `{TABLE}`"))
+
+
+def read_stream_batches(conn, batch_size):
+    return sum(len(b) for b in stream_batches(conn, f"SELECT * FROM `{TABLE}`", batch_size=batch_size))
+
+
+def read_keyset(conn, page_size):
+    return sum(len(p) for p in keyset_pages(conn, TABLE, page_size=page_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--skip-fetchall", action="store_true",
+                        help="skip fetchall() when the table does not fit in memory")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database, use_pure=True)
+    ensure_employees(conn, TABLE, args.rows)
+
+    readers = [
+        ("stream_rows", lambda: read_stream_rows(conn)),
+        (f"stream_batches({args.batch_size})", lambda: read_stream_batches(conn, args.batch_size)),
+        (f"keyset_pages({args.batch_size})", lambda: read_keyset(conn, args.batch_size)),
+    ]
+    if not args.skip_fetchall:
+        readers.insert(0, ("fetchall", lambda: read_fetchall(conn)))
+
+    for label, reader in readers:
+        start = time.perf_counter()
+        count, peak = measure_peak_memory(reader)
+        seconds = time.perf_counter() - start
+        print(f"{label:<26} {count:>10} rows  {seconds:8.2f} s  "
+              f"peak {peak / 1024 / 1024:10.2f} MiB")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Single-row write throughput: commit per write vs UnitOfWork group commits.
+
+Inserts the same synthetic employees rows one INSERT at a time, first the
+way 5_constraints.py used to (execute, commit, roll back on error), then
+through UnitOfWork at each --batch-sizes entry. Every --fail-every'th row
+breaks the salary CHECK constraint, so the savepoint isolation is exercised
+too: each method should end with the same rows and the same failure count.
+With --fail-every 0 the batches are also run without savepoints.
+
+    python bench_unit_of_work.py --rows 20000 --batch-sizes 1 10 100 1000
+"""
+import argparse
+import time
+
+import mysql.connector
+
+from bench_common import EMPLOYEE_COLUMNS, employee_rows, write_json
+from db_pool import open_connection
+from db_unit_of_work import UnitOfWork, UnitStats
+
+TABLE = "bench_uow_employees"
+DDL = f"""
+CREATE TABLE `{TABLE}` (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE,
+    age INT,
+    department VARCHAR(100),
+    salary DECIMAL(10,2) NOT NULL CHECK (salary > 30000),
+    description TEXT
+)
+"""
+INSERT = (f"INSERT INTO `{TABLE}` ({', '.join(EMPLOYEE_COLUMNS)}) "
+          f"VALUES ({', '.join(['%s'] * len(EMPLOYEE_COLUMNS))})")
+
+
+def reset_table(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{TABLE}`")
+    cursor.execute(DDL)
+    cursor.close()
+    conn.commit()
+
+
+def workload(rows, fail_every):
+    salary = EMPLOYEE_COLUMNS.index("salary")
+    for i, row in enumerate(employee_rows(rows), 1):
+        if fail_every and i % fail_every == 0:
+            row = row[:salary] + (20000,) + row[salary + 1:]
+        yield row
+
+
+def commit_per_write(conn, rows):
+    # The scripts' approach: every statement is its own transaction.
+    stats = UnitStats()
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    for row in rows:
+        try:
+            cursor.execute(INSERT, row)
+            conn.commit()
+            stats.writes += 1
+            stats.commits += 1
+        except mysql.connector.Error:
+            conn.rollback()
+            stats.failed += 1
+    stats.seconds = time.perf_counter() - start
+    cursor.close()
+    return stats
+
+
+def unit_of_work(conn, rows, batch_size, isolate):
+    with UnitOfWork(conn, max_items=batch_size, max_delay=None, isolate=isolate) as unit:
+        for row in rows:
+            unit.execute(INSERT, row)
+    return unit.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--fail-every", type=int, default=100,
+                        help="every Nth row violates a CHECK constraint; 0 for none")
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--output", default="bench_unit_of_work.json")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    methods = [("commit per write", lambda rows: commit_per_write(conn, rows))]
+    for size in args.batch_sizes:
+        methods.append((f"UnitOfWork batch {size}",
+                        lambda rows, size=size: unit_of_work(conn, rows, size, True)))
+        if not args.fail_every:
+            methods.append((f"UnitOfWork batch {size}, no savepoints",
+                            lambda rows, size=size: unit_of_work(conn, rows, size, False)))
+
+    print(f"Inserting {args.rows} rows one at a time per method into {args.database}.{TABLE}")
+    results = {}
+    for label, method in methods:
+        reset_table(conn)
+        stats = method(workload(args.rows, args.fail_every))
+        print(f"{label:<36} {stats.writes_per_sec:12.1f} writes/s  {stats.seconds:8.2f} s  "
+              f"commits {stats.commits:7d}  failed {stats.failed:5d}")
+        results[label] = {"writes": stats.writes, "failed": stats.failed, "commits": stats.commits,
+                          "seconds": stats.seconds, "writes_per_sec": stats.writes_per_sec}
+
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{TABLE}`")
+    cursor.close()
+    conn.close()
+    write_json(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
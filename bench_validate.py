@@ -0,0 +1,132 @@
+"""
+Bulk-load throughput on clean vs dirty data: retry-on-error vs db_validate.
+
+Loads --rows employees into a copy of the 5_constraints.py table (NOT NULL,
+UNIQUE email, CHECKs on age and salary, self-referencing manager_id FK)
+twice: once clean, and once with --dirty-rate of the rows violating one
+constraint each. Two loaders are compared:
+  * multi-row INSERT batches that fall back to row-by-row INSERTs when a
+    batch is rejected (what catching exceptions forces)
+  * load_valid(): validate each batch client-side, insert only accepted rows
+
+    python bench_validate.py --rows 200000 --dirty-rate 0.02
+"""
+import argparse
+import random
+import time
+
+import mysql.connector
+
+from bench_common import DEPARTMENTS
+from db_pool import open_connection
+from db_validate import load_valid
+
+TABLE = "bench_validate_employees"
+COLUMNS = ["name", "email", "age", "department", "salary", "manager_id"]
+DDL = f"""
+CREATE TABLE `{TABLE}` (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE,
+    age INT CHECK (age >= 18),
+    department VARCHAR(100) DEFAULT 'General',
+    salary DECIMAL(10,2) NOT NULL CHECK (salary > 30000),
+    manager_id INT,
+    FOREIGN KEY (manager_id) REFERENCES `{TABLE}`(id)
+)"""
+
+
+def reset(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{TABLE}`")
+    cursor.execute(DDL)
+    # Every run starts with the manager that clean rows point at (id 1).
+    cursor.execute(f"INSERT INTO `{TABLE}` (name, email, age, department, salary) "
+                   f"VALUES ('Manager', 'manager@example.com', 40, 'IT', 90000)")
+    conn.commit()
+    cursor.close()
+
+
+def make_rows(count, dirty_rate, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = [f"Employee {i}", f"employee{i}@example.com", rng.randint(18, 65),
+               rng.choice(DEPARTMENTS), round(rng.uniform(30001, 200000), 2),
+               1 if rng.random() < 0.1 else None]
+        if i and rng.random() < dirty_rate:
+            fault = rng.randrange(5)
+            if fault == 0:
+                row[0] = None                                   # NOT NULL
+            elif fault == 1:
+                row[1] = f"employee{rng.randrange(i)}@example.com"  # UNIQUE
+            elif fault == 2:
+                row[2] = 17                                     # CHECK age
+            elif fault == 3:
+                row[4] = 20000                                  # CHECK salary
+            else:
+                row[5] = 10 ** 9                                # FOREIGN KEY
+        rows.append(tuple(row))
+    return rows
+
+
+def load_with_retry(conn, rows, batch_size):
+    column_list = ", ".join(COLUMNS)
+    placeholder = "(" + ", ".join(["%s"] * len(COLUMNS)) + ")"
+    single = f"INSERT INTO `{TABLE}` ({column_list}) VALUES {placeholder}"
+    cursor = conn.cursor()
+    rejected = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            cursor.execute(
+                f"INSERT INTO `{TABLE}` ({column_list}) VALUES {', '.join([placeholder] * len(batch))}",
+                [value for row in batch for value in row],
+            )
+            conn.commit()
+        except mysql.connector.Error:
+            conn.rollback()
+            for row in batch:
+                try:
+                    cursor.execute(single, row)
+                except mysql.connector.Error:
+                    rejected += 1
+            conn.commit()
+    cursor.close()
+    return rejected
+
+
+def load_validated(conn, rows, batch_size):
+    _, rejected = load_valid(conn, TABLE, COLUMNS, rows, batch_size=batch_size,
+                             max_rows=batch_size, commit_every=batch_size)
+    return len(rejected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dirty-rate", type=float, default=0.02)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--database", default="Database1")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    datasets = [("clean", make_rows(args.rows, 0.0)),
+                (f"{args.dirty_rate:.0%} dirty", make_rows(args.rows, args.dirty_rate))]
+    for label, loader in [("retry on error", load_with_retry), ("load_valid", load_validated)]:
+        for name, rows in datasets:
+            reset(conn)
+            start = time.perf_counter()
+            rejected = loader(conn, rows, args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"{label + ', ' + name:<40} {elapsed:8.3f} s  "
+                  f"{len(rows) / elapsed:12.1f} rows/s  rejected {rejected}")
+
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{TABLE}`")
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
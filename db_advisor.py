@@ -0,0 +1,629 @@
+"""
+Index advisor: recommend indexes to add and drop from the observed workload.
+
+6_indexes_1.py and 7_indexes.py create and drop idx_department,
+idx_age_salary and the FULLTEXT index by hand. The advisor works from what
+actually runs instead:
+
+    1. WorkloadRecorder, a db_instrument sink, records the statements executed
+       through the library (with their latency); Workload.from_digests() adds
+       performance_schema's statement digests.
+    2. Each statement's WHERE / JOIN ... ON / ORDER BY / GROUP BY is read for
+       equality, range and sort columns per table, and a candidate index is
+       built for it: equality columns (most selective first), then one range
+       or the sort columns. sys.schema_unused_indexes and left-prefix
+       duplicates give the indexes to drop.
+    3. Candidates are validated on a scratch copy of the tables (a sample of
+       their rows): EXPLAIN FORMAT=JSON runs before and after creating each
+       candidate there. A candidate the optimizer doesn't pick, or that
+       barely moves the cost, is discarded.
+    4. The report ranks the survivors by estimated latency saved: the
+       observed latency of every query the index helps, scaled by its cost
+       reduction.
+
+    from db_advisor import IndexAdvisor, Workload, WorkloadRecorder
+    from db_instrument import Instrumenter, install
+
+    recorder = WorkloadRecorder()
+    install(Instrumenter([recorder]))
+    ...                                          # run the application / scripts
+    workload = recorder.workload()
+    workload.merge(Workload.from_digests(conn))  # optional
+    report = IndexAdvisor(conn, workload).analyze()
+    print(report.format())
+
+or from the command line, from digests or a saved workload:
+
+    python db_advisor.py --database Database1 --workload workload.json --output advice.json
+
+The scratch schema (`<schema>_advisor_scratch`) is dropped afterwards. The
+source tables are only read.
+"""
+import argparse
+import json
+import re
+import threading
+
+import mysql.connector
+
+from db_pool import open_connection
+from db_profiler import parse_explain_json
+from db_schema import table_indexes
+from db_sql import fingerprint, is_read, normalize_sql, statement_verb, tables_written
+
+_KEYWORDS = {
+    "where", "on", "using", "join", "inner", "left", "right", "cross", "outer", "natural",
+    "straight_join", "group", "order", "limit", "having", "union", "for", "force", "use",
+    "ignore", "window", "set", "lock", "into", "as",
+}
+_COLUMN = r"((?:`?\w+`?\.)?`?[a-z_]\w*`?)"
+_TABLE_REF_RE = re.compile(
+    r"\b(?:from|join|update)\s+(`?\w+`?(?:\.`?\w+`?)?)(?:\s+(?:as\s+)?`?(\w+)`?)?", re.I)
+_CLAUSE_END = r"(?=\b(?:group\s+by|order\s+by|limit|having|union|for\s+update|window)\b|$)"
+_WHERE_RE = re.compile(rf"\bwhere\b(.*?){_CLAUSE_END}", re.I | re.S)
+_ON_RE = re.compile(
+    r"\bon\b(.*?)(?=\b(?:inner|left|right|cross|straight_join|join|where|group\s+by|order\s+by|limit)\b|$)",
+    re.I | re.S)
+_EQUAL_RE = re.compile(rf"{_COLUMN}\s*(?:=|<=>)\s*(?:\?|\(\?\+\)|null)|{_COLUMN}\s+(?:in\s*\(|is\s+null)",
+                       re.I)
+_JOIN_EQUAL_RE = re.compile(rf"{_COLUMN}\s*=\s*{_COLUMN}", re.I)
+_RANGE_RE = re.compile(rf"{_COLUMN}\s*(?:<=|>=|<|>)\s*\?|{_COLUMN}\s+between\b", re.I)
+_ORDER_RE = re.compile(r"\b(order|group)\s+by\s+(.*?)(?=\b(?:limit|having|order\s+by|for\s+update)\b|$)",
+                       re.I | re.S)
+_LIKE_RE = re.compile(rf"{_COLUMN}\s+like\s+'([^']*)'", re.I)
+_MATCH_RE = re.compile(r"\bmatch\s*\(([^)]*)\)\s*against\b", re.I)
+
+
+def _bare(name):
+    return name.replace("`", "").lower()
+
+
+class WorkloadEntry:
+    """One statement shape with a runnable sample and what it cost."""
+
+    def __init__(self, fingerprint, sample, count=0, latency=0.0, rows_examined=0, source="library"):
+        self.fingerprint = fingerprint
+        self.sample = sample
+        self.count = count
+        self.latency = latency
+        self.rows_examined = rows_examined
+        self.source = source
+
+    def to_dict(self):
+        return {"fingerprint": self.fingerprint, "sample": self.sample, "count": self.count,
+                "latency": self.latency, "rows_examined": self.rows_examined, "source": self.source}
+
+    def __repr__(self):
+        return f"WorkloadEntry({self.fingerprint!r}, count={self.count}, latency={self.latency:.3f}s)"
+
+
+class Workload:
+    """Statement shapes by fingerprint, plus write counts per table."""
+
+    def __init__(self, entries=(), writes=None):
+        self.entries = {e.fingerprint: e for e in entries}
+        self.writes = dict(writes or {})
+
+    def add(self, entry):
+        current = self.entries.get(entry.fingerprint)
+        if current is None:
+            self.entries[entry.fingerprint] = entry
+            return
+        # Digests already include what the library recorded: keep the larger view.
+        if entry.count > current.count:
+            current.count, current.latency = entry.count, entry.latency
+            current.rows_examined = max(current.rows_examined, entry.rows_examined)
+        if not current.sample:
+            current.sample = entry.sample
+
+    def merge(self, other):
+        for entry in other.entries.values():
+            self.add(WorkloadEntry(**entry.to_dict()))
+        for table, count in other.writes.items():
+            self.writes[table] = max(self.writes.get(table, 0), count)
+        return self
+
+    def __len__(self):
+        return len(self.entries)
+
+    def save(self, path):
+        with open(path, "w") as fh:
+            json.dump({"entries": [e.to_dict() for e in self.entries.values()],
+                       "writes": self.writes}, fh, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            data = json.load(fh)
+        return cls([WorkloadEntry(**e) for e in data["entries"]], data.get("writes"))
+
+    @classmethod
+    def from_digests(cls, conn, schema=None, limit=500):
+        """
+        Statement digests for `schema` (default: the current database) from
+        performance_schema. Only digests with a complete QUERY_SAMPLE_TEXT
+        (MySQL 8.0.3+) can be validated, but all of them count as writes.
+        """
+        cursor = conn.cursor(buffered=True)
+        cursor.execute(
+            "SELECT DIGEST_TEXT, QUERY_SAMPLE_TEXT, COUNT_STAR, SUM_TIMER_WAIT / 1e12, SUM_ROWS_EXAMINED "
+            "FROM performance_schema.events_statements_summary_by_digest "
+            "WHERE SCHEMA_NAME = COALESCE(%s, DATABASE()) AND DIGEST_TEXT IS NOT NULL "
+            "ORDER BY SUM_TIMER_WAIT DESC LIMIT %s",
+            (schema, limit),
+        )
+        workload = cls()
+        for digest, sample, count, seconds, examined in cursor.fetchall():
+            # None: CALL, DDL on databases, multi-statement text - no table to charge.
+            for table in tables_written(digest) or ():
+                workload.writes[table] = workload.writes.get(table, 0) + int(count)
+            if not sample or sample.endswith("..."):
+                continue
+            workload.add(WorkloadEntry(fingerprint(sample), sample, int(count), float(seconds),
+                                       int(examined or 0), source="digest"))
+        cursor.close()
+        return workload
+
+
+class WorkloadRecorder:
+    """db_instrument sink that records executed statements into a Workload."""
+
+    def __init__(self):
+        self._workload = Workload()
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        if event.operation not in ("execute", "executemany") or event.error or not event.sql:
+            return
+        with self._lock:
+            # None: CALL, DDL on databases, multi-statement text - no table to charge.
+            for table in tables_written(event.sql) or ():
+                self._workload.writes[table] = self._workload.writes.get(table, 0) + 1
+            if not event.statement:
+                return
+            entry = self._workload.entries.get(event.fingerprint)
+            if entry is None:
+                entry = self._workload.entries[event.fingerprint] = WorkloadEntry(
+                    event.fingerprint, event.statement)
+            entry.count += 1
+            entry.latency += event.latency
+
+    def workload(self):
+        with self._lock:
+            return Workload().merge(self._workload)
+
+
+class QueryShape:
+    """Index-relevant columns of one statement, per table."""
+
+    def __init__(self):
+        self.aliases = {}          # alias or name -> table
+        self.equal = {}            # table -> [column] compared with a constant
+        self.join = {}             # table -> [column] compared with another table's column
+        self.range = {}
+        self.order = {}
+        self.like_scans = []       # (table, column) with a leading wildcard
+        self.fulltext = []         # (table, [columns]) used by MATCH ... AGAINST
+
+    @property
+    def tables(self):
+        return sorted(set(self.aliases.values()))
+
+    def _add(self, bucket, table, column):
+        columns = bucket.setdefault(table, [])
+        if column not in columns:
+            columns.append(column)
+
+
+def parse_query(sql, columns_of):
+    """
+    Pull the equality, range and sort columns of `sql` per table.
+
+    columns_of(table) -> set of column names; used to place unqualified
+    columns. Regex based, like db_sql: subqueries and expressions over
+    columns are not followed.
+    """
+    text = fingerprint(sql)
+    # LIKE patterns are literals, which fingerprint() replaces; read them from the original.
+    literal_where = " ".join(_WHERE_RE.findall(normalize_sql(sql)))
+    shape = QueryShape()
+    for ref, alias in _TABLE_REF_RE.findall(text):
+        table = _bare(ref).split(".")[-1]
+        if table in _KEYWORDS:
+            continue
+        shape.aliases[table] = table
+        if alias and alias.lower() not in _KEYWORDS:
+            shape.aliases[alias.lower()] = table
+
+    def resolve(column):
+        parts = _bare(column).split(".")
+        if len(parts) == 2:
+            table = shape.aliases.get(parts[0])
+            return (table, parts[1]) if table else None
+        owners = [t for t in shape.tables if parts[0] in columns_of(t)]
+        return (owners[0], parts[0]) if len(owners) == 1 else None
+
+    where = " ".join(_WHERE_RE.findall(text))
+    joins = " ".join(_ON_RE.findall(text))
+    for match in _JOIN_EQUAL_RE.finditer(joins + " " + where):
+        for side in match.groups():
+            found = resolve(side)
+            if found:
+                shape._add(shape.join, *found)
+    for match in _EQUAL_RE.finditer(where):
+        found = resolve(match.group(1) or match.group(2))
+        if found:
+            shape._add(shape.equal, *found)
+    for match in _RANGE_RE.finditer(where):
+        found = resolve(match.group(1) or match.group(2))
+        if found and found[1] not in shape.equal.get(found[0], []):
+            shape._add(shape.range, *found)
+    for match in _LIKE_RE.finditer(literal_where):
+        found = resolve(match.group(1))
+        if not found:
+            continue
+        if match.group(2).startswith(("%", "_")):
+            shape.like_scans.append(found)
+        else:
+            shape._add(shape.range, *found)
+    for _, columns in _ORDER_RE.findall(text):
+        for item in columns.split(","):
+            item = re.sub(r"\s+(?:asc|desc)\s*$", "", item.strip(), flags=re.I)
+            if re.fullmatch(_COLUMN, item, re.I):
+                found = resolve(item)
+                if found:
+                    shape._add(shape.order, *found)
+    for columns in _MATCH_RE.findall(text):
+        resolved = [resolve(c.strip()) for c in columns.split(",")]
+        if resolved and all(resolved) and len({t for t, _ in resolved}) == 1:
+            shape.fulltext.append((resolved[0][0], [c for _, c in resolved]))
+    return shape
+
+
+class Recommendation:
+    """One ranked action in the report."""
+
+    def __init__(self, action, table, index, columns, ddl, reason, estimated_savings=0.0,
+                 queries=(), cost_before=None, cost_after=None):
+        self.action = action
+        self.table = table
+        self.index = index
+        self.columns = list(columns)
+        self.ddl = ddl
+        self.reason = reason
+        self.estimated_savings = estimated_savings
+        self.queries = list(queries)
+        self.cost_before = cost_before
+        self.cost_after = cost_after
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"Recommendation({self.action} {self.table}.{self.index} {self.columns})"
+
+
+class AdvisorReport:
+    def __init__(self, recommendations, notes):
+        self.recommendations = recommendations
+        self.notes = notes
+
+    @property
+    def add(self):
+        return [r for r in self.recommendations if r.action == "add"]
+
+    @property
+    def drop(self):
+        return [r for r in self.recommendations if r.action == "drop"]
+
+    def format(self):
+        lines = []
+        for rank, rec in enumerate(self.recommendations, 1):
+            saving = f"~{rec.estimated_savings:.3f}s saved" if rec.action == "add" else ""
+            lines.append(f"{rank:>3}. {rec.action.upper():<4} {rec.table}.{rec.index} "
+                         f"({', '.join(rec.columns)}) {saving}")
+            lines.append(f"       {rec.reason}")
+            lines.append(f"       {rec.ddl}")
+        for note in self.notes:
+            lines.append(f"  note: {note}")
+        return "\n".join(lines) if lines else "No recommendations."
+
+    def to_dict(self):
+        return {"recommendations": [r.to_dict() for r in self.recommendations], "notes": self.notes}
+
+
+class IndexAdvisor:
+    """
+    Turn a Workload into ranked add/drop recommendations.
+
+    sample_rows     -- rows copied per table into the scratch schema
+    min_improvement -- fraction the EXPLAIN cost must drop for an index to count
+    max_columns     -- widest candidate index proposed
+    """
+
+    def __init__(self, conn, workload, schema=None, sample_rows=200_000, min_improvement=0.1,
+                 max_columns=4):
+        self.conn = conn
+        self.workload = workload
+        self.sample_rows = sample_rows
+        self.min_improvement = min_improvement
+        self.max_columns = max_columns
+        self.schema = schema or self._fetchone("SELECT DATABASE()")[0]
+        self.scratch = f"{self.schema}_advisor_scratch"[:64]
+        self.notes = []
+        self._columns = {}
+        self._base_tables = None
+
+    def analyze(self, keep_scratch=False):
+        shapes = []
+        for entry in self.workload.entries.values():
+            if entry.sample and statement_verb(entry.sample) in ("SELECT", "UPDATE", "DELETE", "WITH"):
+                shapes.append((entry, parse_query(entry.sample, self._table_columns)))
+        tables = sorted({t for _, shape in shapes for t in shape.tables if t in self._tables()})
+        existing = {t: table_indexes(self.conn, t, self.schema) for t in tables}
+        self._note_scans(shapes, existing)
+
+        self._create_scratch(tables)
+        try:
+            candidates = self._candidates(shapes, existing)
+            adds = self._validate(candidates, shapes)
+        finally:
+            if not keep_scratch:
+                self._execute(f"DROP DATABASE IF EXISTS `{self.scratch}`")
+        adds.sort(key=lambda r: r.estimated_savings, reverse=True)
+        drops = self._drops(tables, existing, adds)
+        return AdvisorReport(adds + drops, self.notes)
+
+    # -- introspection -------------------------------------------------------
+
+    def _tables(self):
+        if self._base_tables is None:
+            cursor = self.conn.cursor(buffered=True)
+            cursor.execute("SELECT TABLE_NAME FROM information_schema.TABLES "
+                           "WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'", (self.schema,))
+            self._base_tables = {name.lower() for (name,) in cursor.fetchall()}
+            cursor.close()
+        return self._base_tables
+
+    def _table_columns(self, table):
+        if table not in self._columns:
+            cursor = self.conn.cursor(buffered=True)
+            cursor.execute("SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+                           "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s", (self.schema, table))
+            self._columns[table] = {name.lower() for (name,) in cursor.fetchall()}
+            cursor.close()
+        return self._columns[table]
+
+    def _note_scans(self, shapes, existing):
+        seen = set()
+        for _, shape in shapes:
+            for table, column in shape.like_scans:
+                if (table, column) not in seen:
+                    seen.add((table, column))
+                    self.notes.append(
+                        f"{table}.{column} is searched with a leading-wildcard LIKE, which no B-tree "
+                        f"index can serve; use db_search.FullTextSearch with a FULLTEXT index")
+            for table, columns in shape.fulltext:
+                covered = any(info["type"] == "FULLTEXT" and
+                              sorted(c.lower() for c in info["columns"]) == sorted(columns)
+                              for info in existing.get(table, {}).values())
+                if not covered:
+                    self.notes.append(f"MATCH on {table}({', '.join(columns)}) needs "
+                                      f"CREATE FULLTEXT INDEX ON `{table}` ({', '.join(columns)})")
+
+    # -- scratch copy ----------------------------------------------------------
+
+    def _create_scratch(self, tables):
+        self._execute(f"DROP DATABASE IF EXISTS `{self.scratch}`")
+        self._execute(f"CREATE DATABASE `{self.scratch}`")
+        for table in tables:
+            self._execute(f"CREATE TABLE `{self.scratch}`.`{table}` LIKE `{self.schema}`.`{table}`")
+            self._execute(f"INSERT INTO `{self.scratch}`.`{table}` "
+                          f"SELECT * FROM `{self.schema}`.`{table}` LIMIT {int(self.sample_rows)}")
+            self._execute(f"ANALYZE TABLE `{self.scratch}`.`{table}`", fetch=True)
+        self.conn.commit()
+
+    def _distinct_ratio(self, table, column):
+        count, distinct = self._fetchone(
+            f"SELECT COUNT(*), COUNT(DISTINCT `{column}`) FROM `{self.scratch}`.`{table}`")
+        return distinct / count if count else 0.0
+
+    def _explain(self, sql):
+        """EXPLAIN cost of `sql` against the scratch schema, and the indexes it picks."""
+        text = re.sub(rf"`?{re.escape(self.schema)}`?\.", "", sql)
+        cursor = self.conn.cursor(buffered=True)
+        try:
+            cursor.execute(f"USE `{self.scratch}`")
+            cursor.execute(f"EXPLAIN FORMAT=JSON {text}")
+            tables, cost = parse_explain_json(cursor.fetchone()[0])
+        except mysql.connector.Error:
+            return None, set()
+        finally:
+            cursor.execute(f"USE `{self.schema}`")
+            cursor.close()
+        if cost is None:
+            cost = sum(t.get("rows_examined_per_scan") or 0 for t in tables)
+        # EXPLAIN names tables by alias, so report the chosen index names only.
+        return cost, {t["key"] for t in tables if t.get("key")}
+
+    # -- candidates --------------------------------------------------------------
+
+    def _candidates(self, shapes, existing):
+        """{(table, columns): [entries it should help]}"""
+        ratios = {}
+        candidates = {}
+        for entry, shape in shapes:
+            for table in shape.tables:
+                if table not in existing:
+                    continue
+                equal = shape.equal.get(table, [])
+                if any(info["unique"] and {c.lower() for c in info["columns"]} <= set(equal)
+                       for info in existing[table].values()):
+                    continue           # already a unique lookup
+                for column in equal:
+                    if (table, column) not in ratios:
+                        ratios[(table, column)] = self._distinct_ratio(table, column)
+                columns = sorted(equal, key=lambda c: -ratios[(table, c)])
+                columns.extend(c for c in shape.join.get(table, []) if c not in columns)
+                ranges = shape.range.get(table, [])
+                order = shape.order.get(table, [])
+                if ranges:
+                    columns.append(ranges[0])
+                elif order and len(shape.tables) == 1:
+                    columns.extend(c for c in order if c not in columns)
+                # InnoDB secondary indexes already end with the primary key.
+                primary = {c.lower() for c in existing[table].get("PRIMARY", {}).get("columns", [])}
+                columns = tuple([c for c in columns if c not in primary][:self.max_columns])
+                if not columns or self._covered(columns, existing[table]):
+                    continue
+                candidates.setdefault((table, columns), []).append(entry)
+        return candidates
+
+    @staticmethod
+    def _covered(columns, indexes):
+        for info in indexes.values():
+            if info["type"] != "BTREE":
+                continue
+            if tuple(c.lower() for c in info["columns"][:len(columns)]) == columns:
+                return True
+        return False
+
+    def _validate(self, candidates, shapes):
+        baseline = {}
+        for entry, _ in shapes:
+            if entry.fingerprint not in baseline:
+                baseline[entry.fingerprint] = self._explain(entry.sample)[0]
+        recommendations = []
+        for (table, columns), entries in candidates.items():
+            name = ("idx_" + "_".join(columns))[:64]
+            column_sql = ", ".join(f"`{c}`" for c in columns)
+            try:
+                self._execute(f"CREATE INDEX `{name}` ON `{self.scratch}`.`{table}` ({column_sql})")
+            except mysql.connector.Error as err:
+                self.notes.append(f"Could not try {table}({', '.join(columns)}): {err}")
+                continue
+            self._execute(f"ANALYZE TABLE `{self.scratch}`.`{table}`", fetch=True)
+            saved, helped, before_total, after_total = 0.0, [], 0.0, 0.0
+            try:
+                for entry in entries:
+                    before = baseline.get(entry.fingerprint)
+                    after, used = self._explain(entry.sample)
+                    if not before or after is None or name not in used:
+                        continue
+                    improvement = 1 - after / before
+                    if improvement < self.min_improvement:
+                        continue
+                    saved += entry.latency * improvement
+                    before_total += before
+                    after_total += after
+                    helped.append(entry.fingerprint)
+            finally:
+                self._execute(f"DROP INDEX `{name}` ON `{self.scratch}`.`{table}`")
+            if helped:
+                recommendations.append(Recommendation(
+                    "add", table, name, columns,
+                    f"CREATE INDEX `{name}` ON `{table}` ({column_sql})",
+                    f"chosen by EXPLAIN for {len(helped)} statement(s); "
+                    f"cost {before_total:.1f} -> {after_total:.1f}",
+                    saved, helped, before_total, after_total,
+                ))
+        return recommendations
+
+    # -- drops --------------------------------------------------------------------
+
+    def _drops(self, tables, existing, adds):
+        drops = {}
+        try:
+            cursor = self.conn.cursor(buffered=True)
+            cursor.execute("SELECT object_name, index_name FROM sys.schema_unused_indexes "
+                           "WHERE object_schema = %s", (self.schema,))
+            unused = cursor.fetchall()
+            cursor.close()
+        except mysql.connector.Error as err:
+            self.notes.append(f"sys.schema_unused_indexes unavailable ({err}); unused indexes not checked")
+            unused = []
+        for table, index in unused:
+            info = table_indexes(self.conn, table, self.schema).get(index)
+            if info is None or info["unique"]:
+                continue           # UNIQUE indexes enforce constraints even when never read
+            drops[(table, index)] = (info["columns"], "never used since the server started "
+                                                      "(sys.schema_unused_indexes)")
+        for table in tables:
+            indexes = existing[table]
+            for name, info in indexes.items():
+                if info["unique"] or info["type"] != "BTREE":
+                    continue
+                columns = [c.lower() for c in info["columns"]]
+                for other, other_info in indexes.items():
+                    wider = [c.lower() for c in other_info["columns"]]
+                    if other != name and other_info["type"] == "BTREE" and \
+                            len(wider) >= len(columns) and wider[:len(columns)] == columns and \
+                            (len(wider) > len(columns) or other_info["unique"] or name > other):
+                        drops[(table, name)] = (info["columns"], f"left prefix of `{other}` "
+                                                                 f"({', '.join(other_info['columns'])})")
+                        break
+        for add in adds:
+            for name, info in existing.get(add.table, {}).items():
+                columns = tuple(c.lower() for c in info["columns"])
+                if not info["unique"] and info["type"] == "BTREE" and \
+                        add.columns[:len(columns)] == list(columns) and len(columns) < len(add.columns):
+                    drops.setdefault((add.table, name), (info["columns"],
+                                                         f"made redundant by the proposed `{add.index}`"))
+        recommendations = []
+        for (table, name), (columns, reason) in drops.items():
+            writes = self.workload.writes.get(table, 0)
+            recommendations.append(Recommendation(
+                "drop", table, name, columns, f"DROP INDEX `{name}` ON `{table}`",
+                f"{reason}; every one of the {writes} recorded write(s) to {table} maintains it"))
+        recommendations.sort(key=lambda r: self.workload.writes.get(r.table, 0), reverse=True)
+        return recommendations
+
+    def _execute(self, sql, fetch=False):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql)
+            if fetch or cursor.with_rows:
+                cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _fetchone(self, sql, params=None):
+        cursor = self.conn.cursor(buffered=True)
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+
+def advise(conn, workload, **options):
+    """Convenience wrapper: IndexAdvisor(conn, workload, **options).analyze()."""
+    return IndexAdvisor(conn, workload, **options).analyze()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database", default="Database1")
+    parser.add_argument("--workload", help="Workload.save() file from a WorkloadRecorder")
+    parser.add_argument("--no-digests", action="store_true",
+                        help="don't read performance_schema statement digests")
+    parser.add_argument("--sample-rows", type=int, default=200_000)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    conn = open_connection(args.database)
+    workload = Workload.load(args.workload) if args.workload else Workload()
+    if not args.no_digests:
+        workload.merge(Workload.from_digests(conn))
+    reads = sum(1 for e in workload.entries.values() if is_read(e.sample or ""))
+    print(f"Workload: {len(workload)} statement shapes ({reads} reads)")
+    report = IndexAdvisor(conn, workload, sample_rows=args.sample_rows).analyze()
+    print(report.format())
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report.to_dict(), fh, indent=2, default=str)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
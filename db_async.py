@@ -0,0 +1,309 @@
+"""
+asyncio execution path for the operations the numbered scripts perform.
+
+Built on mysql-connector-python's own asyncio driver (mysql.connector.aio,
+9.0+), so no extra dependency is needed. AsyncPool is the asyncio twin of
+db_pool.ConnectionPool (bounded, health-checked, idle eviction, max
+lifetime); AsyncDB puts the script operations on top of it:
+
+    import asyncio
+    from db_async import AsyncDB
+
+    async def main():
+        db = await AsyncDB.create(database="Database1", size=100)
+        await db.execute("INSERT INTO employees (name, department) VALUES (%s, %s)",
+                         ("John Doe", "Sales"))
+        rows = await db.fetchall("SELECT * FROM employees WHERE department = %s", ("Sales",))
+        async for row in db.stream("SELECT * FROM employees"):
+            print(row)
+        async with db.transaction() as tx:
+            await tx.execute("UPDATE employees SET department = %s WHERE id = %s", ("HR", 1))
+        await db.callproc("AddEmployee", ("Alice Green", "HR", 4500.00, 30))
+        await db.close()
+
+    asyncio.run(main())
+
+Statements run outside transaction() are committed immediately. Each call
+holds a pooled connection only for its own duration, so one process can
+keep as many queries in flight as the pool has connections.
+"""
+import asyncio
+import contextlib
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+from db_pool import connection_config
+
+try:
+    from mysql.connector import aio as mysql_aio
+except ImportError:  # mysql-connector-python < 9.0
+    mysql_aio = None
+
+
+class _AsyncEntry:
+    __slots__ = ("conn", "created_at", "last_used", "database")
+
+    def __init__(self, conn, database):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        self.database = database
+
+
+class AsyncPool:
+    """
+    Bounded asyncio pool of mysql.connector.aio connections.
+
+    Takes the same sizing and health options as db_pool.ConnectionPool.
+    """
+
+    def __init__(self, size=100, max_idle=300, max_lifetime=3600, timeout=30,
+                 health_check=True, **config):
+        if mysql_aio is None:
+            raise ImportError("The asyncio path needs mysql-connector-python 9.0 or newer")
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.health_check = health_check
+        self._config = config or connection_config()
+        self._idle = deque()
+        self._slots = asyncio.Semaphore(size)
+        self._closed = False
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "handshake_seconds": 0.0}
+
+    @contextlib.asynccontextmanager
+    async def connection(self, database=None):
+        """Check out a connection for the duration of the `async with` block."""
+        entry = await self.acquire(database)
+        try:
+            yield entry.conn
+        except BaseException:
+            await self.release(entry, broken=not await _safe_rollback(entry.conn))
+            raise
+        else:
+            await self.release(entry)
+
+    async def acquire(self, database=None):
+        """
+        Check out a connection switched to `database`, or to the pool's
+        configured database when None, whatever the last borrower used.
+        """
+        if self._closed:
+            raise PoolError("Connection pool is closed")
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise PoolError(
+                f"No connection available within {self.timeout}s (pool size {self.size})"
+            ) from None
+        database = database or self._config.get("database")
+        try:
+            while True:
+                entry = await self._checkout(database)
+                if entry.database == database:
+                    return entry
+                if database:
+                    await entry.conn.set_database(database)
+                    entry.database = database
+                    return entry
+                # There is no USE back to "no database": open a fresh session.
+                await self._discard(entry)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, entry, broken=False):
+        try:
+            now = time.monotonic()
+            if not broken:
+                try:
+                    if entry.conn.unread_result:
+                        await entry.conn.consume_results()
+                    if entry.conn.in_transaction:
+                        await entry.conn.rollback()
+                except mysql.connector.Error:
+                    broken = True
+            if broken or self._closed or now - entry.created_at >= self.max_lifetime:
+                await self._discard(entry)
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        self._closed = True
+        while self._idle:
+            await self._discard(self._idle.popleft())
+
+    async def _checkout(self, database):
+        now = time.monotonic()
+        while self._idle and now - self._idle[0].last_used >= self.max_idle:
+            await self._discard(self._idle.popleft())
+        while self._idle:
+            entry = self._idle.pop()
+            if await self._is_healthy(entry):
+                self.stats["reused"] += 1
+                return entry
+            await self._discard(entry)
+        config = dict(self._config)
+        if database:
+            config["database"] = database
+        start = time.perf_counter()
+        conn = await mysql_aio.connect(**config)
+        self.stats["handshake_seconds"] += time.perf_counter() - start
+        self.stats["created"] += 1
+        return _AsyncEntry(conn, config.get("database"))
+
+    async def _is_healthy(self, entry):
+        if time.monotonic() - entry.created_at >= self.max_lifetime:
+            return False
+        if not self.health_check:
+            return True
+        try:
+            await entry.conn.ping()
+        except mysql.connector.Error:
+            return False
+        return True
+
+    async def _discard(self, entry):
+        self.stats["discarded"] += 1
+        with contextlib.suppress(mysql.connector.Error):
+            await entry.conn.close()
+
+
+async def _safe_rollback(conn):
+    try:
+        if conn.unread_result:
+            await conn.consume_results()
+        await conn.rollback()
+    except mysql.connector.Error:
+        return False
+    return True
+
+
+class AsyncTransaction:
+    """Statements sharing one connection and one transaction (see AsyncDB.transaction)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def execute(self, sql, params=None):
+        cursor = await self.conn.cursor()
+        try:
+            await cursor.execute(sql, params)
+            if cursor.with_rows:
+                await cursor.fetchall()
+            return cursor.rowcount
+        finally:
+            await cursor.close()
+
+    async def executemany(self, sql, seq_params):
+        cursor = await self.conn.cursor()
+        try:
+            await cursor.executemany(sql, seq_params)
+            return cursor.rowcount
+        finally:
+            await cursor.close()
+
+    async def fetchall(self, sql, params=None):
+        cursor = await self.conn.cursor()
+        try:
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+        finally:
+            await cursor.close()
+
+    async def fetchone(self, sql, params=None):
+        rows = await self.fetchall(sql, params)
+        return rows[0] if rows else None
+
+    async def callproc(self, name, args=()):
+        """Call a stored procedure; returns (args, [rows of each result set])."""
+        cursor = await self.conn.cursor()
+        try:
+            result_args = await cursor.callproc(name, args)
+            results = []
+            for result in cursor.stored_results():
+                results.append(await result.fetchall())
+            return result_args, results
+        finally:
+            await cursor.close()
+
+
+class AsyncDB:
+    """High-level async API over an AsyncPool."""
+
+    def __init__(self, pool, database=None):
+        self.pool = pool
+        self.database = database
+
+    @classmethod
+    async def create(cls, database=None, **pool_options):
+        """Build an AsyncDB with a pool configured from the environment."""
+        config = connection_config()
+        config.update(pool_options.pop("config", {}))
+        return cls(AsyncPool(**pool_options, **config), database)
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        """`async with db.transaction() as tx:` commits on success, rolls back on error."""
+        async with self.pool.connection(self.database) as conn:
+            tx = AsyncTransaction(conn)
+            await tx.execute("START TRANSACTION")
+            yield tx
+            await conn.commit()
+
+    async def execute(self, sql, params=None):
+        """Run one statement and commit it; returns the affected row count."""
+        async with self.pool.connection(self.database) as conn:
+            rowcount = await AsyncTransaction(conn).execute(sql, params)
+            await conn.commit()
+            return rowcount
+
+    async def executemany(self, sql, seq_params):
+        async with self.pool.connection(self.database) as conn:
+            rowcount = await AsyncTransaction(conn).executemany(sql, seq_params)
+            await conn.commit()
+            return rowcount
+
+    async def fetchall(self, sql, params=None):
+        async with self.pool.connection(self.database) as conn:
+            return await AsyncTransaction(conn).fetchall(sql, params)
+
+    async def fetchone(self, sql, params=None):
+        async with self.pool.connection(self.database) as conn:
+            return await AsyncTransaction(conn).fetchone(sql, params)
+
+    async def stream(self, sql, params=None, batch_size=1000):
+        """Async generator over rows, fetched in fetchmany() batches from an unbuffered cursor."""
+        async with self.pool.connection(self.database) as conn:
+            cursor = await conn.cursor(buffered=False)
+            try:
+                await cursor.execute(sql, params)
+                while True:
+                    batch = await cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    for row in batch:
+                        yield row
+            finally:
+                if conn.unread_result:
+                    await conn.consume_results()
+                await cursor.close()
+
+    async def callproc(self, name, args=()):
+        async with self.pool.connection(self.database) as conn:
+            result = await AsyncTransaction(conn).callproc(name, args)
+            await conn.commit()
+            return result
+
+    async def close(self):
+        await self.pool.close()
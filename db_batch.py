@@ -0,0 +1,197 @@
+"""
+Chunked, throttled UPDATE and DELETE for large tables.
+
+A single `UPDATE employees SET ... WHERE <broad predicate>` locks every
+matching row (and the gaps around them) until it commits, and builds up a
+large undo log. batch_update() / batch_delete() walk the primary key in
+chunks instead and apply the statement to one key range at a time, each
+chunk in its own short transaction. Between chunks they sleep in proportion
+to how long the chunk took, so the server gets breathing room under load.
+
+    from db_batch import batch_update, batch_delete
+
+    stats = batch_update(conn, "employees", "department = %s", ("Sales",),
+                         where="name = %s", where_params=("Alice Green",))
+    stats = batch_delete(conn, "employees", where="department IS NULL",
+                         checkpoint="purge.json")
+    print(stats)
+
+With `checkpoint` set, progress is saved after every chunk; running the same
+mutation again after a crash resumes after the last committed chunk.
+"""
+import json
+import os
+import time
+
+
+class MutationStats:
+    """Counters for one batch mutation."""
+
+    def __init__(self, last_key=None, rows_affected=0, chunks=0):
+        self.last_key = last_key
+        self.rows_affected = rows_affected
+        self.chunks = chunks
+        self.seconds = 0.0
+        self.sleep_seconds = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_affected / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"MutationStats(rows_affected={self.rows_affected}, chunks={self.chunks}, "
+            f"seconds={self.seconds:.3f}, sleep_seconds={self.sleep_seconds:.3f}, "
+            f"rows_per_sec={self.rows_per_sec:.1f}, last_key={self.last_key!r})"
+        )
+
+
+class BatchMutation:
+    """
+    Apply `statement` (an UPDATE ... SET or DELETE prefix) to `table` one
+    primary-key range at a time.
+
+    key           -- unique, indexed column to walk (the primary key)
+    chunk_size    -- keys per chunk; adapted toward chunk_time
+    chunk_time    -- target seconds per chunk; 0 keeps chunk_size fixed
+    sleep_ratio   -- sleep this fraction of each chunk's duration afterwards
+    max_sleep     -- upper bound on a single sleep, in seconds
+    checkpoint    -- JSON file to save/resume progress from
+    progress      -- optional callable(stats) invoked after every chunk
+    """
+
+    def __init__(self, conn, table, statement, params=(), where=None, where_params=(),
+                 key="id", chunk_size=1000, chunk_time=0.2, sleep_ratio=0.5,
+                 max_sleep=2.0, checkpoint=None, progress=None):
+        self.conn = conn
+        self.table = table
+        self.statement = statement
+        self.params = tuple(params)
+        self.where = where
+        self.where_params = tuple(where_params)
+        self.key = key
+        self.chunk_size = chunk_size
+        self.chunk_time = chunk_time
+        self.sleep_ratio = sleep_ratio
+        self.max_sleep = max_sleep
+        self.checkpoint = checkpoint
+        self.progress = progress
+
+    @property
+    def signature(self):
+        # Identifies the mutation so a checkpoint is never applied to a different one.
+        return json.dumps(
+            [self.table, self.statement, self.params, self.where, self.where_params, self.key],
+            default=str,
+        )
+
+    def run(self):
+        stats = self._load_checkpoint()
+        start = time.perf_counter()
+        max_key = self._fetchone(f"SELECT MAX(`{self.key}`) FROM `{self.table}`")[0]
+        if max_key is None:
+            self._clear_checkpoint()
+            return stats
+        chunk_size = self.chunk_size
+        filter_sql = f" AND ({self.where})" if self.where else ""
+        while stats.last_key is None or stats.last_key < max_key:
+            lower, lower_params = self._lower_bound(stats.last_key)
+            row = self._fetchone(
+                f"SELECT `{self.key}` FROM `{self.table}` WHERE {lower}`{self.key}` <= %s "
+                f"ORDER BY `{self.key}` LIMIT 1 OFFSET {int(chunk_size) - 1}",
+                lower_params + (max_key,),
+            )
+            upper = row[0] if row else max_key
+
+            chunk_start = time.perf_counter()
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(
+                    f"{self.statement} WHERE {lower}`{self.key}` <= %s{filter_sql}",
+                    self.params + lower_params + (upper,) + self.where_params,
+                )
+                affected = max(cursor.rowcount, 0)
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+            elapsed = time.perf_counter() - chunk_start
+
+            stats.last_key = upper
+            stats.rows_affected += affected
+            stats.chunks += 1
+            self._save_checkpoint(stats)
+            stats.seconds = time.perf_counter() - start
+            if self.progress is not None:
+                self.progress(stats)
+
+            if self.chunk_time and elapsed > 0:
+                factor = max(0.5, min(2.0, self.chunk_time / elapsed))
+                chunk_size = max(10, int(chunk_size * factor))
+            pause = min(self.max_sleep, elapsed * self.sleep_ratio)
+            if pause > 0 and upper != max_key:
+                time.sleep(pause)
+                stats.sleep_seconds += pause
+        stats.seconds = time.perf_counter() - start
+        self._clear_checkpoint()
+        return stats
+
+    def _lower_bound(self, last_key):
+        if last_key is None:
+            return "", ()
+        return f"`{self.key}` > %s AND ", (last_key,)
+
+    def _fetchone(self, sql, params=None):
+        cursor = self.conn.cursor(buffered=True)
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def _load_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return MutationStats()
+        with open(self.checkpoint) as fh:
+            saved = json.load(fh)
+        if saved.get("signature") != self.signature:
+            raise ValueError(
+                f"Checkpoint {self.checkpoint} belongs to a different mutation; "
+                f"remove it to start over"
+            )
+        return MutationStats(saved["last_key"], saved["rows_affected"], saved["chunks"])
+
+    def _save_checkpoint(self, stats):
+        if not self.checkpoint:
+            return
+        tmp_path = self.checkpoint + ".tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump({
+                "signature": self.signature,
+                "last_key": stats.last_key,
+                "rows_affected": stats.rows_affected,
+                "chunks": stats.chunks,
+            }, fh)
+        os.replace(tmp_path, self.checkpoint)
+
+    def _clear_checkpoint(self):
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+
+def batch_update(conn, table, set_clause, set_params=(), where=None, where_params=(),
+                 **options):
+    """UPDATE `table` SET `set_clause` [WHERE `where`], one key range at a time."""
+    return BatchMutation(
+        conn, table, f"UPDATE `{table}` SET {set_clause}", set_params,
+        where, where_params, **options
+    ).run()
+
+
+def batch_delete(conn, table, where=None, where_params=(), **options):
+    """DELETE FROM `table` [WHERE `where`], one key range at a time."""
+    return BatchMutation(
+        conn, table, f"DELETE FROM `{table}`", (), where, where_params, **options
+    ).run()
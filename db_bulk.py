@@ -0,0 +1,241 @@
+"""
+Bulk loading for large inserts.
+
+cursor.executemany() needs the whole data set as a Python list and sends it
+as one statement. BulkLoader streams rows from any iterable (a generator, or
+read_csv() for files), packs them into multi-row INSERTs that stay under the
+server's max_allowed_packet, and commits every `commit_every` rows, so peak
+memory depends on the batch size and not on the input size.
+
+    from db_bulk import BulkLoader, read_csv
+
+    loader = BulkLoader(conn, "employees", ["name", "age", "department"])
+    stats = loader.load(read_csv("employees.csv"))
+    print(stats)
+
+With use_load_data=True rows are spooled to a temporary file per chunk and
+sent with LOAD DATA LOCAL INFILE instead. That needs a connection opened
+with allow_local_infile=True and local_infile enabled on the server.
+"""
+import csv
+import os
+import tempfile
+import time
+
+# Fixed per-statement overhead allowance (INSERT header, packet header).
+_STATEMENT_OVERHEAD = 1024
+
+
+class LoadStats:
+    """Counters for one load() call."""
+
+    def __init__(self):
+        self.rows = 0
+        self.statements = 0
+        self.commits = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"LoadStats(rows={self.rows}, statements={self.statements}, "
+            f"commits={self.commits}, seconds={self.seconds:.3f}, "
+            f"rows_per_sec={self.rows_per_sec:.1f})"
+        )
+
+
+def read_csv(path, header=True, null_value="", encoding="utf-8"):
+    """Yield rows from a CSV file as tuples, mapping `null_value` to None."""
+    with open(path, newline="", encoding=encoding) as fh:
+        reader = csv.reader(fh)
+        if header:
+            next(reader, None)
+        for row in reader:
+            yield tuple(None if value == null_value else value for value in row)
+
+
+def estimate_row_bytes(row):
+    """
+    Upper bound on the bytes a row adds to an INSERT statement.
+
+    Strings are counted as if every character needed escaping, so the
+    estimate never undershoots what the connector actually sends.
+    """
+    size = 3  # "(", ")" and ","
+    for value in row:
+        if value is None:
+            size += 5
+        elif isinstance(value, (bytes, bytearray)):
+            size += 2 * len(value) + 3
+        elif isinstance(value, str):
+            size += 2 * len(value.encode("utf-8")) + 3
+        else:
+            size += len(str(value)) + 3
+    return size
+
+
+class BulkLoader:
+    """
+    Stream rows into `table` using multi-row INSERTs or LOAD DATA LOCAL INFILE.
+
+    conn            -- an open connection (pooled or direct)
+    columns         -- column names, in the order values appear in each row
+    commit_every    -- rows per transaction; None leaves committing to the caller
+    max_rows        -- cap on rows per INSERT statement
+    max_packet      -- statement size limit; defaults to @@max_allowed_packet
+    use_load_data   -- send each chunk with LOAD DATA LOCAL INFILE
+    progress        -- optional callable(stats), invoked after every commit
+    """
+
+    def __init__(self, conn, table, columns, commit_every=50000, max_rows=5000,
+                 max_packet=None, use_load_data=False, progress=None):
+        if not columns:
+            raise ValueError("At least one column is required")
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.commit_every = commit_every
+        self.max_rows = max_rows
+        self.use_load_data = use_load_data
+        self.progress = progress
+        self._max_packet = max_packet
+        column_list = ", ".join(f"`{name}`" for name in self.columns)
+        self._insert_prefix = f"INSERT INTO `{table}` ({column_list}) VALUES "
+        self._row_placeholder = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+        self._statement_cache = {}
+
+    @property
+    def max_packet(self):
+        if self._max_packet is None:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT @@max_allowed_packet")
+            self._max_packet = int(cursor.fetchone()[0])
+            cursor.close()
+        return self._max_packet
+
+    def load(self, rows):
+        """Load every row from the iterable and return a LoadStats."""
+        stats = LoadStats()
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            if self.use_load_data:
+                self._load_data(cursor, rows, stats, start)
+            else:
+                self._load_inserts(cursor, rows, stats, start)
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _load_inserts(self, cursor, rows, stats, start):
+        budget = self.max_packet - _STATEMENT_OVERHEAD - len(self._insert_prefix)
+        width = len(self.columns)
+        batch = []
+        batch_bytes = 0
+        uncommitted = 0
+        for row in rows:
+            if len(row) != width:
+                raise ValueError(
+                    f"Row has {len(row)} values, expected {width}: {row!r}"
+                )
+            row_bytes = estimate_row_bytes(row)
+            if batch and (batch_bytes + row_bytes > budget or len(batch) >= self.max_rows):
+                self._flush(cursor, batch, stats)
+                uncommitted += len(batch)
+                batch = []
+                batch_bytes = 0
+                if self.commit_every and uncommitted >= self.commit_every:
+                    self._commit(stats, start)
+                    uncommitted = 0
+            batch.append(row)
+            batch_bytes += row_bytes
+        if batch:
+            self._flush(cursor, batch, stats)
+            uncommitted += len(batch)
+        if uncommitted and self.commit_every:
+            self._commit(stats, start)
+
+    def _flush(self, cursor, batch, stats):
+        cursor.execute(self._statement(len(batch)), [v for row in batch for v in row])
+        stats.rows += len(batch)
+        stats.statements += 1
+
+    def _statement(self, row_count):
+        statement = self._statement_cache.get(row_count)
+        if statement is None:
+            statement = self._insert_prefix + ",".join([self._row_placeholder] * row_count)
+            # Batches are mostly full-size, so only a few shapes ever show up.
+            if len(self._statement_cache) > 4:
+                self._statement_cache.clear()
+            self._statement_cache[row_count] = statement
+        return statement
+
+    def _load_data(self, cursor, rows, stats, start):
+        column_list = ", ".join(f"`{name}`" for name in self.columns)
+        fd, path = tempfile.mkstemp(prefix="bulk_", suffix=".tsv")
+        os.close(fd)
+        try:
+            chunk = 0
+            fh = open(path, "w", encoding="utf-8", newline="\n")
+            try:
+                for row in rows:
+                    fh.write("\t".join(_load_data_value(v) for v in row))
+                    fh.write("\n")
+                    chunk += 1
+                    if self.commit_every and chunk >= self.commit_every:
+                        fh.close()
+                        self._send_file(cursor, path, column_list, chunk, stats, start)
+                        fh = open(path, "w", encoding="utf-8", newline="\n")
+                        chunk = 0
+            finally:
+                fh.close()
+            if chunk:
+                self._send_file(cursor, path, column_list, chunk, stats, start)
+        finally:
+            os.remove(path)
+
+    def _send_file(self, cursor, path, column_list, chunk, stats, start):
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE `{self.table}` "
+            f"CHARACTER SET utf8mb4 ({column_list})",
+            (path,),
+        )
+        stats.rows += chunk
+        stats.statements += 1
+        if self.commit_every:
+            self._commit(stats, start)
+
+    def _commit(self, stats, start):
+        self.conn.commit()
+        stats.commits += 1
+        if self.progress is not None:
+            stats.seconds = time.perf_counter() - start
+            self.progress(stats)
+
+
+def _load_data_value(value):
+    # LOAD DATA's default format: tab separated, backslash escaped, \N for NULL.
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    text = value.decode("utf-8") if isinstance(value, (bytes, bytearray)) else str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
+
+
+def bulk_insert(conn, table, columns, rows, **options):
+    """Convenience wrapper: BulkLoader(conn, table, columns, **options).load(rows)."""
+    return BulkLoader(conn, table, columns, **options).load(rows)
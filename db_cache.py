@@ -0,0 +1,306 @@
+"""
+Client-side query result cache with per-table invalidation.
+
+8_views.py and 9_joins.py run the same employees/sales queries over and
+over. CachedConnection wraps a connection so that reads are served from an
+in-process cache, and writes made through it evict every cached result that
+depends on the tables they touch:
+
+    from db_cache import CachedConnection, QueryCache
+
+    cache = QueryCache(max_bytes=64 * 1024 * 1024, ttl=30)
+    cache.add_view("employee_sales", ["employees", "sales"])
+    db = CachedConnection(conn, cache)
+
+    db.query("SELECT * FROM employee_sales")          # miss: goes to MySQL
+    db.query("SELECT  *  FROM employee_sales")        # hit (same normalized SQL)
+    db.execute("INSERT INTO sales VALUES (%s, %s)", (1, 99.5))  # evicts both
+    print(cache.metrics())
+
+Entries are keyed by whitespace-normalized SQL plus parameters and evicted
+by LRU, TTL and a total byte cap. Only writes that go through this layer
+invalidate entries; changes made by other clients become visible when the
+TTL expires. A write evicts its tables when it runs and again when the
+transaction commits or rolls back, and until then this connection's reads
+of those tables bypass the cache, so uncommitted rows are never cached.
+Callers get their own copy of the cached rows. Statements that aren't
+deterministic (NOW(), RAND(), session variables, locking reads) are never
+cached.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from db_sql import is_deterministic, is_read, normalize_sql, tables_read, tables_written
+
+
+def _copy_rows(rows):
+    return [dict(row) if isinstance(row, dict) else row for row in rows]
+
+
+def estimate_size(rows):
+    """Approximate memory held by a list of result rows, in bytes."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        if isinstance(row, dict):
+            row = row.values()
+        for value in row:
+            size += sys.getsizeof(value)
+    return size
+
+
+class _Entry:
+    __slots__ = ("rows", "tables", "size", "expires_at")
+
+    def __init__(self, rows, tables, size, expires_at):
+        self.rows = rows
+        self.tables = tables
+        self.size = size
+        self.expires_at = expires_at
+
+
+class QueryCache:
+    """
+    Thread-safe LRU + TTL cache of query results, bounded by total bytes.
+
+    max_bytes    -- evict least recently used entries beyond this total size
+    ttl          -- seconds an entry stays valid (None: until invalidated)
+    max_entries  -- hard cap on the number of entries
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=60, max_entries=10000):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._by_table = {}
+        self._versions = {}
+        self._views = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._metrics = dict.fromkeys(
+            ("hits", "misses", "evictions", "expirations", "invalidations",
+             "uncacheable", "oversized"), 0)
+
+    def add_view(self, view, tables):
+        """Declare that `view` reads from `tables`, so writes to them evict it."""
+        with self._lock:
+            self._views[view.lower()] = {t.lower() for t in tables}
+
+    def load_views(self, conn):
+        """Register every view of the current database from information_schema."""
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT VIEW_NAME, TABLE_NAME FROM information_schema.VIEW_TABLE_USAGE "
+            "WHERE VIEW_SCHEMA = DATABASE()"
+        )
+        views = {}
+        for view, table in cursor.fetchall():
+            views.setdefault(view, []).append(table)
+        cursor.close()
+        for view, tables in views.items():
+            self.add_view(view, tables)
+
+    def key(self, sql, params=None):
+        return (normalize_sql(sql), repr(tuple(params)) if params is not None else None)
+
+    def dependencies(self, sql):
+        """Base tables a read depends on, expanding registered views."""
+        tables = set()
+        for name in tables_read(sql):
+            tables.add(name)
+            tables |= self._views.get(name, set())
+        return frozenset(tables)
+
+    def versions(self, tables):
+        with self._lock:
+            return {t: self._versions.get(t, 0) for t in tables}
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._metrics["misses"] += 1
+                return None
+            if entry.expires_at is not None and entry.expires_at <= now:
+                self._remove(key)
+                self._metrics["expirations"] += 1
+                self._metrics["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._metrics["hits"] += 1
+            return _copy_rows(entry.rows)
+
+    def put(self, key, rows, tables, versions=None):
+        """
+        Store `rows`. When `versions` (from versions() taken before the query
+        ran) no longer match, a write raced with the read and nothing is stored.
+        """
+        size = estimate_size(rows)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if versions and any(self._versions.get(t, 0) != v for t, v in versions.items()):
+                return False
+            if size > self.max_bytes:
+                self._metrics["oversized"] += 1
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(_copy_rows(rows), tables, size, expires_at)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._metrics["evictions"] += 1
+            return True
+
+    def invalidate(self, tables=None):
+        """Evict entries depending on `tables`; None evicts everything."""
+        with self._lock:
+            if tables is None:
+                count = len(self._entries)
+                self._entries.clear()
+                self._by_table.clear()
+                self._bytes = 0
+                for table in self._versions:
+                    self._versions[table] += 1
+                # Unknown writes may touch tables we have no version for yet.
+                self._versions["*"] = self._versions.get("*", 0) + 1
+                self._metrics["invalidations"] += count
+                return count
+            expanded = {t.lower() for t in tables}
+            for view, base in self._views.items():
+                if base & expanded:
+                    expanded.add(view)
+            count = 0
+            for table in expanded:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                for key in list(self._by_table.get(table, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        count += 1
+            self._metrics["invalidations"] += count
+            return count
+
+    def record_uncacheable(self):
+        with self._lock:
+            self._metrics["uncacheable"] += 1
+
+    def metrics(self):
+        with self._lock:
+            lookups = self._metrics["hits"] + self._metrics["misses"]
+            return {
+                **self._metrics,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_ratio": self._metrics["hits"] / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+
+class CachedConnection:
+    """
+    Run reads through a QueryCache and writes straight to MySQL, evicting
+    the cached results of every table a write touches.
+    """
+
+    def __init__(self, conn, cache=None):
+        self.conn = conn
+        self.cache = cache if cache is not None else QueryCache()
+        # Tables written in the open transaction; None once an unknown write ran.
+        self._pending = set()
+
+    def query(self, sql, params=None):
+        """Return all rows of a read, from the cache when possible."""
+        if not (is_read(sql) and is_deterministic(sql)):
+            self.cache.record_uncacheable()
+            return self._fetch(sql, params)
+        tables = self.cache.dependencies(sql)
+        if self._pending is None or self._pending & tables:
+            # Our own uncommitted writes: neither serve nor store a shared result.
+            return self._fetch(sql, params)
+        key = self.cache.key(sql, params)
+        rows = self.cache.get(key)
+        if rows is not None:
+            return rows
+        versions = self.cache.versions(tables | {"*"})
+        rows = self._fetch(sql, params)
+        self.cache.put(key, rows, tables, versions)
+        return rows
+
+    def execute(self, sql, params=None):
+        """Run a write (or any statement) and invalidate what it touches. Returns rowcount."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            if cursor.with_rows:
+                cursor.fetchall()
+            rowcount = cursor.rowcount
+        finally:
+            cursor.close()
+            self._invalidate_for(sql)
+        return rowcount
+
+    def executemany(self, sql, seq_params):
+        cursor = self.conn.cursor()
+        try:
+            cursor.executemany(sql, seq_params)
+            rowcount = cursor.rowcount
+        finally:
+            cursor.close()
+            self._invalidate_for(sql)
+        return rowcount
+
+    def commit(self):
+        try:
+            self.conn.commit()
+        finally:
+            self._end_transaction()
+
+    def rollback(self):
+        try:
+            self.conn.rollback()
+        finally:
+            self._end_transaction()
+
+    def _invalidate_for(self, sql):
+        if is_read(sql):
+            return
+        tables = tables_written(sql)
+        self.cache.invalidate(tables)
+        if getattr(self.conn, "autocommit", False):
+            return
+        if tables is None or self._pending is None:
+            self._pending = None
+        else:
+            self._pending |= {t.lower() for t in tables}
+
+    def _end_transaction(self):
+        # Other connections may have cached pre-commit rows since the write ran.
+        pending, self._pending = self._pending, set()
+        if pending is None:
+            self.cache.invalidate()
+        elif pending:
+            self.cache.invalidate(pending)
+
+    def _fetch(self, sql, params):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
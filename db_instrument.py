@@ -0,0 +1,452 @@
+"""
+Per-query instrumentation: latency, rows, bytes and pool wait for every statement.
+
+Wrap a connection (or install on the shared pool) and every execute,
+executemany, callproc, fetch, commit and rollback becomes a QueryEvent that
+is handed to the configured sinks. Statements are grouped by fingerprint
+(db_sql.fingerprint: literals replaced with ?), so "WHERE id = 1" and
+"WHERE id = 2" land in the same histogram.
+
+    from db_instrument import Instrumenter, HistogramSink, JsonLinesSink, OpenMetricsSink, install
+
+    metrics = OpenMetricsSink()
+    instrumenter = Instrumenter([metrics, JsonLinesSink("queries.jsonl")], slow_threshold=0.1)
+    install(instrumenter)              # every db_pool.connect() is now instrumented
+    ...
+    print(metrics.render())            # OpenMetrics text for a scrape endpoint or a file
+
+A statement slower than slow_threshold seconds (execute plus fetch) gets its
+EXPLAIN FORMAT=JSON plan attached and is reported again as a "slow" event.
+Byte counts are estimates: the statement text sent, and the length of the
+values received.
+"""
+import bisect
+import json
+import math
+import threading
+import time
+
+import mysql.connector
+
+from db_pool import add_connect_hook, remove_connect_hook
+from db_profiler import parse_explain_json
+from db_sql import fingerprint, is_read
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueryEvent:
+    """One instrumented operation."""
+
+    def __init__(self, operation, sql=None, latency=0.0, rows=0, bytes_sent=0,
+                 bytes_received=0, wait_seconds=0.0, error=None, explain=None, statement=None):
+        self.operation = operation
+        self.sql = sql
+        # The statement as sent, parameters included (execute only); kept out of to_dict().
+        self.statement = statement
+        self.fingerprint = fingerprint(sql) if sql else operation
+        self.latency = latency
+        self.rows = rows
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.wait_seconds = wait_seconds
+        self.error = error
+        self.explain = explain
+        self.timestamp = time.time()
+
+    def to_dict(self):
+        return {
+            "ts": self.timestamp,
+            "operation": self.operation,
+            "fingerprint": self.fingerprint,
+            "latency": self.latency,
+            "rows": self.rows,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "wait_seconds": self.wait_seconds,
+            "error": self.error,
+            "explain": self.explain,
+        }
+
+    def __repr__(self):
+        return (f"QueryEvent({self.operation} {self.fingerprint!r} {self.latency * 1000:.3f} ms, "
+                f"rows={self.rows})")
+
+
+class Instrumenter:
+    """
+    Dispatches QueryEvents to sinks.
+
+    sinks          -- objects with emit(event)
+    slow_threshold -- seconds; slower statements get EXPLAIN attached (None disables)
+    explain        -- run EXPLAIN for slow statements (reads only, never DML)
+    """
+
+    def __init__(self, sinks=(), slow_threshold=None, explain=True):
+        self.sinks = list(sinks)
+        self.slow_threshold = slow_threshold
+        self.explain = explain
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def wrap(self, conn, wait_seconds=0.0):
+        """Instrument `conn`; wait_seconds is how long the checkout took."""
+        if isinstance(conn, InstrumentedConnection):
+            return conn
+        self.emit(QueryEvent("acquire", latency=wait_seconds, wait_seconds=wait_seconds))
+        return InstrumentedConnection(conn, self, wait_seconds)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors, commit() and rollback() report to an Instrumenter."""
+
+    def __init__(self, conn, instrumenter, wait_seconds=0.0):
+        self._conn = conn
+        self._instrumenter = instrumenter
+        self.wait_seconds = wait_seconds
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self)
+
+    def commit(self):
+        self._timed("commit", self._conn.commit)
+
+    def rollback(self):
+        self._timed("rollback", self._conn.rollback)
+
+    def _timed(self, operation, func):
+        start = time.perf_counter()
+        error = None
+        try:
+            return func()
+        except mysql.connector.Error as err:
+            error = str(err)
+            raise
+        finally:
+            self._instrumenter.emit(QueryEvent(operation, latency=time.perf_counter() - start,
+                                               error=error))
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy that times execute/executemany/callproc and the fetches
+    that follow, and emits one event per call.
+    """
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+        self._instrumenter = connection._instrumenter
+        self._statement = None      # [sql, params, total latency, rows fetched]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._run("execute", operation, params,
+                         lambda: self._cursor.execute(operation, params, *args, **kwargs))
+
+    def executemany(self, operation, seq_params):
+        seq_params = list(seq_params)
+        return self._run("executemany", operation, seq_params,
+                         lambda: self._cursor.executemany(operation, seq_params))
+
+    def callproc(self, procname, args=()):
+        return self._run("callproc", f"CALL {procname}", args,
+                         lambda: self._cursor.callproc(procname, args))
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._fetch(self._cursor.fetchmany)
+        return self._fetch(lambda: self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def _run(self, operation, sql, params, func):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            result = func()
+        except mysql.connector.Error as err:
+            self._instrumenter.emit(QueryEvent(
+                operation, sql, time.perf_counter() - start, error=str(err),
+                bytes_sent=_statement_bytes(self._cursor, sql),
+            ))
+            raise
+        latency = time.perf_counter() - start
+        statement = getattr(self._cursor, "statement", None) if operation == "execute" else None
+        if isinstance(statement, (bytes, bytearray)):
+            statement = statement.decode("utf-8", "replace")
+        event = QueryEvent(operation, sql, latency, rows=max(self._cursor.rowcount, 0),
+                           bytes_sent=_statement_bytes(self._cursor, sql), statement=statement)
+        self._instrumenter.emit(event)
+        if getattr(self._cursor, "with_rows", False):
+            # The result set is still to be read; its fetches count towards this statement.
+            self._statement = [sql, params, latency, 0]
+        else:
+            self._check_slow(sql, params, latency, event.rows)
+        return result
+
+    def _fetch(self, func):
+        start = time.perf_counter()
+        result = func()
+        latency = time.perf_counter() - start
+        if isinstance(result, list):
+            rows, size = len(result), sum(_row_bytes(row) for row in result)
+        elif result is not None:
+            rows, size = 1, _row_bytes(result)
+        else:
+            rows, size = 0, 0
+        sql = self._statement[0] if self._statement else None
+        self._instrumenter.emit(QueryEvent("fetch", sql, latency, rows=rows, bytes_received=size))
+        if self._statement:
+            self._statement[2] += latency
+            self._statement[3] += rows
+            exhausted = result is None or func == self._cursor.fetchall or (
+                isinstance(result, list) and not result)
+            if exhausted:
+                self._finish()
+        return result
+
+    def _finish(self):
+        statement, self._statement = self._statement, None
+        if statement:
+            self._check_slow(*statement)
+
+    def _check_slow(self, sql, params, latency, rows):
+        threshold = self._instrumenter.slow_threshold
+        if threshold is None or latency < threshold:
+            return
+        explain = self._explain(sql, params) if self._instrumenter.explain else None
+        self._instrumenter.emit(QueryEvent("slow", sql, latency, rows=rows, explain=explain))
+
+    def _explain(self, sql, params):
+        # Reads only: CALLs can't be explained, and executemany has no single parameter set.
+        if not is_read(sql) or sql.lstrip().upper().startswith("CALL"):
+            return None
+        conn = self._connection._conn
+        if getattr(conn, "unread_result", False):
+            return None
+        cursor = conn.cursor(buffered=True)
+        try:
+            cursor.execute(f"EXPLAIN FORMAT=JSON {sql}", params or None)
+            document = cursor.fetchone()[0]
+        except mysql.connector.Error as err:
+            return {"error": str(err)}
+        finally:
+            cursor.close()
+        tables, cost = parse_explain_json(document)
+        return {"query_cost": cost, "tables": tables}
+
+
+def _statement_bytes(cursor, sql):
+    statement = getattr(cursor, "statement", None) or sql
+    if isinstance(statement, str):
+        return len(statement.encode("utf-8", "replace"))
+    return len(statement or b"")
+
+
+def _row_bytes(row):
+    values = row.values() if isinstance(row, dict) else row
+    size = 0
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, (bytes, bytearray)):
+            size += len(value)
+        elif isinstance(value, str):
+            size += len(value.encode("utf-8", "replace"))
+        else:
+            size += len(str(value))
+    return size
+
+
+class HistogramSink:
+    """
+    In-memory latency histograms per (operation, fingerprint).
+
+    "slow" events repeat a statement already counted, so they are not added.
+
+    buckets -- upper bounds in seconds, ascending
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        if event.operation == "slow":
+            return
+        key = (event.operation, event.fingerprint)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "count": 0, "sum": 0.0, "buckets": [0] * (len(self.buckets) + 1),
+                    "rows": 0, "bytes_sent": 0, "bytes_received": 0,
+                    "wait_seconds": 0.0, "errors": 0,
+                }
+            series["count"] += 1
+            series["sum"] += event.latency
+            series["buckets"][bisect.bisect_left(self.buckets, event.latency)] += 1
+            series["rows"] += event.rows
+            series["bytes_sent"] += event.bytes_sent
+            series["bytes_received"] += event.bytes_received
+            series["wait_seconds"] += event.wait_seconds
+            series["errors"] += event.error is not None
+
+    def series(self):
+        """Snapshot: {(operation, fingerprint): stats dict}."""
+        with self._lock:
+            return {key: dict(value, buckets=list(value["buckets"]))
+                    for key, value in self._series.items()}
+
+    def percentile(self, operation, fingerprint_, q):
+        """Approximate q-quantile (0..1) of latency: the upper bound of the bucket it falls in."""
+        with self._lock:
+            series = self._series.get((operation, fingerprint_))
+            if not series or not series["count"]:
+                return None
+            target = max(1, math.ceil(q * series["count"]))
+            seen = 0
+            for bound, count in zip(self.buckets + (math.inf,), series["buckets"]):
+                seen += count
+                if seen >= target:
+                    return bound
+        return math.inf
+
+    def top(self, n=10, operation=None):
+        """The n fingerprints with the most total latency."""
+        ranked = sorted(((key, value) for key, value in self.series().items()
+                         if operation is None or key[0] == operation),
+                        key=lambda item: item[1]["sum"], reverse=True)
+        return ranked[:n]
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class JsonLinesSink:
+    """Appends one JSON object per event to a file path or open text file."""
+
+    def __init__(self, target, operations=None):
+        self._owned = isinstance(target, str)
+        self._file = open(target, "a", encoding="utf-8") if self._owned else target
+        self.operations = set(operations) if operations else None
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        if self.operations and event.operation not in self.operations:
+            return
+        line = json.dumps(event.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+
+class OpenMetricsSink(HistogramSink):
+    """HistogramSink that renders its series as OpenMetrics text."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="mysql"):
+        super().__init__(buckets)
+        self.prefix = prefix
+
+    def render(self):
+        p = self.prefix
+        series = self.series()
+        lines = [f"# TYPE {p}_query_duration_seconds histogram",
+                 f"# UNIT {p}_query_duration_seconds seconds",
+                 f"# HELP {p}_query_duration_seconds Latency per statement fingerprint."]
+        for (operation, fp), value in sorted(series.items()):
+            labels = f'operation="{operation}",fingerprint="{_escape(fp)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), value["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                lines.append(f'{p}_query_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{p}_query_duration_seconds_count{{{labels}}} {value['count']}")
+            lines.append(f"{p}_query_duration_seconds_sum{{{labels}}} {value['sum']}")
+        for name, field, help_text in [
+            ("query_rows", "rows", "Rows returned or affected."),
+            ("query_sent_bytes", "bytes_sent", "Estimated statement bytes sent."),
+            ("query_received_bytes", "bytes_received", "Estimated result bytes received."),
+            ("query_errors", "errors", "Statements that raised an error."),
+            ("connection_wait_seconds", "wait_seconds", "Time spent waiting for a pooled connection."),
+        ]:
+            lines.append(f"# TYPE {p}_{name} counter")
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            for (operation, fp), value in sorted(series.items()):
+                if value[field]:
+                    labels = f'operation="{operation}",fingerprint="{_escape(fp)}"'
+                    lines.append(f"{p}_{name}_total{{{labels}}} {value[field]}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(self.render())
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_installed = []
+
+
+def install(instrumenter):
+    """Instrument every connection handed out by db_pool.connect()."""
+    uninstall()
+    hook = instrumenter.wrap
+    add_connect_hook(hook)
+    _installed.append(hook)
+    return instrumenter
+
+
+def uninstall():
+    while _installed:
+        remove_connect_hook(_installed.pop())
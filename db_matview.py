@@ -0,0 +1,238 @@
+"""
+Materialized, incrementally refreshed version of the employee_sales view.
+
+8_views.py's employee_sales view recomputes SUM(sales.sales_amount) over the
+whole employees x sales join every time it is read. MaterializedEmployeeSales
+keeps that aggregate in a real table instead:
+
+* triggers on `sales` (and on `employees`, for renames) append deltas to a
+  change-log table;
+* refresh("incremental") folds the pending deltas into the summary table,
+  so its cost depends on how much changed, not on the size of `sales`;
+* refresh("full") rebuilds the summary from scratch;
+* staleness() reports how many changes are pending and how old they are.
+
+    from db_matview import MaterializedEmployeeSales
+
+    mv = MaterializedEmployeeSales(conn)
+    mv.install()                 # tables, triggers, initial full refresh
+    ...
+    mv.refresh()                 # e.g. every few seconds from a scheduler
+    rows = mv.read()             # same shape as SELECT * FROM employee_sales
+    print(mv.staleness())
+"""
+import datetime
+
+
+class MaterializedEmployeeSales:
+    """
+    Summary of sales per employee, keyed by employee id.
+
+    name       -- summary table name; the change log is `<name>_changelog`
+    employees  -- employees table name
+    sales      -- sales table name
+    """
+
+    def __init__(self, conn, name="employee_sales_mv", employees="employees", sales="sales"):
+        self.conn = conn
+        self.name = name
+        self.employees = employees
+        self.sales = sales
+        self.changelog = f"{name}_changelog"
+        self.state = f"{name}_state"
+        self._triggers = {
+            f"{name}_sales_ins": (sales, "INSERT"),
+            f"{name}_sales_upd": (sales, "UPDATE"),
+            f"{name}_sales_del": (sales, "DELETE"),
+            f"{name}_emp_upd": (employees, "UPDATE"),
+        }
+
+    def install(self):
+        """Create the summary, change-log and state tables and triggers, then fill the summary."""
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS `{self.name}` (
+                employee_id INT PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                department VARCHAR(100),
+                total_sales DECIMAL(20, 2) NOT NULL,
+                sales_count BIGINT NOT NULL,
+                INDEX idx_{self.name}_name_department (name, department)
+            )""")
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS `{self.changelog}` (
+                seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+                employee_id INT,
+                amount_delta DECIMAL(20, 2) NOT NULL,
+                count_delta INT NOT NULL,
+                changed_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+            )""")
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS `{self.state}` (
+                id TINYINT PRIMARY KEY,
+                last_seq BIGINT NOT NULL DEFAULT 0,
+                last_refresh_at TIMESTAMP(6) NULL,
+                last_full_refresh_at TIMESTAMP(6) NULL
+            )""")
+        self._execute(f"INSERT IGNORE INTO `{self.state}` (id) VALUES (1)")
+        log = f"INSERT INTO `{self.changelog}` (employee_id, amount_delta, count_delta) VALUES"
+        bodies = {
+            "INSERT": f"{log} (NEW.employee_id, COALESCE(NEW.sales_amount, 0), 1)",
+            "DELETE": f"{log} (OLD.employee_id, -COALESCE(OLD.sales_amount, 0), -1)",
+            "UPDATE": (f"BEGIN {log} (OLD.employee_id, -COALESCE(OLD.sales_amount, 0), -1); "
+                       f"{log} (NEW.employee_id, COALESCE(NEW.sales_amount, 0), 1); END"),
+        }
+        for trigger, (table, event) in self._triggers.items():
+            if table == self.employees:
+                # A rename or department change only needs the label refreshed.
+                body = f"{log} (NEW.id, 0, 0)"
+            else:
+                body = bodies[event]
+            self._execute(f"DROP TRIGGER IF EXISTS `{trigger}`")
+            self._execute(
+                f"CREATE TRIGGER `{trigger}` AFTER {event} ON `{table}` FOR EACH ROW {body}"
+            )
+        self.conn.commit()
+        return self.refresh("full")
+
+    def uninstall(self):
+        for trigger in self._triggers:
+            self._execute(f"DROP TRIGGER IF EXISTS `{trigger}`")
+        for table in (self.name, self.changelog, self.state):
+            self._execute(f"DROP TABLE IF EXISTS `{table}`")
+        self.conn.commit()
+
+    def refresh(self, mode="incremental", max_changes=None):
+        """
+        Bring the summary up to date and return {"mode", "changes", "rows_written"}.
+
+        Any transaction already open on the connection is committed first.
+
+        Incremental refreshes apply at most `max_changes` change-log rows per
+        call (all pending ones by default), bounding the cost of one refresh.
+        """
+        if mode not in ("incremental", "full"):
+            raise ValueError("mode must be 'incremental' or 'full'")
+        # Autocommit is off by default, so earlier reads may have left an
+        # implicit transaction open; refresh() always runs in its own.
+        if self.conn.in_transaction:
+            self.conn.commit()
+        # The locking reads below are what make the high-water mark safe:
+        # they wait for in-flight writers whose change-log rows sit below it.
+        self.conn.start_transaction(isolation_level="REPEATABLE READ")
+        try:
+            high_water = self._fetchone(
+                f"SELECT COALESCE(MAX(seq), 0) FROM `{self.changelog}` FOR UPDATE"
+            )[0]
+            if mode == "incremental" and max_changes:
+                first = self._fetchone(
+                    f"SELECT COALESCE(MIN(seq), 0) FROM `{self.changelog}`"
+                )[0]
+                high_water = min(high_water, first + max_changes - 1)
+            changes = self._fetchone(
+                f"SELECT COUNT(*) FROM `{self.changelog}` WHERE seq <= %s FOR UPDATE",
+                (high_water,),
+            )[0]
+            if mode == "full":
+                written = self._full_rebuild()
+            else:
+                written = self._apply_changes(high_water)
+            self._execute(f"DELETE FROM `{self.changelog}` WHERE seq <= %s", (high_water,))
+            full_column = ", last_full_refresh_at = NOW(6)" if mode == "full" else ""
+            self._execute(
+                f"UPDATE `{self.state}` SET last_seq = GREATEST(last_seq, %s), "
+                f"last_refresh_at = NOW(6){full_column} WHERE id = 1",
+                (high_water,),
+            )
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        return {"mode": mode, "changes": changes, "rows_written": written}
+
+    def _apply_changes(self, high_water):
+        written = self._execute(f"""
+            INSERT INTO `{self.name}` (employee_id, name, department, total_sales, sales_count)
+            SELECT c.employee_id, e.name, e.department, SUM(c.amount_delta), SUM(c.count_delta)
+            FROM `{self.changelog}` c
+            JOIN `{self.employees}` e ON e.id = c.employee_id
+            WHERE c.seq <= %s
+            GROUP BY c.employee_id, e.name, e.department
+            ON DUPLICATE KEY UPDATE
+                name = VALUES(name),
+                department = VALUES(department),
+                total_sales = total_sales + VALUES(total_sales),
+                sales_count = sales_count + VALUES(sales_count)
+            """, (high_water,))
+        # The view is an inner join: employees without sales drop out.
+        self._execute(
+            f"DELETE FROM `{self.name}` WHERE sales_count <= 0 AND employee_id IN "
+            f"(SELECT employee_id FROM `{self.changelog}` WHERE seq <= %s)",
+            (high_water,),
+        )
+        return written
+
+    def _full_rebuild(self):
+        self._execute(f"DELETE FROM `{self.name}`")
+        return self._execute(f"""
+            INSERT INTO `{self.name}` (employee_id, name, department, total_sales, sales_count)
+            SELECT e.id, e.name, e.department, COALESCE(SUM(s.sales_amount), 0), COUNT(*)
+            FROM `{self.employees}` e
+            JOIN `{self.sales}` s ON e.id = s.employee_id
+            GROUP BY e.id, e.name, e.department
+            """)
+
+    def read(self):
+        """Rows shaped like employee_sales: (name, department, total_sales)."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"SELECT name, department, SUM(total_sales) AS total_sales "
+            f"FROM `{self.name}` GROUP BY name, department"
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def read_employee(self, employee_id):
+        """(name, department, total_sales, sales_count) for one employee, or None."""
+        return self._fetchone(
+            f"SELECT name, department, total_sales, sales_count FROM `{self.name}` "
+            f"WHERE employee_id = %s",
+            (employee_id,),
+        )
+
+    def staleness(self):
+        """How far the summary lags behind `sales`."""
+        pending, oldest, now = self._fetchone(
+            f"SELECT COUNT(*), MIN(changed_at), NOW(6) FROM `{self.changelog}`"
+        )
+        last_refresh, last_full = self._fetchone(
+            f"SELECT last_refresh_at, last_full_refresh_at FROM `{self.state}` WHERE id = 1"
+        )
+        lag = (now - oldest).total_seconds() if oldest is not None else 0.0
+        return {
+            "pending_changes": pending,
+            "oldest_pending_at": oldest,
+            "seconds_behind": lag,
+            "last_refresh_at": last_refresh,
+            "last_full_refresh_at": last_full,
+            "seconds_since_refresh": (
+                (now - last_refresh).total_seconds()
+                if isinstance(last_refresh, datetime.datetime) else None
+            ),
+        }
+
+    def _execute(self, sql, params=None):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def _fetchone(self, sql, params=None):
+        cursor = self.conn.cursor(buffered=True)
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        finally:
+            cursor.close()
@@ -0,0 +1,567 @@
+"""
+Versioned, idempotent schema migrations.
+
+The numbered scripts create the same tables over and over and can't be
+rerun (8_views.py's CREATE VIEW fails the second time, 10_Stored_Procedure.py
+sends DELIMITER to the server). The schema they build lives in
+migrations/<database>/NNNN_name.sql instead, and this runner applies it:
+
+    python db_migrate.py                  # apply everything pending
+    python db_migrate.py --status         # applied / pending / changed
+    python db_migrate.py --dry-run        # show the dependency waves only
+
+or from Python:
+
+    from db_migrate import Migrator
+
+    report = Migrator("migrations", parallel=4).migrate()
+    print(report)
+
+* Applied versions and a SHA-256 of each file are recorded in a
+  `schema_migrations` table per database; only pending steps run, and a
+  step whose file changed after it was applied stops the run.
+* Files may use DELIMITER like the mysql client. CREATE TABLE/DATABASE get
+  IF NOT EXISTS, CREATE VIEW becomes CREATE OR REPLACE, routines and
+  triggers are dropped before being created, and CREATE INDEX and
+  ALTER TABLE ... ADD COLUMN/INDEX are skipped when the column or index
+  exists, so a step that failed halfway can simply be rerun.
+* Steps are ordered by the tables and routines they read and write (FK
+  targets, view and procedure bodies, ALTERs), plus any `-- depends:` lines,
+  and steps with no ordering between them run in parallel.
+"""
+import argparse
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import mysql.connector
+
+from db_pool import ConnectionPool, connection_config
+from db_procs import run_multi
+from db_schema import column_exists, index_exists
+from db_sql import is_read, strip_comments, tables_read, tables_written
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+_FILE_RE = re.compile(r"^(\d+)_(\w+)\.sql$")
+_DEPENDS_RE = re.compile(r"^\s*--\s*depends:\s*(.+)$", re.I | re.M)
+_DELIMITER_RE = re.compile(r"[ \t]*DELIMITER[ \t]+(\S+)[ \t]*(?:\n|$)", re.I)
+_NAME = r"`?\w+`?(?:\.`?\w+`?)?"
+_ROUTINE_RE = re.compile(
+    rf"^\s*(CREATE|DROP)\s+(?:OR\s+REPLACE\s+)?(?:DEFINER\s*=\s*\S+\s+)?"
+    rf"(PROCEDURE|FUNCTION|TRIGGER|EVENT)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?({_NAME})", re.I
+)
+_CREATE_TABLE_RE = re.compile(r"^(\s*CREATE\s+(?:TEMPORARY\s+)?(?:TABLE|DATABASE|SCHEMA))\s+"
+                              r"(?!IF\s+NOT\s+EXISTS\b)", re.I)
+_CREATE_VIEW_RE = re.compile(r"^(\s*CREATE)\s+(?!OR\s+REPLACE\b)((?:ALGORITHM\s*=\s*\w+\s+)?"
+                             r"(?:DEFINER\s*=\s*\S+\s+)?(?:SQL\s+SECURITY\s+\w+\s+)?VIEW\b)", re.I)
+_CREATE_INDEX_RE = re.compile(
+    rf"^\s*CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?INDEX\s+(`?\w+`?)\s+ON\s+({_NAME})", re.I
+)
+_ALTER_TABLE_RE = re.compile(rf"^\s*ALTER\s+TABLE\s+({_NAME})\s+", re.I)
+_ADD_INDEX_RE = re.compile(r"^\s*ADD\s+(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?(?:INDEX|KEY)\s+(`?\w+`?)", re.I)
+_ADD_COLUMN_RE = re.compile(
+    r"^\s*ADD\s+(?:COLUMN\s+)?(?!(?:UNIQUE|FULLTEXT|SPATIAL|INDEX|KEY|PRIMARY|FOREIGN|CONSTRAINT|"
+    r"CHECK|PARTITION)\b)(`?\w+`?)\s", re.I
+)
+# Tables a statement touches beyond what db_sql's FROM/JOIN scan sees.
+_REFERENCE_RE = re.compile(
+    rf"\b(?:REFERENCES|INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+({_NAME})"
+    rf"|\bON\s+({_NAME})\s+FOR\s+EACH\s+ROW\b", re.I
+)
+
+
+class MigrationError(Exception):
+    """A migration failed, or an applied migration no longer matches its file."""
+
+
+def _bare(name):
+    return name.split(".")[-1].strip("`").lower()
+
+
+def split_statements(text):
+    """
+    Split SQL text into statements the way the mysql client does, honouring
+    quotes, comments and DELIMITER lines.
+    """
+    statements = []
+    delimiter = ";"
+    start = i = 0
+    quote = None
+    length = len(text)
+
+    def add(statement):
+        if statement.strip():
+            statements.append(statement.strip())
+
+    while i < length:
+        ch = text[i]
+        if quote:
+            if ch == "\\" and quote != "`":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        if i == 0 or text[i - 1] == "\n":
+            match = _DELIMITER_RE.match(text, i)
+            if match:
+                add(text[start:i])
+                delimiter = match.group(1)
+                i = start = match.end()
+                continue
+        if ch in "'\"`":
+            quote = ch
+        elif ch == "#" or (text.startswith("--", i) and text[i + 2:i + 3] in ("", " ", "\t", "\n")):
+            leading = not text[start:i].strip()
+            newline = text.find("\n", i)
+            i = length if newline < 0 else newline
+            if leading:
+                start = i  # drop comments that precede a statement
+            continue
+        elif text.startswith("/*", i) and not text.startswith("/*!", i):
+            end = text.find("*/", i + 2)
+            leading = not text[start:i].strip()
+            i = length if end < 0 else end + 2
+            if leading:
+                start = i
+            continue
+        elif text.startswith(delimiter, i):
+            add(text[start:i])
+            i = start = i + len(delimiter)
+            continue
+        i += 1
+    add(text[start:])
+    return statements
+
+
+def split_clauses(text):
+    """Split on the commas that are outside parentheses and quotes."""
+    clauses, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote and text[i - 1] != "\\":
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            clauses.append(text[start:i])
+            start = i + 1
+    clauses.append(text[start:])
+    return [clause.strip() for clause in clauses]
+
+
+def make_idempotent(statement):
+    """
+    Rewrite a statement so it can be run again: returns the list of
+    statements to send instead.
+    """
+    routine = _ROUTINE_RE.match(statement)
+    if routine and routine.group(1).upper() == "CREATE":
+        kind, name = routine.group(2).upper(), routine.group(3)
+        return [f"DROP {kind} IF EXISTS {name}", statement]
+    if _CREATE_VIEW_RE.match(statement):
+        return [_CREATE_VIEW_RE.sub(r"\1 OR REPLACE \2", statement, count=1)]
+    if _CREATE_TABLE_RE.match(statement):
+        return [_CREATE_TABLE_RE.sub(r"\1 IF NOT EXISTS ", statement, count=1)]
+    return [statement]
+
+
+class Migration:
+    """One NNNN_name.sql file."""
+
+    def __init__(self, database, path):
+        self.database = database
+        self.path = path
+        filename = os.path.basename(path)
+        match = _FILE_RE.match(filename)
+        if not match:
+            raise MigrationError(f"{path}: migration files are named NNNN_name.sql")
+        self.number = int(match.group(1))
+        self.version = filename[:-len(".sql")]
+        self.key = f"{database}/{self.version}"
+        with open(path, encoding="utf-8") as fh:
+            self.text = fh.read()
+        self.checksum = hashlib.sha256(self.text.replace("\r\n", "\n").encode("utf-8")).hexdigest()
+        self.statements = split_statements(self.text)
+        self.explicit_depends = [
+            name.strip()
+            for line in _DEPENDS_RE.findall(self.text)
+            for name in line.split(",") if name.strip()
+        ]
+        self.reads, self.writes, self.barrier = set(), set(), False
+        for statement in self.statements:
+            self._analyze(statement)
+        self.depends = set()
+
+    def _analyze(self, statement):
+        routine = _ROUTINE_RE.match(statement)
+        if routine:
+            kind = routine.group(2).lower()
+            self.writes.add(f"{kind}:{_bare(routine.group(3))}")
+            # Routine and trigger bodies only read from the schema's point of view.
+            self.reads |= tables_read(statement) | self._references(statement)
+            return
+        if is_read(statement):
+            self.reads |= tables_read(statement)
+            return
+        written = tables_written(statement)
+        if written is None:
+            self.barrier = True
+            return
+        self.writes |= written
+        self.reads |= (tables_read(statement) | self._references(statement)) - written
+
+    @staticmethod
+    def _references(statement):
+        names = set()
+        for match in _REFERENCE_RE.finditer(strip_comments(statement)):
+            names.add(_bare(match.group(1) or match.group(2)))
+        return names
+
+    def conflicts_with(self, earlier):
+        """True when this step must run after `earlier` (same database)."""
+        if self.barrier or earlier.barrier:
+            return True
+        return bool(
+            earlier.writes & (self.writes | self.reads) or earlier.reads & self.writes
+        )
+
+    def __repr__(self):
+        return f"Migration({self.key})"
+
+
+class StepResult:
+    __slots__ = ("key", "status", "seconds", "statements", "error")
+
+    def __init__(self, key, status, seconds=0.0, statements=0, error=None):
+        self.key = key
+        self.status = status
+        self.seconds = seconds
+        self.statements = statements
+        self.error = error
+
+
+class MigrationReport:
+    """What one migrate() call did, step by step."""
+
+    def __init__(self):
+        self.steps = []
+        self.seconds = 0.0
+
+    @property
+    def applied(self):
+        return [step for step in self.steps if step.status == "applied"]
+
+    def __str__(self):
+        lines = [f"{'step':<45} {'status':<10} {'seconds':>9}"]
+        for step in self.steps:
+            lines.append(f"{step.key:<45} {step.status:<10} {step.seconds:9.3f}")
+            if step.error:
+                lines.append(f"    {step.error}")
+        lines.append(f"{len(self.applied)} applied in {self.seconds:.3f} s wall time")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"MigrationReport(applied={len(self.applied)}, seconds={self.seconds:.3f})"
+
+
+def load_migrations(directory, databases=None):
+    """Every migration under directory/<database>/, with dependencies resolved."""
+    migrations = []
+    for database in sorted(os.listdir(directory)):
+        folder = os.path.join(directory, database)
+        if not os.path.isdir(folder) or (databases and database not in databases):
+            continue
+        steps = sorted(
+            (Migration(database, os.path.join(folder, name))
+             for name in os.listdir(folder) if name.endswith(".sql")),
+            key=lambda step: step.number,
+        )
+        numbers = [step.number for step in steps]
+        if len(numbers) != len(set(numbers)):
+            raise MigrationError(f"{folder}: two migrations share a version number")
+        for index, step in enumerate(steps):
+            step.depends = {earlier.key for earlier in steps[:index] if step.conflicts_with(earlier)}
+        migrations.extend(steps)
+    by_key = {step.key: step for step in migrations}
+    for step in migrations:
+        for name in step.explicit_depends:
+            key = name if "/" in name else f"{step.database}/{name}"
+            if key not in by_key:
+                raise MigrationError(f"{step.key}: unknown dependency {name}")
+            step.depends.add(key)
+    return migrations
+
+
+def waves(migrations):
+    """Group migrations into batches that can run in parallel, in order."""
+    level = {}
+    by_key = {step.key: step for step in migrations}
+
+    def depth(step, seen=()):
+        if step.key in seen:
+            raise MigrationError(f"Dependency cycle through {step.key}")
+        if step.key not in level:
+            level[step.key] = 1 + max(
+                (depth(by_key[key], seen + (step.key,)) for key in step.depends if key in by_key),
+                default=-1,
+            )
+        return level[step.key]
+
+    grouped = {}
+    for step in migrations:
+        grouped.setdefault(depth(step), []).append(step)
+    return [grouped[index] for index in sorted(grouped)]
+
+
+class Migrator:
+    """
+    Apply pending migrations from `directory`.
+
+    databases  -- only these database folders (default: all)
+    parallel   -- steps run at the same time, each on its own connection
+    lock_wait  -- seconds to wait for another runner's lock on a database
+    """
+
+    def __init__(self, directory="migrations", databases=None, parallel=4, lock_wait=60,
+                 **config):
+        self.directory = directory
+        self.databases = databases
+        self.parallel = max(1, parallel)
+        self.lock_wait = lock_wait
+        self.config = config or connection_config()
+        self.migrations = load_migrations(directory, databases)
+
+    def status(self):
+        """{key: "applied" | "pending" | "changed"} for every migration."""
+        pool = ConnectionPool(size=1, **self.config)
+        try:
+            conn = pool.acquire()
+            try:
+                applied = self._applied(conn)
+            finally:
+                conn.close()
+        finally:
+            pool.close()
+        return {step.key: self._state(step, applied) for step in self.migrations}
+
+    def migrate(self, dry_run=False):
+        """
+        Apply every pending migration and return a MigrationReport. With
+        dry_run nothing is created or changed; pending steps are listed by wave.
+        """
+        report = MigrationReport()
+        start = time.perf_counter()
+        pool = ConnectionPool(size=self.parallel + 1, **self.config)
+        control = pool.acquire()
+        locked = []
+        try:
+            if not dry_run:
+                for database in sorted({step.database for step in self.migrations}):
+                    self._prepare(control, database)
+                    locked.append(database)
+            applied = self._applied(control)
+            changed = [step.key for step in self.migrations if self._state(step, applied) == "changed"]
+            if changed:
+                raise MigrationError(
+                    f"Applied migrations were modified afterwards: {', '.join(changed)}"
+                )
+            pending = [step for step in self.migrations if step.key not in applied]
+            for step in self.migrations:
+                if step.key in applied:
+                    report.steps.append(StepResult(step.key, "skipped"))
+            planned = waves(pending)
+            if dry_run:
+                for number, wave in enumerate(planned, 1):
+                    for step in wave:
+                        report.steps.append(StepResult(step.key, f"wave {number}"))
+            else:
+                self._run(pool, pending, report)
+        finally:
+            for database in locked:
+                self._fetchone(control, "SELECT RELEASE_LOCK(%s)",
+                               (f"{MIGRATIONS_TABLE}:{database}",))
+            control.close()
+            pool.close()
+            report.seconds = time.perf_counter() - start
+        failed = [step for step in report.steps if step.status == "failed"]
+        if failed:
+            raise MigrationError(f"{failed[0].key} failed: {failed[0].error}\n{report}")
+        return report
+
+    def _prepare(self, conn, database):
+        """Create the database and its migrations table, and lock out other runners."""
+        self._execute(conn, f"CREATE DATABASE IF NOT EXISTS `{database}`")
+        if not self._fetchone(conn, "SELECT GET_LOCK(%s, %s)",
+                              (f"{MIGRATIONS_TABLE}:{database}", self.lock_wait))[0]:
+            raise MigrationError(f"Another migration run holds the lock on {database}")
+        self._execute(conn, f"""
+            CREATE TABLE IF NOT EXISTS `{database}`.`{MIGRATIONS_TABLE}` (
+                version VARCHAR(255) PRIMARY KEY,
+                checksum CHAR(64) NOT NULL,
+                applied_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+                duration_ms INT NOT NULL
+            )""")
+
+    def _run(self, pool, pending, report):
+        by_key = {step.key: step for step in pending}
+        remaining = dict(by_key)
+        done = set()
+        running = {}
+        failed = False
+        with ThreadPoolExecutor(max_workers=self.parallel) as executor:
+            while remaining or running:
+                if not failed:
+                    for key, step in list(remaining.items()):
+                        if all(dep in done or dep not in by_key for dep in step.depends):
+                            del remaining[key]
+                            running[executor.submit(self._apply, pool, step)] = step
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    result = future.result()
+                    report.steps.append(result)
+                    if result.status == "applied":
+                        done.add(step.key)
+                    else:
+                        failed = True
+        for step in remaining.values():
+            report.steps.append(StepResult(step.key, "not run"))
+
+    def _apply(self, pool, step):
+        start = time.perf_counter()
+        conn = pool.acquire(step.database)
+        count = 0
+        try:
+            cursor = conn.cursor()
+            try:
+                for statement in step.statements:
+                    for sql in make_idempotent(statement):
+                        sql = self._skip_existing(conn, sql)
+                        if sql is None:
+                            continue
+                        run_multi(cursor, sql)
+                        count += 1
+                seconds = time.perf_counter() - start
+                cursor.execute(
+                    f"INSERT INTO `{MIGRATIONS_TABLE}` (version, checksum, duration_ms) "
+                    f"VALUES (%s, %s, %s)",
+                    (step.version, step.checksum, int(seconds * 1000)),
+                )
+                conn.commit()
+            finally:
+                cursor.close()
+        except Exception as err:
+            try:
+                conn.rollback()
+            except mysql.connector.Error:
+                conn.discard()
+            return StepResult(step.key, "failed", time.perf_counter() - start, count, err)
+        finally:
+            conn.close()
+        return StepResult(step.key, "applied", time.perf_counter() - start, count)
+
+    @staticmethod
+    def _skip_existing(conn, sql):
+        """
+        `sql` without the indexes and columns it would add that already
+        exist; None when nothing is left to run.
+        """
+        index = _CREATE_INDEX_RE.match(sql)
+        if index:
+            exists = index_exists(conn, _bare(index.group(2)), index.group(1).strip("`"))
+            return None if exists else sql
+        alter = _ALTER_TABLE_RE.match(sql)
+        if not alter:
+            return sql
+        table = _bare(alter.group(1))
+        clauses = []
+        for clause in split_clauses(strip_comments(sql[alter.end():])):
+            added = _ADD_INDEX_RE.match(clause)
+            if added and index_exists(conn, table, added.group(1).strip("`")):
+                continue
+            added = _ADD_COLUMN_RE.match(clause)
+            if added and column_exists(conn, table, added.group(1).strip("`")):
+                continue
+            clauses.append(clause)
+        if not clauses:
+            return None
+        return f"{sql[:alter.end()]}{', '.join(clauses)}"
+
+    def _applied(self, conn):
+        applied = {}
+        for database in sorted({step.database for step in self.migrations}):
+            exists = self._fetchone(
+                conn,
+                "SELECT COUNT(*) FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+                (database, MIGRATIONS_TABLE),
+            )[0]
+            if not exists:
+                continue
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT version, checksum FROM `{database}`.`{MIGRATIONS_TABLE}`")
+            for version, checksum in cursor.fetchall():
+                applied[f"{database}/{version}"] = checksum
+            cursor.close()
+        return applied
+
+    @staticmethod
+    def _state(step, applied):
+        if step.key not in applied:
+            return "pending"
+        return "applied" if applied[step.key] == step.checksum else "changed"
+
+    @staticmethod
+    def _execute(conn, sql, params=None):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _fetchone(conn, sql, params=None):
+        cursor = conn.cursor(buffered=True)
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+
+def migrate(directory="migrations", **options):
+    """Apply pending migrations from `directory`; see Migrator."""
+    dry_run = options.pop("dry_run", False)
+    return Migrator(directory, **options).migrate(dry_run=dry_run)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default=os.path.join(os.path.dirname(__file__) or ".", "migrations"))
+    parser.add_argument("--database", action="append", help="only this database (repeatable)")
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--status", action="store_true")
+    args = parser.parse_args()
+
+    migrator = Migrator(args.dir, databases=args.database, parallel=args.parallel)
+    if args.status:
+        for key, state in migrator.status().items():
+            print(f"{key:<45} {state}")
+        return
+    print(migrator.migrate(dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
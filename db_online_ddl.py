@@ -0,0 +1,316 @@
+"""
+Online, non-blocking ALTER TABLE.
+
+A plain `ALTER TABLE employees ...` (as 4_alter_table.py runs it) may copy
+the table while blocking writers. online_alter() avoids that:
+
+1. It first asks the server for ALGORITHM=INSTANT, then ALGORITHM=INPLACE,
+   LOCK=NONE. MySQL rejects either up front when the change can't be done
+   that way, so trying costs nothing.
+2. Otherwise it builds a shadow copy: it creates `_<table>_new` with the
+   new definition and adds triggers that mirror every INSERT/UPDATE/DELETE
+   into it. It copies existing rows in primary-key chunks, each chunk its
+   own short transaction, throttling on Threads_running and replica lag.
+   Finally it swaps the tables with one atomic RENAME TABLE.
+
+    from db_online_ddl import online_alter
+
+    online_alter(conn, "employees", "ADD COLUMN email VARCHAR(255) DEFAULT NULL")
+
+The shadow copy needs a single-column primary key and refuses tables that
+take part in foreign keys: CREATE TABLE ... LIKE does not copy them, and a
+RENAME would leave child tables pointing at the old table.
+"""
+import time
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from db_schema import table_indexes
+
+# Errors meaning "this ALGORITHM/LOCK combination is not possible here".
+_UNSUPPORTED_ALGORITHM = {
+    errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED,
+    errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED_REASON,
+    errorcode.ER_UNKNOWN_ALTER_ALGORITHM,
+    errorcode.ER_UNKNOWN_ALTER_LOCK,
+}
+
+
+class OnlineAlterError(Exception):
+    """The change cannot be applied online, or the shadow copy failed."""
+
+
+def print_progress(progress):
+    """Default progress callback."""
+    if progress["phase"] == "copy":
+        eta = progress["eta_seconds"]
+        eta_text = f", ETA {eta:.0f}s" if eta is not None else ""
+        print(f"⏳ {progress['table']}: copied {progress['copied']}/{progress['total']} "
+              f"rows ({progress['percent']:.1f}%){eta_text}")
+    else:
+        print(f"⏳ {progress['table']}: {progress['phase']}")
+
+
+class OnlineAlter:
+    """
+    Apply `alter_clause` (the part after ALTER TABLE <table>) without
+    blocking writers.
+
+    chunk_size           -- rows per copy chunk (adapted toward chunk_time)
+    chunk_time           -- target seconds per chunk; 0 keeps chunk_size fixed
+    max_threads_running  -- pause copying while Threads_running is above this
+    max_replica_lag      -- pause while any replica is more seconds behind
+    replica_conns        -- connections to replicas whose lag is checked
+    drop_old             -- drop the original table after the swap
+    progress             -- callable(dict) for progress reports, or None
+    """
+
+    def __init__(self, conn, table, alter_clause, chunk_size=10000, chunk_time=0.5,
+                 max_threads_running=50, max_replica_lag=5, replica_conns=(),
+                 throttle_sleep=1.0, drop_old=True, progress=print_progress):
+        self.conn = conn
+        self.table = table
+        self.alter_clause = alter_clause
+        self.chunk_size = chunk_size
+        self.chunk_time = chunk_time
+        self.max_threads_running = max_threads_running
+        self.max_replica_lag = max_replica_lag
+        self.replica_conns = list(replica_conns)
+        self.throttle_sleep = throttle_sleep
+        self.drop_old = drop_old
+        self.progress = progress
+        self.new_table = f"_{table}_new"
+        self.old_table = f"_{table}_old"
+        self._triggers = [f"_{table}_osc_{kind}" for kind in ("ins", "upd", "del")]
+
+    def run(self):
+        """Apply the change; returns a summary dict with the method used."""
+        start = time.perf_counter()
+        for algorithm, lock in (("INSTANT", None), ("INPLACE", "NONE")):
+            if self._try_native(algorithm, lock):
+                return {"method": algorithm, "rows_copied": 0,
+                        "seconds": time.perf_counter() - start}
+        copied = self._shadow_copy()
+        return {"method": "COPY", "rows_copied": copied,
+                "seconds": time.perf_counter() - start}
+
+    def _try_native(self, algorithm, lock):
+        options = f", ALGORITHM={algorithm}"
+        if lock:
+            options += f", LOCK={lock}"
+        try:
+            self._execute(f"ALTER TABLE `{self.table}` {self.alter_clause}{options}")
+        except mysql.connector.Error as err:
+            if err.errno in _UNSUPPORTED_ALGORITHM:
+                return False
+            raise
+        self._report("done", method=algorithm)
+        return True
+
+    def _shadow_copy(self):
+        self._check_foreign_keys()
+        pk = self._primary_key()
+        try:
+            self._report("creating shadow table")
+            self._execute(f"DROP TABLE IF EXISTS `{self.new_table}`")
+            self._execute(f"CREATE TABLE `{self.new_table}` LIKE `{self.table}`")
+            self._execute(f"ALTER TABLE `{self.new_table}` {self.alter_clause}")
+            columns = self._common_columns()
+            self._report("creating change-capture triggers")
+            self._create_triggers(pk, columns)
+            copied = self._copy_rows(pk, columns)
+            self._report("swapping tables")
+            self._execute(
+                f"RENAME TABLE `{self.table}` TO `{self.old_table}`, "
+                f"`{self.new_table}` TO `{self.table}`"
+            )
+        except BaseException:
+            self._drop_triggers()
+            self._execute(f"DROP TABLE IF EXISTS `{self.new_table}`")
+            raise
+        # The triggers moved with the original table; remove them before it goes.
+        self._drop_triggers()
+        if self.drop_old:
+            self._execute(f"DROP TABLE IF EXISTS `{self.old_table}`")
+        self._report("done", method="COPY")
+        return copied
+
+    def _copy_rows(self, pk, columns):
+        column_sql = ", ".join(f"`{c}`" for c in columns)
+        total, max_key = self._fetchone(
+            f"SELECT COUNT(*), MAX(`{pk}`) FROM `{self.table}`"
+        )
+        if max_key is None:
+            return 0
+        # Rows above max_key arrive through the triggers.
+        copied = 0
+        last_key = None
+        chunk_size = self.chunk_size
+        started = time.perf_counter()
+        while True:
+            self._throttle()
+            lower = "" if last_key is None else f"`{pk}` > %s AND "
+            params = () if last_key is None else (last_key,)
+            row = self._fetchone(
+                f"SELECT `{pk}` FROM `{self.table}` WHERE {lower}`{pk}` <= %s "
+                f"ORDER BY `{pk}` LIMIT 1 OFFSET {int(chunk_size) - 1}",
+                params + (max_key,),
+            )
+            upper = row[0] if row else max_key
+            chunk_start = time.perf_counter()
+            cursor = self.conn.cursor()
+            try:
+                # A plain INSERT, so values the new definition rejects fail the copy as
+                # ALTER TABLE would, instead of being coerced (IGNORE). Rows the
+                # triggers already wrote are newer than the source and are skipped.
+                source_columns = ", ".join(f"t.`{c}`" for c in columns)
+                cursor.execute(
+                    f"INSERT INTO `{self.new_table}` ({column_sql}) "
+                    f"SELECT {source_columns} FROM `{self.table}` t FORCE INDEX (PRIMARY) "
+                    f"WHERE {lower.replace(f'`{pk}`', f't.`{pk}`')}t.`{pk}` <= %s "
+                    f"AND NOT EXISTS (SELECT 1 FROM `{self.new_table}` n WHERE n.`{pk}` = t.`{pk}`) "
+                    f"LOCK IN SHARE MODE",
+                    params + (upper,),
+                )
+                copied += max(cursor.rowcount, 0)
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+            elapsed = time.perf_counter() - chunk_start
+            if self.chunk_time and elapsed > 0:
+                # Move the chunk size toward the target time, at most 2x per step.
+                factor = max(0.5, min(2.0, self.chunk_time / elapsed))
+                chunk_size = max(100, int(chunk_size * factor))
+            rate = copied / (time.perf_counter() - started or 1e-9)
+            remaining = max(total - copied, 0)
+            self._report(
+                "copy", copied=copied, total=total,
+                percent=100.0 * copied / total if total else 100.0,
+                eta_seconds=remaining / rate if rate else None,
+            )
+            if upper == max_key:
+                return copied
+            last_key = upper
+
+    def _throttle(self):
+        while True:
+            reasons = []
+            running = int(self._fetchone("SHOW GLOBAL STATUS LIKE 'Threads_running'")[1])
+            if running > self.max_threads_running:
+                reasons.append(f"Threads_running={running}")
+            lag = self._replica_lag()
+            if lag is not None and lag > self.max_replica_lag:
+                reasons.append(f"replica lag {lag}s")
+            if not reasons:
+                return
+            self._report("throttled: " + ", ".join(reasons))
+            time.sleep(self.throttle_sleep)
+
+    def _replica_lag(self):
+        worst = None
+        for replica in self.replica_conns:
+            cursor = replica.cursor(dictionary=True)
+            try:
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except mysql.connector.Error:
+                    cursor.execute("SHOW SLAVE STATUS")
+                status = cursor.fetchone()
+            finally:
+                cursor.close()
+            if not status:
+                continue
+            lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+            if lag is None:
+                # Replication stopped: treat as infinitely behind.
+                lag = float("inf")
+            worst = lag if worst is None else max(worst, lag)
+        return worst
+
+    def _create_triggers(self, pk, columns):
+        column_sql = ", ".join(f"`{c}`" for c in columns)
+        new_values = ", ".join(f"NEW.`{c}`" for c in columns)
+        ins, upd, dele = self._triggers
+        self._execute(
+            f"CREATE TRIGGER `{ins}` AFTER INSERT ON `{self.table}` FOR EACH ROW "
+            f"REPLACE INTO `{self.new_table}` ({column_sql}) VALUES ({new_values})"
+        )
+        self._execute(
+            f"CREATE TRIGGER `{upd}` AFTER UPDATE ON `{self.table}` FOR EACH ROW BEGIN "
+            f"DELETE IGNORE FROM `{self.new_table}` WHERE `{pk}` = OLD.`{pk}`; "
+            f"REPLACE INTO `{self.new_table}` ({column_sql}) VALUES ({new_values}); END"
+        )
+        self._execute(
+            f"CREATE TRIGGER `{dele}` AFTER DELETE ON `{self.table}` FOR EACH ROW "
+            f"DELETE IGNORE FROM `{self.new_table}` WHERE `{pk}` = OLD.`{pk}`"
+        )
+
+    def _drop_triggers(self):
+        for name in self._triggers:
+            self._execute(f"DROP TRIGGER IF EXISTS `{name}`")
+
+    def _primary_key(self):
+        primary = table_indexes(self.conn, self.table).get("PRIMARY")
+        if not primary or len(primary["columns"]) != 1:
+            raise OnlineAlterError(
+                f"{self.table} needs a single-column primary key for an online copy"
+            )
+        return primary["columns"][0]
+
+    def _common_columns(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN (%s, %s) "
+            "ORDER BY ORDINAL_POSITION",
+            (self.table, self.new_table),
+        )
+        old, new = [], set()
+        for table_name, column in cursor.fetchall():
+            if table_name == self.table:
+                old.append(column)
+            else:
+                new.add(column)
+        cursor.close()
+        return [c for c in old if c in new]
+
+    def _check_foreign_keys(self):
+        references = self._fetchone(
+            "SELECT COUNT(*) FROM information_schema.KEY_COLUMN_USAGE "
+            "WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL "
+            "AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)",
+            (self.table, self.table),
+        )[0]
+        if references:
+            raise OnlineAlterError(
+                f"{self.table} takes part in foreign keys; the server cannot apply "
+                f"this change online and a shadow copy would break them"
+            )
+
+    def _execute(self, sql, params=None):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+        finally:
+            cursor.close()
+
+    def _fetchone(self, sql, params=None):
+        cursor = self.conn.cursor(buffered=True)
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def _report(self, phase, **details):
+        if self.progress is not None:
+            self.progress({"table": self.table, "phase": phase, **details})
+
+
+def online_alter(conn, table, alter_clause, **options):
+    """Shortcut for OnlineAlter(conn, table, alter_clause, **options).run()."""
+    return OnlineAlter(conn, table, alter_clause, **options).run()
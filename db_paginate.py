@@ -0,0 +1,241 @@
+"""
+Keyset (seek) pagination with opaque cursor tokens.
+
+LIMIT n OFFSET m reads and throws away m rows, so page 10,000 of a listing
+costs 10,000 times page 1. Paginator seeks instead: every page starts right
+after (or before) the key of the row that ended the previous one, so it is
+one index range read no matter how deep it is.
+
+    from db_paginate import Paginator
+
+    listing = Paginator(conn, "employees", key=("department", "id"),
+                        columns=["id", "name", "department"], page_size=50)
+    page = listing.page()                       # first page
+    page = listing.page(page.next_token)        # forwards
+    page = listing.page(page.prev_token)        # and back again
+    for row in page.rows:
+        print(row)
+
+Tokens are opaque URL-safe strings carrying the boundary key and direction,
+tied to the listing they came from (a token from another table, key,
+column list, filter or filter parameters is rejected). Pass `secret` to sign them so clients can't forge keys.
+
+The key must be unique as a whole (end it with the primary key) and be
+covered by an index in the same column order, e.g. (department, id) uses
+idx_department, since InnoDB secondary indexes end with the primary key.
+Key columns must not be NULL in the rows being paged.
+"""
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+from decimal import Decimal
+
+from db_sql import normalize_sql
+
+
+class InvalidToken(ValueError):
+    """A page token that is malformed, forged or from another listing."""
+
+
+class Page:
+    """One page of rows with the tokens that lead away from it."""
+
+    def __init__(self, rows, next_token, prev_token):
+        self.rows = rows
+        self.next_token = next_token
+        self.prev_token = prev_token
+
+    @property
+    def has_next(self):
+        return self.next_token is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_token is not None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"Page(rows={len(self.rows)}, has_prev={self.has_prev}, has_next={self.has_next})"
+
+
+def _encode_value(value):
+    if isinstance(value, Decimal):
+        return {"$d": str(value)}
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$da": value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$b": base64.b64encode(bytes(value)).decode("ascii")}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "$d" in value:
+            return Decimal(value["$d"])
+        if "$dt" in value:
+            return datetime.datetime.fromisoformat(value["$dt"])
+        if "$da" in value:
+            return datetime.date.fromisoformat(value["$da"])
+        if "$b" in value:
+            return base64.b64decode(value["$b"])
+    return value
+
+
+class Paginator:
+    """
+    Seek-based pages over one table.
+
+    key        -- column name or tuple of names the listing is ordered by
+    columns    -- "*" or the columns to return; must include the key columns
+    where      -- extra filter, with `params` for its placeholders
+    descending -- order the listing by the key descending
+    secret     -- bytes used to HMAC-sign tokens (unsigned when None)
+    """
+
+    def __init__(self, conn, table, key="id", columns="*", page_size=50, where=None,
+                 params=(), descending=False, secret=None):
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self.conn = conn
+        self.table = table
+        self.key = (key,) if isinstance(key, str) else tuple(key)
+        self.columns = columns
+        self.page_size = page_size
+        self.where = where
+        self.params = tuple(params)
+        self.descending = descending
+        self.secret = secret
+        column_sql = columns if isinstance(columns, str) else ", ".join(f"`{c}`" for c in columns)
+        self._select = f"SELECT {column_sql} FROM `{table}`"
+        self._key_index = None
+        # Identifies the listing so tokens can't be replayed against another one.
+        shape = "|".join([table, ",".join(self.key), column_sql, normalize_sql(where or ""),
+                          json.dumps([_encode_value(v) for v in self.params], default=str),
+                          "desc" if descending else "asc"])
+        self._listing = hashlib.sha256(shape.encode("utf-8")).hexdigest()[:12]
+
+    def _seek(self, forward):
+        """
+        WHERE clause for rows after (forward) or before the boundary key.
+
+        (a, b) > (x, y) is spelled out as a >= x AND (a > x OR (a = x AND b > y)):
+        the leading a >= x gives the optimizer a plain range on the index.
+        """
+        op = ">" if forward != self.descending else "<"
+        columns = [f"`{c}`" for c in self.key]
+        terms, params = [], []
+        for i, column in enumerate(columns):
+            equal = [f"{c} = %s" for c in columns[:i]]
+            terms.append("(" + " AND ".join(equal + [f"{column} {op} %s"]) + ")")
+            params.append(list(range(i + 1)))
+        sql = f"{columns[0]} {op}= %s AND ({' OR '.join(terms)})"
+        return sql, params
+
+    def _query(self, boundary, forward):
+        order = "ASC" if forward != self.descending else "DESC"
+        filters, args = [], []
+        if self.where:
+            filters.append(f"({self.where})")
+            args.extend(self.params)
+        if boundary is not None:
+            seek, positions = self._seek(forward)
+            filters.append(f"({seek})")
+            args.append(boundary[0])
+            for indexes in positions:
+                args.extend(boundary[i] for i in indexes)
+        where = f" WHERE {' AND '.join(filters)}" if filters else ""
+        order_by = ", ".join(f"`{c}` {order}" for c in self.key)
+        # One extra row tells whether there is another page in this direction.
+        return (f"{self._select}{where} ORDER BY {order_by} LIMIT {int(self.page_size) + 1}",
+                tuple(args))
+
+    def page(self, token=None):
+        """The first page, or the page a next_token / prev_token points to."""
+        boundary, forward = (None, True) if token is None else self._decode(token)
+        sql, args = self._query(boundary, forward)
+        cursor = self.conn.cursor(buffered=True)
+        try:
+            cursor.execute(sql, args)
+            rows = cursor.fetchall()
+            if self._key_index is None:
+                names = list(cursor.column_names)
+                missing = [c for c in self.key if c not in names]
+                if missing:
+                    raise ValueError(f"Key columns {missing} must be among the selected columns")
+                self._key_index = [names.index(c) for c in self.key]
+        finally:
+            cursor.close()
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward:
+            rows.reverse()
+        if not rows:
+            return Page(rows, None, None)
+        if forward:
+            next_token = self._token(rows[-1], True) if more else None
+            prev_token = self._token(rows[0], False) if boundary is not None else None
+        else:
+            next_token = self._token(rows[-1], True)
+            prev_token = self._token(rows[0], False) if more else None
+        return Page(rows, next_token, prev_token)
+
+    def pages(self, token=None):
+        """Iterate forward page by page from `token` (or the start)."""
+        while True:
+            page = self.page(token)
+            if page.rows:
+                yield page
+            if not page.has_next:
+                return
+            token = page.next_token
+
+    def token_after(self, key_values):
+        """A next-page token that starts right after the given key values."""
+        return self._encode(tuple(key_values), True)
+
+    def _token(self, row, forward):
+        return self._encode(tuple(row[i] for i in self._key_index), forward)
+
+    def _encode(self, key_values, forward):
+        if len(key_values) != len(self.key):
+            raise ValueError(f"Expected {len(self.key)} key values, got {len(key_values)}")
+        if any(v is None for v in key_values):
+            raise ValueError(f"Key columns {list(self.key)} must not be NULL for keyset paging")
+        payload = json.dumps({"l": self._listing, "f": forward,
+                              "k": [_encode_value(v) for v in key_values]},
+                             separators=(",", ":")).encode("utf-8")
+        if self.secret is not None:
+            payload += b"." + self._sign(payload)
+        return base64.urlsafe_b64encode(payload).rstrip(b"=").decode("ascii")
+
+    def _decode(self, token):
+        try:
+            payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            if self.secret is not None:
+                payload, _, signature = payload.rpartition(b".")
+                if not hmac.compare_digest(signature, self._sign(payload)):
+                    raise InvalidToken("Page token signature does not match")
+            data = json.loads(payload)
+            boundary = tuple(_decode_value(v) for v in data["k"])
+            forward = bool(data["f"])
+            listing = data["l"]
+        except InvalidToken:
+            raise
+        except (ValueError, KeyError, TypeError) as err:
+            raise InvalidToken(f"Malformed page token: {err}") from None
+        if listing != self._listing or len(boundary) != len(self.key):
+            raise InvalidToken("Page token belongs to a different listing")
+        return boundary, forward
+
+    def _sign(self, payload):
+        return base64.urlsafe_b64encode(
+            hmac.new(self.secret, payload, hashlib.sha256).digest()[:16]).rstrip(b"=")
@@ -0,0 +1,243 @@
+"""
+Split a large join/aggregation by key range across a pool of worker processes.
+
+A single SELECT runs on one server thread, however many cores the server
+has. ParallelQuery runs the same statement once per key range, each range on
+a worker process with its own connection, and merges the partial results on
+the client:
+
+    from db_parallel import ParallelQuery
+
+    report = ParallelQuery(
+        "SELECT e.department, SUM(s.sales_amount), COUNT(*), MAX(s.sales_amount) "
+        "FROM employees e JOIN sales s ON e.id = s.employee_id "
+        "WHERE {partition} GROUP BY e.department",
+        partition_column="s.employee_id",
+        merge=("key", "sum", "sum", "max"),
+        database="Database1", workers=8,
+    )
+    with report:
+        for department, total, count, largest in report.run(table="employees"):
+            print(department, total, count, largest)
+
+`{partition}` is replaced with `column BETWEEN lo AND hi`. The merge spec
+names what to do with each output column: "key" columns identify a group,
+and "sum", "min" and "max" combine the partial aggregates (COUNT merges as
+"sum"; compute averages as SUM / COUNT after merging). Without a merge spec
+the partial rows are concatenated in range order, which is how plain joins
+are parallelised.
+
+Partition on the column the join is driven from: employees.id for LEFT
+JOIN, sales.employee_id for INNER and RIGHT JOIN. With include_nulls=True,
+rows whose partition column is NULL (a RIGHT JOIN's sales without an
+employee) are read by the first range.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+from db_pool import backend_connect, connection_config
+
+MERGES = {
+    "sum": lambda a, b: b if a is None else a if b is None else a + b,
+    "min": lambda a, b: b if a is None else a if b is None else min(a, b),
+    "max": lambda a, b: b if a is None else a if b is None else max(a, b),
+}
+
+# One connection per worker process, opened by _init_worker().
+_worker_conn = None
+
+
+def _init_worker(config):
+    global _worker_conn
+    _worker_conn = backend_connect()(**config)
+
+
+def _run_partition(sql, params):
+    start = time.perf_counter()
+    cursor = _worker_conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    return rows, time.perf_counter() - start
+
+
+def key_ranges(conn, table, column="id", partitions=8):
+    """
+    Split MIN(column)..MAX(column) of `table` into `partitions` contiguous,
+    equal-width inclusive ranges. Returns [] for an empty table.
+    """
+    cursor = conn.cursor(buffered=True)
+    cursor.execute(f"SELECT MIN(`{column}`), MAX(`{column}`) FROM `{table}`")
+    low, high = cursor.fetchone()
+    cursor.close()
+    if low is None:
+        return []
+    partitions = max(1, min(partitions, high - low + 1))
+    width = (high - low + 1) / partitions
+    bounds = [low + round(i * width) for i in range(partitions)] + [high + 1]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(partitions)]
+
+
+class ParallelStats:
+    def __init__(self):
+        self.partitions = 0
+        self.rows = 0
+        self.elapsed = 0.0
+        self.partition_seconds = []
+
+    @property
+    def skew(self):
+        """Slowest partition over the mean: 1.0 means perfectly balanced ranges."""
+        if not self.partition_seconds:
+            return 0.0
+        mean = sum(self.partition_seconds) / len(self.partition_seconds)
+        return max(self.partition_seconds) / mean if mean else 0.0
+
+    def __repr__(self):
+        return (f"ParallelStats(partitions={self.partitions}, rows={self.rows}, "
+                f"elapsed={self.elapsed:.3f}s, skew={self.skew:.2f})")
+
+
+class ParallelQuery:
+    """
+    One SELECT run per key range on a process pool, merged on the client.
+
+    partition_column -- column the {partition} placeholder constrains, e.g. "s.employee_id"
+    merge            -- per output column "key", "sum", "min" or "max"; None concatenates rows
+    workers          -- worker processes, each holding one connection (default: CPU count)
+    partitions       -- ranges per run (default 4 x workers, so a slow range doesn't
+                        leave the other workers idle)
+    include_nulls    -- also read rows whose partition column is NULL (first range)
+    """
+
+    def __init__(self, sql, partition_column, merge=None, workers=None, partitions=None,
+                 include_nulls=False, database=None, **config):
+        if "{partition}" not in sql:
+            raise ValueError("sql must contain a {partition} placeholder")
+        if merge is not None:
+            unknown = [m for m in merge if m != "key" and m not in MERGES]
+            if unknown:
+                raise ValueError(f"Unknown merge {unknown}; use 'key', {', '.join(MERGES)}")
+        self.sql = sql
+        self.partition_column = partition_column
+        self.merge = tuple(merge) if merge is not None else None
+        self.workers = workers or os.cpu_count() or 1
+        self.partitions = partitions or 4 * self.workers
+        self.include_nulls = include_nulls
+        self.config = connection_config(database, **config)
+        self._executor = None
+        self.stats = ParallelStats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                 initargs=(self.config,))
+        return self._executor
+
+    def ranges(self, table, column="id"):
+        """key_ranges() of `table`, read over a short-lived connection."""
+        conn = backend_connect()(**self.config)
+        try:
+            return key_ranges(conn, table, column, self.partitions)
+        finally:
+            conn.close()
+
+    def statements(self, ranges, params=None):
+        """The (sql, params) pair each range runs."""
+        column = self.partition_column
+        statements = []
+        for i, (low, high) in enumerate(ranges):
+            predicate = f"{column} BETWEEN %s AND %s"
+            if i == 0 and self.include_nulls:
+                predicate = f"({predicate} OR {column} IS NULL)"
+            statements.append((self.sql.replace("{partition}", predicate),
+                               tuple(params or ()) + (low, high)))
+        return statements
+
+    def run(self, params=None, ranges=None, table=None, column="id"):
+        """
+        Run every range and return the merged rows. Pass explicit `ranges`
+        or the `table`/`column` to derive them from. `params` fill any %s
+        placeholders that come before {partition} in the statement.
+        """
+        if ranges is None:
+            if table is None:
+                raise ValueError("Pass ranges or the table to derive them from")
+            ranges = self.ranges(table, column)
+        start = time.perf_counter()
+        stats = self.stats = ParallelStats()
+        statements = self.statements(ranges, params)
+        futures = [self._pool().submit(_run_partition, sql, args) for sql, args in statements]
+        partials = []
+        for future in futures:
+            rows, seconds = future.result()
+            partials.append(rows)
+            stats.partition_seconds.append(seconds)
+            stats.rows += len(rows)
+        stats.partitions = len(statements)
+        merged = self._merge(partials)
+        stats.elapsed = time.perf_counter() - start
+        return merged
+
+    def _merge(self, partials):
+        if self.merge is None:
+            return [row for rows in partials for row in rows]
+        merger = RowMerger(self.merge)
+        for rows in partials:
+            merger.add(rows)
+        return merger.rows()
+
+
+class RowMerger:
+    """
+    Combine partial aggregate rows by a merge spec, one batch at a time, so
+    partials can be folded in as they arrive. rows() returns the merged
+    groups sorted by their key columns.
+    """
+
+    def __init__(self, merge):
+        unknown = [m for m in merge if m != "key" and m not in MERGES]
+        if unknown:
+            raise ValueError(f"Unknown merge {unknown}; use 'key', {', '.join(MERGES)}")
+        self.merge = tuple(merge)
+        self._keys = [i for i, m in enumerate(self.merge) if m == "key"]
+        self._groups = {}
+
+    def add(self, rows):
+        for row in rows:
+            if len(row) != len(self.merge):
+                raise ValueError(f"merge has {len(self.merge)} entries but rows have {len(row)} columns")
+            key = tuple(row[i] for i in self._keys)
+            current = self._groups.get(key)
+            if current is None:
+                self._groups[key] = list(row)
+                continue
+            for i, how in enumerate(self.merge):
+                if how != "key":
+                    current[i] = MERGES[how](current[i], row[i])
+
+    def rows(self):
+        keys = self._keys
+        return sorted((tuple(row) for row in self._groups.values()),
+                      key=lambda row: tuple((row[i] is None, row[i]) for i in keys))
+
+
+def parallel_query(sql, partition_column, table, merge=None, params=None, column="id", **options):
+    """Convenience wrapper: run a ParallelQuery once and shut its workers down."""
+    with ParallelQuery(sql, partition_column, merge, **options) as query:
+        return query.run(params, table=table, column=column)
@@ -0,0 +1,353 @@
+"""
+Shared MySQL connection pool for the numbered scripts.
+
+Every script used to open its own connection with mysql.connector.connect()
+and close it at the end, paying the TCP + auth handshake each time. Import
+`connect` from here instead: it hands out a pooled connection whose close()
+returns it to the pool, so scripts run back to back in one process reuse the
+same server sessions.
+
+    from db_pool import connect
+
+    conn = connect(database="Database1")
+    cursor = conn.cursor()
+    ...
+    cursor.close()
+    conn.close()   # returned to the pool, not disconnected
+
+Settings come from the environment (or a .env file):
+    MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD
+    MYSQL_POOL_SIZE, MYSQL_POOL_MAX_IDLE, MYSQL_POOL_MAX_LIFETIME, MYSQL_POOL_TIMEOUT
+    MYSQL_BACKEND   "mysql" (default) or "sqlite" for the in-process stand-in
+                    in db_sqlite.py, which also reads MYSQL_SQLITE_PATH and
+                    MYSQL_SQLITE_LATENCY
+The older `user` / `password` names used by scripts 1-4 are still honoured.
+
+Code that needs its own, unpooled connection (benchmarks, worker processes)
+calls open_connection(database), which goes to the same backend.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def connection_config(database=None, **overrides):
+    """Build mysql.connector.connect() keyword arguments from the environment."""
+    config = {
+        "host": os.getenv("MYSQL_HOST", "localhost"),
+        "port": int(os.getenv("MYSQL_PORT", "3306")),
+        "user": os.getenv("MYSQL_USER") or os.getenv("user"),
+        "password": os.getenv("MYSQL_PASSWORD") or os.getenv("password"),
+    }
+    if database:
+        config["database"] = database
+    config.update(overrides)
+    return config
+
+
+_backends = {"mysql": mysql.connector.connect}
+
+
+def register_backend(name, connect):
+    """Make connect(**config) available as MYSQL_BACKEND=name."""
+    _backends[name] = connect
+
+
+def backend_connect():
+    """The connect(**config) function of the backend MYSQL_BACKEND names."""
+    name = os.getenv("MYSQL_BACKEND", "mysql").lower()
+    if name == "sqlite" and name not in _backends:
+        import db_sqlite  # noqa: F401  (registers itself)
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown MYSQL_BACKEND {name!r}; expected one of {sorted(_backends)}") from None
+
+
+def open_connection(database=None, **overrides):
+    """An unpooled connection to the configured backend."""
+    return backend_connect()(**connection_config(database, **overrides))
+
+
+class _PoolEntry:
+    """Bookkeeping for one physical connection owned by the pool."""
+
+    __slots__ = ("conn", "created_at", "last_used", "database")
+
+    def __init__(self, conn, database):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        self.database = database
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled connection.
+
+    Behaves like the underlying mysql.connector connection, except that
+    close() hands the connection back to its pool instead of disconnecting.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise PoolError("Connection has already been returned to the pool")
+        return getattr(entry.conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def raw_connection(self):
+        """The underlying mysql.connector connection object."""
+        if self._entry is None:
+            raise PoolError("Connection has already been returned to the pool")
+        return self._entry.conn
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+    def discard(self):
+        """Close the physical connection instead of returning it to the pool."""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.discard(entry)
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of MySQL connections.
+
+    size          -- maximum number of open connections (idle + checked out)
+    max_idle      -- seconds an idle connection may sit before it is closed
+    max_lifetime  -- seconds after which a connection is retired on release
+    timeout       -- seconds acquire() waits for a free slot before PoolError
+    health_check  -- ping connections on checkout and replace dead ones
+    """
+
+    def __init__(self, size=5, max_idle=300, max_lifetime=3600, timeout=30,
+                 health_check=True, **config):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.health_check = health_check
+        self._config = config or connection_config()
+        self._idle = deque()
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {
+            "created": 0,
+            "reused": 0,
+            "discarded": 0,
+            "waits": 0,
+            "handshake_seconds": 0.0,
+        }
+
+    def acquire(self, database=None, timeout=None):
+        """
+        Check out a connection switched to `database`, or to the pool's
+        configured database when None, whatever the last borrower used.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        database = database or self._config.get("database")
+        while True:
+            entry = self._checkout(deadline, timeout)
+            if entry is None:
+                entry = self._new_entry(database)
+            elif not self._is_healthy(entry):
+                self.discard(entry)
+                continue
+            if entry.database != database:
+                if not database:
+                    # There is no USE back to "no database": open a fresh session.
+                    self.discard(entry)
+                    continue
+                entry.conn.database = database
+                entry.database = database
+            return PooledConnection(self, entry)
+
+    def release(self, entry):
+        """Return a connection to the pool, rolling back any open transaction."""
+        conn = entry.conn
+        try:
+            if conn.unread_result:
+                conn.consume_results()
+            if conn.in_transaction:
+                conn.rollback()
+        except mysql.connector.Error:
+            self.discard(entry)
+            return
+        now = time.monotonic()
+        with self._cond:
+            if self._closed or now - entry.created_at >= self.max_lifetime:
+                retire = True
+            else:
+                retire = False
+                entry.last_used = now
+                self._idle.append(entry)
+                self._cond.notify()
+        if retire:
+            self.discard(entry)
+
+    def discard(self, entry):
+        """Close a connection and free its slot."""
+        _close_quietly(entry.conn)
+        with self._cond:
+            self._open -= 1
+            self.stats["discarded"] += 1
+            self._cond.notify()
+
+    def close(self):
+        """Close every idle connection and refuse new checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            _close_quietly(entry.conn)
+
+    def _checkout(self, deadline, timeout):
+        # Returns an idle entry, or None when the caller should open a new one.
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                self._evict_idle()
+                if self._idle:
+                    self.stats["reused"] += 1
+                    return self._idle.pop()
+                if self._open < self.size:
+                    self._open += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolError(
+                        f"No connection available within {timeout}s "
+                        f"(pool size {self.size})"
+                    )
+                self.stats["waits"] += 1
+                self._cond.wait(remaining)
+
+    def _evict_idle(self):
+        # Idle entries are appended on release, so the oldest sit on the left.
+        now = time.monotonic()
+        while self._idle and now - self._idle[0].last_used >= self.max_idle:
+            entry = self._idle.popleft()
+            self._open -= 1
+            self.stats["discarded"] += 1
+            _close_quietly(entry.conn)
+
+    def _new_entry(self, database):
+        config = dict(self._config)
+        if database:
+            config["database"] = database
+        start = time.perf_counter()
+        try:
+            conn = backend_connect()(**config)
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats["handshake_seconds"] += time.perf_counter() - start
+            self.stats["created"] += 1
+        return _PoolEntry(conn, config.get("database"))
+
+    def _is_healthy(self, entry):
+        if time.monotonic() - entry.created_at >= self.max_lifetime:
+            return False
+        if not self.health_check:
+            return True
+        try:
+            entry.conn.ping(reconnect=False)
+        except mysql.connector.Error:
+            return False
+        return True
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except mysql.connector.Error:
+        pass
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it from the environment."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool(
+                size=int(os.getenv("MYSQL_POOL_SIZE", "5")),
+                max_idle=float(os.getenv("MYSQL_POOL_MAX_IDLE", "300")),
+                max_lifetime=float(os.getenv("MYSQL_POOL_MAX_LIFETIME", "3600")),
+                timeout=float(os.getenv("MYSQL_POOL_TIMEOUT", "30")),
+                **connection_config(),
+            )
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+def reset_pool():
+    """Close the process-wide pool; the next connect() builds a fresh one."""
+    global _default_pool
+    with _default_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.close()
+
+
+_connect_hooks = []
+
+
+def add_connect_hook(hook):
+    """
+    Register hook(conn, wait_seconds) -> conn. connect() passes every
+    checkout through the hooks (db_instrument uses this to wrap connections).
+    """
+    _connect_hooks.append(hook)
+
+
+def remove_connect_hook(hook):
+    if hook in _connect_hooks:
+        _connect_hooks.remove(hook)
+
+
+def connect(database=None):
+    """Check out a connection from the shared pool."""
+    start = time.perf_counter()
+    conn = get_pool().acquire(database)
+    wait = time.perf_counter() - start
+    for hook in list(_connect_hooks):
+        conn = hook(conn, wait)
+    return conn
@@ -0,0 +1,149 @@
+"""
+Per-connection cache of server-side prepared statements.
+
+cursor.execute(sql, params) interpolates the parameters on the client and
+the server parses the full statement text every time. For statements run
+over and over (5_constraints.py's INSERT, point SELECTs by id) it is cheaper
+to prepare once and send only the parameters afterwards:
+
+    from db_prepared import statement_cache
+
+    statements = statement_cache(conn)
+    insert = "INSERT INTO employees (name, department) VALUES (%s, %s)"
+    for row in rows:
+        statements.execute(insert, row)
+    employee = statements.query("SELECT * FROM employees WHERE id = %s", (1,))
+
+Each connection gets one StatementCache, keyed by SQL text and bounded by
+LRU. The default size is the connection's fair share of the server-wide
+max_prepared_stmt_count (divided by max_connections), and hitting that
+limit anyway evicts and shrinks the cache instead of failing. When the
+connection reconnects, statements are prepared again on the new session.
+"""
+import weakref
+from collections import OrderedDict
+
+import mysql.connector
+from mysql.connector import errorcode
+
+_SESSION_LOST = {errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST}
+
+_CACHES = weakref.WeakKeyDictionary()
+
+
+class StatementCache:
+    """
+    LRU of prepared cursors for one connection.
+
+    max_size  -- statements kept prepared; None derives it from the server limits
+    """
+
+    def __init__(self, conn, max_size=None):
+        self.conn = conn
+        self._cursors = OrderedDict()
+        self._session = None
+        self.max_size = max_size if max_size is not None else self._server_share()
+        self.stats = dict.fromkeys(("hits", "misses", "evictions", "reprepares"), 0)
+
+    def _server_share(self):
+        cursor = self.conn.cursor(buffered=True)
+        cursor.execute("SELECT @@global.max_prepared_stmt_count, @@global.max_connections")
+        limit, connections = cursor.fetchone()
+        cursor.close()
+        return max(8, min(256, int(limit) // max(1, int(connections))))
+
+    def cursor(self, sql):
+        """The prepared cursor for `sql`, preparing it on first use."""
+        return self._lookup(sql)[1]
+
+    def _lookup(self, sql):
+        session = self.conn.connection_id
+        if session != self._session:
+            if self._session is not None and self._cursors:
+                self.stats["reprepares"] += len(self._cursors)
+            # Statements from an earlier session died with it; don't deallocate them.
+            self._cursors.clear()
+            self._session = session
+        entry = self._cursors.get(sql)
+        if entry is not None:
+            self._cursors.move_to_end(sql)
+            self.stats["hits"] += 1
+            return entry
+        self.stats["misses"] += 1
+        while len(self._cursors) >= self.max_size:
+            self._evict()
+        # The connector re-prepares whenever it is handed a different string
+        # object, so executions always pass the text stored here.
+        entry = self._cursors[sql] = (sql, self.conn.cursor(prepared=True))
+        return entry
+
+    def execute(self, sql, params=()):
+        """Execute `sql` as a prepared statement; returns the cursor for rowcount, lastrowid or rows."""
+        text, cursor = self._lookup(sql)
+        try:
+            cursor.execute(text, params)
+        except mysql.connector.Error as err:
+            if err.errno == errorcode.ER_MAX_PREPARED_STMT_COUNT_REACHED:
+                # Other sessions hold more than their share: give some back and retry.
+                self._forget(sql)
+                self.max_size = max(1, len(self._cursors) // 2)
+                while len(self._cursors) >= self.max_size:
+                    self._evict()
+            elif err.errno == errorcode.ER_UNKNOWN_STMT_HANDLER:
+                self._forget(sql, close=False)
+                self.stats["reprepares"] += 1
+            else:
+                if err.errno in _SESSION_LOST:
+                    # Nothing to deallocate; the next call after a reconnect prepares afresh.
+                    self._cursors.clear()
+                raise
+            text, cursor = self._lookup(sql)
+            cursor.execute(text, params)
+        return cursor
+
+    def executemany(self, sql, seq_params):
+        cursor = None
+        for params in seq_params:
+            cursor = self.execute(sql, params)
+        return cursor
+
+    def query(self, sql, params=()):
+        """Run a prepared SELECT and return all rows."""
+        return self.execute(sql, params).fetchall()
+
+    def clear(self):
+        """Deallocate every cached statement."""
+        while self._cursors:
+            self._evict()
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def _evict(self):
+        _, (_, cursor) = self._cursors.popitem(last=False)
+        self.stats["evictions"] += 1
+        _close_quietly(cursor)
+
+    def _forget(self, sql, close=True):
+        entry = self._cursors.pop(sql, None)
+        if entry is not None and close:
+            _close_quietly(entry[1])
+
+
+def _close_quietly(cursor):
+    try:
+        cursor.close()
+    except mysql.connector.Error:
+        pass
+
+
+def statement_cache(conn, max_size=None):
+    """
+    The StatementCache of `conn`, created on first use. Pooled connections
+    share the cache of the underlying session across checkouts.
+    """
+    raw = getattr(conn, "raw_connection", conn)
+    cache = _CACHES.get(raw)
+    if cache is None:
+        cache = _CACHES[raw] = StatementCache(raw, max_size)
+    return cache
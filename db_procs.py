@@ -0,0 +1,274 @@
+"""
+Parameterized, pipelined stored-procedure calls.
+
+11_Call_Stored_Procedure.py sends `CALL AddEmployee('Alice Green', ...)`
+statements with literal values pasted into one multi-statement string.
+Procedure looks the procedure's signature up once in
+information_schema.PARAMETERS, binds arguments by position or by name, and
+either calls it through cursor.callproc() or, for many calls, pipelines
+parameterized CALLs so that one round trip carries up to `pipeline_size`
+of them:
+
+    from db_procs import Procedure
+
+    add_employee = Procedure(conn, "AddEmployee")
+    add_employee.call("Alice Green", "HR", 4500.00)
+    add_employee.call(emp_name="Bob Brown", emp_department="IT", emp_salary=5000.00)
+    stats = add_employee.call_many(rows)        # tuples or dicts
+    conn.commit()
+    print(stats)
+
+Signatures are cached per schema and procedure name; call
+forget_procedure() after a procedure is redefined (12_Modify_...py).
+"""
+import threading
+import time
+
+from mysql.connector.errors import ProgrammingError
+
+from db_bulk import estimate_row_bytes
+
+_PARAMETER_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
+class Parameter:
+    __slots__ = ("name", "mode", "data_type")
+
+    def __init__(self, name, mode, data_type):
+        self.name = name
+        self.mode = mode
+        self.data_type = data_type
+
+    def __repr__(self):
+        return f"Parameter({self.mode} {self.name} {self.data_type})"
+
+
+class CallStats:
+    """Counters for one call_many() run."""
+
+    def __init__(self):
+        self.calls = 0
+        self.round_trips = 0
+        self.result_sets = 0
+        self.seconds = 0.0
+
+    @property
+    def calls_per_sec(self):
+        return self.calls / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"CallStats(calls={self.calls}, round_trips={self.round_trips}, "
+            f"result_sets={self.result_sets}, seconds={self.seconds:.3f}, "
+            f"calls_per_sec={self.calls_per_sec:.1f})"
+        )
+
+
+def _current_schema(conn):
+    cursor = conn.cursor(buffered=True)
+    cursor.execute("SELECT DATABASE()")
+    schema = cursor.fetchone()[0]
+    cursor.close()
+    if schema is None:
+        raise ProgrammingError(msg="No database selected", errno=1046)
+    return schema
+
+
+def procedure_parameters(conn, name, schema=None, refresh=False):
+    """The parameters of procedure `name`, in declaration order, cached per schema."""
+    if schema is None:
+        schema = _current_schema(conn)
+    key = (schema.lower(), name.lower())
+    with _CACHE_LOCK:
+        if not refresh and key in _PARAMETER_CACHE:
+            return _PARAMETER_CACHE[key]
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT r.ROUTINE_NAME, p.PARAMETER_NAME, p.PARAMETER_MODE, p.DATA_TYPE
+        FROM information_schema.ROUTINES r
+        LEFT JOIN information_schema.PARAMETERS p
+            ON p.SPECIFIC_SCHEMA = r.ROUTINE_SCHEMA
+            AND p.SPECIFIC_NAME = r.SPECIFIC_NAME
+            AND p.ORDINAL_POSITION > 0
+        WHERE r.ROUTINE_SCHEMA = %s AND r.ROUTINE_NAME = %s AND r.ROUTINE_TYPE = 'PROCEDURE'
+        ORDER BY p.ORDINAL_POSITION
+        """,
+        (schema, name),
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    if not rows:
+        raise ProgrammingError(msg=f"PROCEDURE {schema}.{name} does not exist", errno=1305)
+    params = tuple(
+        Parameter(param, mode, data_type)
+        for _, param, mode, data_type in rows
+        if param is not None
+    )
+    with _CACHE_LOCK:
+        _PARAMETER_CACHE[key] = params
+    return params
+
+
+def forget_procedure(name=None, schema=None):
+    """Drop cached signatures: one procedure, every procedure in a schema, or all."""
+    with _CACHE_LOCK:
+        for key in list(_PARAMETER_CACHE):
+            if (schema is None or key[0] == schema.lower()) and (
+                name is None or key[1] == name.lower()
+            ):
+                del _PARAMETER_CACHE[key]
+
+
+def run_multi(cursor, sql, params=None):
+    """
+    Run a multi-statement string and read every result set it produces.
+
+    Returns the number of result sets that carried rows.
+    """
+    try:
+        results = cursor.execute(sql, params, multi=True)
+    except TypeError:  # newer connectors run multi-statements without the flag
+        cursor.execute(sql, params)
+        results = None
+    with_rows = 0
+    if results is not None:
+        for result in results:
+            if result.with_rows:
+                result.fetchall()
+                with_rows += 1
+        return with_rows
+    while True:
+        if cursor.with_rows:
+            cursor.fetchall()
+            with_rows += 1
+        if not cursor.nextset():
+            return with_rows
+
+
+class Procedure:
+    """
+    A stored procedure with a cached signature.
+
+    schema         -- schema holding the procedure (default: current database)
+    pipeline_size  -- CALL statements sent per round trip by call_many()
+    max_packet     -- size limit for one pipelined batch; defaults to @@max_allowed_packet
+    """
+
+    def __init__(self, conn, name, schema=None, pipeline_size=200, max_packet=None):
+        self.conn = conn
+        self.name = name
+        self.schema = schema or _current_schema(conn)
+        self.pipeline_size = pipeline_size
+        self._max_packet = max_packet
+        self.params = procedure_parameters(conn, name, self.schema)
+        self._qualified = f"`{self.schema}`.`{name}`"
+        self._call = f"CALL {self._qualified}(" + ", ".join(["%s"] * len(self.params)) + ")"
+
+    @property
+    def pipelinable(self):
+        """OUT/INOUT values are only returned through callproc()."""
+        return all(param.mode == "IN" for param in self.params)
+
+    @property
+    def max_packet(self):
+        if self._max_packet is None:
+            cursor = self.conn.cursor(buffered=True)
+            cursor.execute("SELECT @@max_allowed_packet")
+            self._max_packet = int(cursor.fetchone()[0])
+            cursor.close()
+        return self._max_packet
+
+    def bind(self, args=(), kwargs=None):
+        """Order positional and keyword arguments by the procedure's signature."""
+        if isinstance(args, dict):
+            args, kwargs = (), args
+        kwargs = kwargs or {}
+        if len(args) > len(self.params):
+            raise TypeError(
+                f"{self.name}() takes {len(self.params)} arguments but {len(args)} were given"
+            )
+        values = list(args)
+        by_name = {param.name.lower(): param for param in self.params}
+        unknown = [key for key in kwargs if key.lower() not in by_name]
+        if unknown:
+            raise TypeError(f"{self.name}() got unexpected arguments: {', '.join(unknown)}")
+        supplied = {key.lower(): value for key, value in kwargs.items()}
+        repeated = [param.name for param in self.params[:len(values)]
+                    if param.name.lower() in supplied]
+        if repeated:
+            raise TypeError(f"{self.name}() got multiple values for: {', '.join(repeated)}")
+        for param in self.params[len(values):]:
+            if param.name.lower() in supplied:
+                values.append(supplied.pop(param.name.lower()))
+            elif param.mode == "OUT":
+                values.append(None)
+            else:
+                raise TypeError(f"{self.name}() missing argument `{param.name}`")
+        return tuple(values)
+
+    def call(self, *args, **kwargs):
+        """
+        Call the procedure once. Returns (arguments, result_sets): the
+        arguments with OUT/INOUT values filled in, and the rows of every
+        result set the procedure produced.
+        """
+        cursor = self.conn.cursor()
+        try:
+            result_args = cursor.callproc(self._qualified, self.bind(args, kwargs))
+            return tuple(result_args), [result.fetchall() for result in cursor.stored_results()]
+        finally:
+            cursor.close()
+
+    def call_many(self, rows):
+        """
+        Call the procedure once per row (tuples or dicts), pipelining the calls.
+
+        The caller commits; result sets are read and discarded.
+        """
+        stats = CallStats()
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            if not self.pipelinable:
+                for row in rows:
+                    cursor.callproc(self._qualified, self.bind(row))
+                    for result in cursor.stored_results():
+                        result.fetchall()
+                        stats.result_sets += 1
+                    stats.calls += 1
+                    stats.round_trips += 1
+                return stats
+            budget = self.max_packet - 1024
+            batch, params, size = [], [], 0
+            for row in rows:
+                values = self.bind(row)
+                row_size = len(self._call) + 2 + estimate_row_bytes(values)
+                if batch and (len(batch) >= self.pipeline_size or size + row_size > budget):
+                    self._send(cursor, batch, params, stats)
+                    batch, params, size = [], [], 0
+                batch.append(self._call)
+                params.extend(values)
+                size += row_size
+            if batch:
+                self._send(cursor, batch, params, stats)
+            return stats
+        finally:
+            cursor.close()
+            stats.seconds = time.perf_counter() - start
+
+    def _send(self, cursor, batch, params, stats):
+        stats.result_sets += run_multi(cursor, "; ".join(batch), params)
+        stats.calls += len(batch)
+        stats.round_trips += 1
+
+
+def call_procedure(conn, name, *args, **kwargs):
+    """Call `name` once with bound arguments; see Procedure.call()."""
+    return Procedure(conn, name).call(*args, **kwargs)
+
+
+def call_many(conn, name, rows, **options):
+    """Pipeline one call of `name` per row; see Procedure.call_many()."""
+    return Procedure(conn, name, **options).call_many(rows)
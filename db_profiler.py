@@ -0,0 +1,265 @@
+"""
+Query plan capture and plan-regression detection.
+
+7_indexes.py prints raw EXPLAIN ANALYZE rows. QueryProfiler runs
+EXPLAIN FORMAT=JSON (and, optionally, EXPLAIN ANALYZE) for every registered
+query and pulls out what matters: the indexes the optimizer chose, full
+table scans, rows examined, and estimated vs actual cost. Profiles can be
+saved as a baseline and later runs compared against it, so a dropped or
+ignored index (6_indexes_1.py and 7_indexes.py both drop theirs) shows up as
+a failure instead of a silent slowdown.
+
+    from db_profiler import QueryProfiler
+
+    profiler = QueryProfiler(conn)
+    profiler.register("composite", "SELECT * FROM employees WHERE age = %s AND salary > %s",
+                      (30, 50000), expect_index="idx_age_salary")
+    profiler.save_baseline("plans.json")        # once, on a known-good schema
+    ...
+    profiler.assert_no_regressions("plans.json")  # in CI / after migrations
+
+EXPLAIN ANALYZE executes the statement, so only enable analyze for reads.
+"""
+import json
+import re
+
+_ESTIMATE_RE = re.compile(r"\(cost=([\d.eE+]+) rows=([\d.eE+]+)\)")
+_ACTUAL_RE = re.compile(
+    r"\(actual time=([\d.eE+]+)\.\.([\d.eE+]+) rows=([\d.eE+]+) loops=(\d+)\)"
+)
+_USING_INDEX_RE = re.compile(r" using (\w+)")
+# Leaf access methods: "Table scan on t", "Index lookup on t using idx (...)",
+# "Full-text index search on t using idx (...)", ...
+_ACCESS_RE = re.compile(r"\b(?:scan|lookup|search) on (\w+)")
+
+
+class PlanRegressionError(AssertionError):
+    """Raised by assert_no_regressions() when any registered plan regressed."""
+
+    def __init__(self, regressions):
+        self.regressions = regressions
+        lines = "\n".join(f"  - {r}" for r in regressions)
+        super().__init__(f"{len(regressions)} query plan regression(s):\n{lines}")
+
+
+class Regression:
+    """One way in which a query plan got worse than its baseline."""
+
+    def __init__(self, query, kind, detail):
+        self.query = query
+        self.kind = kind
+        self.detail = detail
+
+    def to_dict(self):
+        return {"query": self.query, "kind": self.kind, "detail": self.detail}
+
+    def __repr__(self):
+        return f"{self.query}: {self.kind} ({self.detail})"
+
+
+class PlanProfile:
+    """The parsed plan of one query."""
+
+    def __init__(self, name, sql, tables, estimated_cost, explain_json,
+                 analyze=None):
+        self.name = name
+        self.sql = sql
+        self.tables = tables
+        self.estimated_cost = estimated_cost
+        self.explain_json = explain_json
+        self.analyze_text = analyze
+        self.estimated_rows = None
+        self.actual_rows = None
+        self.actual_ms = None
+        self.rows_examined = None
+        if analyze:
+            self._parse_analyze(analyze)
+
+    @property
+    def indexes(self):
+        """Sorted names of the indexes the optimizer chose."""
+        return sorted({t["key"] for t in self.tables if t.get("key")})
+
+    @property
+    def full_scans(self):
+        """Tables read with a full table scan (access_type ALL)."""
+        return sorted({t["table"] for t in self.tables if t.get("access_type") == "ALL"})
+
+    def _parse_analyze(self, text):
+        lines = [line for line in text.splitlines() if line.strip()]
+        if not lines:
+            return
+        estimate = _ESTIMATE_RE.search(lines[0])
+        if estimate:
+            self.estimated_rows = float(estimate.group(2))
+        actual = _ACTUAL_RE.search(lines[0])
+        if actual:
+            self.actual_ms = float(actual.group(2))
+            self.actual_rows = float(actual.group(3)) * int(actual.group(4))
+        # Rows examined: what the access methods at the leaves actually read.
+        examined = 0.0
+        for line in lines:
+            if _ACCESS_RE.search(line):
+                actual = _ACTUAL_RE.search(line)
+                if actual:
+                    examined += float(actual.group(3)) * int(actual.group(4))
+        self.rows_examined = examined
+        # EXPLAIN ANALYZE also names indexes (e.g. FULLTEXT searches) that the
+        # JSON format reports differently; merge them in.
+        known = set(self.indexes)
+        for line in lines:
+            if not _ACCESS_RE.search(line):
+                continue
+            for name in _USING_INDEX_RE.findall(line):
+                if name not in known:
+                    self.tables.append({"table": None, "key": name, "access_type": None})
+                    known.add(name)
+
+    def summary(self):
+        parts = [
+            f"{self.name}: indexes={self.indexes or 'none'}",
+            f"full_scans={self.full_scans or 'none'}",
+            f"estimated_cost={self.estimated_cost}",
+        ]
+        if self.actual_ms is not None:
+            parts.append(f"estimated_rows={self.estimated_rows}")
+            parts.append(f"actual_rows={self.actual_rows}")
+            parts.append(f"rows_examined={self.rows_examined}")
+            parts.append(f"actual_ms={self.actual_ms}")
+        return ", ".join(parts)
+
+    def to_dict(self):
+        return {
+            "sql": self.sql,
+            "indexes": self.indexes,
+            "full_scans": self.full_scans,
+            "tables": self.tables,
+            "estimated_cost": self.estimated_cost,
+            "estimated_rows": self.estimated_rows,
+            "actual_rows": self.actual_rows,
+            "actual_ms": self.actual_ms,
+            "rows_examined": self.rows_examined,
+        }
+
+
+def parse_explain_json(document):
+    """
+    Pull the per-table access info and total cost out of EXPLAIN FORMAT=JSON.
+
+    Returns (tables, query_cost) where tables is a list of dicts with table,
+    access_type, key, possible_keys, rows_examined_per_scan and
+    rows_produced_per_join.
+    """
+    if isinstance(document, (str, bytes, bytearray)):
+        document = json.loads(document)
+    query_block = document.get("query_block", {})
+    cost = query_block.get("cost_info", {}).get("query_cost")
+    tables = []
+    _collect_tables(query_block, tables)
+    return tables, float(cost) if cost is not None else None
+
+
+def _collect_tables(node, tables):
+    if isinstance(node, dict):
+        table = node.get("table")
+        if isinstance(table, dict) and "table_name" in table:
+            tables.append({
+                "table": table["table_name"],
+                "access_type": table.get("access_type"),
+                "key": table.get("key"),
+                "possible_keys": table.get("possible_keys", []),
+                "rows_examined_per_scan": table.get("rows_examined_per_scan"),
+                "rows_produced_per_join": table.get("rows_produced_per_join"),
+            })
+        for value in node.values():
+            _collect_tables(value, tables)
+    elif isinstance(node, list):
+        for item in node:
+            _collect_tables(item, tables)
+
+
+class QueryProfiler:
+    """
+    Registry of named queries whose plans are captured and compared.
+
+    cost_tolerance -- estimated cost may grow by this factor before it is
+                      reported as a regression (plans with the same indexes
+                      drift as table statistics change)
+    """
+
+    def __init__(self, conn, analyze=False, cost_tolerance=2.0):
+        self.conn = conn
+        self.analyze = analyze
+        self.cost_tolerance = cost_tolerance
+        self._queries = {}
+
+    def register(self, name, sql, params=None, expect_index=None):
+        """Register a query; expect_index names an index its plan must use."""
+        self._queries[name] = {"sql": sql, "params": params, "expect_index": expect_index}
+
+    def profile(self, name):
+        query = self._queries[name]
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("EXPLAIN FORMAT=JSON " + query["sql"], query["params"])
+            document = cursor.fetchone()[0]
+            analyze = None
+            if self.analyze:
+                cursor.execute("EXPLAIN ANALYZE " + query["sql"], query["params"])
+                analyze = "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.close()
+        tables, cost = parse_explain_json(document)
+        return PlanProfile(name, query["sql"], tables, cost, document, analyze)
+
+    def profile_all(self):
+        return {name: self.profile(name) for name in self._queries}
+
+    def save_baseline(self, path, profiles=None):
+        """Profile every registered query and store the plans as the baseline."""
+        profiles = profiles or self.profile_all()
+        with open(path, "w") as fh:
+            json.dump({name: p.to_dict() for name, p in profiles.items()}, fh,
+                      indent=2, sort_keys=True)
+        return profiles
+
+    def check(self, baseline_path, profiles=None):
+        """Compare current plans with the baseline and return a list of Regressions."""
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)
+        profiles = profiles or self.profile_all()
+        regressions = []
+        for name, current in profiles.items():
+            expected = self._queries[name]["expect_index"]
+            if expected and expected not in current.indexes:
+                regressions.append(Regression(
+                    name, "expected_index_unused",
+                    f"{expected} not in chosen indexes {current.indexes}",
+                ))
+            before = baseline.get(name)
+            if before is None:
+                continue
+            lost = sorted(set(before["indexes"]) - set(current.indexes))
+            if lost:
+                regressions.append(Regression(
+                    name, "index_lost",
+                    f"no longer uses {lost}; now {current.indexes or 'none'}",
+                ))
+            new_scans = sorted(set(current.full_scans) - set(before["full_scans"]))
+            if new_scans:
+                regressions.append(Regression(
+                    name, "new_full_scan", f"full table scan on {new_scans}",
+                ))
+            old_cost = before.get("estimated_cost")
+            if (old_cost and current.estimated_cost is not None
+                    and current.estimated_cost > old_cost * self.cost_tolerance):
+                regressions.append(Regression(
+                    name, "cost_increase",
+                    f"estimated cost {old_cost} -> {current.estimated_cost}",
+                ))
+        return regressions
+
+    def assert_no_regressions(self, baseline_path):
+        regressions = self.check(baseline_path)
+        if regressions:
+            raise PlanRegressionError(regressions)
@@ -0,0 +1,269 @@
+"""
+Retry transient MySQL errors with jittered exponential backoff.
+
+A deadlock (1213), a lock wait timeout (1205) or a dropped connection
+(2006 "server has gone away", 2013 "lost connection") is not a bug in the
+statement, and running it again a moment later usually succeeds. Retrier
+classifies mysql.connector errors as retryable or fatal and replays the work
+after a randomized, growing pause. When the connection is lost it gets a new
+one from db_pool (or from the `connect` factory it was given):
+
+    from db_retry import Retrier
+
+    retrier = Retrier(database="Database1")
+    retrier.execute("UPDATE employees SET salary = salary * 1.1 WHERE id = %s", (7,))
+
+    def transfer(conn):
+        cursor = conn.cursor()
+        cursor.execute("UPDATE accounts SET balance = balance - 10 WHERE id = 1")
+        cursor.execute("UPDATE accounts SET balance = balance + 10 WHERE id = 2")
+
+    retrier.transaction(transfer)     # replayed from the start on a retryable error
+    print(retrier.stats)
+
+transaction() hands func a connection inside a fresh transaction and
+commits after it returns. The transaction is started explicitly, so this
+holds under autocommit too. If a retryable error happens first, the
+transaction is rolled back, so replaying func from the start is safe; func
+should not commit itself. If the connection drops during COMMIT, the server
+may or may not have applied the transaction. That case is only replayed
+when the caller passes idempotent=True; otherwise the error is raised.
+Reads are always idempotent.
+
+Every Retrier adds to its own RetryStats and to the process-wide `totals`.
+"""
+import random
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from db_pool import connect as pool_connect
+from db_sql import is_read
+
+# Roll the transaction back (InnoDB already has for a deadlock) and replay it.
+ROLLED_BACK = {errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT}
+# The session is gone, or could not be opened; reconnect, then replay.
+CONNECTION_LOST = {errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST,
+                   errorcode.CR_SERVER_LOST_EXTENDED, errorcode.CR_CONN_HOST_ERROR,
+                   errorcode.ER_CON_COUNT_ERROR}
+
+
+def classify(err):
+    """'rollback' or 'reconnect' for a retryable mysql.connector error, 'fatal' otherwise."""
+    errno = getattr(err, "errno", None)
+    if errno in ROLLED_BACK:
+        return "rollback"
+    if errno in CONNECTION_LOST:
+        return "reconnect"
+    return "fatal"
+
+
+class RetryPolicy:
+    """
+    How often and how long to retry.
+
+    attempts    -- tries in total, the first one included
+    base_delay  -- seconds; the backoff cap doubles from here on every retry
+    max_delay   -- upper bound on the backoff cap
+    jitter      -- "full" sleeps uniform(0, cap), "equal" uniform(cap / 2, cap),
+                   "none" exactly cap
+    """
+
+    def __init__(self, attempts=5, base_delay=0.05, max_delay=2.0, jitter="full"):
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        if jitter not in ("full", "equal", "none"):
+            raise ValueError(f"Unknown jitter {jitter!r}")
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, retry):
+        """Seconds to sleep before retry number `retry` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        if self.jitter == "full":
+            return random.uniform(0, cap)
+        if self.jitter == "equal":
+            return random.uniform(cap / 2, cap)
+        return cap
+
+
+class RetryStats:
+    """Retry counters; `by_errno` maps each retried error number to its count."""
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.reconnects = 0
+        self.gave_up = 0
+        self.fatal = 0
+        self.sleep_seconds = 0.0
+        self.by_errno = {}
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def count_errno(self, errno):
+        with self._lock:
+            self.by_errno[errno] = self.by_errno.get(errno, 0) + 1
+
+    def as_dict(self):
+        with self._lock:
+            return {"calls": self.calls, "retries": self.retries, "reconnects": self.reconnects,
+                    "gave_up": self.gave_up, "fatal": self.fatal,
+                    "sleep_seconds": self.sleep_seconds, "by_errno": dict(self.by_errno)}
+
+    def __repr__(self):
+        return (
+            f"RetryStats(calls={self.calls}, retries={self.retries}, reconnects={self.reconnects}, "
+            f"gave_up={self.gave_up}, fatal={self.fatal}, sleep_seconds={self.sleep_seconds:.3f}, "
+            f"by_errno={self.by_errno})"
+        )
+
+
+totals = RetryStats()
+
+
+class Retrier:
+    """
+    Run statements and transactions with retries.
+
+    conn        -- connection to use; None checks one out of db_pool on first use.
+                   A lost pooled connection is discarded and replaced, so read
+                   `retrier.conn` again after a retry rather than keeping the old one
+    database    -- database for connections checked out of db_pool (default: conn's)
+    policy      -- RetryPolicy; the defaults allow 5 tries over about 0.75 s at most
+    on_retry    -- optional callable(err, retry, delay), invoked before each sleep
+    connect     -- callable(database) for replacement connections (default:
+                   db_pool.connect); pass db_router.connect to keep a routed session
+    """
+
+    def __init__(self, conn=None, database=None, policy=None, on_retry=None, connect=None):
+        self._conn = conn
+        self._connect = connect or pool_connect
+        self.database = database
+        self.policy = policy or RetryPolicy()
+        self.on_retry = on_retry
+        self.stats = RetryStats()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = self._connect(self.database)
+        return self._conn
+
+    def close(self):
+        """Return a pooled connection (or close a direct one)."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def execute(self, sql, params=(), idempotent=None):
+        """
+        Run one statement as its own transaction and return the cursor,
+        its rows already fetched (buffered) for rowcount, lastrowid and fetch*().
+        """
+        def run(conn):
+            cursor = conn.cursor(buffered=True)
+            cursor.execute(sql, params)
+            return cursor
+
+        if idempotent is None:
+            idempotent = is_read(sql)
+        return self.transaction(run, idempotent=idempotent)
+
+    def query(self, sql, params=()):
+        """Run a read and return all rows."""
+        return self.execute(sql, params, idempotent=True).fetchall()
+
+    def transaction(self, func, *args, idempotent=False, **kwargs):
+        """
+        Call func(conn, *args, **kwargs) inside a transaction, commit, and
+        return its result. Replays func on retryable errors.
+        """
+        self._count(calls=1)
+        if self.database is None and hasattr(self._conn, "discard"):
+            # Remembered while the session is healthy, for the replacement checkout.
+            self.database = self._conn.database
+        retry = 0
+        while True:
+            conn, committing = None, False
+            try:
+                conn = self.conn
+                if not conn.in_transaction:
+                    # Explicit even under autocommit, where each statement of func
+                    # would otherwise commit on its own and be applied again on replay.
+                    conn.start_transaction()
+                result = func(conn, *args, **kwargs)
+                committing = True
+                conn.commit()
+                return result
+            except mysql.connector.Error as err:
+                kind = classify(err)
+                if kind == "fatal":
+                    self._rollback_quietly(conn)
+                    self._count(fatal=1)
+                    raise
+                if kind == "reconnect" and committing and not idempotent:
+                    # The server may have committed before the connection dropped.
+                    self._reconnect()
+                    self._count(fatal=1)
+                    raise
+                retry += 1
+                if retry >= self.policy.attempts:
+                    self._recover(kind)
+                    self._count(gave_up=1)
+                    raise
+                self._recover(kind)
+                delay = self.policy.delay(retry)
+                self._count(retries=1, sleep_seconds=delay)
+                self.stats.count_errno(err.errno)
+                totals.count_errno(err.errno)
+                if self.on_retry:
+                    self.on_retry(err, retry, delay)
+                time.sleep(delay)
+
+    def _recover(self, kind):
+        if kind == "reconnect":
+            self._reconnect()
+        else:
+            self._rollback_quietly(self._conn)
+
+    def _reconnect(self):
+        conn, self._conn = self._conn, None
+        self._count(reconnects=1)
+        if conn is None:
+            return
+        if hasattr(conn, "discard"):
+            # Pooled: drop the dead session; the next use checks out a healthy one.
+            conn.discard()
+            return
+        try:
+            conn.reconnect()
+        except mysql.connector.Error:
+            pass    # Reconnect errors surface on the next attempt and are classified there.
+        self._conn = conn
+
+    def _rollback_quietly(self, conn):
+        if conn is None:
+            return
+        try:
+            conn.rollback()
+        except mysql.connector.Error:
+            pass
+
+    def _count(self, **counts):
+        self.stats.add(**counts)
+        totals.add(**counts)
@@ -0,0 +1,626 @@
+"""
+Read/write splitting across a primary and its replicas.
+
+Every script sends all of its traffic to one server. Router keeps that
+server as the primary and adds a set of replicas. RoutedConnection looks
+like an ordinary connection, but each statement goes to the right place:
+
+    from db_router import Router
+
+    router = Router.from_env()                 # MYSQL_REPLICAS=127.0.0.1:3307,127.0.0.1:3308
+    conn = router.connect(database="Database1")
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM employee_sales")                  # a replica
+    cursor.execute("INSERT INTO sales VALUES (%s, %s)", (1, 99.5))  # the primary
+    conn.commit()
+    cursor.execute("SELECT SUM(sales_amount) FROM sales")           # sees the insert
+    conn.close()
+    print(router.metrics())
+
+Routing rules:
+  * db_sql.is_read() statements (SELECT, SHOW, EXPLAIN, WITH, without
+    locking reads) go to a replica; everything else goes to the primary.
+  * Reads that depend on session state go to the primary: user or system
+    @variables, LAST_INSERT_ID(), FOUND_ROWS(), named locks, SHOW WARNINGS.
+    Reads inside use_primary() go there too, for example when they touch
+    temporary tables.
+  * Once the session writes, it stays on the primary until commit() or
+    rollback(), so the transaction reads its own uncommitted rows.
+  * After a committed write, the session remembers the primary's
+    @@gtid_executed. The next read on a replica first runs
+    WAIT_FOR_EXECUTED_GTID_SET() with a short timeout. If the replica
+    doesn't catch up in time, the read goes to the primary. With gtid_mode
+    OFF there is nothing to wait on, so reads stay on the primary for
+    `sticky_seconds` after a write instead.
+
+db_router.connect(database) returns a RoutedConnection over a shared Router
+when MYSQL_REPLICAS is set, and a plain db_pool connection otherwise.
+8_views.py and 9_joins.py connect this way.
+
+A replica is chosen by least outstanding queries: statements routed to it
+whose results have not been fully read yet, counted across every session
+of the Router. Ties are broken at random. Every `health_interval` seconds
+the replicas are checked with SHOW REPLICA STATUS. A replica is ejected for
+`eject_seconds` when:
+  * it is unreachable,
+  * its replication threads have stopped, or
+  * it lags more than `max_lag` seconds.
+A failed read is retried on another replica or on the primary, because a
+read is safe to repeat. There is no background thread: checks run inside
+the session that finds them due.
+"""
+import atexit
+import contextlib
+import os
+import random
+import re
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from db_pool import ConnectionPool, connection_config, connect as pool_connect
+from db_sql import is_read, statement_verb, strip_comments
+
+_SESSION_STATE_RE = re.compile(
+    r"@|\b(?:LAST_INSERT_ID|FOUND_ROWS|ROW_COUNT|CONNECTION_ID|GET_LOCK|RELEASE_LOCK|"
+    r"IS_USED_LOCK|IS_FREE_LOCK)\s*\(|^\s*SHOW\s+(?:WARNINGS|ERRORS|PROFILES?|COUNT\b|"
+    r"(?:SESSION\s+)?(?:STATUS|VARIABLES))", re.I)
+# SET [SESSION|LOCAL] autocommit = v, SET @@[session.]autocommit = v (not GLOBAL).
+_SET_AUTOCOMMIT_RE = re.compile(
+    r"(?<![\w.@])(GLOBAL\s+|PERSIST(?:_ONLY)?\s+)?(?:(?:SESSION|LOCAL)\s+|@@(?:SESSION\.|LOCAL\.)?)?"
+    r"autocommit\s*:?=\s*'?(\w+)'?", re.I)
+_CONNECTION_ERRORS = {errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST,
+                      errorcode.CR_SERVER_LOST_EXTENDED, errorcode.CR_CONN_HOST_ERROR,
+                      errorcode.CR_CONNECTION_ERROR, errorcode.ER_CON_COUNT_ERROR}
+
+
+def replica_addresses(value=None):
+    """[(host, port), ...] from "host:port,host:port" (default: MYSQL_REPLICAS)."""
+    value = os.getenv("MYSQL_REPLICAS", "") if value is None else value
+    addresses = []
+    for item in value.split(","):
+        item = item.strip()
+        if item:
+            host, _, port = item.rpartition(":")
+            addresses.append((host or "localhost", int(port)) if port.isdigit() else (item, 3306))
+    return addresses
+
+
+def needs_primary(sql):
+    """True when a statement has to run on the primary session."""
+    return not is_read(sql) or bool(_SESSION_STATE_RE.search(strip_comments(sql)))
+
+
+class Replica:
+    """One replica endpoint: its pool, load and health."""
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.outstanding = 0
+        self.queries = 0
+        self.errors = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.lag = None
+        self.reason = None
+
+    @property
+    def healthy(self):
+        return self.reason is None
+
+    @property
+    def probe_due(self):
+        """Ejected, and the ejection has run out: check before readmitting."""
+        return self.reason is not None and time.monotonic() >= self.ejected_until
+
+    def as_dict(self):
+        return {"outstanding": self.outstanding, "queries": self.queries, "errors": self.errors,
+                "ejections": self.ejections, "healthy": self.healthy, "lag": self.lag,
+                "reason": self.reason}
+
+    def __repr__(self):
+        state = "healthy" if self.healthy else f"ejected: {self.reason}"
+        return f"Replica({self.name}, outstanding={self.outstanding}, {state})"
+
+
+class Router:
+    """
+    Primary plus replicas, shared by every RoutedConnection it hands out.
+
+    replicas         -- list of connection_config() overrides, one per replica (host, port, ...)
+    pool_size        -- connections per replica pool
+    max_lag          -- seconds behind the source before a replica is ejected
+    gtid_wait        -- seconds a read waits for a replica to apply the session's writes
+    sticky_seconds   -- without GTIDs: how long reads stay on the primary after a write
+    health_interval  -- seconds between replica health checks
+    eject_seconds    -- how long an unhealthy replica is left out before it is checked again
+    """
+
+    def __init__(self, replicas, pool_size=5, max_lag=5.0, gtid_wait=0.05, sticky_seconds=1.0,
+                 health_interval=5.0, eject_seconds=10.0):
+        self.max_lag = max_lag
+        self.gtid_wait = gtid_wait
+        self.sticky_seconds = sticky_seconds
+        self.health_interval = health_interval
+        self.eject_seconds = eject_seconds
+        self.replicas = []
+        for overrides in replicas:
+            config = connection_config(**overrides)
+            name = f"{config.get('host')}:{config.get('port')}"
+            pool = ConnectionPool(size=pool_size, **config)
+            self.replicas.append(Replica(name, pool))
+        self._gtid_mode = None
+        self._next_check = 0.0
+        self._checking = False
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(("primary_reads", "replica_reads", "writes", "gtid_waits",
+                                    "gtid_fallbacks", "sticky_reads", "read_retries"), 0)
+
+    @classmethod
+    def from_env(cls, **options):
+        """A Router over the MYSQL_REPLICAS addresses."""
+        return cls([{"host": host, "port": port} for host, port in replica_addresses()], **options)
+
+    def connect(self, database=None):
+        """A RoutedConnection whose primary session comes from db_pool.connect()."""
+        return RoutedConnection(self, database)
+
+    def close(self):
+        for replica in self.replicas:
+            replica.pool.close()
+
+    def metrics(self):
+        with self._lock:
+            return {**self.stats, "replicas": {r.name: r.as_dict() for r in self.replicas}}
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    # Replica selection
+
+    def pick(self, exclude=()):
+        """The healthy replica with the fewest outstanding queries, or None."""
+        self._maybe_check_health()
+        with self._lock:
+            candidates = [r for r in self.replicas if r.healthy and r not in exclude]
+            if not candidates:
+                return None
+            least = min(r.outstanding for r in candidates)
+            replica = random.choice([r for r in candidates if r.outstanding == least])
+            replica.outstanding += 1
+            replica.queries += 1
+            return replica
+
+    def done(self, replica):
+        with self._lock:
+            replica.outstanding = max(0, replica.outstanding - 1)
+
+    def eject(self, replica, reason):
+        with self._lock:
+            if replica.healthy:
+                replica.ejections += 1
+            replica.ejected_until = time.monotonic() + self.eject_seconds
+            replica.reason = reason
+
+    # Health
+
+    def check_health(self):
+        """Probe every replica not serving out an ejection; eject the unhealthy ones."""
+        for replica in self.replicas:
+            if not (replica.healthy or replica.probe_due):
+                continue
+            try:
+                status = self._replica_status(replica)
+            except mysql.connector.Error as err:
+                replica.errors += 1
+                self.eject(replica, f"unreachable: {err}")
+                continue
+            reason = None
+            if status is not None:
+                io, sql, lag = status
+                replica.lag = lag
+                if io != "Yes" or sql != "Yes":
+                    reason = f"replication stopped (io={io}, sql={sql})"
+                elif lag is None:
+                    reason = "lag unknown"
+                elif lag > self.max_lag:
+                    reason = f"lagging {lag}s"
+            if reason:
+                self.eject(replica, reason)
+            else:
+                replica.reason = None
+
+    def _maybe_check_health(self):
+        now = time.monotonic()
+        with self._lock:
+            due = now >= self._next_check or any(r.probe_due for r in self.replicas)
+            if self._checking or not due:
+                return
+            self._checking = True
+        try:
+            self.check_health()
+        finally:
+            with self._lock:
+                self._checking = False
+                self._next_check = time.monotonic() + self.health_interval
+
+    def _replica_status(self, replica):
+        # (io_running, sql_running, lag) or None when the server reports no replication
+        # (not configured as a replica); then reachability is all that is checked.
+        conn = replica.pool.acquire(timeout=self.gtid_wait + 1)
+        try:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except mysql.connector.Error as err:
+                if err.errno != errorcode.ER_PARSE_ERROR:
+                    raise
+                cursor.execute("SHOW SLAVE STATUS")     # before 8.0.22
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        io = row.get("Replica_IO_Running", row.get("Slave_IO_Running"))
+        sql = row.get("Replica_SQL_Running", row.get("Slave_SQL_Running"))
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        return io, sql, None if lag is None else float(lag)
+
+    def gtid_mode(self, conn):
+        """Whether the primary runs with gtid_mode=ON (looked up once)."""
+        if self._gtid_mode is None:
+            cursor = conn.cursor()
+            cursor.execute("SELECT @@global.gtid_mode")
+            self._gtid_mode = str(cursor.fetchone()[0]).upper() == "ON"
+            cursor.close()
+        return self._gtid_mode
+
+
+_default_router = None
+_default_lock = threading.Lock()
+
+
+def get_router():
+    """The process-wide Router over MYSQL_REPLICAS, created on first use."""
+    global _default_router
+    with _default_lock:
+        if _default_router is None:
+            _default_router = Router.from_env()
+            atexit.register(_default_router.close)
+        return _default_router
+
+
+def connect(database=None):
+    """
+    A RoutedConnection when MYSQL_REPLICAS is set, otherwise a plain
+    db_pool connection, so callers work the same with or without replicas.
+    """
+    if not replica_addresses():
+        return pool_connect(database)
+    return get_router().connect(database)
+
+
+class RoutedConnection:
+    """
+    A session over the primary and the replicas; use it like a connection.
+
+    Attributes that aren't routing specific (database, connection_id,
+    cmd_query, ...) belong to the primary session.
+    """
+
+    def __init__(self, router, database=None):
+        self.router = router
+        self.database_name = database
+        self._primary = None
+        self._replica_conns = {}        # Replica -> pooled connection
+        self._pinned = 0                # use_primary() depth
+        self._writing = False           # uncommitted writes on the primary
+        self._gtid_set = None           # primary's gtid_executed after our last write
+        self._caught_up = set()         # replicas known to have applied _gtid_set
+        self._sticky_until = 0.0
+        self._autocommit = None         # the primary session's, cached client-side
+
+    @property
+    def primary(self):
+        if self._primary is None:
+            self._primary = pool_connect(self.database_name)
+            # The connector's autocommit getter is a server round trip: read it once per session.
+            self._autocommit = self._primary.autocommit
+        return self._primary
+
+    @property
+    def autocommit(self):
+        return self.primary is not None and self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self.primary.raw_connection.autocommit = value
+        self._autocommit = bool(value)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def cursor(self, *args, **kwargs):
+        return RoutedCursor(self, args, kwargs)
+
+    @contextlib.contextmanager
+    def use_primary(self):
+        """Send every statement in the block to the primary."""
+        self._pinned += 1
+        try:
+            yield self
+        finally:
+            self._pinned -= 1
+
+    @property
+    def in_transaction(self):
+        return self._writing or (self._primary is not None and self._primary.in_transaction)
+
+    def start_transaction(self, *args, **kwargs):
+        self.primary.start_transaction(*args, **kwargs)
+        self._writing = True
+
+    def commit(self):
+        if self._primary is None:
+            return
+        self._primary.commit()
+        if self._writing:
+            self._writing = False
+            self._after_write()
+
+    def rollback(self):
+        if self._primary is not None:
+            self._primary.rollback()
+        self._writing = False
+
+    def close(self):
+        for conn in self._replica_conns.values():
+            conn.close()
+        self._replica_conns = {}
+        if self._primary is not None:
+            self._primary.close()
+            self._primary = None
+            self._autocommit = None
+        self._writing = False
+
+    def discard(self):
+        """
+        Drop the primary session (after a lost connection) and return the
+        replica sessions; the next statement checks out new ones.
+        """
+        for conn in self._replica_conns.values():
+            conn.close()
+        self._replica_conns = {}
+        if self._primary is not None:
+            self._primary.discard()
+            self._primary = None
+            self._autocommit = None
+        self._writing = False
+
+    # Routing
+
+    def route(self, sql):
+        """The Replica a statement should run on, or None for the primary."""
+        if self._pinned or self._writing or needs_primary(sql):
+            return None
+        if self._gtid_set is None and time.monotonic() < self._sticky_until:
+            self.router.count("sticky_reads")
+            return None
+        return self.router.pick()
+
+    def connection_for(self, replica):
+        conn = self._replica_conns.get(replica)
+        if conn is None:
+            conn = replica.pool.acquire(self.database_name)
+            # Autocommit, so each read sees the replica's latest state instead of an old snapshot.
+            conn.raw_connection.autocommit = True
+            self._replica_conns[replica] = conn
+        return conn
+
+    def caught_up(self, replica, conn):
+        """Wait (briefly) until `replica` has applied this session's last write."""
+        if self._gtid_set is None or replica in self._caught_up:
+            return True
+        self.router.count("gtid_waits")
+        cursor = conn.cursor()
+        cursor.execute("SELECT WAIT_FOR_EXECUTED_GTID_SET(%s, %s)", (self._gtid_set, self.router.gtid_wait))
+        timed_out = cursor.fetchone()[0]
+        cursor.close()
+        if timed_out:
+            self.router.count("gtid_fallbacks")
+            return False
+        self._caught_up.add(replica)
+        return True
+
+    def forget(self, replica):
+        """Drop the session's connection to a failed replica."""
+        conn = self._replica_conns.pop(replica, None)
+        if conn is not None:
+            conn.discard()
+
+    def sent(self, sql):
+        """Track transaction state after a statement ran on the primary."""
+        verb = statement_verb(sql)
+        if verb in ("COMMIT", "ROLLBACK") and not re.search(r"\bTO\b", sql, re.I):
+            wrote, self._writing = self._writing, False
+            if wrote and verb == "COMMIT":
+                self._after_write()
+        elif verb in ("START", "BEGIN"):
+            self._writing = True
+        elif verb in ("CREATE", "ALTER", "DROP", "RENAME", "TRUNCATE"):
+            # DDL commits implicitly, together with anything pending.
+            self.router.count("writes")
+            self._writing = False
+            self._after_write()
+        elif verb == "SET":
+            self._set_autocommit(sql)
+        elif verb not in ("USE", "SAVEPOINT", "RELEASE", "DO") and not is_read(sql):
+            self.router.count("writes")
+            if self._autocommit:
+                self._after_write()
+            else:
+                self._writing = True
+
+    def _set_autocommit(self, sql):
+        for match in _SET_AUTOCOMMIT_RE.finditer(strip_comments(sql)):
+            if match.group(1):
+                continue
+            value = match.group(2).upper()
+            if value in ("1", "ON", "TRUE"):
+                self._autocommit = True
+            elif value in ("0", "OFF", "FALSE"):
+                self._autocommit = False
+            else:
+                # A variable or DEFAULT: ask the server once.
+                self._autocommit = self._primary.autocommit
+
+    def _after_write(self):
+        self._caught_up = set()
+        if self.router.replicas and self.router.gtid_mode(self._primary):
+            cursor = self._primary.cursor()
+            cursor.execute("SELECT @@global.gtid_executed")
+            self._gtid_set = cursor.fetchone()[0]
+            cursor.close()
+        else:
+            self._sticky_until = time.monotonic() + self.router.sticky_seconds
+
+
+class RoutedCursor:
+    """A cursor that picks its server on every execute(); everything else goes to the current cursor."""
+
+    def __init__(self, session, args, kwargs):
+        self._session = session
+        self._args = args
+        self._kwargs = kwargs
+        self._cursor = None
+        self._replica = None            # where the last statement ran; None for the primary
+        self._holding = None            # replica whose outstanding count this cursor holds
+        self._cursors = {}              # replica (None: primary) -> (connection, cursor)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._current(), name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def server(self):
+        """The server the last statement ran on: "primary" or a replica's host:port."""
+        return self._replica.name if self._replica else "primary"
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._release()
+        session = self._session
+        tried = []
+        replica = self._holding = session.route(operation)
+        while replica is not None:
+            try:
+                conn = session.connection_for(replica)
+                if not session.caught_up(replica, conn):
+                    self._release()
+                    break
+                self._use(replica, conn)
+                result = self._cursor.execute(operation, params, *args, **kwargs)
+            except mysql.connector.Error as err:
+                self._release()
+                if err.errno not in _CONNECTION_ERRORS:
+                    raise
+                replica.errors += 1
+                session.router.eject(replica, f"query failed: {err}")
+                session.forget(replica)
+                self._cursors.pop(replica, None)
+                session.router.count("read_retries")
+                tried.append(replica)
+                replica = self._holding = session.router.pick(exclude=tried)
+                continue
+            session.router.count("replica_reads")
+            if self._kwargs.get("buffered") or not self._cursor.with_rows:
+                self._release()
+            return result
+        if is_read(operation):
+            session.router.count("primary_reads")
+        self._use(None, session.primary)
+        result = self._cursor.execute(operation, params, *args, **kwargs)
+        session.sent(operation)
+        return result
+
+    def executemany(self, operation, seq_params):
+        self._release()
+        self._use(None, self._session.primary)
+        result = self._cursor.executemany(operation, seq_params)
+        self._session.sent(operation)
+        return result
+
+    def callproc(self, procname, args=()):
+        self._release()
+        self._use(None, self._session.primary)
+        result = self._cursor.callproc(procname, args)
+        self._session.sent("CALL")
+        return result
+
+    def fetchone(self):
+        row = self._current().fetchone()
+        if row is None:
+            self._release()
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._current().fetchmany(size)
+        if not rows:
+            self._release()
+        return rows
+
+    def fetchall(self):
+        rows = self._current().fetchall()
+        self._release()
+        return rows
+
+    def close(self):
+        self._release()
+        for _, cursor in self._cursors.values():
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+        self._cursors = {}
+        self._cursor = None
+        return True
+
+    def _current(self):
+        if self._cursor is None:
+            raise mysql.connector.ProgrammingError("No statement has been executed on this cursor")
+        return self._cursor
+
+    def _use(self, replica, conn):
+        # One underlying cursor per server, reused until that server's connection changes.
+        entry = self._cursors.get(replica)
+        if entry is None or entry[0] is not conn:
+            entry = self._cursors[replica] = (conn, conn.cursor(*self._args, **self._kwargs))
+        self._replica = replica
+        self._cursor = entry[1]
+
+    def _release(self):
+        replica, self._holding = self._holding, None
+        if replica is not None:
+            self._session.router.done(replica)
@@ -0,0 +1,72 @@
+"""
+Schema introspection helpers shared by the tools in this repo.
+
+MySQL has no DROP INDEX IF EXISTS, so anything that creates and drops
+indexes (6_indexes_1.py, 7_indexes.py, the benchmarks) checks
+information_schema first.
+"""
+
+
+def table_indexes(conn, table, schema=None):
+    """
+    Return {index_name: {"columns": [...], "unique": bool, "type": "BTREE"|"FULLTEXT"|...}}
+    for `table` in `schema` (default: the connection's current database).
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT INDEX_NAME, COLUMN_NAME, NON_UNIQUE, INDEX_TYPE
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """,
+        (schema, table),
+    )
+    indexes = {}
+    for name, column, non_unique, index_type in cursor.fetchall():
+        info = indexes.setdefault(
+            name, {"columns": [], "unique": not int(non_unique), "type": index_type}
+        )
+        info["columns"].append(column)
+    cursor.close()
+    return indexes
+
+
+def index_exists(conn, table, index, schema=None):
+    return index in table_indexes(conn, table, schema)
+
+
+def column_exists(conn, table, column, schema=None):
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (schema, table, column),
+    )
+    (count,) = cursor.fetchone()
+    cursor.close()
+    return bool(count)
+
+
+def drop_index_if_exists(conn, table, index):
+    """Drop `index` on `table` if present. Returns True when something was dropped."""
+    if not index_exists(conn, table, index):
+        return False
+    cursor = conn.cursor()
+    cursor.execute(f"DROP INDEX `{index}` ON `{table}`")
+    cursor.close()
+    return True
+
+
+def server_version(conn):
+    """The server version as a tuple of ints, e.g. (8, 0, 36)."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT VERSION()")
+    version = cursor.fetchone()[0]
+    cursor.close()
+    parts = []
+    for piece in version.split("-")[0].split("."):
+        parts.append(int(piece) if piece.isdigit() else 0)
+    return tuple(parts)
@@ -0,0 +1,244 @@
+"""
+Ranked full-text search over a FULLTEXT index, with a LIKE fallback.
+
+7_indexes.py creates idx_fulltext_description and then searches with
+`description LIKE '%engineer%'`, which can't use it: a leading wildcard
+means a full table scan. FullTextSearch issues MATCH ... AGAINST instead and
+returns rows ranked by relevance:
+
+    from db_search import FullTextSearch
+
+    search = FullTextSearch(conn, "employees", ["description"],
+                            columns=["id", "name", "description"])
+    result = search.search("software engineer")                 # natural language mode
+    result = search.search("+engineer -junior", mode="boolean")  # boolean operators
+    for row, score in result.scored():
+        print(score, row)
+    result = search.search("software engineer", page=2)         # 20 rows per page
+
+When no FULLTEXT index covers exactly the searched columns (or it was
+dropped, as 7_indexes.py does), the same call falls back to a LIKE scan,
+scoring each row by how many search terms it contains; result.used_index
+says which path ran. Pass a db_cache.QueryCache to keep results of repeated
+searches for its TTL.
+"""
+import re
+
+import mysql.connector
+from mysql.connector import errorcode
+
+MODES = {"natural": "IN NATURAL LANGUAGE MODE", "boolean": "IN BOOLEAN MODE",
+         "expansion": "WITH QUERY EXPANSION"}
+
+_TERM_RE = re.compile(r'([+\-~<>]?)("[^"]+"|[^\s"()]+)')
+
+
+class SearchResult:
+    """One page of ranked matches; the relevance score is each row's last column."""
+
+    def __init__(self, rows, query, mode, page, page_size, has_more, used_index, cached=False):
+        self.rows = rows
+        self.query = query
+        self.mode = mode
+        self.page = page
+        self.page_size = page_size
+        self.has_more = has_more
+        self.used_index = used_index
+        self.cached = cached
+
+    def scored(self):
+        """(row without the score, score) pairs."""
+        return [(row[:-1], row[-1]) for row in self.rows]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        path = "FULLTEXT" if self.used_index else "LIKE scan"
+        return (f"SearchResult({self.query!r}, mode={self.mode}, page={self.page}, "
+                f"rows={len(self.rows)}, has_more={self.has_more}, {path})")
+
+
+def like_terms(query, mode="natural"):
+    """
+    Split a search string into (required, excluded, optional) terms for the
+    LIKE fallback. Boolean-mode operators + and - are honoured, quoted
+    phrases stay whole and a trailing * is dropped; in natural mode every
+    term is optional.
+    """
+    required, excluded, optional = [], [], []
+    for operator, term in _TERM_RE.findall(query):
+        term = term.strip('"').rstrip("*")
+        if not term:
+            continue
+        if mode == "boolean" and operator == "+":
+            required.append(term)
+        elif mode == "boolean" and operator == "-":
+            excluded.append(term)
+        else:
+            optional.append(term)
+    return required, excluded, optional
+
+
+def _like_pattern(term):
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class FullTextSearch:
+    """
+    Search one table's text columns.
+
+    match_columns -- the columns searched; a FULLTEXT index must cover exactly these
+    columns       -- columns returned ("*" or a list); the score is appended
+    key           -- unique column used to order rows with equal scores
+    page_size     -- rows per page
+    cache         -- optional db_cache.QueryCache for repeated searches
+    """
+
+    def __init__(self, conn, table, match_columns=("description",), columns="*",
+                 key="id", page_size=20, cache=None):
+        self.conn = conn
+        self.table = table
+        self.match_columns = [match_columns] if isinstance(match_columns, str) else list(match_columns)
+        self.columns = columns
+        self.key = key
+        self.page_size = page_size
+        self.cache = cache
+        self.index = None
+        self._index_checked = False
+
+    def refresh_index(self):
+        """Look up the FULLTEXT index covering match_columns; None when there isn't one."""
+        cursor = self.conn.cursor(buffered=True)
+        cursor.execute(
+            "SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) "
+            "FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_TYPE = 'FULLTEXT' "
+            "GROUP BY INDEX_NAME",
+            (self.table,),
+        )
+        wanted = sorted(c.lower() for c in self.match_columns)
+        self.index = None
+        for name, columns in cursor.fetchall():
+            if sorted(c.lower() for c in columns.split(",")) == wanted:
+                self.index = name
+                break
+        cursor.close()
+        self._index_checked = True
+        return self.index
+
+    def search(self, query, mode="natural", page=1, page_size=None, min_score=None):
+        """
+        One page (1-based) of rows matching `query`, best first.
+
+        mode      -- "natural", "boolean" or "expansion" (natural + query expansion)
+        min_score -- drop matches scoring below this
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {sorted(MODES)}")
+        if page < 1:
+            raise ValueError("page must be at least 1")
+        page_size = page_size or self.page_size
+        if not self._index_checked:
+            self.refresh_index()
+        return self._search(query, mode, page, page_size, min_score, self.index is not None)
+
+    def _search(self, query, mode, page, page_size, min_score, used_index):
+        sql, params = (self._match_sql if used_index else self._like_sql)(
+            query, mode, page, page_size, min_score)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(sql, params)
+            rows = self.cache.get(cache_key)
+            if rows is not None:
+                return self._result(rows, query, mode, page, page_size, used_index, cached=True)
+            versions = self.cache.versions({self.table.lower(), "*"})
+        try:
+            rows = self._fetch(sql, params)
+        except mysql.connector.Error as err:
+            if not used_index or err.errno != errorcode.ER_FT_MATCHING_KEY_NOT_FOUND:
+                raise
+            # The index was dropped since it was looked up: rescan with LIKE,
+            # even if refresh_index() still lists it (e.g. mid-rebuild).
+            self.refresh_index()
+            return self._search(query, mode, page, page_size, min_score, False)
+        if cache_key is not None:
+            self.cache.put(cache_key, rows, frozenset({self.table.lower()}), versions)
+        return self._result(rows, query, mode, page, page_size, used_index)
+
+    def _result(self, rows, query, mode, page, page_size, used_index, cached=False):
+        # One extra row was fetched to tell whether another page follows.
+        return SearchResult(rows[:page_size], query, mode, page, page_size,
+                            len(rows) > page_size, used_index, cached)
+
+    def _select_list(self):
+        if isinstance(self.columns, str):
+            return self.columns
+        return ", ".join(f"`{c}`" for c in self.columns)
+
+    def _page_sql(self, page, page_size):
+        return f"LIMIT {int(page_size) + 1} OFFSET {(page - 1) * int(page_size)}"
+
+    def _match_sql(self, query, mode, page, page_size, min_score):
+        match = f"MATCH({', '.join(f'`{c}`' for c in self.match_columns)}) AGAINST (%s {MODES[mode]})"
+        having = " HAVING score >= %s" if min_score is not None else ""
+        # MySQL evaluates an identical MATCH in the select list and WHERE clause only once.
+        sql = (f"SELECT {self._select_list()}, {match} AS score FROM `{self.table}` "
+               f"WHERE {match}{having} ORDER BY score DESC, `{self.key}` "
+               f"{self._page_sql(page, page_size)}")
+        params = (query, query) + ((min_score,) if min_score is not None else ())
+        return sql, params
+
+    def _like_sql(self, query, mode, page, page_size, min_score):
+        required, excluded, optional = like_terms(query, mode)
+        terms = required + optional
+        if not terms:
+            return f"SELECT {self._select_list()}, 0 AS score FROM `{self.table}` WHERE FALSE", ()
+
+        def any_column(term):
+            clause = " OR ".join(f"`{c}` LIKE %s" for c in self.match_columns)
+            return f"({clause})", [_like_pattern(term)] * len(self.match_columns)
+
+        score_parts, score_params = [], []
+        for term in terms:
+            clause, args = any_column(term)
+            score_parts.append(clause)
+            score_params.extend(args)
+        filters, filter_params = [], []
+        for term in required:
+            clause, args = any_column(term)
+            filters.append(clause)
+            filter_params.extend(args)
+        for term in excluded:
+            clause, args = any_column(term)
+            filters.append(f"NOT {clause}")
+            filter_params.extend(args)
+        if optional and not required:
+            clause = " OR ".join(any_column(term)[0] for term in optional)
+            filters.append(f"({clause})")
+            for term in optional:
+                filter_params.extend(any_column(term)[1])
+        having = " HAVING score >= %s" if min_score is not None else ""
+        sql = (f"SELECT {self._select_list()}, ({' + '.join(score_parts)}) AS score "
+               f"FROM `{self.table}` WHERE {' AND '.join(filters)}{having} "
+               f"ORDER BY score DESC, `{self.key}` {self._page_sql(page, page_size)}")
+        params = tuple(score_params + filter_params) + ((min_score,) if min_score is not None else ())
+        return sql, params
+
+    def _fetch(self, sql, params):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+
+def search(conn, table, query, match_columns=("description",), mode="natural", **options):
+    """Convenience wrapper: FullTextSearch(conn, table, match_columns, **options).search(query, mode)."""
+    return FullTextSearch(conn, table, match_columns, **options).search(query, mode)
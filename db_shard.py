@@ -0,0 +1,614 @@
+"""
+Hash-partitioned sharding of employees and sales across several databases.
+
+Every script keeps all employees in one table on one server. ShardedDatabase
+spreads them over N shards. A shard is a schema on a server ("shard0"), or a
+schema on another instance ("127.0.0.1:3307/shard1"). Employees are placed
+by consistent hashing of their id. Sales are placed by employee_id on the
+same ring, so each sale lives on its employee's shard. That keeps the
+9_joins.py joins, and the foreign key between the tables, inside one shard:
+
+    from db_shard import ShardedDatabase
+
+    cluster = ShardedDatabase.from_env()     # MYSQL_SHARDS=shard0,shard1,shard2,shard3
+    cluster.create_tables()
+    ids = cluster.add_employees([("John Doe", "Sales"), ("Jane Smith", "Marketing")])
+    cluster.add_sales([(ids[0], 1500.50), (ids[1], 3000.00)])
+
+    cluster.query(ids[0], "SELECT e.name, s.sales_amount FROM employees e "
+                          "JOIN sales s ON e.id = s.employee_id WHERE e.id = %s", (ids[0],))
+    cluster.employee_sales()                 # the 8_views.py view, over every shard
+    cluster.scatter("SELECT department, COUNT(*) FROM employees GROUP BY department",
+                    merge=("key", "sum"))
+
+Ids come from a ticket table (shard_sequence) on the first shard.
+AUTO_INCREMENT would hand out the same id on every shard.
+
+scatter() runs a statement on every shard in parallel, one thread per shard.
+The partial results are merged with a db_parallel merge spec as each shard
+answers. Without a spec the rows are concatenated. Aggregates must be
+mergeable: SUM, COUNT, MIN or MAX. For an average, select SUM and COUNT and
+divide after the merge.
+
+Consistent hashing gives each shard `vnodes` points on a 64-bit ring. Adding
+a shard to N takes over about 1/(N+1) of the keys, and every one of those
+comes from an existing shard; no other key changes owner. Resharder moves
+those keys while the cluster stays in use:
+
+    Resharder(cluster, ["shard0", "shard1", "shard2", "shard3", "shard4"]).run()
+
+The keys move in batches. For each batch, the Resharder:
+  1. Pauses the batch's keys. New sessions for them wait, and the Resharder
+     waits for running ones to finish.
+  2. Copies the employees and their sales to the new owner and commits.
+  3. Deletes them from the old owner.
+  4. Routes the keys to their new shard and resumes them.
+Ids allocated after resharding starts go to their new owner straight away.
+A final pass, with the whole cluster paused for a moment, catches rows that
+were written under the old layout while the batches ran. If the tool stops
+part way, run it again: the copy replaces whatever an earlier attempt left
+on the target, so it can be repeated safely.
+
+The pausing lives in the ShardedDatabase object. Resharding is online for
+the process that runs the Resharder, through session(), transaction(),
+query(), scatter() and the add_* methods. Other processes must be stopped,
+or pointed at the new MYSQL_SHARDS, while `python db_shard.py --to ...`
+runs.
+"""
+import argparse
+import bisect
+import contextlib
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import mysql.connector
+
+from db_bulk import bulk_insert
+from db_parallel import RowMerger
+from db_pool import ConnectionPool, backend_connect, connection_config
+
+EMPLOYEE_COLUMNS = ("id", "name", "department")
+SALE_COLUMNS = ("employee_id", "sales_amount")
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS employees (
+        id INT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        department VARCHAR(100)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sales (
+        employee_id INT,
+        sales_amount DECIMAL(10, 2),
+        KEY (employee_id),
+        FOREIGN KEY (employee_id) REFERENCES employees(id)
+    )
+    """,
+]
+SEQUENCE_TABLE = ("CREATE TABLE IF NOT EXISTS shard_sequence "
+                  "(name VARCHAR(64) PRIMARY KEY, next_id BIGINT NOT NULL)")
+
+
+def shard_names(value=None):
+    """Shard names from "shard0,127.0.0.1:3307/shard1,..." (default: MYSQL_SHARDS)."""
+    value = os.getenv("MYSQL_SHARDS", "") if value is None else value
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def shard_config(name):
+    """connection_config() for a shard name: "database" or "host:port/database"."""
+    address, _, database = name.rpartition("/")
+    if not address:
+        return connection_config(database)
+    host, _, port = address.rpartition(":")
+    if not port.isdigit():
+        host, port = address, "3306"
+    return connection_config(database, host=host or "localhost", port=int(port))
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(str(value).encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring over shard names.
+
+    vnodes -- points per shard; more points spread the keys more evenly
+    """
+
+    def __init__(self, shards, vnodes=128):
+        if not shards:
+            raise ValueError("A ring needs at least one shard")
+        self.shards = list(shards)
+        self.vnodes = vnodes
+        points = sorted((_hash(f"{shard}#{i}"), shard) for shard in self.shards for i in range(vnodes))
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, key):
+        """The shard owning `key`: the first point clockwise from its hash."""
+        return self._owners[bisect.bisect(self._points, _hash(key)) % len(self._points)]
+
+
+class Shard:
+    def __init__(self, name, pool_size):
+        self.name = name
+        self.config = shard_config(name)
+        self.pool = ConnectionPool(size=pool_size, **self.config)
+        self.queries = 0
+
+    def __repr__(self):
+        return f"Shard({self.name!r}, queries={self.queries})"
+
+
+class ShardedDatabase:
+    """
+    employees and sales hash-partitioned by employee id over several shards.
+
+    shards     -- shard names (see shard_config); their order fixes which one
+                  holds the id sequence (the first)
+    vnodes     -- ring points per shard
+    pool_size  -- connections per shard
+    workers    -- threads for scatter() and multi-shard writes (default: two per shard, at least 4)
+    """
+
+    def __init__(self, shards, vnodes=128, pool_size=5, workers=None):
+        names = list(shards)
+        self.pool_size = pool_size
+        self.workers = workers
+        self.ring = HashRing(names, vnodes)
+        self.shards = {name: Shard(name, pool_size) for name in names}
+        self.catalog = names[0]
+        self._executor = None
+        # Resharding state; see Resharder.
+        self._cond = threading.Condition()
+        self._active = {}            # key -> sessions using it
+        self._scans = 0              # scatter() calls in progress
+        self._paused = set()         # keys being moved
+        self._paused_all = False
+        self._next_ring = None
+        self._cutoff = None          # ids from here on route by _next_ring
+        self._moved = set()
+
+    @classmethod
+    def from_env(cls, **options):
+        """A ShardedDatabase over the MYSQL_SHARDS names."""
+        names = shard_names()
+        if not names:
+            raise ValueError("MYSQL_SHARDS is not set")
+        return cls(names, **options)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for shard in self.shards.values():
+            shard.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # -- schema and ids ---------------------------------------------------
+
+    def create_tables(self, shards=None):
+        """Create the shard databases and their employees/sales tables (and the id sequence)."""
+        for name in shards or self.shards:
+            config = dict(self.shards[name].config)
+            database = config.pop("database")
+            conn = backend_connect()(**config)
+            cursor = conn.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+            cursor.execute(f"USE `{database}`")
+            for ddl in TABLES:
+                cursor.execute(ddl)
+            if name == self.catalog:
+                cursor.execute(SEQUENCE_TABLE)
+                cursor.execute("INSERT IGNORE INTO shard_sequence (name, next_id) VALUES ('employees', 1)")
+            conn.commit()
+            cursor.close()
+            conn.close()
+
+    def allocate_ids(self, count=1, sequence="employees"):
+        """Reserve `count` consecutive ids; returns them as a range."""
+        conn = self.shards[self.catalog].pool.acquire()
+        try:
+            cursor = conn.cursor()
+            # The UPDATE's row lock serialises concurrent allocations until commit.
+            cursor.execute("UPDATE shard_sequence SET next_id = next_id + %s WHERE name = %s",
+                           (count, sequence))
+            cursor.execute("SELECT next_id FROM shard_sequence WHERE name = %s", (sequence,))
+            row = cursor.fetchone()
+            cursor.close()
+            if row is None:
+                raise ValueError(f"No sequence {sequence!r}; run create_tables() first")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return range(row[0] - count, row[0])
+
+    # -- routing ----------------------------------------------------------
+
+    def shard_for(self, key):
+        """Name of the shard holding employee `key` (and that employee's sales)."""
+        with self._cond:
+            return self._owner(key)
+
+    def _owner(self, key):
+        if self._next_ring is not None and (key in self._moved or key >= self._cutoff):
+            return self._next_ring.shard_for(key)
+        return self.ring.shard_for(key)
+
+    def _enter(self, keys):
+        """Wait until none of `keys` (None: the whole cluster) is being moved, then mark them in use."""
+        with self._cond:
+            if keys is None:
+                self._cond.wait_for(lambda: not self._paused_all and not self._paused)
+                self._scans += 1
+                return None
+            self._cond.wait_for(lambda: not self._paused_all and self._paused.isdisjoint(keys))
+            for key in keys:
+                self._active[key] = self._active.get(key, 0) + 1
+            return {key: self._owner(key) for key in keys}
+
+    def _exit(self, keys):
+        with self._cond:
+            if keys is None:
+                self._scans -= 1
+            else:
+                for key in keys:
+                    self._active[key] -= 1
+                    if not self._active[key]:
+                        del self._active[key]
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def session(self, key):
+        """
+        A pooled connection to the shard holding `key`. The key cannot be
+        moved by a Resharder until the block exits.
+        """
+        owner = self._enter([key])[key]
+        shard = self.shards[owner]
+        conn = shard.pool.acquire()
+        self._count(shard)
+        try:
+            yield conn
+        finally:
+            conn.close()
+            self._exit([key])
+
+    def transaction(self, key, func, *args, **kwargs):
+        """Call func(conn, *args, **kwargs) on `key`'s shard and commit; roll back on error."""
+        with self.session(key) as conn:
+            try:
+                result = func(conn, *args, **kwargs)
+                conn.commit()
+                return result
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def query(self, key, sql, params=()):
+        """Run a statement on `key`'s shard and return all rows."""
+        with self.session(key) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                return cursor.fetchall() if cursor.description else []
+            finally:
+                cursor.close()
+
+    # -- multi-shard ------------------------------------------------------
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers or max(4, 2 * len(self.shards)))
+        return self._executor
+
+    def _run_on(self, name, sql, params):
+        shard = self.shards[name]
+        conn = shard.pool.acquire()
+        self._count(shard)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            return rows
+        finally:
+            conn.close()
+
+    def scatter(self, sql, params=(), merge=None):
+        """
+        Run a read on every shard in parallel and return the merged rows.
+        `merge` is a db_parallel spec ("key", "sum", "min", "max" per output
+        column). Without it the shards' rows are concatenated, in no
+        particular order.
+        """
+        merger = RowMerger(merge) if merge is not None else None
+        self._enter(None)
+        try:
+            futures = [self._pool().submit(self._run_on, name, sql, params) for name in self.shards]
+            rows = []
+            for future in as_completed(futures):
+                if merger is None:
+                    rows.extend(future.result())
+                else:
+                    merger.add(future.result())
+            return rows if merger is None else merger.rows()
+        finally:
+            self._exit(None)
+
+    def employee_sales(self):
+        """8_views.py's employee_sales view: (name, department, total_sales) across all shards."""
+        return self.scatter(
+            "SELECT e.name, e.department, SUM(s.sales_amount) FROM employees e "
+            "JOIN sales s ON e.id = s.employee_id GROUP BY e.name, e.department",
+            merge=("key", "key", "sum"))
+
+    def counts(self):
+        """{shard: (employees, sales)} row counts."""
+        sql = "SELECT (SELECT COUNT(*) FROM employees), (SELECT COUNT(*) FROM sales)"
+        self._enter(None)
+        try:
+            futures = {name: self._pool().submit(self._run_on, name, sql, ()) for name in self.shards}
+            return {name: future.result()[0] for name, future in futures.items()}
+        finally:
+            self._exit(None)
+
+    def add_employees(self, rows):
+        """Insert (name, department) rows on their shards; returns the allocated ids."""
+        rows = list(rows)
+        ids = list(self.allocate_ids(len(rows))) if rows else []
+        self._write_grouped("employees", EMPLOYEE_COLUMNS,
+                            [(key,) + tuple(row) for key, row in zip(ids, rows)])
+        return ids
+
+    def add_sales(self, rows):
+        """Insert (employee_id, sales_amount) rows on their employees' shards."""
+        self._write_grouped("sales", SALE_COLUMNS, [tuple(row) for row in rows])
+
+    def _write_grouped(self, table, columns, rows):
+        keys = sorted({row[0] for row in rows})
+        if not keys:
+            return
+        owners = self._enter(keys)
+        try:
+            groups = {}
+            for row in rows:
+                groups.setdefault(owners[row[0]], []).append(row)
+            futures = [self._pool().submit(self._insert_on, name, table, columns, group)
+                       for name, group in groups.items()]
+            for future in futures:
+                future.result()
+        finally:
+            self._exit(keys)
+
+    def _insert_on(self, name, table, columns, rows):
+        shard = self.shards[name]
+        conn = shard.pool.acquire()
+        self._count(shard)
+        try:
+            bulk_insert(conn, table, list(columns), rows)
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _count(self, shard):
+        # Sessions and fan-out workers bump this from many threads.
+        with self._cond:
+            shard.queries += 1
+
+    def metrics(self):
+        with self._cond:
+            return {
+                "shards": {name: shard.queries for name, shard in self.shards.items()},
+                "resharding": self._next_ring is not None,
+                "moved": len(self._moved),
+            }
+
+
+class ReshardStats:
+    def __init__(self):
+        self.employees = 0
+        self.sales = 0
+        self.batches = 0
+        self.stragglers = 0
+        self.seconds = 0.0
+        self.pause_seconds = 0.0
+
+    def __repr__(self):
+        return (f"ReshardStats(employees={self.employees}, sales={self.sales}, batches={self.batches}, "
+                f"stragglers={self.stragglers}, seconds={self.seconds:.3f}, "
+                f"pause_seconds={self.pause_seconds:.3f})")
+
+
+class Resharder:
+    """
+    Move a ShardedDatabase to a new set of shards while it stays in use.
+
+    cluster     -- the ShardedDatabase to change; it routes by the new ring afterwards
+    shards      -- the complete new list of shard names; shards left out are drained
+    batch_size  -- employees moved per batch (and paused for the length of one batch)
+    progress    -- optional callable(stats), invoked after each batch
+    """
+
+    def __init__(self, cluster, shards, batch_size=500, progress=None):
+        self.cluster = cluster
+        self.target = list(shards)
+        if cluster.catalog not in self.target:
+            raise ValueError(f"{cluster.catalog!r} holds the id sequence and must stay a shard")
+        self.batch_size = batch_size
+        self.progress = progress
+        self.stats = ReshardStats()
+
+    def run(self):
+        cluster = self.cluster
+        start = time.perf_counter()
+        added = [name for name in self.target if name not in cluster.shards]
+        for name in added:
+            cluster.shards[name] = Shard(name, cluster.pool_size)
+        if added:
+            cluster.create_tables(added)
+        ring = HashRing(self.target, cluster.ring.vnodes)
+        # Ids allocated from here on have no rows under the old layout.
+        cutoff = cluster.allocate_ids(0).start
+        with cluster._cond:
+            cluster._next_ring, cluster._cutoff, cluster._moved = ring, cutoff, set()
+
+        sources = list(cluster.ring.shards)
+        for name in sources:
+            self._drain(name, ring, cutoff, pause=self._pause_keys)
+        # Rows written under the old layout while the batches ran.
+        paused = time.perf_counter()
+        with self._pause_all():
+            before = self.stats.employees
+            for name in sources:
+                self._drain(name, ring, cutoff, pause=None)
+            self.stats.stragglers = self.stats.employees - before
+            cluster.ring = ring
+            cluster._next_ring = cluster._cutoff = None
+            cluster._moved = set()
+        self.stats.pause_seconds = time.perf_counter() - paused
+        for name in [name for name in sources if name not in self.target]:
+            cluster.shards.pop(name).pool.close()
+        self.stats.seconds = time.perf_counter() - start
+        return self.stats
+
+    def _drain(self, name, ring, cutoff, pause):
+        """Move every employee below `cutoff` on shard `name` whose owner under `ring` differs."""
+        after = None
+        while True:
+            ids, after = self._scan(name, after)
+            if not ids:
+                return
+            movers = {}
+            for key in ids:
+                owner = ring.shard_for(key)
+                if owner != name and key < cutoff:
+                    movers.setdefault(owner, []).append(key)
+            for owner, keys in movers.items():
+                if pause is None:
+                    self._move(name, owner, keys)
+                else:
+                    with pause(keys):
+                        self._move(name, owner, keys)
+                self.stats.batches += 1
+                if self.progress:
+                    self.progress(self.stats)
+
+    def _scan(self, name, after):
+        sql = "SELECT id FROM employees"
+        params = ()
+        if after is not None:
+            sql += " WHERE id > %s"
+            params = (after,)
+        rows = self.cluster._run_on(name, sql + " ORDER BY id LIMIT %s", params + (self.batch_size,))
+        ids = [row[0] for row in rows]
+        return ids, (ids[-1] if ids else after)
+
+    def _move(self, source, target, keys):
+        cluster = self.cluster
+        marks = ", ".join(["%s"] * len(keys))
+        src = cluster.shards[source].pool.acquire()
+        dst = cluster.shards[target].pool.acquire()
+        try:
+            cursor = src.cursor()
+            cursor.execute(f"SELECT {', '.join(EMPLOYEE_COLUMNS)} FROM employees "
+                           f"WHERE id IN ({marks}) FOR UPDATE", keys)
+            employees = cursor.fetchall()
+            cursor.execute(f"SELECT {', '.join(SALE_COLUMNS)} FROM sales "
+                           f"WHERE employee_id IN ({marks}) FOR UPDATE", keys)
+            sales = cursor.fetchall()
+
+            # Replace, not append: a previous, interrupted run may have copied these already.
+            out = dst.cursor()
+            out.execute(f"DELETE FROM sales WHERE employee_id IN ({marks})", keys)
+            out.execute(f"DELETE FROM employees WHERE id IN ({marks})", keys)
+            out.close()
+            bulk_insert(dst, "employees", list(EMPLOYEE_COLUMNS), employees, commit_every=None)
+            bulk_insert(dst, "sales", list(SALE_COLUMNS), sales, commit_every=None)
+            dst.commit()
+
+            cursor.execute(f"DELETE FROM sales WHERE employee_id IN ({marks})", keys)
+            cursor.execute(f"DELETE FROM employees WHERE id IN ({marks})", keys)
+            cursor.close()
+            src.commit()
+        except BaseException:
+            for conn in (dst, src):
+                try:
+                    conn.rollback()
+                except mysql.connector.Error:
+                    pass
+            raise
+        finally:
+            dst.close()
+            src.close()
+        with cluster._cond:
+            cluster._moved.update(keys)
+        self.stats.employees += len(employees)
+        self.stats.sales += len(sales)
+
+    @contextlib.contextmanager
+    def _pause_keys(self, keys):
+        cond = self.cluster._cond
+        with cond:
+            self.cluster._paused.update(keys)
+            cond.wait_for(lambda: not self.cluster._scans
+                          and not any(key in self.cluster._active for key in keys))
+        try:
+            yield
+        finally:
+            with cond:
+                self.cluster._paused.difference_update(keys)
+                cond.notify_all()
+
+    @contextlib.contextmanager
+    def _pause_all(self):
+        cond = self.cluster._cond
+        with cond:
+            self.cluster._paused_all = True
+            cond.wait_for(lambda: not self.cluster._scans and not self.cluster._active)
+        try:
+            yield
+        finally:
+            with cond:
+                self.cluster._paused_all = False
+                cond.notify_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shards", default=None, help="current shards (default: MYSQL_SHARDS)")
+    parser.add_argument("--to", default=None, help="new shard list; omit to print row counts")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    names = shard_names(args.shards)
+    if not names:
+        parser.error("no shards: pass --shards or set MYSQL_SHARDS")
+    with ShardedDatabase(names) as cluster:
+        if args.to:
+            def progress(stats):
+                print(f"  moved {stats.employees} employees, {stats.sales} sales", end="\r")
+
+            print(Resharder(cluster, shard_names(args.to), args.batch_size, progress).run())
+        for name, (employees, sales) in cluster.counts().items():
+            print(f"{name:<40} employees {employees:8d}  sales {sales:8d}")
+
+
+if __name__ == "__main__":
+    main()
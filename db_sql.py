@@ -0,0 +1,142 @@
+"""
+Lightweight SQL text helpers: normalization, statement classification and
+the tables a statement reads or writes.
+
+These are regex based, not a full parser. They are good enough for the
+statements this repo issues (plain SELECT/INSERT/UPDATE/DELETE, joins, DDL)
+and err on the side of "write" / "unknown" for anything they don't follow.
+"""
+import re
+
+# Quoted strings and identifiers are kept verbatim; whitespace runs collapse.
+_TOKEN_RE = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`[^`]*`)|(\s+)""")
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*|#[^\n]*", re.S)
+
+_NAME = r"`?\w+`?(?:\.`?\w+`?)?"
+_READ_TABLES_RE = re.compile(
+    rf"\b(?:FROM|JOIN)\s+({_NAME}(?:\s*,\s*{_NAME})*)", re.I
+)
+_WRITE_PATTERNS = [
+    re.compile(rf"^\s*(?:INSERT|REPLACE)\s+(?:(?:LOW_PRIORITY|DELAYED|HIGH_PRIORITY|IGNORE)\s+)*"
+               rf"(?:INTO\s+)?({_NAME})", re.I),
+    re.compile(r"^\s*UPDATE\s+(?:(?:LOW_PRIORITY|IGNORE)\s+)*(.+?)\s+SET\b", re.I | re.S),
+    re.compile(rf"^\s*DELETE\s+(?:(?:LOW_PRIORITY|QUICK|IGNORE)\s+)*FROM\s+({_NAME})", re.I),
+    re.compile(rf"^\s*TRUNCATE\s+(?:TABLE\s+)?({_NAME})", re.I),
+    re.compile(rf"^\s*(?:ALTER|CREATE|DROP)\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?"
+               rf"({_NAME}(?:\s*,\s*{_NAME})*)", re.I),
+    re.compile(rf"^\s*LOAD\s+DATA\b.*?\bINTO\s+TABLE\s+({_NAME})", re.I | re.S),
+    re.compile(rf"^\s*(?:CREATE|DROP)\s+(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?INDEX\s+\S+\s+ON\s+({_NAME})",
+               re.I),
+]
+_RENAME_RE = re.compile(rf"\b({_NAME})\s+TO\s+({_NAME})", re.I)
+_READ_VERBS = {"SELECT", "SHOW", "EXPLAIN", "DESCRIBE", "DESC", "WITH"}
+_NON_DETERMINISTIC_RE = re.compile(
+    r"\b(?:NOW|CURDATE|CURTIME|CURRENT_TIMESTAMP|SYSDATE|UNIX_TIMESTAMP|UTC_TIMESTAMP|"
+    r"RAND|UUID|UUID_SHORT|CONNECTION_ID|LAST_INSERT_ID|FOUND_ROWS|ROW_COUNT|"
+    r"GET_LOCK|SLEEP)\s*\(|\bFOR\s+UPDATE\b|\bFOR\s+SHARE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|@",
+    re.I,
+)
+
+
+def strip_comments(sql):
+    return _COMMENT_RE.sub(" ", sql)
+
+
+def normalize_sql(sql):
+    """Collapse whitespace outside quotes and drop comments and a trailing ';'."""
+    sql = strip_comments(sql).strip().rstrip(";").strip()
+    return _TOKEN_RE.sub(lambda m: m.group(1) or " ", sql)
+
+
+_LITERAL_RE = re.compile(
+    r"""'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|(`[^`]*`)|\b0x[0-9a-f]+\b|"""
+    r"""(?<![\w.])-?\d+(?:\.\d+)?(?:e[-+]?\d+)?\b|%s|%\(\w+\)s""",
+    re.I,
+)
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_RE = re.compile(r"\bVALUES\s*\(\?\+\)(?:\s*,\s*\(\?\+\))*", re.I)
+
+
+def fingerprint(sql):
+    """
+    The shape of a statement with its values removed, for grouping metrics:
+    literals and placeholders become ?, IN lists and multi-row VALUES collapse.
+
+        fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'")
+        -> "select * from t where id in (?+) and name = ?"
+    """
+    text = normalize_sql(sql)
+    text = _LITERAL_RE.sub(lambda m: m.group(1) or "?", text)
+    text = _LIST_RE.sub("(?+)", text)
+    text = _VALUES_RE.sub("VALUES (?+)", text)
+    return text.lower()
+
+
+def statement_verb(sql):
+    """The leading keyword of a statement, upper-cased ('SELECT', 'INSERT', ...)."""
+    match = re.match(r"\s*\(?\s*(\w+)", strip_comments(sql))
+    return match.group(1).upper() if match else ""
+
+
+def is_read(sql):
+    """True for statements that cannot modify data (SELECT without locking reads, SHOW, ...)."""
+    verb = statement_verb(sql)
+    if verb not in _READ_VERBS:
+        return False
+    text = strip_comments(sql)
+    return not re.search(r"\bFOR\s+UPDATE\b|\bFOR\s+SHARE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b"
+                         r"|\bINTO\s+(?:OUTFILE|DUMPFILE|@)", text, re.I)
+
+
+def is_deterministic(sql):
+    """False when the result may change without any table changing (NOW(), RAND(), variables...)."""
+    return not _NON_DETERMINISTIC_RE.search(strip_comments(sql))
+
+
+def _names(group):
+    names = set()
+    for part in group.split(","):
+        part = part.strip().split()[0] if part.strip() else ""
+        if part:
+            names.add(part.split(".")[-1].strip("`").lower())
+    return names
+
+
+def tables_read(sql):
+    """Tables named after FROM / JOIN anywhere in the statement."""
+    names = set()
+    for match in _READ_TABLES_RE.finditer(strip_comments(sql)):
+        names |= _names(match.group(1))
+    return names
+
+
+def tables_written(sql):
+    """
+    Tables a statement modifies, or None when that can't be determined
+    (CALL, multi-statement strings, unknown verbs) and callers should assume
+    everything changed.
+    """
+    text = strip_comments(sql)
+    if is_read(text):
+        return set()
+    verb = statement_verb(text)
+    if verb in ("START", "BEGIN", "COMMIT", "ROLLBACK", "SET", "USE", "SAVEPOINT", "RELEASE"):
+        return set()
+    if verb == "RENAME":
+        names = set()
+        for old, new in _RENAME_RE.findall(text):
+            names |= _names(old) | _names(new)
+        return names
+    if verb in ("CREATE", "DROP", "ALTER") and re.match(r"\s*\w+\s+(?:OR\s+REPLACE\s+)?"
+                                                        r"(?:ALGORITHM\s*=\s*\w+\s+)?VIEW\b", text, re.I):
+        match = re.search(rf"\bVIEW\s+(?:IF\s+EXISTS\s+)?({_NAME})", text, re.I)
+        return _names(match.group(1)) if match else None
+    for pattern in _WRITE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            names = _names(match.group(1))
+            if verb == "UPDATE":
+                # Multi-table UPDATE: "t1 JOIN t2 ON ..." - keep every table mentioned.
+                names |= tables_read("FROM " + match.group(1))
+            return names
+    return None
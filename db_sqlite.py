@@ -0,0 +1,5140 @@
+"""
+In-process MySQL stand-in over SQLite, for server-free test and benchmark runs.
+
+Everything in this repo talks to MySQL through mysql.connector. This module
+provides connections with the same interface backed by SQLite: statements
+are translated from MySQL as they run, each MySQL database is a SQLite
+database shared by every connection in the process, and failures come back
+as mysql.connector exceptions carrying MySQL's error numbers. db_pool picks
+the backend from MYSQL_BACKEND, so the numbered scripts, the db_* helpers and
+the bench_*.py harness run unchanged against either:
+
+    MYSQL_BACKEND=sqlite python bench_paginate.py --rows 20000 --deep-page 100
+
+or directly:
+
+    import db_sqlite
+
+    conn = db_sqlite.connect(database="Database1")
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM employees WHERE id = %s", (1,))
+
+Running the module executes the 1-12 workflow against a fresh stand-in and
+prints how long each script took:
+
+    python db_sqlite.py            # all twelve
+    python db_sqlite.py 5 6 7      # a subset
+
+Covered: CREATE/ALTER/DROP TABLE with AUTO_INCREMENT, NOT NULL, UNIQUE,
+CHECK, DEFAULT and FOREIGN KEY constraints; CREATE/DROP INDEX, including
+FULLTEXT with MATCH ... AGAINST; views, triggers, joins, stored procedures
+whose body is a list of plain statements; SHOW, EXPLAIN (built from SQLite's
+query plan), information_schema, @@variables, GET_LOCK and transactions with
+savepoints. Not covered: stored-program control flow, performance_schema and
+sys, replication, and InnoDB row locking. Readers see uncommitted rows, and a
+writer waits for another writer's table (not row) up to
+innodb_lock_wait_timeout before failing with error 1205.
+
+Settings come from the environment:
+    MYSQL_SQLITE_PATH       directory for database files instead of memory; worker
+                            processes (db_parallel) only see the data this way
+    MYSQL_SQLITE_LATENCY    simulated network round trip in milliseconds, paid by
+                            every statement, commit, rollback and ping (three at
+                            connect), so timings keep a server-like shape
+    MYSQL_SQLITE_DATABASES  comma-separated databases that exist from the start
+                            (default: Database1,test_db, the two the scripts use)
+"""
+import argparse
+import calendar
+import collections
+import datetime
+import decimal
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import re
+import runpy
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from decimal import Decimal
+
+from mysql.connector import errorcode
+from mysql.connector.constants import FieldFlag, FieldType
+from mysql.connector.errors import (
+    InterfaceError,
+    InternalError,
+    OperationalError,
+    ProgrammingError,
+    get_mysql_exception,
+)
+
+import db_pool
+
+SERVER_VERSION = "8.0.36-standin"
+
+_GLOBAL_VARIABLES = {
+    "auto_increment_increment": 1,
+    "auto_increment_offset": 1,
+    "autocommit": 1,
+    "binlog_format": "ROW",
+    "character_set_client": "utf8mb4",
+    "character_set_connection": "utf8mb4",
+    "character_set_results": "utf8mb4",
+    "character_set_server": "utf8mb4",
+    "collation_connection": "utf8mb4_0900_ai_ci",
+    "collation_server": "utf8mb4_0900_ai_ci",
+    "default_storage_engine": "InnoDB",
+    "explicit_defaults_for_timestamp": 1,
+    "foreign_key_checks": 1,
+    "ft_min_word_len": 4,
+    "group_concat_max_len": 1024,
+    "gtid_executed": "",
+    "gtid_mode": "OFF",
+    "hostname": "localhost",
+    "innodb_buffer_pool_size": 134217728,
+    "innodb_ft_enable_stopword": 1,
+    "innodb_ft_min_token_size": 3,
+    "innodb_lock_wait_timeout": 50,
+    "interactive_timeout": 28800,
+    "local_infile": 1,
+    "log_bin": 0,
+    "long_query_time": 10.0,
+    "lower_case_table_names": 0,
+    "max_allowed_packet": 67108864,
+    "max_connections": 151,
+    "max_execution_time": 0,
+    "max_prepared_stmt_count": 16382,
+    "net_read_timeout": 30,
+    "net_write_timeout": 60,
+    "performance_schema": 0,
+    "port": 3306,
+    "read_only": 0,
+    "server_id": 1,
+    "session_track_gtids": "OFF",
+    "sort_buffer_size": 262144,
+    "sql_mode": ("ONLY_FULL_GROUP_BY,STRICT_TRANS_TABLES,NO_ZERO_IN_DATE,NO_ZERO_DATE,"
+                 "ERROR_FOR_DIVISION_BY_ZERO,NO_ENGINE_SUBSTITUTION"),
+    "sql_safe_updates": 0,
+    "super_read_only": 0,
+    "system_time_zone": "UTC",
+    "time_zone": "SYSTEM",
+    "transaction_isolation": "REPEATABLE-READ",
+    "transaction_read_only": 0,
+    "unique_checks": 1,
+    "version": SERVER_VERSION,
+    "version_comment": f"SQLite {sqlite3.sqlite_version} stand-in",
+    "wait_timeout": 28800,
+}
+_STATUS_COUNTERS = [
+    "Aborted_connects", "Com_begin", "Com_commit", "Com_delete", "Com_insert", "Com_replace",
+    "Com_rollback", "Com_select", "Com_update", "Connections", "Innodb_row_lock_current_waits",
+    "Innodb_row_lock_time", "Innodb_row_lock_waits", "Innodb_rows_deleted", "Innodb_rows_inserted",
+    "Innodb_rows_read", "Innodb_rows_updated", "Queries", "Questions", "Slow_queries",
+    "Threads_connected", "Threads_running",
+]
+# InnoDB's default full-text stopword list.
+_STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or that the this "
+    "to was what when where who will with und www".split()
+)
+
+# Identifiers, optionally back-quoted, and schema-qualified names.
+_NAME = r"(?:`(?:[^`]|``)+`|[\w$]+)"
+_QNAME = rf"{_NAME}(?:\s*\.\s*{_NAME})?"
+_TOKEN_RE = re.compile("\x00(\\d+)\x00")
+_PARAM_RE = re.compile(r"%\((\w+)\)s|%s")
+_SQLITE_PARAM_RE = re.compile(r"\?\d*|(?<![\w:]):[A-Za-z_]\w*")
+_SPECIAL_RE = re.compile(r"['\"`#]|--(?=\s|$)|/\*")
+_ESCAPES = {"0": "\0", "b": "\b", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a",
+            "%": "\\%", "_": "\\_"}
+
+
+def _error(errno, msg, sqlstate="HY000"):
+    """A mysql.connector exception of the class the real driver raises for `errno`."""
+    return get_mysql_exception(errno, msg, sqlstate)
+
+
+def _unsupported(what):
+    return _error(errorcode.ER_NOT_SUPPORTED_YET,
+                  f"This version of MySQL doesn't yet support '{what}' (SQLite stand-in)", "42000")
+
+
+def _syntax_error(near):
+    near = " ".join(near.split())[:80]
+    return _error(errorcode.ER_PARSE_ERROR,
+                  "You have an error in your SQL syntax; check the manual that corresponds to your "
+                  f"MySQL server version for the right syntax to use near '{near}' at line 1", "42000")
+
+
+def _ident(text):
+    """An identifier without its quotes."""
+    text = text.strip()
+    if len(text) > 1 and text[0] == text[-1] and text[0] in "`\"":
+        return text[1:-1].replace(text[0] * 2, text[0])
+    return text
+
+
+def _qualified(text):
+    """(schema or None, name) from `a`.`b`, a.b or b."""
+    parts = re.findall(_NAME, text)
+    if len(parts) > 1:
+        return _ident(parts[0]), _ident(parts[1])
+    return None, _ident(parts[0])
+
+
+def _quote(name):
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _mysql_expression(expr, columns):
+    """A stored CHECK expression as MySQL shows it (CHECK_CLAUSE, SHOW CREATE): column names backquoted."""
+    masked, literals = _mask(expr, sqlite=True)      # quoted identifiers come back backquoted
+    names = {name.lower() for name in columns}
+    masked = re.sub(r"`(?:[^`]|``)+`|(?<![\w.`])([A-Za-z_]\w*)(?!\s*\()",
+                    lambda m: _quote(m.group(1)) if m.group(1) and m.group(1).lower() in names
+                    else m.group(), masked)
+    return _unmask(masked, literals, mysql=True)
+
+
+def _read_string(sql, start, quote, escapes):
+    buf = []
+    i, n = start + 1, len(sql)
+    while i < n:
+        c = sql[i]
+        if c == "\\" and escapes and i + 1 < n:
+            buf.append(_ESCAPES.get(sql[i + 1], sql[i + 1]))
+            i += 2
+        elif c == quote:
+            if i + 1 < n and sql[i + 1] == quote:
+                buf.append(quote)
+                i += 2
+            else:
+                return "".join(buf), i + 1
+        else:
+            buf.append(c)
+            i += 1
+    raise _syntax_error(sql[start:])
+
+
+def _mask(sql, sqlite=False):
+    """
+    Replace string literals with \\x00n\\x00 tokens and drop comments, so the
+    statement can be rewritten with regular expressions. Returns the masked
+    text and the list of literal values. With sqlite=True the text is SQL
+    stored by SQLite: no backslash escapes, and "x" is an identifier.
+    """
+    out, literals = [], []
+    pos, n = 0, len(sql)
+    while True:
+        m = _SPECIAL_RE.search(sql, pos)
+        if not m:
+            out.append(sql[pos:])
+            break
+        start = m.start()
+        out.append(sql[pos:start])
+        token = m.group()
+        if token == "`" or (token == '"' and sqlite):
+            end = start + 1
+            while True:
+                end = sql.find(token, end)
+                if end < 0:
+                    raise _syntax_error(sql[start:])
+                if sql.startswith(token * 2, end):
+                    end += 2
+                    continue
+                break
+            out.append(_quote(_ident(sql[start:end + 1])))
+            pos = end + 1
+        elif token in "'\"":
+            value, pos = _read_string(sql, start, token, escapes=not sqlite)
+            out.append(f"\x00{len(literals)}\x00")
+            literals.append(value)
+        elif token in ("#", "--"):
+            end = sql.find("\n", start)
+            pos = n if end < 0 else end
+            out.append(" ")
+        else:
+            end = sql.find("*/", start + 2)
+            if end < 0:
+                raise _syntax_error(sql[start:])
+            body = sql[start + 2:end]
+            if body.startswith("!"):
+                # /*!80000 ... */ is read by MySQL: keep its contents.
+                inner, inner_literals = _mask(re.sub(r"^!\d*", " ", body) + " ", sqlite)
+                offset = len(literals)
+                out.append(_TOKEN_RE.sub(lambda t: f"\x00{int(t.group(1)) + offset}\x00", inner))
+                literals.extend(inner_literals)
+            else:
+                out.append(" ")
+            pos = end + 2
+    return "".join(out), literals
+
+
+def _sqlite_literal(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _mysql_literal(value):
+    return "'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def _unmask(masked, literals, mysql=False):
+    quote = _mysql_literal if mysql else _sqlite_literal
+    return _TOKEN_RE.sub(lambda m: quote(literals[int(m.group(1))]), masked)
+
+
+def _close_paren(text, start):
+    """Index of the parenthesis closing the one at text[start]."""
+    depth, i, n = 0, start, len(text)
+    while i < n:
+        c = text[i]
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        elif c == "`":
+            # Parentheses inside quoted identifiers don't count.
+            end = text.find("`", i + 1)
+            if end < 0:
+                break
+            i = end
+        i += 1
+    raise _syntax_error(text[start:])
+
+
+def _split_top(text, sep=","):
+    """Split on `sep` outside parentheses and quoted identifiers."""
+    parts, depth, start, quoted = [], 0, 0, False
+    for i, c in enumerate(text):
+        if c == "`":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p for p in parts if p.strip()]
+
+
+_SPLIT_RE = re.compile(r";|\b(BEGIN|END|CASE)\b(\s+(?:IF|LOOP|WHILE|REPEAT)\b)?", re.I)
+
+
+def _split_statements(masked):
+    """Split a multi-statement string at top-level semicolons (not inside BEGIN ... END)."""
+    parts, depth, start = [], 0, 0
+    for m in _SPLIT_RE.finditer(masked):
+        if m.group() == ";":
+            if depth == 0:
+                parts.append(masked[start:m.start()])
+                start = m.end()
+            continue
+        word = m.group(1).upper()
+        if word == "BEGIN":
+            head = masked[start:m.start()].strip()
+            if not head or re.search(r"(?:\bXA|\w+\s*:)$", head, re.I):
+                continue            # BEGIN [WORK] starts a transaction
+            depth += 1
+        elif word == "CASE":
+            depth += 1
+        elif not m.group(2):
+            depth = max(0, depth - 1)
+    parts.append(masked[start:])
+    return [p for p in parts if p.strip()]
+
+
+def _like_regex(pattern):
+    """A compiled regex for a SHOW ... LIKE pattern."""
+    out = []
+    escaped = False
+    for c in pattern:
+        if escaped:
+            out.append(re.escape(c))
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif c == "%":
+            out.append(".*")
+        elif c == "_":
+            out.append(".")
+        else:
+            out.append(re.escape(c))
+    return re.compile("".join(out) + r"\Z", re.I | re.S)
+
+
+# SQLite values <-> Python values.
+
+def _decimal_converter(scale):
+    quantum = Decimal(1).scaleb(-scale)
+
+    def convert(value):
+        text = value.decode()
+        try:
+            return Decimal(text).quantize(quantum)
+        except decimal.InvalidOperation:
+            return text
+    return convert
+
+
+def _datetime_converter(value):
+    text = value.decode()
+    try:
+        return datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return None if text.startswith("0000-00-00") else text
+
+
+def _date_converter(value):
+    text = value.decode()
+    try:
+        return datetime.date.fromisoformat(text[:10])
+    except ValueError:
+        return None if text.startswith("0000-00-00") else text
+
+
+def _time_converter(value):
+    text = value.decode()
+    m = re.match(r"(-)?(\d+):(\d\d):(\d\d)(?:\.(\d+))?$", text)
+    if not m:
+        return text
+    delta = datetime.timedelta(hours=int(m.group(2)), minutes=int(m.group(3)),
+                               seconds=int(m.group(4)),
+                               microseconds=int((m.group(5) or "0").ljust(6, "0")[:6]))
+    return -delta if m.group(1) else delta
+
+
+def _format_timedelta(value):
+    seconds = int(value.total_seconds())
+    sign = "-" if seconds < 0 else ""
+    seconds = abs(seconds)
+    text = f"{sign}{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    if value.microseconds:
+        text += f".{value.microseconds:06d}"
+    return text
+
+
+for _scale in range(31):
+    sqlite3.register_converter(f"DECIMAL_{_scale}", _decimal_converter(_scale))
+sqlite3.register_converter("DATETIME", _datetime_converter)
+sqlite3.register_converter("TIMESTAMP", _datetime_converter)
+sqlite3.register_converter("DATE", _date_converter)
+sqlite3.register_converter("TIME", _time_converter)
+sqlite3.register_converter("SET_TEXT", lambda v: set(filter(None, v.decode().split(","))))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime.datetime, lambda v: v.isoformat(" "))
+sqlite3.register_adapter(datetime.date, lambda v: v.isoformat())
+sqlite3.register_adapter(datetime.time, lambda v: v.isoformat())
+sqlite3.register_adapter(datetime.timedelta, _format_timedelta)
+
+
+def _literal_sql(value):
+    """A Python value as MySQL literal text (for cursor.statement)."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float, Decimal)):
+        return repr(value) if isinstance(value, float) else str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "_binary" + _mysql_literal(bytes(value).decode("latin-1"))
+    if isinstance(value, datetime.timedelta):
+        return _mysql_literal(_format_timedelta(value))
+    if isinstance(value, (datetime.date, datetime.time)):
+        return _mysql_literal(value.isoformat(" ") if isinstance(value, datetime.datetime)
+                              else value.isoformat())
+    return _mysql_literal(str(value))
+
+
+def _field_type(value):
+    """(FieldType, charset) the real driver would report for a column holding `value`."""
+    if value is None:
+        return FieldType.NULL, 63
+    if isinstance(value, int):
+        return FieldType.LONGLONG, 63
+    if isinstance(value, float):
+        return FieldType.DOUBLE, 63
+    if isinstance(value, Decimal):
+        return FieldType.NEWDECIMAL, 63
+    if isinstance(value, (bytes, bytearray)):
+        return FieldType.BLOB, 63
+    if isinstance(value, datetime.datetime):
+        return FieldType.DATETIME, 63
+    if isinstance(value, datetime.date):
+        return FieldType.DATE, 63
+    if isinstance(value, datetime.timedelta):
+        return FieldType.TIME, 63
+    if isinstance(value, set):
+        return FieldType.SET, 255
+    return FieldType.VAR_STRING, 255
+
+
+_DECLARED_FIELD_TYPES = {
+    "TINYINT": (FieldType.TINY, 63), "SMALLINT": (FieldType.SHORT, 63), "MEDIUMINT": (FieldType.INT24, 63),
+    "INT": (FieldType.LONG, 63), "INTEGER": (FieldType.LONG, 63), "BIGINT": (FieldType.LONGLONG, 63),
+    "FLOAT": (FieldType.FLOAT, 63), "DOUBLE": (FieldType.DOUBLE, 63), "REAL": (FieldType.DOUBLE, 63),
+    "DATE": (FieldType.DATE, 63), "DATETIME": (FieldType.DATETIME, 63), "TIMESTAMP": (FieldType.TIMESTAMP, 63),
+    "TIME": (FieldType.TIME, 63), "YEAR": (FieldType.YEAR, 63),
+    "CHAR": (FieldType.STRING, 255), "VARCHAR": (FieldType.VAR_STRING, 255), "ENUM_TEXT": (FieldType.STRING, 255),
+    "SET_TEXT": (FieldType.SET, 255),
+    "TINYTEXT": (FieldType.BLOB, 255), "TEXT": (FieldType.BLOB, 255), "MEDIUMTEXT": (FieldType.BLOB, 255),
+    "LONGTEXT": (FieldType.BLOB, 255), "TINYBLOB": (FieldType.BLOB, 63), "BLOB": (FieldType.BLOB, 63),
+    "MEDIUMBLOB": (FieldType.BLOB, 63), "LONGBLOB": (FieldType.BLOB, 63),
+}
+
+
+def _declared_field_type(decl):
+    """(FieldType, charset, flags) for a column declared `decl` in SQLite, or None if unknown."""
+    m = re.match(r"(\w+)(?:\([^)]*\))?(\s+UNSIGNED)?", decl.upper())
+    if not m:
+        return None
+    base = m.group(1)
+    if base.startswith("DECIMAL"):
+        return FieldType.NEWDECIMAL, 63, FieldFlag.BINARY
+    if base not in _DECLARED_FIELD_TYPES:
+        return None
+    type_code, charset = _DECLARED_FIELD_TYPES[base]
+    flags = FieldFlag.BINARY if charset == 63 else 0
+    if m.group(2):
+        flags |= FieldFlag.UNSIGNED
+    return type_code, charset, flags
+
+
+def _text_value(value):
+    """A value as the text protocol sends it (raw cursors)."""
+    if value is None or isinstance(value, (bytes, bytearray)):
+        return value
+    if isinstance(value, float):
+        return repr(value).encode()
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(" ").encode()
+    if isinstance(value, datetime.timedelta):
+        return _format_timedelta(value).encode()
+    if isinstance(value, set):
+        return ",".join(sorted(value)).encode()
+    return str(value).encode()
+
+
+# SQL functions MySQL has and SQLite lacks.
+
+def _match_score(query, mode, *texts):
+    """Relevance of `texts` for a MATCH ... AGAINST query (0 when it doesn't match)."""
+    if query is None:
+        return 0.0
+    words = re.findall(r"[\w']+", " ".join(t for t in texts if t is not None).lower())
+    if not words:
+        return 0.0
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1
+    joined = " " + " ".join(words) + " "
+
+    def hits(term):
+        if " " in term:
+            return joined.count(" " + term + " ")
+        if term.endswith("*"):
+            stem = term[:-1]
+            return sum(c for w, c in counts.items() if w.startswith(stem))
+        return counts.get(term, 0)
+
+    if mode == "boolean":
+        score, required = 0.0, False
+        for operator, term in re.findall(r'([+\-~<>]?)("[^"]+"|[^\s"()]+)', query.lower()):
+            if term.startswith('"'):
+                term = " ".join(re.findall(r"[\w']+", term))
+            if not term or term in _STOPWORDS:
+                continue
+            found = hits(term)
+            if operator == "+":
+                required = True
+                if not found:
+                    return 0.0
+            elif operator == "-":
+                if found:
+                    return 0.0
+                continue
+            if found:
+                weight = 0.5 if operator in "~<" and operator else 1.0
+                score += weight * (1 + math.log(found))
+        return score if score or required else 0.0
+    score = 0.0
+    for term in set(re.findall(r"[\w']+", query.lower())):
+        if len(term) < 3 or term in _STOPWORDS:
+            continue
+        found = counts.get(term, 0)
+        if found:
+            score += 1 + math.log(found)
+    return score
+
+
+def _concat(*args):
+    if any(a is None for a in args):
+        return None
+    return "".join(_sql_text(a) for a in args)
+
+
+def _concat_ws(sep, *args):
+    if sep is None:
+        return None
+    return _sql_text(sep).join(_sql_text(a) for a in args if a is not None)
+
+
+def _sql_text(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+def _greatest(*args):
+    return None if any(a is None for a in args) else max(args)
+
+
+def _least(*args):
+    return None if any(a is None for a in args) else min(args)
+
+
+def _now(fsp=0):
+    now = datetime.datetime.now()
+    if not fsp:
+        return now.strftime("%Y-%m-%d %H:%M:%S")
+    return now.strftime("%Y-%m-%d %H:%M:%S.%f")[:20 + int(fsp)]
+
+
+def _unix_timestamp(value=None):
+    if value is None:
+        return int(time.time())
+    try:
+        return int(datetime.datetime.fromisoformat(str(value)).timestamp())
+    except ValueError:
+        return 0
+
+
+def _date_format(value, fmt):
+    if value is None or fmt is None:
+        return None
+    try:
+        moment = datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    table = {"Y": "%Y", "y": "%y", "m": "%m", "c": str(moment.month), "d": "%d",
+             "e": str(moment.day), "H": "%H", "k": str(moment.hour), "h": "%I", "I": "%I",
+             "i": "%M", "s": "%S", "S": "%S", "f": "%f", "p": "%p", "M": "%B", "b": "%b",
+             "W": "%A", "a": "%a", "j": "%j", "T": "%H:%M:%S", "r": "%I:%M:%S %p", "%": "%%"}
+    out = re.sub(r"%(.)", lambda m: table.get(m.group(1), m.group(1)), fmt)
+    return moment.strftime(out)
+
+
+def _regexp(pattern, value):
+    if pattern is None or value is None:
+        return None
+    return 1 if re.search(pattern, str(value), re.I) else 0
+
+
+def _hash(name):
+    def digest(value, bits=None):
+        if value is None:
+            return None
+        data = value if isinstance(value, bytes) else str(value).encode()
+        algorithm = name if bits is None else f"sha{int(bits) or 256}"
+        return hashlib.new(algorithm, data).hexdigest()
+    return digest
+
+
+def _locate(needle, haystack, start=1):
+    if needle is None or haystack is None:
+        return None
+    return str(haystack).lower().find(str(needle).lower(), int(start) - 1) + 1
+
+
+def _substring_index(value, delim, count):
+    if value is None or delim is None or count is None:
+        return None
+    parts = str(value).split(str(delim))
+    count = int(count)
+    return str(delim).join(parts[:count] if count >= 0 else parts[count:])
+
+
+def _field(value, *options):
+    for i, option in enumerate(options, 1):
+        if value is not None and option == value:
+            return i
+    return 0
+
+
+def _sleep(seconds):
+    time.sleep(float(seconds or 0))
+    return 0
+
+
+_FUNCTIONS = [
+    ("CONCAT", -1, _concat, True),
+    ("CONCAT_WS", -1, _concat_ws, True),
+    ("GREATEST", -1, _greatest, True),
+    ("LEAST", -1, _least, True),
+    ("NOW", -1, _now, False),
+    ("SYSDATE", -1, _now, False),
+    ("CURDATE", 0, lambda: datetime.date.today().isoformat(), False),
+    ("CURRENT_DATE", 0, lambda: datetime.date.today().isoformat(), False),
+    ("CURTIME", 0, lambda: datetime.datetime.now().strftime("%H:%M:%S"), False),
+    ("UTC_TIMESTAMP", 0, lambda: datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), False),
+    ("UNIX_TIMESTAMP", -1, _unix_timestamp, False),
+    ("DATE_FORMAT", 2, _date_format, True),
+    ("RAND", -1, lambda seed=None: random.Random(seed).random() if seed is not None
+     else random.random(), False),
+    ("UUID", 0, lambda: str(uuid.uuid1()), False),
+    ("FLOOR", 1, lambda v: None if v is None else math.floor(v), True),
+    ("CEIL", 1, lambda v: None if v is None else math.ceil(v), True),
+    ("CEILING", 1, lambda v: None if v is None else math.ceil(v), True),
+    ("POW", 2, lambda a, b: None if a is None or b is None else math.pow(a, b), True),
+    ("POWER", 2, lambda a, b: None if a is None or b is None else math.pow(a, b), True),
+    ("SQRT", 1, lambda v: None if v is None or v < 0 else math.sqrt(v), True),
+    ("LN", 1, lambda v: None if v is None or v <= 0 else math.log(v), True),
+    ("LOG2", 1, lambda v: None if v is None or v <= 0 else math.log2(v), True),
+    ("LOG10", 1, lambda v: None if v is None or v <= 0 else math.log10(v), True),
+    ("EXP", 1, lambda v: None if v is None else math.exp(v), True),
+    ("MOD", 2, lambda a, b: None if a is None or not b else math.fmod(a, b) if
+     isinstance(a, float) or isinstance(b, float) else int(math.fmod(a, b)), True),
+    ("TRUNCATE", 2, lambda v, d: None if v is None else math.trunc(v * 10 ** d) / 10 ** d, True),
+    ("CHAR_LENGTH", 1, lambda v: None if v is None else len(_sql_text(v)), True),
+    ("CHARACTER_LENGTH", 1, lambda v: None if v is None else len(_sql_text(v)), True),
+    ("LCASE", 1, lambda v: None if v is None else _sql_text(v).lower(), True),
+    ("UCASE", 1, lambda v: None if v is None else _sql_text(v).upper(), True),
+    ("LEFT", 2, lambda v, n: None if v is None or n is None else _sql_text(v)[:max(int(n), 0)], True),
+    ("RIGHT", 2, lambda v, n: None if v is None or n is None else
+     (_sql_text(v)[-int(n):] if int(n) > 0 else ""), True),
+    ("LPAD", 3, lambda v, n, p: None if None in (v, n, p) else
+     _sql_text(v)[:int(n)].rjust(int(n), str(p)[:1] or " "), True),
+    ("RPAD", 3, lambda v, n, p: None if None in (v, n, p) else
+     _sql_text(v)[:int(n)].ljust(int(n), str(p)[:1] or " "), True),
+    ("REVERSE", 1, lambda v: None if v is None else _sql_text(v)[::-1], True),
+    ("REPEAT", 2, lambda v, n: None if v is None or n is None else _sql_text(v) * int(n), True),
+    ("SPACE", 1, lambda n: None if n is None else " " * int(n), True),
+    ("LOCATE", -1, _locate, True),
+    ("POSITION", 2, _locate, True),
+    ("SUBSTRING_INDEX", 3, _substring_index, True),
+    ("FIELD", -1, _field, True),
+    ("MD5", 1, _hash("md5"), True),
+    ("SHA1", 1, _hash("sha1"), True),
+    ("SHA", 1, _hash("sha1"), True),
+    ("SHA2", 2, _hash("sha256"), True),
+    ("REGEXP", 2, _regexp, True),
+    ("SLEEP", 1, _sleep, False),
+    ("_standin_match", -1, _match_score, True),
+]
+
+
+class StandInServer:
+    """
+    Process-wide state of one stand-in server: its databases, global
+    variables, status counters and named locks.
+
+    path -- directory holding one <database>.sqlite3 file per database;
+            None keeps every database in shared-cache memory
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, path=None):
+        self.path = os.path.abspath(path) if path else None
+        self._tag = f"standin{os.getpid()}x{next(self._ids)}"
+        self._lock = threading.RLock()
+        self._lock_released = threading.Condition(self._lock)
+        self._databases = {}        # name -> (uri, generation, anchor connection)
+        self._generations = itertools.count(1)
+        self._named_locks = {}      # lower-cased name -> [connection id, count]
+        self._connection_ids = itertools.count(1)
+        self.sessions = {}          # connection id -> SQLiteConnection
+        self.variables = dict(_GLOBAL_VARIABLES)
+        self.status = dict.fromkeys(_STATUS_COUNTERS, 0)
+        self.started = time.time()
+        self.ddl_version = 0        # bumped by every DDL statement; sessions drop cached schema
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            for entry in sorted(os.listdir(self.path)):
+                if entry.endswith(".sqlite3"):
+                    self._register(entry[:-len(".sqlite3")])
+
+    def __repr__(self):
+        where = self.path or "memory"
+        return f"StandInServer({where}, databases={self.databases()})"
+
+    # Databases
+
+    def _register(self, name):
+        generation = next(self._generations)
+        if self.path:
+            uri = "file:" + urllib.parse.quote(os.path.join(self.path, name + ".sqlite3"))
+            anchor = None
+        else:
+            uri = (f"file:{self._tag}_{generation}_{urllib.parse.quote(name, safe='')}"
+                   "?mode=memory&cache=shared")
+            # Shared-cache memory databases live as long as one connection is open.
+            anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._databases[name] = (uri, generation, anchor)
+        return self._databases[name]
+
+    def databases(self):
+        with self._lock:
+            return sorted(self._databases)
+
+    def database(self, name):
+        """(uri, generation) of database `name`, or None when it doesn't exist."""
+        entry = self._databases.get(name)
+        return entry[:2] if entry else None
+
+    def create_database(self, name, if_not_exists=False):
+        with self._lock:
+            if name in self._databases or name.lower() == "information_schema":
+                if if_not_exists:
+                    return False
+                raise _error(errorcode.ER_DB_CREATE_EXISTS,
+                             f"Can't create database '{name}'; database exists")
+            self._register(name)
+            if self.path:
+                sqlite3.connect(self._databases[name][0], uri=True).close()
+            return True
+
+    def drop_database(self, name, if_exists=False):
+        with self._lock:
+            entry = self._databases.pop(name, None)
+            if entry is None:
+                if if_exists:
+                    return False
+                raise _error(errorcode.ER_DB_DROP_EXISTS,
+                             f"Can't drop database '{name}'; database doesn't exist")
+            uri, _, anchor = entry
+            if anchor is not None:
+                anchor.close()
+            if self.path:
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(os.path.join(self.path, name + ".sqlite3" + suffix))
+                    except FileNotFoundError:
+                        pass
+            return True
+
+    # Sessions, counters and named locks
+
+    def open_session(self, conn):
+        with self._lock:
+            connection_id = next(self._connection_ids)
+            self.sessions[connection_id] = conn
+            self.status["Connections"] += 1
+            self.status["Threads_connected"] += 1
+            return connection_id
+
+    def close_session(self, connection_id):
+        with self._lock:
+            if self.sessions.pop(connection_id, None) is not None:
+                self.status["Threads_connected"] -= 1
+            for name, holder in list(self._named_locks.items()):
+                if holder[0] == connection_id:
+                    del self._named_locks[name]
+            self._lock_released.notify_all()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.status[name] = self.status.get(name, 0) + amount
+
+    def status_rows(self):
+        with self._lock:
+            rows = dict(self.status)
+        rows["Uptime"] = int(time.time() - self.started)
+        return sorted(rows.items())
+
+    def get_lock(self, name, timeout, owner):
+        """GET_LOCK(): 1 when acquired, 0 on timeout."""
+        key = name.lower()
+        deadline = None if timeout is None or timeout < 0 else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                holder = self._named_locks.get(key)
+                if holder is None or holder[0] == owner:
+                    self._named_locks[key] = [owner, (holder[1] if holder else 0) + 1]
+                    return 1
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return 0
+                self._lock_released.wait(remaining)
+
+    def release_lock(self, name, owner):
+        """RELEASE_LOCK(): 1 released, 0 held by another session, None not held."""
+        key = name.lower()
+        with self._lock:
+            holder = self._named_locks.get(key)
+            if holder is None:
+                return None
+            if holder[0] != owner:
+                return 0
+            holder[1] -= 1
+            if not holder[1]:
+                del self._named_locks[key]
+                self._lock_released.notify_all()
+            return 1
+
+    def lock_holder(self, name):
+        holder = self._named_locks.get(name.lower())
+        return holder[0] if holder else None
+
+    def release_all_locks(self, owner):
+        with self._lock:
+            released = 0
+            for name, holder in list(self._named_locks.items()):
+                if holder[0] == owner:
+                    released += holder[1]
+                    del self._named_locks[name]
+            self._lock_released.notify_all()
+            return released
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_server():
+    """The process-wide stand-in server, created from MYSQL_SQLITE_PATH on first use."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = StandInServer(os.getenv("MYSQL_SQLITE_PATH") or None)
+            for name in os.getenv("MYSQL_SQLITE_DATABASES", "Database1,test_db").split(","):
+                if name.strip():
+                    _server.create_database(name.strip(), if_not_exists=True)
+        return _server
+
+
+def reset_server(path=None):
+    """Replace the process-wide server with an empty one (databases in memory unless `path`)."""
+    global _server
+    with _server_lock:
+        old, _server = _server, StandInServer(path)
+    if old is not None and not old.path:
+        for name in old.databases():
+            old.drop_database(name)
+    return _server
+
+
+class _Result:
+    """One statement's outcome: a result set (columns and rows) or an update count."""
+
+    __slots__ = ("columns", "rows", "rowcount", "lastrowid", "types")
+
+    def __init__(self, columns=None, rows=None, rowcount=-1, lastrowid=None, types=None):
+        self.columns = columns
+        self.rows = rows            # a list, or a sqlite3 cursor still being read
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+        self.types = types          # SQLite declared type of each column, when known
+
+
+def _rows_result(columns, rows):
+    return _Result(list(columns), [tuple(r) for r in rows])
+
+
+_VERB_RE = re.compile(r"\s*\(*\s*([A-Za-z_]+)")
+_HANDLERS = {
+    "SELECT": "_select", "WITH": "_select", "VALUES": "_select", "TABLE": "_select",
+    "INSERT": "_modify", "REPLACE": "_modify", "UPDATE": "_modify", "DELETE": "_modify",
+    "CREATE": "_create", "DROP": "_drop", "ALTER": "_alter", "RENAME": "_rename",
+    "TRUNCATE": "_truncate", "USE": "_use_statement", "SET": "_set", "SHOW": "_show",
+    "EXPLAIN": "_explain", "DESCRIBE": "_explain", "DESC": "_explain",
+    "START": "_transaction", "BEGIN": "_transaction", "COMMIT": "_transaction",
+    "ROLLBACK": "_transaction", "SAVEPOINT": "_transaction", "RELEASE": "_transaction",
+    "CALL": "_call", "ANALYZE": "_maintenance", "OPTIMIZE": "_maintenance",
+    "CHECK": "_maintenance", "REPAIR": "_maintenance", "LOAD": "_load_data", "DO": "_do",
+    "KILL": "_kill", "LOCK": "_noop", "UNLOCK": "_noop", "FLUSH": "_noop", "GRANT": "_noop",
+    "REVOKE": "_noop", "RESET": "_noop", "PURGE": "_noop",
+}
+_DDL_VERBS = {"CREATE", "DROP", "ALTER", "RENAME", "TRUNCATE"}
+_QUALIFIER_RE = re.compile(r"(?<![\w$.`\x00])(`(?:[^`]|``)+`|[A-Za-z_$][\w$]*)\s*\.\s*(?=[`A-Za-z_$*])")
+_INFO_TABLE_RE = re.compile(r"\binformation_schema\s*\.\s*`?(\w+)`?", re.I)
+_SYSVAR_RE = re.compile(r"@@(?:(global|session|local)\s*\.\s*)?`?(\w+)`?", re.I)
+_USERVAR_RE = re.compile(r"(?<![@\w])@(`(?:[^`]|``)+`|\x00\d+\x00|[\w$.]+)")
+_MATCH_RE = re.compile(
+    r"\bMATCH\s*\(([^()]*)\)\s*AGAINST\s*\(\s*(\?|:\w+|\x00\d+\x00)\s*"
+    r"(IN\s+NATURAL\s+LANGUAGE\s+MODE(?:\s+WITH\s+QUERY\s+EXPANSION)?|IN\s+BOOLEAN\s+MODE|"
+    r"WITH\s+QUERY\s+EXPANSION)?\s*\)", re.I)
+_TABLE_REF_RE = re.compile(rf"\b(?:FROM|JOIN|UPDATE|INTO)\s+({_QNAME})", re.I)
+_INTERVAL_RE = re.compile(
+    r"(\b\w+\s*\(\s*[^()]*\)|[\w.`]+)\s*([+-])\s*INTERVAL\s+(\?|:\w+|-?\d+|\x00\d+\x00)\s+"
+    r"(MICROSECOND|SECOND|MINUTE|HOUR|DAY|WEEK|MONTH|QUARTER|YEAR)\b", re.I)
+_DATE_ADD_RE = re.compile(r"\b(DATE_ADD|DATE_SUB|ADDDATE|SUBDATE)\s*\(", re.I)
+_REWRITES = [
+    (re.compile(r"\b(?:FORCE|USE|IGNORE)\s+(?:INDEX|KEY)(?:\s+FOR\s+(?:JOIN|ORDER\s+BY|GROUP\s+BY))?"
+                r"\s*\([^)]*\)", re.I), ""),
+    (re.compile(r"\bLOCK\s+IN\s+SHARE\s+MODE\b", re.I), ""),
+    (re.compile(r"\bFOR\s+(?:UPDATE|SHARE)(?:\s+OF\s+[`\w\s,]+?)?(?:\s+(?:NOWAIT|SKIP\s+LOCKED))?"
+                r"(?=\s*\)|\s*$)", re.I), ""),
+    (re.compile(r"\b(?:SQL_NO_CACHE|SQL_CACHE|SQL_CALC_FOUND_ROWS|SQL_BUFFER_RESULT|"
+                r"SQL_SMALL_RESULT|SQL_BIG_RESULT|HIGH_PRIORITY|LOW_PRIORITY|DELAYED)\b", re.I), ""),
+    (re.compile(r"(\bSELECT\s+)STRAIGHT_JOIN\b", re.I), r"\1"),
+    (re.compile(r"\bSTRAIGHT_JOIN\b", re.I), "JOIN"),
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.I), "INSERT OR IGNORE"),
+    (re.compile(r"\bUPDATE\s+IGNORE\b", re.I), "UPDATE OR IGNORE"),
+    (re.compile(r"\bDELETE\s+(?:IGNORE\s+|QUICK\s+)+", re.I), "DELETE "),
+    (re.compile(r"\bFROM\s+DUAL\b", re.I), ""),
+    (re.compile(r"<=>"), " IS "),
+    (re.compile(r"\|\|"), " OR "),
+    (re.compile(r"&&"), " AND "),
+    (re.compile(r"\bXOR\b", re.I), "<>"),
+    (re.compile(r"\bDIV\b", re.I), "/"),
+    (re.compile(r"\bRLIKE\b", re.I), "REGEXP"),
+    (re.compile(r"\bIF\s*\(", re.I), "IIF("),
+    (re.compile(r"\bCURRENT_TIMESTAMP\s*\(\s*(\d*)\s*\)|\bLOCALTIMESTAMP\b(?:\s*\(\s*(\d*)\s*\))?|"
+                r"\bLOCALTIME\b(?:\s*\(\s*(\d*)\s*\))?", re.I),
+     lambda m: f"NOW({m.group(1) or m.group(2) or m.group(3) or ''})"),
+    (re.compile(r"\bCURRENT_TIMESTAMP\b(?!\s*\()", re.I), "NOW()"),
+    (re.compile(r"\bTIMESTAMPDIFF\s*\(\s*(\w+)\s*,", re.I), r"TIMESTAMPDIFF('\1',"),
+    (re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.I), "ON CONFLICT DO UPDATE SET"),
+]
+_CAST_TYPES = [
+    (re.compile(r"^(?:SIGNED|UNSIGNED)(?:\s+INT(?:EGER)?)?$", re.I), "INTEGER"),
+    (re.compile(r"^(?:N?CHAR|VARCHAR|TEXT)\b.*$", re.I | re.S), "TEXT"),
+    (re.compile(r"^(?:BINARY|VARBINARY)\b.*$", re.I | re.S), "BLOB"),
+    (re.compile(r"^(?:DECIMAL|NUMERIC)\b.*$", re.I | re.S), "NUMERIC"),
+    (re.compile(r"^(?:DOUBLE|FLOAT|REAL)\b.*$", re.I | re.S), "REAL"),
+    (re.compile(r"^(?:DATETIME|DATE|TIME|JSON|YEAR)\b.*$", re.I | re.S), "TEXT"),
+]
+_UNITS = {"MICROSECOND": (1e-6, "seconds"), "SECOND": (1, "seconds"), "MINUTE": (1, "minutes"),
+          "HOUR": (1, "hours"), "DAY": (1, "days"), "WEEK": (7, "days"), "MONTH": (1, "months"),
+          "QUARTER": (3, "months"), "YEAR": (1, "years")}
+
+
+def _timestampdiff(unit, start, end):
+    if start is None or end is None:
+        return None
+    try:
+        a = datetime.datetime.fromisoformat(str(start))
+        b = datetime.datetime.fromisoformat(str(end))
+    except ValueError:
+        return None
+    unit = unit.upper()
+    if unit in ("MONTH", "QUARTER", "YEAR"):
+        months = (b.year - a.year) * 12 + b.month - a.month
+        if (b.day, b.time()) < (a.day, a.time()) and months > 0:
+            months -= 1
+        return months // {"MONTH": 1, "QUARTER": 3, "YEAR": 12}[unit]
+    seconds = (b - a).total_seconds()
+    divisor = {"MICROSECOND": 1e-6, "SECOND": 1, "MINUTE": 60, "HOUR": 3600, "DAY": 86400,
+               "WEEK": 604800}.get(unit, 1)
+    return int(seconds / divisor)
+
+
+def _datediff(a, b):
+    if a is None or b is None:
+        return None
+    try:
+        return (datetime.date.fromisoformat(str(a)[:10]) - datetime.date.fromisoformat(str(b)[:10])).days
+    except ValueError:
+        return None
+
+
+def _date_part(attribute):
+    def part(value):
+        if value is None:
+            return None
+        try:
+            moment = datetime.datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+        return getattr(moment, attribute)
+    return part
+
+
+_FUNCTIONS.extend([
+    ("TIMESTAMPDIFF", 3, _timestampdiff, True),
+    ("DATEDIFF", 2, _datediff, True),
+    ("YEAR", 1, _date_part("year"), True),
+    ("MONTH", 1, _date_part("month"), True),
+    ("DAY", 1, _date_part("day"), True),
+    ("DAYOFMONTH", 1, _date_part("day"), True),
+    ("HOUR", 1, _date_part("hour"), True),
+    ("MINUTE", 1, _date_part("minute"), True),
+    ("SECOND", 1, _date_part("second"), True),
+])
+
+
+def _is_lock_error(err):
+    code = getattr(err, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(err)
+
+
+def _sql_value(value, literals):
+    """A Python value as SQLite text inside a masked statement (strings become tokens)."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float, Decimal)):
+        return repr(value) if isinstance(value, float) else str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "X'" + bytes(value).hex() + "'"
+    literals.append(sqlite3.adapters.get((type(value), sqlite3.PrepareProtocol), str)(value)
+                    if not isinstance(value, str) else value)
+    return f"\x00{len(literals) - 1}\x00"
+
+
+def _date_add_value(value, amount, unit):
+    """`value` moved by `amount` units (a timedelta keyword, or months/years); dates stay dates."""
+    if value is None or amount is None:
+        return None
+    text = str(value)
+    try:
+        moment = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if unit in ("months", "years"):
+        months = moment.month - 1 + int(amount) * (12 if unit == "years" else 1)
+        year, month = moment.year + months // 12, months % 12 + 1
+        moment = moment.replace(year=year, month=month,
+                                day=min(moment.day, calendar.monthrange(year, month)[1]))
+    else:
+        moment += datetime.timedelta(**{unit: amount})
+    if len(text) == 10 and unit in ("days", "months", "years"):
+        return moment.date().isoformat()
+    return moment.isoformat(" ")
+
+
+_FUNCTIONS.append(("_standin_date_add", 3, _date_add_value, True))
+
+
+# Rewrites of MySQL-only syntax, used by SQLiteConnection._rewrite().
+
+def _top_level_split(text, pattern):
+    """(before, after) around the last match of `pattern` outside parentheses; (text, None) if none."""
+    found = None
+    for m in re.finditer(pattern, text, re.I):
+        prefix = text[:m.start()]
+        if prefix.count("(") == prefix.count(")"):
+            found = m
+    if found is None:
+        return text, None
+    return text[:found.start()], text[found.end():]
+
+
+def _group_concat(m, inner):
+    inner, separator = _top_level_split(inner, r"\s+SEPARATOR\s+")
+    separator = (separator or "','").strip()
+    inner, order = _top_level_split(inner, r"\s+ORDER\s+BY\s+")
+    distinct = re.match(r"\s*DISTINCT\s+", inner, re.I)
+    if distinct:
+        inner = inner[distinct.end():]
+    parts = _split_top(inner)
+    expr = parts[0].strip() if len(parts) == 1 else f"CONCAT({', '.join(p.strip() for p in parts)})"
+    # ORDER BY inside an aggregate arrived in SQLite 3.44; older versions keep scan order.
+    order = f" ORDER BY {order.strip()}" if order and sqlite3.sqlite_version_info >= (3, 44) else ""
+    if distinct:
+        # SQLite only allows DISTINCT with the default ',' separator.
+        call = f"group_concat(DISTINCT {expr}{order})"
+        return call if separator == "','" else f"replace({call}, ',', {separator})"
+    return f"group_concat({expr}, {separator}{order})"
+
+
+def _cast_sql(expr, target):
+    target = " ".join(target.split()).upper()
+    d = re.match(r"(?:DECIMAL|NUMERIC|DEC)\s*(?:\(\s*\d+\s*(?:,\s*(\d+)\s*)?\))?$", target)
+    if d:
+        scale = int(d.group(1) or 0)
+        return f"ROUND({expr}, {scale})" if scale else f"CAST(ROUND({expr}) AS INTEGER)"
+    if target.startswith("DATETIME"):
+        return f"datetime({expr})"
+    if target == "DATE":
+        return f"date({expr})"
+    if target.startswith("TIME"):
+        return f"time({expr})"
+    for regex, affinity in _CAST_TYPES:
+        if regex.match(target):
+            return f"CAST({expr} AS {affinity})"
+    raise _unsupported(f"CAST(... AS {target})")
+
+
+def _cast(m, inner):
+    expr, target = _top_level_split(inner, r"\s+AS\s+")
+    if target is None:
+        raise _syntax_error("CAST(" + inner)
+    return _cast_sql(expr, target)
+
+
+def _convert(m, inner):
+    using = re.match(r"(.*)\s+USING\s+\w+\s*$", inner, re.I | re.S)
+    if using:
+        return f"({using.group(1)})"
+    parts = _split_top(inner)
+    if len(parts) != 2:
+        raise _syntax_error("CONVERT(" + inner)
+    return _cast_sql(parts[0], parts[1])
+
+
+def _date_shift(operand, sign, value, unit):
+    factor, name = _UNITS[unit.upper()]
+    amount = f"{sign}({value})" + (f" * {factor}" if factor != 1 else "")
+    return f"_standin_date_add({operand}, {amount}, '{name}')"
+
+
+def _date_add(m, inner):
+    sign = "-" if m.group(1).upper() in ("DATE_SUB", "SUBDATE") else "+"
+    parts = _split_top(inner)
+    if len(parts) != 2:
+        raise _syntax_error(m.group(1) + "(" + inner)
+    interval = re.match(r"\s*INTERVAL\s+(.+?)\s+(\w+)\s*$", parts[1], re.I | re.S)
+    if interval is None:
+        return _date_shift(parts[0], sign, parts[1].strip(), "DAY")
+    if interval.group(2).upper() not in _UNITS:
+        raise _unsupported(f"INTERVAL ... {interval.group(2)}")
+    return _date_shift(parts[0], sign, interval.group(1), interval.group(2))
+
+
+def _interval(m):
+    return _date_shift(m.group(1), m.group(2), m.group(3), m.group(4))
+
+
+def _upsert(text):
+    """ON DUPLICATE KEY UPDATE (already ON CONFLICT DO UPDATE SET) with VALUES(c) / alias.c as excluded.c."""
+    head, marker, tail = text.partition("ON CONFLICT DO UPDATE SET")
+    alias = re.search(rf"\)\s+AS\s+({_NAME})(?:\s*\([^()]*\))?\s*$", head, re.I)
+    if alias:
+        name = _ident(alias.group(1))
+        head = head[:alias.start() + 1] + " "
+        tail = re.sub(rf"(?<![\w$.`])(?:`{re.escape(name)}`|{re.escape(name)})\s*\.\s*", "excluded.", tail)
+    tail = re.sub(r"\bVALUES\s*\(\s*(`(?:[^`]|``)+`|[\w$]+)\s*\)", r"excluded.\1", tail, flags=re.I)
+    return head + marker + tail
+
+
+def _index_name(sqlite_name):
+    """MySQL name of a stand-in index: i:<name>:<suffix> or f:<name>:<suffix> (FULLTEXT)."""
+    if sqlite_name.count(":") < 2:
+        return sqlite_name
+    return sqlite_name[sqlite_name.index(":") + 1:sqlite_name.rindex(":")]
+
+
+_LOCKING_READ_RE = re.compile(r"\bFOR\s+(?:UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b", re.I)
+_LIMITED_DML_RE = re.compile(
+    rf"^\s*((?:DELETE\s+(?:(?:IGNORE|QUICK|LOW_PRIORITY)\s+)*FROM|UPDATE\s+(?:(?:IGNORE|LOW_PRIORITY)\s+)*)"
+    rf"\s*({_QNAME})(?:\s+SET\s+.*?)?)(\s+WHERE\s+.*?)?(\s+ORDER\s+BY\s+.*?)?\s+LIMIT\s+(\d+|\?|:\w+)\s*$",
+    re.I | re.S)
+_INSERT_TABLE_RE = re.compile(
+    rf"\s*(?:INSERT|REPLACE)\s+(?:(?:IGNORE|LOW_PRIORITY|DELAYED|HIGH_PRIORITY)\s+)*(?:INTO\s+)?({_QNAME})",
+    re.I)
+_VALUES_RE = re.compile(r"\bVALUES?\s*\(", re.I)
+_ROWS_COUNTER = {"INSERT": "Innodb_rows_inserted", "REPLACE": "Innodb_rows_inserted",
+                 "UPDATE": "Innodb_rows_updated", "DELETE": "Innodb_rows_deleted"}
+_SET_RE = re.compile(
+    r"\s*(?:(GLOBAL|SESSION|LOCAL|PERSIST)\s+)?(@@(?:(GLOBAL|SESSION|LOCAL)\s*\.\s*)?|@)?"
+    r"(`(?:[^`]|``)+`|\x00\d+\x00|[\w$.]+)\s*:?=\s*(.*)$", re.I | re.S)
+_DEFINER_RE = re.compile(
+    r"\bDEFINER\s*=\s*(?:`[^`]*`|\x00\d+\x00|[\w$.%-]+)(?:\s*@\s*(?:`[^`]*`|\x00\d+\x00|[\w$.%-]+))?|"
+    r"\bALGORITHM\s*=\s*(?:UNDEFINED|MERGE|TEMPTABLE)\b|\bSQL\s+SECURITY\s+(?:DEFINER|INVOKER)\b", re.I)
+
+
+# LOAD DATA
+
+_LOAD_DATA_RE = re.compile(
+    rf"\s*LOAD\s+DATA\s+(?:(?:LOW_PRIORITY|CONCURRENT)\s+)?(LOCAL\s+)?INFILE\s+(\?|:\w+|\x00\d+\x00)\s+"
+    rf"(?:(REPLACE|IGNORE)\s+)?INTO\s+TABLE\s+({_QNAME})(.*)$", re.I | re.S)
+_LOAD_OPTION_RE = re.compile(
+    r"\b(?:(FIELDS|COLUMNS|LINES)\s+)?(TERMINATED\s+BY|(?:OPTIONALLY\s+)?ENCLOSED\s+BY|ESCAPED\s+BY|"
+    r"STARTING\s+BY|CHARACTER\s+SET|IGNORE)\s+(\x00\d+\x00|\w+)", re.I)
+_LOAD_OPTIONS = {("FIELDS", "TERMINATED BY"): "fields", ("FIELDS", "ENCLOSED BY"): "enclosed",
+                 ("FIELDS", "ESCAPED BY"): "escaped", ("LINES", "TERMINATED BY"): "lines",
+                 ("LINES", "STARTING BY"): "starting"}
+_LOAD_ESCAPES = {c: v for c, v in _ESCAPES.items() if c not in "%_"}
+
+
+def _load_options(rest, literals):
+    """FIELDS / LINES / IGNORE settings of a LOAD DATA statement, with MySQL's defaults."""
+    options = {"fields": "\t", "enclosed": "", "escaped": "\\", "lines": "\n", "starting": "",
+               "ignore": 0, "charset": "utf8mb4"}
+    section = "FIELDS"
+    for m in _LOAD_OPTION_RE.finditer(rest):
+        if m.group(1):
+            section = "LINES" if m.group(1).upper() == "LINES" else "FIELDS"
+        clause = " ".join(m.group(2).upper().split()).replace("OPTIONALLY ", "")
+        token = _TOKEN_RE.fullmatch(m.group(3))
+        value = literals[int(token.group(1))] if token else m.group(3)
+        if clause == "IGNORE":
+            options["ignore"] = int(value)
+        elif clause == "CHARACTER SET":
+            options["charset"] = value
+        elif (section, clause) in _LOAD_OPTIONS:
+            options[_LOAD_OPTIONS[(section, clause)]] = value
+        else:
+            raise _syntax_error(m.group())
+    return options
+
+
+def _parse_load_data(text, options):
+    """Rows (lists of str or None) of a LOAD DATA file, split by MySQL's FIELDS and LINES rules."""
+    fields, lines = options["fields"], options["lines"]
+    enclosed, escaped, starting = options["enclosed"], options["escaped"], options["starting"]
+    rows, row, value = [], [], []
+    null = quoted = False
+    i, n = 0, len(text)
+    line_start = True
+    while i < n:
+        if line_start and starting:
+            j = text.find(starting, i)
+            if j < 0:
+                break
+            i = j + len(starting)
+        line_start = False
+        if escaped and text.startswith(escaped, i) and i + len(escaped) < n:
+            c = text[i + len(escaped)]
+            if c == "N" and not value and not quoted:
+                null = True
+            else:
+                value.append(_LOAD_ESCAPES.get(c, c))
+            i += len(escaped) + 1
+            continue
+        if enclosed and text.startswith(enclosed, i):
+            after = i + len(enclosed)
+            if quoted:
+                if text.startswith(enclosed, after):
+                    value.append(enclosed)
+                    i = after + len(enclosed)
+                    continue
+                if after >= n or text.startswith(fields, after) or text.startswith(lines, after):
+                    quoted = False
+                    i = after
+                    continue
+            elif not value and not null:
+                quoted = True
+                i = after
+                continue
+        if not quoted and text.startswith(fields, i):
+            row.append(None if null else "".join(value))
+            value, null = [], False
+            i += len(fields)
+            continue
+        if not quoted and text.startswith(lines, i):
+            row.append(None if null else "".join(value))
+            if row != [""]:
+                rows.append(row)
+            row, value, null = [], [], False
+            i += len(lines)
+            line_start = True
+            continue
+        value.append(text[i])
+        i += 1
+    if value or null or row:
+        row.append(None if null else "".join(value))
+        rows.append(row)
+    return rows[options["ignore"]:]
+
+
+# Table models: MySQL column and table definitions <-> the SQLite CREATE TABLE text that stores them.
+# A model is {"columns", "primary", "checks", "fks", "autoincrement"}; checks hold SQLite expressions.
+
+_INT_TYPES = {"TINYINT": 3, "SMALLINT": 5, "MEDIUMINT": 7, "INT": 10, "BIGINT": 19}
+_TEXT_LENGTHS = {"TINYTEXT": 255, "TEXT": 65535, "MEDIUMTEXT": 16777215, "LONGTEXT": 4294967295,
+                 "TINYBLOB": 255, "BLOB": 65535, "MEDIUMBLOB": 16777215, "LONGBLOB": 4294967295}
+_TEXT_TYPES = {"CHAR", "VARCHAR", "TINYTEXT", "TEXT", "MEDIUMTEXT", "LONGTEXT", "ENUM_TEXT", "SET_TEXT"}
+_NOW_DEFAULT_RE = re.compile(r"(?:CURRENT_TIMESTAMP|NOW|LOCALTIMESTAMP|LOCALTIME)\b(?:\s*\(\s*(\d*)\s*\))?",
+                             re.I)
+_COLUMN_WORDS = {"PRIMARY", "NOT", "NULL", "DEFAULT", "GENERATED", "AS", "COLLATE", "CONSTRAINT", "CHECK",
+                 "UNIQUE", "REFERENCES"}
+
+
+def _index_sql(alias, table, index):
+    kind = "f" if index["type"] == "FULLTEXT" else "i"
+    name = f"{kind}:{index['name']}:{uuid.uuid4().hex[:8]}"
+    return (f"CREATE {'UNIQUE ' if index['unique'] else ''}INDEX {alias}.{_quote(name)} ON {_quote(table)} "
+            f"({', '.join(_quote(c) for c in index['columns'])})")
+
+
+def _column_sql(column, autoincrement):
+    if autoincrement and column["autoincrement"]:
+        # Only INTEGER PRIMARY KEY columns can use AUTOINCREMENT; keep the MySQL type in a comment.
+        return f"{_quote(column['name'])} INTEGER PRIMARY KEY AUTOINCREMENT /*type:{column['type']}*/"
+    parts = [_quote(column["name"]), column["type"]]
+    if column["generated"]:
+        parts.append(f"GENERATED ALWAYS AS ({column['generated'][0]}) {column['generated'][1]}")
+    if column["notnull"]:
+        parts.append("NOT NULL")
+    if column["default"] is not None:
+        parts.append(f"DEFAULT {column['default']}")
+    if column["collate"]:
+        parts.append(f"COLLATE {column['collate']}")
+    return " ".join(parts)
+
+
+def _table_sql(target, model):
+    """CREATE TABLE `target` for a table model."""
+    items = [_column_sql(c, model["autoincrement"]) for c in model["columns"]]
+    if model["primary"] and not model["autoincrement"]:
+        items.append(f"PRIMARY KEY ({', '.join(_quote(c) for c in model['primary'])})")
+    for name, expr in model["checks"]:
+        items.append(f"CONSTRAINT {_quote(name)} CHECK ({expr})")
+    for fk in model["fks"]:
+        items.append(f"CONSTRAINT {_quote(fk['name'])} FOREIGN KEY ({', '.join(_quote(c) for c in fk['columns'])}) "
+                     f"REFERENCES {_quote(fk['ref_table'])} ({', '.join(_quote(c) for c in fk['ref_columns'])})"
+                     + (f" {fk['rules']}" if fk["rules"] else ""))
+    return f"CREATE TABLE {target} (\n  " + ",\n  ".join(items) + "\n)"
+
+
+def _parse_table_sql(sql):
+    """The table model of a CREATE TABLE stored by SQLite (ours, or one SQLite wrote for CTAS)."""
+    hints = []
+
+    def hint(m):
+        hints.append(m.group(1))
+        return f" _standin_type_{len(hints) - 1} "
+    masked, literals = _mask(re.sub(r"/\*type:(.*?)\*/", hint, sql), sqlite=True)
+    start = masked.index("(")
+    model = {"columns": [], "primary": [], "checks": [], "fks": [], "autoincrement": False}
+    enums = {}
+    for item in _split_top(masked[start + 1:_close_paren(masked, start)]):
+        item = item.strip()
+        m = re.match(rf"(?:CONSTRAINT\s+({_NAME})\s+)?(PRIMARY\s+KEY|CHECK|FOREIGN\s+KEY|UNIQUE)\s*\(", item, re.I)
+        if m:
+            name = _ident(m.group(1)) if m.group(1) else None
+            kind = m.group(2).split()[0].upper()
+            close = _close_paren(item, m.end() - 1)
+            inner = item[m.end():close]
+            if kind == "PRIMARY":
+                model["primary"] = [_ident(c.split()[0]) for c in _split_top(inner)]
+            elif kind == "CHECK":
+                if name and name.startswith("_standin_enum_"):
+                    enums[name[len("_standin_enum_"):].lower()] = [
+                        literals[int(t)] for t in _TOKEN_RE.findall(inner)]
+                model["checks"].append((name, _unmask(inner.strip(), literals)))
+            elif kind == "FOREIGN":
+                r = re.match(rf"\s*REFERENCES\s+({_NAME})\s*\(([^()]*)\)(.*)$", item[close + 1:], re.I | re.S)
+                model["fks"].append({"name": name, "columns": [_ident(c) for c in _split_top(inner)],
+                                     "ref_table": _ident(r.group(1)),
+                                     "ref_columns": [_ident(c) for c in _split_top(r.group(2))],
+                                     "rules": " ".join(r.group(3).split()).upper()})
+            continue
+        m = re.match(rf"({_NAME})\s*", item)
+        column = {"name": _ident(m.group(1)), "type": "", "notnull": False, "default": None, "collate": None,
+                  "autoincrement": False, "generated": None, "enum": None}
+        pos, words = m.end(), []
+        # The declared type: words up to the first constraint keyword, with their (arguments).
+        while pos < len(item):
+            w = re.match(r"([A-Za-z_]\w*)\s*", item[pos:])
+            if not w or w.group(1).upper() in _COLUMN_WORDS:
+                break
+            pos += w.end()
+            if w.group(1).startswith("_standin_type_"):
+                continue
+            words.append(w.group(1))
+            if item.startswith("(", pos):
+                end = _close_paren(item, pos)
+                words[-1] += item[pos:end + 1].replace(" ", "")
+                pos = end + 1
+                pos += len(item[pos:]) - len(item[pos:].lstrip())
+        column["type"] = " ".join(words)
+        rest = item[pos:]
+        while rest.strip():
+            rest = rest.strip()
+            t = re.match(r"_standin_type_(\d+)\b", rest)
+            if t:
+                column["type"] = hints[int(t.group(1))]
+                rest = rest[t.end():]
+                continue
+            c = re.match(r"PRIMARY\s+KEY(?:\s+(?:ASC|DESC))?(\s+AUTOINCREMENT)?\b", rest, re.I)
+            if c:
+                model["primary"] = [column["name"]]
+                column["notnull"] = True
+                if c.group(1):
+                    column["autoincrement"] = model["autoincrement"] = True
+                rest = rest[c.end():]
+                continue
+            c = re.match(r"(NOT\s+)?NULL\b", rest, re.I)
+            if c:
+                column["notnull"] = column["notnull"] or bool(c.group(1))
+                rest = rest[c.end():]
+                continue
+            c = re.match(r"DEFAULT\s+", rest, re.I)
+            if c:
+                rest = rest[c.end():]
+                if rest.startswith("("):
+                    end = _close_paren(rest, 0) + 1
+                else:
+                    end = re.match(r"\x00\d+\x00|[+-]?[\w.]+", rest).end()
+                value = _unmask(rest[:end], literals)
+                column["default"] = None if value.upper() == "NULL" else value
+                rest = rest[end:]
+                continue
+            c = re.match(r"(?:GENERATED\s+ALWAYS\s+)?AS\s*\(", rest, re.I)
+            if c:
+                end = _close_paren(rest, c.end() - 1)
+                kind = re.match(r"\s*(VIRTUAL|STORED)?", rest[end + 1:], re.I)
+                column["generated"] = (_unmask(rest[c.end():end].strip(), literals),
+                                       (kind.group(1) or "VIRTUAL").upper())
+                rest = rest[end + 1 + kind.end():]
+                continue
+            c = re.match(r"COLLATE\s+(\w+)", rest, re.I)
+            if c:
+                column["collate"] = c.group(1).upper()
+                rest = rest[c.end():]
+                continue
+            c = re.match(r"\S+\s*(?:\([^()]*\))?", rest)
+            rest = rest[c.end():]
+        model["columns"].append(column)
+    for column in model["columns"]:
+        column["enum"] = enums.get(column["name"].lower())
+        if column["name"] in model["primary"]:
+            column["notnull"] = True
+    return model
+
+
+def _parse_column(item, literals, rewrite):
+    """
+    A MySQL column definition (masked) as a model column, plus the inline
+    "primary", "unique" and "checks" it declares. `rewrite` turns a MySQL
+    expression into SQLite text; None skips expressions (types only).
+    """
+    m = re.match(rf"\s*({_NAME})\s+([A-Za-z_]\w*)", item)
+    if not m:
+        raise _syntax_error(item)
+    name, base, pos = _ident(m.group(1)), m.group(2).upper(), m.end()
+    args = None
+    p = re.match(r"\s*\(", item[pos:])
+    if p:
+        end = _close_paren(item, pos + p.end() - 1)
+        args, pos = item[pos + p.end():end].strip(), end + 1
+    rest = re.sub(r"^\s*PRECISION\b", "", item[pos:], flags=re.I) if base == "DOUBLE" else item[pos:]
+    column = {"name": name, "type": None, "notnull": False, "default": None, "collate": None,
+              "autoincrement": False, "generated": None, "enum": None, "primary": False, "unique": False,
+              "checks": []}
+    base = {"INTEGER": "INT", "NUMERIC": "DECIMAL", "DEC": "DECIMAL", "FIXED": "DECIMAL", "REAL": "DOUBLE",
+            "NCHAR": "CHAR", "NVARCHAR": "VARCHAR", "BOOLEAN": "BOOL"}.get(base, base)
+    numbers = [a.strip() for a in args.split(",")] if args else []
+    if base in _INT_TYPES:
+        column["type"] = "TINYINT(1)" if base == "TINYINT" and numbers == ["1"] else base
+    elif base == "BOOL":
+        column["type"] = "TINYINT(1)"
+    elif base == "DECIMAL":
+        precision = int(numbers[0]) if numbers else 10
+        scale = int(numbers[1]) if len(numbers) > 1 else 0
+        column["type"] = f"DECIMAL_{scale}({precision},{scale})"
+    elif base in ("DOUBLE", "FLOAT"):
+        column["type"] = base
+    elif base in ("CHAR", "VARCHAR", "BINARY", "VARBINARY"):
+        if base.startswith("VAR") and not numbers:
+            raise _syntax_error(item)
+        column["type"] = f"{base}({numbers[0] if numbers else 1})"
+    elif base in _TEXT_LENGTHS:
+        column["type"] = base
+    elif base in ("DATETIME", "TIMESTAMP", "TIME"):
+        column["type"] = f"{base}({numbers[0]})" if numbers and int(numbers[0]) else base
+    elif base in ("DATE", "YEAR", "JSON"):
+        column["type"] = base
+    elif base == "BIT":
+        column["type"] = f"BIT({numbers[0] if numbers else 1})"
+    elif base in ("ENUM", "SET"):
+        values = [literals[int(t)] for t in _TOKEN_RE.findall(args or "")]
+        column["type"] = f"{base}_TEXT"
+        if base == "ENUM":
+            column["enum"] = values
+    else:
+        raise _unsupported(f"data type {base} in the SQLite stand-in")
+    text = column["type"].split("(")[0] in _TEXT_TYPES
+    if text:
+        column["collate"] = "NOCASE"
+    fsp = int(numbers[0]) if base in ("DATETIME", "TIMESTAMP") and numbers else 0
+    while rest.strip():
+        rest = rest.strip()
+        c = re.match(r"(UNSIGNED|SIGNED|ZEROFILL)\b", rest, re.I)
+        if c:
+            if c.group(1).upper() == "UNSIGNED" and base in _INT_TYPES:
+                column["type"] += " UNSIGNED"
+            rest = rest[c.end():]
+            continue
+        c = re.match(r"(?:CHARACTER\s+SET|CHARSET)\s+(\w+)", rest, re.I)
+        if c:
+            if c.group(1).lower() == "binary":
+                column["collate"] = None
+            rest = rest[c.end():]
+            continue
+        c = re.match(r"COLLATE\s+(\w+)", rest, re.I)
+        if c:
+            if text:
+                binary = c.group(1).lower() == "binary" or c.group(1).lower().endswith("_bin")
+                column["collate"] = None if binary else "NOCASE"
+            rest = rest[c.end():]
+            continue
+        c = re.match(r"(NOT\s+)?NULL\b", rest, re.I)
+        if c:
+            column["notnull"] = bool(c.group(1))
+            rest = rest[c.end():]
+            continue
+        c = re.match(r"DEFAULT\s*", rest, re.I)
+        if c:
+            rest = rest[c.end():]
+            now = _NOW_DEFAULT_RE.match(rest)
+            if rest.startswith("("):
+                end = _close_paren(rest, 0) + 1
+                column["default"] = f"({rewrite(rest[1:end - 1], literals)})" if rewrite else None
+            elif now:
+                end = now.end()
+                if int(now.group(1) or 0) or fsp:
+                    column["default"] = "(strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))"
+                else:
+                    column["default"] = "(datetime('now', 'localtime'))"
+            else:
+                v = re.match(r"\x00(\d+)\x00|([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|(NULL|TRUE|FALSE)\b",
+                             rest, re.I)
+                if not v:
+                    raise _syntax_error(rest)
+                end = v.end()
+                if v.group(1) is not None:
+                    column["default"] = _sqlite_literal(literals[int(v.group(1))])
+                elif v.group(2) is not None:
+                    column["default"] = v.group(2)
+                else:
+                    column["default"] = {"NULL": None, "TRUE": "1", "FALSE": "0"}[v.group(3).upper()]
+            rest = rest[end:]
+            continue
+        c = re.match(r"ON\s+UPDATE\s+", rest, re.I)
+        if c and _NOW_DEFAULT_RE.match(rest[c.end():]):
+            rest = rest[c.end() + _NOW_DEFAULT_RE.match(rest[c.end():]).end():]
+            continue
+        c = re.match(r"AUTO_INCREMENT\b", rest, re.I)
+        if c:
+            column["autoincrement"] = True
+            rest = rest[c.end():]
+            continue
+        c = re.match(r"UNIQUE(?:\s+KEY)?\b", rest, re.I)
+        if c:
+            column["unique"] = True
+            rest = rest[c.end():]
+            continue
+        c = re.match(r"(?:PRIMARY\s+)?KEY\b", rest, re.I)
+        if c:
+            column["primary"] = True
+            rest = rest[c.end():]
+            continue
+        c = re.match(r"COMMENT\s+\x00\d+\x00|(?:VISIBLE|INVISIBLE)\b|(?:COLUMN_FORMAT|STORAGE)\s+\w+|SRID\s+\d+",
+                     rest, re.I)
+        if c:
+            rest = rest[c.end():]
+            continue
+        c = re.match(rf"(?:CONSTRAINT(?:\s+({_NAME}))?\s+)?CHECK\s*\(", rest, re.I)
+        if c:
+            end = _close_paren(rest, c.end() - 1)
+            enforced = re.match(r"\s*(NOT\s+)?ENFORCED\b", rest[end + 1:], re.I)
+            column["checks"].append((rest[c.end():end], _ident(c.group(1)) if c.group(1) else None,
+                                     not (enforced and enforced.group(1))))
+            rest = rest[end + 1 + (enforced.end() if enforced else 0):]
+            continue
+        c = re.match(r"(?:GENERATED\s+ALWAYS\s+)?AS\s*\(", rest, re.I)
+        if c:
+            end = _close_paren(rest, c.end() - 1)
+            kind = re.match(r"\s*(VIRTUAL|STORED)?", rest[end + 1:], re.I)
+            expr = rest[c.end():end]
+            column["generated"] = (rewrite(expr, literals) if rewrite else expr,
+                                   (kind.group(1) or "VIRTUAL").upper())
+            rest = rest[end + 1 + kind.end():]
+            continue
+        c = re.match(rf"REFERENCES\s+{_QNAME}\s*\([^()]*\)(?:\s+ON\s+(?:DELETE|UPDATE)\s+"
+                     r"(?:CASCADE|RESTRICT|SET\s+NULL|SET\s+DEFAULT|NO\s+ACTION))*", rest, re.I)
+        if c:
+            # MySQL parses inline REFERENCES and ignores it; so does the stand-in.
+            rest = rest[c.end():]
+            continue
+        raise _syntax_error(rest)
+    return column
+
+
+def _column_info(name, decl, notnull, default, col):
+    """A column as information_schema.COLUMNS describes it."""
+    declared = col.get("type") or decl
+    m = re.match(r"(\w+)(?:\((\d+)(?:,(\d+))?\))?(\s+UNSIGNED)?", declared.upper())
+    base = m.group(1) if m else ""
+    size = int(m.group(2)) if m and m.group(2) else None
+    unsigned = bool(m and m.group(4))
+    info = {"name": name, "column_type": None, "data_type": None,
+            "nullable": not (notnull or col.get("notnull")), "default": None, "extra": "",
+            "collation": None, "charset": None, "max_length": None, "octet_length": None, "precision": None,
+            "scale": None, "datetime_precision": None, "generation": ""}
+    base = {"INTEGER": "INT", "NUM": "DOUBLE", "REAL": "DOUBLE", "": "TEXT"}.get(base, base)
+    if base.startswith("DECIMAL"):
+        precision, scale = size or 10, int(m.group(3) or 0)
+        info.update(data_type="decimal", column_type=f"decimal({precision},{scale})", precision=precision,
+                    scale=scale)
+    elif base in _INT_TYPES:
+        lowered = base.lower()
+        info.update(data_type=lowered, column_type=(f"{lowered}({size})" if size else lowered)
+                    + (" unsigned" if unsigned else ""),
+                    precision=_INT_TYPES[base] + (1 if unsigned and base == "BIGINT" else 0), scale=0)
+    elif base in ("DOUBLE", "FLOAT"):
+        info.update(data_type=base.lower(), column_type=base.lower(), precision=22 if base == "DOUBLE" else 12)
+    elif base in ("CHAR", "VARCHAR", "ENUM_TEXT", "SET_TEXT") or base in _TEXT_LENGTHS:
+        data_type = {"ENUM_TEXT": "enum", "SET_TEXT": "set"}.get(base, base.lower())
+        if base == "ENUM_TEXT":
+            values = col.get("enum") or []
+            column_type = "enum(" + ",".join(_mysql_literal(v) for v in values) + ")"
+            size = max((len(v) for v in values), default=0)
+        elif base == "SET_TEXT":
+            column_type, size = "set", 0
+        elif base in _TEXT_LENGTHS:
+            column_type, size = data_type, _TEXT_LENGTHS[base]
+        else:
+            column_type = f"{data_type}({size or 1})"
+        info.update(data_type=data_type, column_type=column_type, max_length=size)
+        if "BLOB" in base:
+            info["octet_length"] = size
+        else:
+            info.update(octet_length=size * 4 if size < _TEXT_LENGTHS["LONGTEXT"] // 4 else size,
+                        charset="utf8mb4",
+                        collation="utf8mb4_bin" if col and not col.get("collate") else "utf8mb4_0900_ai_ci")
+    elif base in ("BINARY", "VARBINARY"):
+        info.update(data_type=base.lower(), column_type=f"{base.lower()}({size or 1})", max_length=size or 1,
+                    octet_length=size or 1)
+    elif base in ("DATETIME", "TIMESTAMP", "TIME"):
+        info.update(data_type=base.lower(), column_type=f"{base.lower()}({size})" if size else base.lower(),
+                    datetime_precision=size or 0)
+    elif base == "BIT":
+        info.update(data_type="bit", column_type=f"bit({size or 1})", precision=size or 1)
+    else:
+        info.update(data_type=base.lower(), column_type=base.lower())
+    if col.get("autoincrement"):
+        info["extra"] = "auto_increment"
+    elif col.get("generated"):
+        info["extra"] = f"{col['generated'][1]} GENERATED"
+        info["generation"] = col["generated"][0]
+    elif default is not None:
+        if default.startswith(("(datetime('now'", "(strftime(")):
+            precision = info["datetime_precision"]
+            info["default"] = f"CURRENT_TIMESTAMP({precision})" if precision else "CURRENT_TIMESTAMP"
+            info["extra"] = "DEFAULT_GENERATED"
+        elif default.startswith("("):
+            info["default"] = default[1:-1]
+            info["extra"] = "DEFAULT_GENERATED"
+        elif default.startswith("'"):
+            info["default"] = default[1:-1].replace("''", "'")
+        else:
+            info["default"] = default
+    return info
+
+
+def _column_keys(info):
+    """{column: 'PRI' | 'UNI' | 'MUL'} as SHOW COLUMNS reports the Key field."""
+    rank = {"PRI": 3, "UNI": 2, "MUL": 1}
+    keys = {}
+    for index in info["indexes"]:
+        if not index["columns"]:
+            continue
+        if index["name"] == "PRIMARY":
+            marks = [(c.lower(), "PRI") for c, _ in index["columns"]]
+        elif index["unique"] and len(index["columns"]) == 1:
+            marks = [(index["columns"][0][0].lower(), "UNI")]
+        else:
+            marks = [(index["columns"][0][0].lower(), "MUL")]
+        for column, key in marks:
+            if rank[key] > rank.get(keys.get(column), 0):
+                keys[column] = key
+    return keys
+
+
+def _show_value(value):
+    return "" if value is None else str(value)
+
+
+def _view_select(sql):
+    """The SELECT of a stored CREATE VIEW."""
+    m = re.search(r"\bAS\s+((?:SELECT|WITH|VALUES)\b.*)$", sql, re.I | re.S)
+    return m.group(1).strip() if m else sql
+
+
+def _create_table_sql(info):
+    """SHOW CREATE TABLE text for a described table."""
+    lines = []
+    for column in info["columns"]:
+        parts = [_quote(column["name"]), column["column_type"]]
+        if column["collation"] == "utf8mb4_bin":
+            parts.append("COLLATE utf8mb4_bin")
+        if column["generation"]:
+            parts.append(f"GENERATED ALWAYS AS ({column['generation']}) {column['extra'].split()[0]}")
+        if not column["nullable"]:
+            parts.append("NOT NULL")
+        if column["default"] is not None:
+            if column["extra"] != "DEFAULT_GENERATED":
+                parts.append(f"DEFAULT {_mysql_literal(str(column['default']))}")
+            elif column["default"].startswith("CURRENT_TIMESTAMP"):
+                parts.append(f"DEFAULT {column['default']}")
+            else:
+                parts.append(f"DEFAULT ({column['default']})")
+        elif column["nullable"] and not column["generation"] and "blob" not in column["data_type"] \
+                and "text" not in column["data_type"] and column["data_type"] != "json":
+            parts.append("DEFAULT NULL")
+        if column["extra"] == "auto_increment":
+            parts.append("AUTO_INCREMENT")
+        lines.append(" ".join(parts))
+    for index in info["indexes"]:
+        columns = ",".join(_quote(c) + (" DESC" if order == "D" else "") for c, order in index["columns"])
+        if index["name"] == "PRIMARY":
+            lines.append(f"PRIMARY KEY ({columns})")
+        else:
+            kind = "UNIQUE KEY" if index["unique"] else "FULLTEXT KEY" if index["type"] == "FULLTEXT" else "KEY"
+            lines.append(f"{kind} {_quote(index['name'])} ({columns})")
+    for fk in info["fks"]:
+        lines.append(f"CONSTRAINT {_quote(fk['name'])} FOREIGN KEY ({', '.join(_quote(c) for c in fk['columns'])}) "
+                     f"REFERENCES {_quote(fk['ref_table'])} ({', '.join(_quote(c) for c in fk['ref_columns'])})"
+                     + (f" {fk['rules']}" if fk["rules"] else ""))
+    names = [column["name"] for column in info["columns"]]
+    for name, expr in info["checks"]:
+        if not name.startswith("_standin_"):
+            lines.append(f"CONSTRAINT {_quote(name)} CHECK (({_mysql_expression(expr, names)}))")
+    options = "ENGINE=InnoDB"
+    if info["autoincrement"] and info["autoincrement"] > 1:
+        options += f" AUTO_INCREMENT={info['autoincrement']}"
+    options += " DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci"
+    return f"CREATE TABLE {_quote(info['name'])} (\n  " + ",\n  ".join(lines) + f"\n) {options}"
+
+
+def _in_schema(sql, alias):
+    """A stored CREATE statement re-targeted at SQLite schema `alias`."""
+    return re.sub(r"^\s*(CREATE\s+(?:TEMP(?:ORARY)?\s+)?(?:UNIQUE\s+)?(?:TRIGGER|VIEW|TABLE|INDEX)\s+"
+                  r"(?:IF\s+NOT\s+EXISTS\s+)?)", lambda m: m.group(1) + alias + ".", sql, flags=re.I)
+
+
+def _table_options(tail):
+    """{option: value} of the table options after a CREATE TABLE body."""
+    if re.search(r"\bPARTITION\s+BY\b", tail, re.I):
+        raise _unsupported("PARTITION BY")
+    options = {}
+    for m in re.finditer(r"\b(AUTO_INCREMENT|ENGINE|(?:DEFAULT\s+)?(?:CHARSET|CHARACTER\s+SET|COLLATE)|COMMENT|"
+                         r"ROW_FORMAT|KEY_BLOCK_SIZE|STATS_\w+|TABLESPACE)\s*=?\s*(\x00\d+\x00|[\w.]+)", tail, re.I):
+        options[m.group(1).split()[-1].lower()] = m.group(2)
+    return options
+
+
+def _find_column(model, name, table):
+    for column in model["columns"]:
+        if column["name"].lower() == name.lower():
+            return column
+    if table is None:
+        raise _error(errorcode.ER_KEY_COLUMN_DOES_NOT_EXITS, f"Key column '{name}' doesn't exist in table",
+                     "42000")
+    raise _error(errorcode.ER_BAD_FIELD_ERROR, f"Unknown column '{name}' in '{table}'", "42S22")
+
+
+def _find_index(indexes, name):
+    for index in indexes:
+        if index["name"].lower() == name.lower():
+            return index
+    raise _error(errorcode.ER_CANT_DROP_FIELD_OR_KEY, f"Can't DROP '{name}'; check that column/key exists",
+                 "42000")
+
+
+def _other_key(indexes, model, index, fk):
+    """Whether a key other than `index` still starts with the foreign key's columns."""
+    lowered = [c.lower() for c in fk["columns"]]
+    keys = [[c.lower() for c in i["columns"]] for i in indexes if i is not index]
+    keys.append([c.lower() for c in model["primary"]])
+    return any(k[:len(lowered)] == lowered for k in keys)
+
+
+def _check_auto_column(model):
+    auto = [c for c in model["columns"] if c["autoincrement"]]
+    primary = [c.lower() for c in model["primary"]]
+    if auto and len(auto) == 1 and len(primary) > 1 and primary[0] == auto[0]["name"].lower():
+        raise _unsupported("AUTO_INCREMENT in a composite primary key")
+    if len(auto) > 1 or (auto and primary != [auto[0]["name"].lower()]):
+        raise _error(errorcode.ER_WRONG_AUTO_KEY, "Incorrect table definition; there can be only one auto "
+                     "column and it must be defined as a key", "42000")
+    model["autoincrement"] = bool(auto)
+
+
+def _column_position(definition, model):
+    """(definition without FIRST / AFTER col, index to insert at or None)."""
+    m = re.search(rf"\s+(?:(FIRST)|AFTER\s+({_NAME}))\s*$", definition, re.I)
+    if not m:
+        return definition, None
+    if m.group(1):
+        return definition[:m.start()], 0
+    name = _ident(m.group(2))
+    for index, column in enumerate(model["columns"]):
+        if column["name"].lower() == name.lower():
+            return definition[:m.start()], index + 1
+    raise _error(errorcode.ER_BAD_FIELD_ERROR, f"Unknown column '{name}' in 'table definition'", "42S22")
+
+
+def _rename_column(model, indexes, old, new):
+    """Follow a column rename through the key, index, foreign key and ENUM definitions."""
+    low = old.lower()
+
+    def renamed(columns):
+        return [new if c.lower() == low else c for c in columns]
+    model["primary"] = renamed(model["primary"])
+    for index in indexes:
+        index["columns"] = renamed(index["columns"])
+    for fk in model["fks"]:
+        fk["columns"] = renamed(fk["columns"])
+    pattern = re.compile(rf"(?<![\w$])`?{re.escape(old)}`?(?![\w$])", re.I)
+    taken = {c[0].lower() for c in model["checks"]}
+    checks = []
+    for name, expr in model["checks"]:
+        if name.lower() == f"_standin_enum_{low}":
+            if f"_standin_enum_{new}".lower() not in taken:
+                checks.append((f"_standin_enum_{new}", _quote(new) + expr[expr.index(" IN ("):]))
+            continue
+        if not name.startswith("_standin_enum_") and pattern.search(_mask(expr, sqlite=True)[0]):
+            raise _error(errorcode.ER_DEPENDENT_BY_CHECK_CONSTRAINT,
+                         f"Check constraint '{name}' uses column '{old}', hence column cannot be dropped "
+                         "or renamed.")
+        checks.append((name, expr))
+    model["checks"] = checks
+
+
+class _DDLTransaction:
+    """One DDL statement's SQLite statements as a single transaction (see SQLiteConnection._ddl)."""
+
+    def __init__(self, conn, foreign_keys):
+        self.conn = conn
+        self.foreign_keys = foreign_keys
+        self.restore = False
+
+    def __enter__(self):
+        conn = self.conn
+        if not self.foreign_keys and conn._variable("foreign_key_checks"):
+            # Table rebuilds drop and re-create parents; SQLite only honours this outside transactions.
+            conn._db.execute("PRAGMA foreign_keys = OFF")
+            self.restore = True
+        conn._sqlite("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        db = self.conn._db
+        try:
+            if exc_type is None:
+                self.conn._sqlite("COMMIT")
+            elif db.in_transaction:
+                db.execute("ROLLBACK")
+        finally:
+            if self.restore:
+                db.execute("PRAGMA foreign_keys = ON")
+        return False
+
+
+# information_schema tables the stand-in fills, with their columns in MySQL's order.
+
+_INFORMATION_SCHEMA = {
+    "SCHEMATA": ("CATALOG_NAME", "SCHEMA_NAME", "DEFAULT_CHARACTER_SET_NAME", "DEFAULT_COLLATION_NAME",
+                 "SQL_PATH", "DEFAULT_ENCRYPTION"),
+    "TABLES": ("TABLE_CATALOG", "TABLE_SCHEMA", "TABLE_NAME", "TABLE_TYPE", "ENGINE", "VERSION", "ROW_FORMAT",
+               "TABLE_ROWS", "AVG_ROW_LENGTH", "DATA_LENGTH", "MAX_DATA_LENGTH", "INDEX_LENGTH", "DATA_FREE",
+               "AUTO_INCREMENT", "CREATE_TIME", "UPDATE_TIME", "CHECK_TIME", "TABLE_COLLATION", "CHECKSUM",
+               "CREATE_OPTIONS", "TABLE_COMMENT"),
+    "COLUMNS": ("TABLE_CATALOG", "TABLE_SCHEMA", "TABLE_NAME", "COLUMN_NAME", "ORDINAL_POSITION",
+                "COLUMN_DEFAULT", "IS_NULLABLE", "DATA_TYPE", "CHARACTER_MAXIMUM_LENGTH",
+                "CHARACTER_OCTET_LENGTH", "NUMERIC_PRECISION", "NUMERIC_SCALE", "DATETIME_PRECISION",
+                "CHARACTER_SET_NAME", "COLLATION_NAME", "COLUMN_TYPE", "COLUMN_KEY", "EXTRA", "PRIVILEGES",
+                "COLUMN_COMMENT", "GENERATION_EXPRESSION", "SRS_ID"),
+    "STATISTICS": ("TABLE_CATALOG", "TABLE_SCHEMA", "TABLE_NAME", "NON_UNIQUE", "INDEX_SCHEMA", "INDEX_NAME",
+                   "SEQ_IN_INDEX", "COLUMN_NAME", "COLLATION", "CARDINALITY", "SUB_PART", "PACKED", "NULLABLE",
+                   "INDEX_TYPE", "COMMENT", "INDEX_COMMENT", "IS_VISIBLE", "EXPRESSION"),
+    "TABLE_CONSTRAINTS": ("CONSTRAINT_CATALOG", "CONSTRAINT_SCHEMA", "CONSTRAINT_NAME", "TABLE_SCHEMA",
+                          "TABLE_NAME", "CONSTRAINT_TYPE", "ENFORCED"),
+    "KEY_COLUMN_USAGE": ("CONSTRAINT_CATALOG", "CONSTRAINT_SCHEMA", "CONSTRAINT_NAME", "TABLE_CATALOG",
+                         "TABLE_SCHEMA", "TABLE_NAME", "COLUMN_NAME", "ORDINAL_POSITION",
+                         "POSITION_IN_UNIQUE_CONSTRAINT", "REFERENCED_TABLE_SCHEMA", "REFERENCED_TABLE_NAME",
+                         "REFERENCED_COLUMN_NAME"),
+    "CHECK_CONSTRAINTS": ("CONSTRAINT_CATALOG", "CONSTRAINT_SCHEMA", "CONSTRAINT_NAME", "CHECK_CLAUSE"),
+    "REFERENTIAL_CONSTRAINTS": ("CONSTRAINT_CATALOG", "CONSTRAINT_SCHEMA", "CONSTRAINT_NAME",
+                                "UNIQUE_CONSTRAINT_CATALOG", "UNIQUE_CONSTRAINT_SCHEMA", "UNIQUE_CONSTRAINT_NAME",
+                                "MATCH_OPTION", "UPDATE_RULE", "DELETE_RULE", "TABLE_NAME",
+                                "REFERENCED_TABLE_NAME"),
+    "VIEWS": ("TABLE_CATALOG", "TABLE_SCHEMA", "TABLE_NAME", "VIEW_DEFINITION", "CHECK_OPTION", "IS_UPDATABLE",
+              "DEFINER", "SECURITY_TYPE", "CHARACTER_SET_CLIENT", "COLLATION_CONNECTION"),
+    "VIEW_TABLE_USAGE": ("VIEW_CATALOG", "VIEW_SCHEMA", "VIEW_NAME", "TABLE_CATALOG", "TABLE_SCHEMA",
+                         "TABLE_NAME"),
+    "TRIGGERS": ("TRIGGER_CATALOG", "TRIGGER_SCHEMA", "TRIGGER_NAME", "EVENT_MANIPULATION",
+                 "EVENT_OBJECT_CATALOG", "EVENT_OBJECT_SCHEMA", "EVENT_OBJECT_TABLE", "ACTION_ORDER",
+                 "ACTION_CONDITION", "ACTION_STATEMENT", "ACTION_ORIENTATION", "ACTION_TIMING",
+                 "ACTION_REFERENCE_OLD_ROW", "ACTION_REFERENCE_NEW_ROW", "CREATED", "SQL_MODE", "DEFINER",
+                 "CHARACTER_SET_CLIENT", "COLLATION_CONNECTION", "DATABASE_COLLATION"),
+    "ROUTINES": ("SPECIFIC_NAME", "ROUTINE_CATALOG", "ROUTINE_SCHEMA", "ROUTINE_NAME", "ROUTINE_TYPE",
+                 "DATA_TYPE", "CHARACTER_MAXIMUM_LENGTH", "CHARACTER_OCTET_LENGTH", "NUMERIC_PRECISION",
+                 "NUMERIC_SCALE", "DATETIME_PRECISION", "CHARACTER_SET_NAME", "COLLATION_NAME",
+                 "DTD_IDENTIFIER", "ROUTINE_BODY", "ROUTINE_DEFINITION", "EXTERNAL_NAME", "EXTERNAL_LANGUAGE",
+                 "PARAMETER_STYLE", "IS_DETERMINISTIC", "SQL_DATA_ACCESS", "SQL_PATH", "SECURITY_TYPE",
+                 "CREATED", "LAST_ALTERED", "SQL_MODE", "ROUTINE_COMMENT", "DEFINER", "CHARACTER_SET_CLIENT",
+                 "COLLATION_CONNECTION", "DATABASE_COLLATION"),
+    "PARAMETERS": ("SPECIFIC_CATALOG", "SPECIFIC_SCHEMA", "SPECIFIC_NAME", "ORDINAL_POSITION", "PARAMETER_MODE",
+                   "PARAMETER_NAME", "DATA_TYPE", "CHARACTER_MAXIMUM_LENGTH", "CHARACTER_OCTET_LENGTH",
+                   "NUMERIC_PRECISION", "NUMERIC_SCALE", "DATETIME_PRECISION", "CHARACTER_SET_NAME",
+                   "COLLATION_NAME", "DTD_IDENTIFIER", "ROUTINE_TYPE"),
+    "PROCESSLIST": ("ID", "USER", "HOST", "DB", "COMMAND", "TIME", "STATE", "INFO"),
+}
+
+
+# Stored procedure bodies: plain statements, IN/OUT/INOUT parameters and SELECT ... INTO.
+
+_CONTROL_FLOW = {"DECLARE", "IF", "WHILE", "LOOP", "REPEAT", "CASE", "LEAVE", "ITERATE", "OPEN", "FETCH",
+                 "CLOSE", "SIGNAL", "RESIGNAL", "RETURN", "GET", "HANDLER", "BEGIN"}
+_LOCAL_NAME = r"(?:`(?:[^`]|``)+`|\x00\d+\x00|[\w$]+)"
+_SELECT_INTO_RE = re.compile(
+    rf"\bINTO\s+(@?{_LOCAL_NAME}(?:\s*,\s*@?{_LOCAL_NAME})*)"
+    r"(?=\s+FROM\b|\s*$|\s+(?:WHERE|LIMIT|FOR|ORDER|GROUP)\b)", re.I)
+_LOCAL_RE = re.compile(r"(?<![\w$.@`\x00:])[A-Za-z_][\w$]*(?![\w$`(]|\s*\.)")
+
+
+def _bind_locals(masked, local):
+    """Replace procedure variables in a statement with ? placeholders; returns (text, values)."""
+    args = []
+
+    def replace(m):
+        name = m.group().lower()
+        if name not in local:
+            return m.group()
+        args.append(local[name])
+        return "?"
+    return _LOCAL_RE.sub(replace, masked), args
+
+
+# EXPLAIN output
+
+def _plan_tree(plan, actual=None):
+    """EXPLAIN FORMAT=TREE text; `actual` is (ms, rows) for EXPLAIN ANALYZE."""
+    steps = plan["tables"]
+    if not steps:
+        return "-> Rows fetched before execution  (cost=0..0 rows=1)"
+
+    def timing(rows):
+        if actual is None:
+            return ""
+        return f" (actual time={actual[0] / 2:.3g}..{actual[0]:.3g} rows={rows} loops=1)"
+
+    def line(depth, text, cost, rows, actual_rows=None):
+        return (" " * 4 * depth + f"-> {text}  (cost={cost:.3g} rows={rows:.3g})"
+                + timing(rows if actual_rows is None else actual_rows))
+
+    lines = []
+    depth = 0
+    last = steps[-1]
+    if plan["where"] and not any(s["access_type"] in ("const", "eq_ref", "ref") for s in steps):
+        lines.append(line(depth, f"Filter: ({plan['where']})", plan["cost"], last["produced"],
+                          actual[1] if actual else None))
+        depth += 1
+    if len(steps) > 1:
+        lines.append(line(depth, "Nested loop inner join", plan["cost"], last["produced"],
+                          actual[1] if actual and not lines else None))
+        depth += 1
+    for step in steps:
+        table, key, condition = step["table"], step["key"] or "PRIMARY", step["condition"]
+        kind = step["access_type"]
+        if kind == "ALL":
+            text = f"Table scan on {table}"
+        elif kind == "index":
+            text = f"Index scan on {table} using {key}"
+        elif kind == "fulltext":
+            text = f"Full-text index search on {table} using {key}"
+        elif kind in ("const", "eq_ref"):
+            text = f"Single-row index lookup on {table} using {key} ({condition})"
+        elif kind == "ref":
+            text = f"Index lookup on {table} using {key} ({condition})"
+        else:
+            text = f"Index range scan on {table} using {key} over ({condition})"
+        lines.append(line(depth, text, step["read_cost"], step["rows"],
+                          actual[1] if actual and not lines else None))
+    return "\n".join(lines)
+
+
+def _plan_json(plan):
+    """EXPLAIN FORMAT=JSON document (as a dict)."""
+    block = {"select_id": 1, "cost_info": {"query_cost": f"{plan['cost']:.2f}"}}
+    entries = []
+    for step in plan["tables"]:
+        table = {"table_name": step["table"], "access_type": step["access_type"]}
+        if step["possible_keys"]:
+            table["possible_keys"] = step["possible_keys"]
+        if step["key"]:
+            table.update(key=step["key"], used_key_parts=step["used_key_parts"], key_length=step["key_length"])
+        if step["ref"]:
+            table["ref"] = [step["ref"]]
+        table.update(rows_examined_per_scan=step["rows"], rows_produced_per_join=int(step["produced"]),
+                     filtered=f"{step['filtered']:.2f}",
+                     cost_info={"read_cost": f"{step['read_cost']:.2f}",
+                                "eval_cost": f"{step['produced'] * 0.1:.2f}",
+                                "prefix_cost": f"{step['prefix_cost']:.2f}"},
+                     used_columns=step["columns"])
+        if plan["where"] and step["access_type"] in ("ALL", "index", "range"):
+            table["attached_condition"] = plan["where"]
+        entries.append({"table": table})
+    if not entries:
+        block["message"] = "No tables used"
+    elif len(entries) == 1:
+        block.update(entries[0])
+    else:
+        block["nested_loop"] = entries
+    return {"query_block": block}
+
+
+# Cursor helpers
+
+def _description(columns, rows, types=None):
+    """
+    cursor.description, typed from each column's declared type in `types`
+    (SQLite decltypes; "" for expressions) or else from its first non-NULL value.
+    """
+    description = []
+    for i, name in enumerate(columns):
+        declared = _declared_field_type(types[i]) if types else None
+        if declared is not None:
+            type_code, charset, flags = declared
+        else:
+            value = next((row[i] for row in rows if row[i] is not None), None)
+            type_code, charset = _field_type(value) if value is not None else (FieldType.VAR_STRING, 255)
+            flags = FieldFlag.BINARY if charset == 63 else 0
+        description.append((name, type_code, None, None, None, None, 1, flags, charset))
+    return description
+
+
+def _prepared_sql(operation):
+    """A prepared cursor's ? placeholders as %s."""
+    masked, literals = _mask(operation)
+    return _unmask(masked.replace("?", "%s"), literals, mysql=True)
+
+
+def _statement_text(operation, params):
+    """cursor.statement: the operation with its parameters interpolated, as the driver shows it."""
+    if isinstance(params, dict):
+        return _PARAM_RE.sub(lambda m: _literal_sql(params[m.group(1)])
+                             if m.group(1) in params else m.group(), operation)
+    if isinstance(params, (list, tuple)) and params:
+        values = iter(params)
+        return _PARAM_RE.sub(lambda m: _literal_sql(next(values, None)) if m.group(1) is None else m.group(),
+                             operation)
+    return operation
+
+
+class SQLiteConnection:
+    """
+    A mysql.connector-compatible connection to the stand-in server.
+
+    database           -- database to USE (it must exist)
+    autocommit         -- commit after every statement, as the connector option does
+    allow_local_infile -- permit LOAD DATA LOCAL INFILE
+    consume_results    -- read pending rows instead of raising "Unread result found"
+    latency            -- simulated round trip in ms (default: MYSQL_SQLITE_LATENCY)
+    server             -- StandInServer to connect to (default: get_server())
+
+    The remaining mysql.connector.connect() options (host, port, user,
+    password, use_pure, ...) are accepted and ignored.
+    """
+
+    def __init__(self, database=None, autocommit=False, allow_local_infile=False,
+                 consume_results=False, latency=None, server=None, **config):
+        if latency is None:
+            latency = float(os.getenv("MYSQL_SQLITE_LATENCY") or 0)
+        self._server = server or get_server()
+        self._latency = latency / 1000.0
+        self._config = config
+        self._initial = (database, bool(autocommit))
+        self.allow_local_infile = allow_local_infile
+        self.can_consume_results = consume_results
+        self.get_warnings = False
+        self.raise_on_warnings = False
+        self._connect(database, autocommit)
+
+    def _connect(self, database, autocommit):
+        self._db = None
+        self._database = None
+        self._generation = None
+        self._attached = {}             # schema -> generation
+        self._catalogs = {}             # schema -> (generation, sqlite3 connection)
+        self._autocommit = bool(autocommit)
+        self._session = {}              # session values of system variables
+        self._user_variables = {}
+        self._warnings = []
+        self._last_insert_id = 0
+        self._row_count = -1
+        self._found_rows = 0
+        self._unread_cursor = None
+        self._plans = {}
+        self._translations = {}
+        self._declared = {}
+        self._autoincrement = {}
+        self._describe_cache = {}
+        self._ddl_version = self._server.ddl_version
+        self._killed = False
+        self._closed = False
+        self.connection_id = self._server.open_session(self)
+        try:
+            self._open(database)
+        except BaseException:
+            self._server.close_session(self.connection_id)
+            self._closed = True
+            raise
+        self._round_trip(3)
+
+    def __repr__(self):
+        state = "closed" if self._closed else f"database={self._database!r}"
+        return f"SQLiteConnection(id={self.connection_id}, {state})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Session plumbing
+
+    def _open(self, database):
+        entry = None
+        if database:
+            entry = self._server.database(database)
+            if entry is None:
+                raise _error(errorcode.ER_BAD_DB_ERROR, f"Unknown database '{database}'", "42000")
+        db = sqlite3.connect(entry[0] if entry else ":memory:", uri=True, isolation_level=None,
+                             check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES,
+                             timeout=0, cached_statements=512)
+        for name, nargs, func, deterministic in _FUNCTIONS:
+            db.create_function(name, nargs, func, deterministic=deterministic)
+        for name, nargs, func in self._session_functions():
+            db.create_function(name, nargs, func)
+        db.execute(f"PRAGMA foreign_keys = {'ON' if self._variable('foreign_key_checks') else 'OFF'}")
+        if self._server.path:
+            db.execute("PRAGMA journal_mode = WAL")
+        else:
+            db.execute("PRAGMA read_uncommitted = ON")
+        db.execute("ATTACH DATABASE ':memory:' AS information_schema")
+        old, self._db = self._db, db
+        self._database = database or None
+        self._generation = entry[1] if entry else None
+        self._attached = {}
+        if old is not None:
+            old.close()
+
+    def _session_functions(self):
+        server = self._server
+
+        def last_insert_id(*value):
+            if value:
+                self._last_insert_id = value[0]
+                return value[0]
+            return self._last_insert_id
+
+        def get_lock(name, timeout):
+            if name is None:
+                return None
+            return server.get_lock(str(name), None if timeout is None else float(timeout),
+                                   self.connection_id)
+
+        return [
+            ("DATABASE", 0, lambda: self._database),
+            ("SCHEMA", 0, lambda: self._database),
+            ("CONNECTION_ID", 0, lambda: self.connection_id),
+            ("VERSION", 0, lambda: SERVER_VERSION),
+            ("USER", 0, lambda: self.user + "@localhost"),
+            ("CURRENT_USER", 0, lambda: self.user + "@localhost"),
+            ("SESSION_USER", 0, lambda: self.user + "@localhost"),
+            ("LAST_INSERT_ID", -1, last_insert_id),
+            ("ROW_COUNT", 0, lambda: self._row_count),
+            ("FOUND_ROWS", 0, lambda: self._found_rows),
+            ("GET_LOCK", 2, get_lock),
+            ("RELEASE_LOCK", 1, lambda name: server.release_lock(str(name), self.connection_id)),
+            ("RELEASE_ALL_LOCKS", 0, lambda: server.release_all_locks(self.connection_id)),
+            ("IS_FREE_LOCK", 1, lambda name: int(server.lock_holder(str(name)) is None)),
+            ("IS_USED_LOCK", 1, lambda name: server.lock_holder(str(name))),
+        ]
+
+    def _round_trip(self, count=1):
+        if self._latency:
+            time.sleep(self._latency * count)
+
+    def _check_open(self):
+        if self._closed:
+            raise OperationalError(msg="MySQL Connection not available", errno=2055)
+        if self._killed:
+            self._close_session()
+            raise _error(errorcode.CR_SERVER_LOST, "Lost connection to MySQL server during query")
+
+    def _sync(self):
+        # Another session may have dropped (or dropped and re-created) the current database.
+        if self._database is not None:
+            entry = self._server.database(self._database)
+            if entry is None or entry[1] != self._generation:
+                self._open(self._database if entry else None)
+
+    def _variable(self, name, scope=None):
+        name = name.lower()
+        if scope is None or scope.lower() != "global":
+            if name == "autocommit":
+                return int(getattr(self, "_autocommit", True))
+            if name in ("last_insert_id", "identity"):
+                return self._last_insert_id
+            if name == "warning_count":
+                return len(self._warnings)
+            if name == "error_count":
+                return 0
+            if name == "pseudo_thread_id":
+                return self.connection_id
+            session = getattr(self, "_session", {})
+            if name in session:
+                return session[name]
+        if name in self._server.variables:
+            return self._server.variables[name]
+        if name in ("last_insert_id", "identity", "warning_count", "error_count"):
+            return 0
+        raise _error(errorcode.ER_UNKNOWN_SYSTEM_VARIABLE, f"Unknown system variable '{name}'")
+
+    def _sqlite(self, sql, params=()):
+        """Run one SQLite statement, waiting out other writers' locks like InnoDB does."""
+        started = None
+        try:
+            while True:
+                try:
+                    return self._db.execute(sql, params)
+                except sqlite3.OperationalError as err:
+                    if not _is_lock_error(err):
+                        raise
+                now = time.monotonic()
+                if started is None:
+                    started = now
+                    self._server.count("Innodb_row_lock_waits")
+                    self._server.count("Innodb_row_lock_current_waits")
+                if now - started >= float(self._variable("innodb_lock_wait_timeout")):
+                    raise _error(errorcode.ER_LOCK_WAIT_TIMEOUT,
+                                 "Lock wait timeout exceeded; try restarting transaction")
+                time.sleep(min(0.01, 0.0005 + (now - started) / 20))
+        finally:
+            if started is not None:
+                self._server.count("Innodb_row_lock_current_waits", -1)
+                self._server.count("Innodb_row_lock_time", int((time.monotonic() - started) * 1000))
+
+    # Transactions
+
+    def _begin_implicit(self):
+        if not self._autocommit and not self._db.in_transaction:
+            self._begin()
+
+    def _begin(self):
+        self._sqlite("BEGIN")
+        self._server.count("Com_begin")
+
+    def _commit(self):
+        if self._db.in_transaction:
+            self._sqlite("COMMIT")
+            self._server.count("Com_commit")
+
+    def _rollback(self):
+        if self._db.in_transaction:
+            self._db.execute("ROLLBACK")
+            self._server.count("Com_rollback")
+
+    # Schemas
+
+    def _attach(self, name):
+        entry = self._server.database(name)
+        if entry is None:
+            raise _error(errorcode.ER_BAD_DB_ERROR, f"Unknown database '{name}'", "42000")
+        generation = self._attached.get(name)
+        if generation == entry[1]:
+            return
+        if self._db.in_transaction:
+            raise _unsupported(f"first use of database {name} inside a transaction")
+        if generation is not None:
+            self._db.execute(f"DETACH DATABASE {_quote(name)}")
+        self._db.execute(f"ATTACH DATABASE ? AS {_quote(name)}", (entry[0],))
+        self._attached[name] = entry[1]
+
+    def _schema(self, schema):
+        """Validate a (possibly None) schema name and return it, defaulting to the current database."""
+        if schema is None:
+            if self._database is None:
+                raise _error(errorcode.ER_NO_DB_ERROR, "No database selected", "3D000")
+            return self._database
+        if schema.lower() == "information_schema":
+            return "information_schema"
+        if self._server.database(schema) is None:
+            raise _error(errorcode.ER_BAD_DB_ERROR, f"Unknown database '{schema}'", "42000")
+        return schema
+
+    def _alias(self, schema):
+        """The SQLite schema name under which `schema` (None: current) is reachable."""
+        schema = self._schema(schema)
+        if schema == self._database:
+            return "main"
+        if schema == "information_schema":
+            return schema
+        self._attach(schema)
+        return _quote(schema)
+
+    def _catalog(self, schema):
+        """(sqlite3 connection, schema alias) for reading `schema`'s catalog."""
+        if schema == self._database:
+            return self._db, "main"
+        entry = self._server.database(schema)
+        if entry is None:
+            raise _error(errorcode.ER_BAD_DB_ERROR, f"Unknown database '{schema}'", "42000")
+        if schema in self._attached and self._attached[schema] == entry[1]:
+            return self._db, _quote(schema)
+        cached = self._catalogs.get(schema)
+        if cached is None or cached[0] != entry[1]:
+            db = sqlite3.connect(entry[0], uri=True, isolation_level=None,
+                                 check_same_thread=False, timeout=0)
+            if not self._server.path:
+                db.execute("PRAGMA read_uncommitted = ON")
+            cached = self._catalogs[schema] = (entry[1], db)
+        return cached[1], "main"
+
+    # Statement execution
+
+    def _execute(self, operation, params=None, executemany=False):
+        """Run `operation` (one or more statements) and return their _Results."""
+        self._check_open()
+        self.handle_unread_result()
+        if isinstance(operation, (bytes, bytearray)):
+            operation = operation.decode("utf-8")
+        self._round_trip()
+        self._sync()
+        if self._ddl_version != self._server.ddl_version:
+            self._forget_schema()
+        plan = self._plans.get(operation)
+        if plan is None:
+            masked, literals = _mask(operation)
+            parts = _split_statements(masked)
+            if not parts:
+                raise _error(errorcode.ER_EMPTY_QUERY, "Query was empty", "42000")
+            plan = (parts, literals)
+            if len(self._plans) > 1024:
+                self._plans.clear()
+            self._plans[operation] = plan
+        parts, literals = plan
+        results = []
+        for part, args in self._bind(parts, params):
+            results.extend(self._statement(part, literals, args))
+        return results
+
+    @staticmethod
+    def _bind(parts, params):
+        """Pair each statement with its parameters, turning %s / %(name)s into ? / :name."""
+        if not params:
+            return [(part, ()) for part in parts]
+        if isinstance(params, dict):
+            bound = []
+            for part in parts:
+                names = set(re.findall(r"%\((\w+)\)s", part))
+                missing = names - set(params)
+                if missing:
+                    raise ProgrammingError(
+                        f"Failed processing pyformat-parameters; Missing parameter {sorted(missing)[0]}")
+                bound.append((re.sub(r"%\((\w+)\)s", r":\1", part),
+                              {name: params[name] for name in names}))
+            return bound
+        if not isinstance(params, (list, tuple)):
+            raise ProgrammingError(
+                f"Could not process parameters: {type(params).__name__}({params}),"
+                " it must be of type list, tuple or dict")
+        values, position, bound = list(params), 0, []
+        for part in parts:
+            count = part.count("%s")
+            if position + count > len(values):
+                raise ProgrammingError("Not enough parameters for the SQL statement")
+            bound.append((part.replace("%s", "?"), values[position:position + count]))
+            position += count
+        if position != len(values):
+            raise ProgrammingError("Not all parameters were used in the SQL statement")
+        return bound
+
+    def _statement(self, masked, literals, args):
+        m = _VERB_RE.match(masked)
+        verb = m.group(1).upper() if m else ""
+        handler = _HANDLERS.get(verb)
+        if handler is None:
+            if verb in ("PREPARE", "EXECUTE", "DEALLOCATE", "XA", "HANDLER", "INSTALL", "IMPORT"):
+                raise _unsupported(verb)
+            raise _syntax_error(_unmask(masked, literals, mysql=True).strip())
+        self._server.count("Questions")
+        self._server.count("Threads_running")
+        if verb != "SHOW":
+            self._warnings = []
+        if verb in _DDL_VERBS:
+            self._commit()      # DDL commits the open transaction first, as in MySQL
+        try:
+            result = getattr(self, handler)(masked, list(literals), args, verb)
+        except sqlite3.Error as err:
+            raise self._mysql_error(err, verb, masked, literals) from None
+        finally:
+            self._server.count("Threads_running", -1)
+            if verb in _DDL_VERBS:
+                self._server.ddl_version += 1
+                self._forget_schema()
+        return result if isinstance(result, list) else [result]
+
+    def _forget_schema(self):
+        self._ddl_version = self._server.ddl_version
+        self._translations.clear()
+        self._declared.clear()
+        self._describe_cache.clear()
+        self._autoincrement.clear()
+
+    def _mysql_error(self, err, verb="", masked="", literals=()):
+        """The mysql.connector exception for a SQLite error."""
+        message = str(err)
+        if isinstance(err, sqlite3.IntegrityError):
+            if "NOT NULL constraint failed" in message:
+                column = message.rsplit(".", 1)[-1]
+                return _error(errorcode.ER_BAD_NULL_ERROR, f"Column '{column}' cannot be null", "23000")
+            if "UNIQUE constraint failed" in message:
+                return _error(errorcode.ER_DUP_ENTRY,
+                              f"Duplicate entry for key '{self._unique_key_name(message)}'", "23000")
+            if "CHECK constraint failed" in message:
+                name = message.split(": ", 1)[-1]
+                if name.startswith("_standin_enum_"):
+                    return _error(errorcode.WARN_DATA_TRUNCATED,
+                                  f"Data truncated for column '{name[len('_standin_enum_'):]}' at row 1",
+                                  "01000")
+                return _error(errorcode.ER_CHECK_CONSTRAINT_VIOLATED,
+                              f"Check constraint '{name}' is violated.")
+            if "FOREIGN KEY constraint failed" in message:
+                if verb in ("DELETE", "DROP", "TRUNCATE") or (
+                        verb == "UPDATE" and not self._writes_child_key(masked)):
+                    return _error(errorcode.ER_ROW_IS_REFERENCED_2,
+                                  "Cannot delete or update a parent row: a foreign key constraint fails",
+                                  "23000")
+                return _error(errorcode.ER_NO_REFERENCED_ROW_2,
+                              "Cannot add or update a child row: a foreign key constraint fails", "23000")
+            return _error(errorcode.ER_UNKNOWN_ERROR, message)
+        if isinstance(err, sqlite3.OperationalError):
+            if _is_lock_error(err):
+                return _error(errorcode.ER_LOCK_WAIT_TIMEOUT,
+                              "Lock wait timeout exceeded; try restarting transaction")
+            m = re.match(r"no such table: (.*)", message)
+            if m:
+                name = m.group(1)
+                if "." not in name:
+                    if self._database is None:
+                        return _error(errorcode.ER_NO_DB_ERROR, "No database selected", "3D000")
+                    name = f"{self._database}.{name}"
+                return _error(errorcode.ER_NO_SUCH_TABLE, f"Table '{name}' doesn't exist", "42S02")
+            m = re.match(r"no such column: (.*)", message)
+            if m:
+                clause = "field list" if verb in ("SELECT", "INSERT", "REPLACE") else "where clause"
+                return _error(errorcode.ER_BAD_FIELD_ERROR,
+                              f"Unknown column '{m.group(1)}' in '{clause}'", "42S22")
+            m = re.match(r"(?:table|view) [`\"]?(.*?)[`\"]? already exists", message)
+            if m:
+                return _error(errorcode.ER_TABLE_EXISTS_ERROR,
+                              f"Table '{m.group(1)}' already exists", "42S01")
+            m = re.match(r"index [`\"]?(.*?)[`\"]? already exists", message)
+            if m:
+                return _error(errorcode.ER_DUP_KEYNAME,
+                              f"Duplicate key name '{m.group(1).split(':')[-1]}'", "42000")
+            m = re.match(r"duplicate column name: (.*)", message)
+            if m:
+                return _error(errorcode.ER_DUP_FIELDNAME,
+                              f"Duplicate column name '{m.group(1)}'", "42S21")
+            m = re.match(r"ambiguous column name: (.*)", message)
+            if m:
+                return _error(errorcode.ER_NON_UNIQ_ERROR,
+                              f"Column '{m.group(1)}' in field list is ambiguous", "23000")
+            m = re.match(r"no such function: (.*)", message)
+            if m:
+                return _error(errorcode.ER_SP_DOES_NOT_EXIST,
+                              f"FUNCTION {self._database}.{m.group(1)} does not exist", "42000")
+            m = re.match(r"no such savepoint: (.*)", message)
+            if m:
+                return _error(errorcode.ER_SP_DOES_NOT_EXIST,
+                              f"SAVEPOINT {m.group(1)} does not exist", "42000")
+            if "interrupted" in message:
+                if self._killed:
+                    # KILL CONNECTION: the client sees the socket close mid-statement.
+                    self._close_session()
+                    return _error(errorcode.CR_SERVER_LOST, "Lost connection to MySQL server during query")
+                return _error(errorcode.ER_QUERY_INTERRUPTED, "Query execution was interrupted", "70100")
+            if "too many SQL variables" in message:
+                return _error(errorcode.ER_PS_MANY_PARAM,
+                              "Prepared statement contains too many placeholders")
+            if "misuse of aggregate" in message:
+                return _error(errorcode.ER_INVALID_GROUP_FUNC_USE, "Invalid use of group function")
+            m = re.match(r'near "(.*?)": syntax error', message)
+            if m or "syntax error" in message or "incomplete input" in message or "unrecognized token" in message:
+                near = m.group(1) if m else _unmask(masked, literals, mysql=True)
+                return _syntax_error(near)
+        if isinstance(err, sqlite3.DataError) or "too big" in message:
+            return _error(errorcode.ER_NET_PACKET_TOO_LARGE,
+                          "Got a packet bigger than 'max_allowed_packet' bytes", "08S01")
+        if isinstance(err, sqlite3.ProgrammingError):
+            return ProgrammingError(msg=message)
+        return _error(errorcode.ER_UNKNOWN_ERROR, message)
+
+    def _unique_key_name(self, message):
+        # "UNIQUE constraint failed: employees.email" or "...: t.a, t.b" or "index 'x'".
+        detail = message.split(": ", 1)[-1]
+        m = re.match(r"index '(.*)'", detail)
+        if m:
+            return _index_name(m.group(1))
+        columns = [c.strip() for c in detail.split(",")]
+        table = columns[0].split(".")[0]
+        names = [c.split(".", 1)[-1].lower() for c in columns]
+        try:
+            info = self._describe(self._database, table) if self._database else None
+        except Exception:
+            info = None
+        if info:
+            for index in info["indexes"]:
+                if [c.lower() for c, _ in index["columns"]] == names and index["unique"]:
+                    return f"{table}.{index['name']}"
+        return f"{table}.{names[0] if len(names) == 1 else 'PRIMARY'}"
+
+    @staticmethod
+    def _writes_child_key(masked):
+        return bool(re.search(r"\bSET\b", masked, re.I))
+
+    # Translation
+
+    def _translate(self, masked, literals, schema=None):
+        """
+        MySQL statement (masked) -> SQLite SQL text. `schema` is set for text
+        stored inside that schema (views, triggers): its own qualifiers are
+        dropped, since SQLite resolves those names locally.
+        """
+        if "@" in masked:
+            masked = self._substitute_variables(masked, literals)
+        key = (masked, self._database, schema)
+        cached = self._translations.get(key)
+        if cached is None:
+            cached = self._translations[key] = self._rewrite(masked, literals, schema)
+            if len(self._translations) > 1024:
+                self._translations.clear()
+        text, attach, info = cached
+        if len(self._attached) > len(attach) and not self._db.in_transaction:
+            # SQLite falls back to attached schemas for unqualified names: keep only those in use.
+            for name in [n for n in self._attached if n not in attach]:
+                try:
+                    self._db.execute(f"DETACH DATABASE {_quote(name)}")
+                    del self._attached[name]
+                except sqlite3.OperationalError:
+                    pass
+        for name in attach:
+            self._attach(name)
+        for name in info:
+            self._build_information_schema(name)
+        return _unmask(text, literals)
+
+    def _rewrite(self, text, literals, schema=None):
+        attach, info = set(), set()
+        if "." in text:
+            for name in _INFO_TABLE_RE.findall(text):
+                info.add(name.upper())
+
+            def qualifier(m):
+                name = _ident(m.group(1))
+                if name.lower() == "information_schema":
+                    return "information_schema."
+                if schema is not None and name == schema:
+                    return ""
+                if name == self._database and schema is None:
+                    return "main."
+                if self._server.database(name) is not None:
+                    attach.add(name)
+                    return f"{_quote(name)}."
+                return m.group(0)
+            text = _QUALIFIER_RE.sub(qualifier, text)
+        upper = text.upper()
+        if "MATCH" in upper:
+            text = self._rewrite_match(text)
+        for regex, replacement in _REWRITES:
+            text = regex.sub(replacement, text)
+        if "GROUP_CONCAT" in upper:
+            text = self._rewrite_calls(text, r"\bGROUP_CONCAT\s*\(", _group_concat)
+        if "CAST" in upper or "CONVERT" in upper:
+            text = self._rewrite_calls(text, r"\bCAST\s*\(", _cast)
+            text = self._rewrite_calls(text, r"\bCONVERT\s*\(", _convert)
+        if "INTERVAL" in upper:
+            text = self._rewrite_calls(text, _DATE_ADD_RE.pattern, _date_add)
+            text = _INTERVAL_RE.sub(_interval, text)
+        if "ON CONFLICT DO UPDATE SET" in text:
+            text = _upsert(text)
+        if "LIKE" in upper:
+            text = re.sub(r"\bLIKE\s+(\?|:\w+|\x00\d+\x00)(?!\s*ESCAPE)", r"LIKE \1 ESCAPE '\\'",
+                          text, flags=re.I)
+        return text, frozenset(attach), frozenset(info)
+
+    @staticmethod
+    def _rewrite_calls(text, pattern, func):
+        """Replace every call NAME(args) matched by `pattern` with func(m, inner)."""
+        out, pos = [], 0
+        regex = re.compile(pattern, re.I)
+        while True:
+            m = regex.search(text, pos)
+            if not m:
+                out.append(text[pos:])
+                return "".join(out)
+            end = _close_paren(text, m.end() - 1)
+            out.append(text[pos:m.start()])
+            out.append(func(m, text[m.end():end]))
+            pos = end + 1
+
+    def _rewrite_match(self, text):
+        tables = [_qualified(ref) for ref in _TABLE_REF_RE.findall(text)]
+
+        def replace(m):
+            columns = [_ident(c.split(".")[-1]) for c in m.group(1).split(",")]
+            if not any(self._fulltext_index(schema, table, columns) for schema, table in tables):
+                raise _error(errorcode.ER_FT_MATCHING_KEY_NOT_FOUND,
+                             "Can't find FULLTEXT index matching the column list")
+            mode = "boolean" if "BOOLEAN" in (m.group(3) or "").upper() else "natural"
+            return f"_standin_match({m.group(2)}, '{mode}', {m.group(1)})"
+        return _MATCH_RE.sub(replace, text)
+
+    def _fulltext_index(self, schema, table, columns):
+        try:
+            info = self._describe(self._schema(schema), table)
+        except Exception:
+            return None
+        wanted = sorted(c.lower() for c in columns)
+        for index in info["indexes"] if info else ():
+            if index["type"] == "FULLTEXT" and sorted(c.lower() for c, _ in index["columns"]) == wanted:
+                return index["name"]
+        return None
+
+    def _substitute_variables(self, masked, literals):
+        def system(m):
+            return _sql_value(self._variable(m.group(2), m.group(1)), literals)
+
+        def user(m):
+            name = m.group(1)
+            token = _TOKEN_RE.fullmatch(name)
+            name = literals[int(token.group(1))] if token else _ident(name)
+            return _sql_value(self._user_variables.get(name.lower()), literals)
+        masked = _SYSVAR_RE.sub(system, masked)
+        return _USERVAR_RE.sub(user, masked)
+
+    def _evaluate(self, masked_expr, literals, args=()):
+        """Value of one MySQL expression."""
+        sql = self._translate("SELECT " + masked_expr, literals)
+        row = self._sqlite(sql, args).fetchone()
+        return row[0] if row else None
+
+    # DML and session statements
+
+    def _select(self, masked, literals, args, verb):
+        if verb == "TABLE":
+            masked = re.sub(r"^\s*TABLE\b", "SELECT * FROM", masked, flags=re.I)
+        sql = self._translate(masked, literals)
+        types = self._column_types(sql)
+        if _LOCKING_READ_RE.search(masked):
+            self._begin_implicit()
+        cursor = self._sqlite(sql, args)
+        self._server.count("Com_select")
+        columns = [d[0] for d in cursor.description]
+        return _Result(columns, cursor, types=types if len(types) == len(columns) else None)
+
+    def _column_types(self, sql):
+        """
+        The declared type of each result column of a SELECT ("" for
+        expressions), from a temporary view over it; cached per statement.
+        """
+        types = self._declared.get(sql)
+        if types is None:
+            masked, literals = _mask(sql, sqlite=True)
+            view = _unmask(_SQLITE_PARAM_RE.sub("NULL", masked), literals)
+            try:
+                self._db.execute(f"CREATE TEMP VIEW _standin_columns AS {view}")
+                try:
+                    types = [row[2] for row in self._db.execute("PRAGMA temp.table_info(_standin_columns)")]
+                finally:
+                    self._db.execute("DROP VIEW temp._standin_columns")
+            except sqlite3.Error:
+                types = []
+            if len(self._declared) > 1024:
+                self._declared.clear()
+            self._declared[sql] = types
+        return types
+
+    def _modify(self, masked, literals, args, verb):
+        m = _LIMITED_DML_RE.match(masked)
+        if m:
+            # SQLite's UPDATE/DELETE ... LIMIT is a compile-time option: go through rowid.
+            head, table, where, order, limit = m.group(1, 2, 3, 4, 5)
+            masked = (f"{head} WHERE rowid IN (SELECT rowid FROM {table}{where or ''}"
+                      f"{order or ''} LIMIT {limit})")
+        sql = self._translate(masked, literals)
+        self._begin_implicit()
+        cursor = self._sqlite(sql, args)
+        return self._modified(masked, verb, cursor.rowcount, cursor.lastrowid)
+
+    def _modified(self, masked, verb, rowcount, lastrowid):
+        self._server.count("Com_" + verb.lower())
+        self._server.count(_ROWS_COUNTER[verb], max(rowcount, 0))
+        self._row_count = rowcount
+        if verb not in ("INSERT", "REPLACE") or rowcount <= 0 or not self._autoincrement_table(masked):
+            return _Result(rowcount=rowcount, lastrowid=0)
+        # MySQL reports the first id of a multi-row INSERT; SQLite the last.
+        lastrowid -= rowcount - 1
+        self._last_insert_id = lastrowid
+        return _Result(rowcount=rowcount, lastrowid=lastrowid)
+
+    def _autoincrement_table(self, masked):
+        m = _INSERT_TABLE_RE.match(masked)
+        if not m:
+            return False
+        schema, table = _qualified(m.group(1))
+        key = (schema, table.lower())
+        if key not in self._autoincrement:
+            db, alias = self._catalog(self._schema(schema))
+            row = db.execute(f"SELECT sql FROM {alias}.sqlite_master WHERE type = 'table' "
+                             "AND name = ? COLLATE NOCASE", (table,)).fetchone()
+            self._autoincrement[key] = bool(row and "AUTOINCREMENT" in row[0].upper())
+        return self._autoincrement[key]
+
+    def _executemany(self, operation, seq_params):
+        """
+        executemany(): one SQLite executemany() for a single INSERT/REPLACE ...
+        VALUES (the connector's multi-row INSERT), statement by statement otherwise.
+        """
+        self._check_open()
+        self.handle_unread_result()
+        self._sync()
+        masked, literals = _mask(operation)
+        parts = _split_statements(masked)
+        m = _VERB_RE.match(parts[0]) if len(parts) == 1 else None
+        if not (m and m.group(1).upper() in ("INSERT", "REPLACE") and _VALUES_RE.search(parts[0])):
+            results = []
+            for params in seq_params:
+                results.extend(self._execute(operation, params))
+            return results
+        seq_params = list(seq_params)
+        if not seq_params:
+            return []
+        verb = m.group(1).upper()
+        self._round_trip()
+        bound = [self._bind(parts, params)[0] for params in seq_params]
+        sql = self._translate(bound[0][0], list(literals))
+        self._server.count("Questions")
+        self._warnings = []
+        self._begin_implicit()
+        savepoint = "_standin_many"
+        try:
+            self._sqlite(f"SAVEPOINT {savepoint}")
+            try:
+                cursor = self._db.executemany(sql, [args for _, args in bound])
+                lastrowid = self._db.execute("SELECT last_insert_rowid()").fetchone()[0]
+            except BaseException:
+                self._db.execute(f"ROLLBACK TO {savepoint}")
+                raise
+            finally:
+                self._db.execute(f"RELEASE {savepoint}")
+        except sqlite3.Error as err:
+            raise self._mysql_error(err, verb, bound[0][0], literals) from None
+        return [self._modified(bound[0][0], verb, cursor.rowcount, lastrowid)]
+
+    def _transaction(self, masked, literals, args, verb):
+        words = masked.split()
+        if verb in ("START", "BEGIN"):
+            self._commit()
+            self._begin()
+        elif verb == "COMMIT":
+            self._commit()
+        elif verb == "ROLLBACK":
+            m = re.match(r"\s*ROLLBACK\s+(?:WORK\s+)?TO\s+(?:SAVEPOINT\s+)?(\S+)", masked, re.I)
+            if m:
+                self._savepoint("ROLLBACK TO", m.group(1))
+            else:
+                self._rollback()
+        elif verb == "SAVEPOINT":
+            if len(words) != 2:
+                raise _syntax_error(masked)
+            if self._db.in_transaction or not self._autocommit:
+                self._begin_implicit()
+                # MySQL replaces a savepoint of the same name; SQLite would nest a second one.
+                try:
+                    self._db.execute(f"RELEASE {_quote(_ident(words[1]))}")
+                except sqlite3.OperationalError:
+                    pass
+                self._savepoint("SAVEPOINT", words[1])
+        else:
+            m = re.match(r"\s*RELEASE\s+SAVEPOINT\s+(\S+)\s*$", masked, re.I)
+            if not m:
+                raise _syntax_error(masked)
+            self._savepoint("RELEASE", m.group(1))
+        return _Result(rowcount=0)
+
+    def _savepoint(self, command, name):
+        name = _ident(name)
+        if not self._db.in_transaction:
+            raise _error(errorcode.ER_SP_DOES_NOT_EXIST, f"SAVEPOINT {name} does not exist", "42000")
+        self._sqlite(f"{command} {_quote(name)}")
+
+    def _set(self, masked, literals, args, verb):
+        body = re.sub(r"^\s*SET\s+", "", masked, flags=re.I)
+        m = re.match(r"(?:(GLOBAL|SESSION|LOCAL)\s+)?TRANSACTION\b(.*)$", body, re.I | re.S)
+        if m:
+            level = re.search(r"ISOLATION\s+LEVEL\s+(READ\s+UNCOMMITTED|READ\s+COMMITTED|"
+                              r"REPEATABLE\s+READ|SERIALIZABLE)", m.group(2), re.I)
+            if level:
+                value = "-".join(level.group(1).upper().split())
+                self._assign_variable("transaction_isolation", value, m.group(1))
+            return _Result(rowcount=0)
+        if re.match(r"(?:NAMES|CHARACTER\s+SET|CHARSET)\b", body, re.I):
+            return _Result(rowcount=0)
+        assignments, expressions = [], []
+        for item in _split_top(body):
+            m = _SET_RE.match(item)
+            if not m:
+                raise _syntax_error(item)
+            scope = m.group(1) or m.group(3)
+            user = m.group(2) == "@"
+            name = m.group(4)
+            token = _TOKEN_RE.fullmatch(name)
+            name = literals[int(token.group(1))] if token else _ident(name)
+            expr = m.group(5).strip()
+            if not user and re.fullmatch(r"[A-Za-z_][\w-]*", expr) and expr.upper() not in (
+                    "NULL", "TRUE", "FALSE") or not expr:
+                value = {"ON": 1, "OFF": 0}.get(expr.upper(), expr)
+                if expr.upper() == "DEFAULT":
+                    value = self._server.variables.get(name.lower())
+                assignments.append((user, scope, name, value, None))
+            else:
+                assignments.append((user, scope, name, None, len(expressions)))
+                expressions.append(expr)
+        values = ()
+        if expressions:
+            sql = self._translate("SELECT " + ", ".join(expressions), literals)
+            values = self._sqlite(sql, args).fetchone()
+        for user, scope, name, value, index in assignments:
+            if index is not None:
+                value = values[index]
+            if user:
+                self._user_variables[name.lower()] = value
+            else:
+                self._assign_variable(name, value, scope)
+        return _Result(rowcount=0)
+
+    def _assign_variable(self, name, value, scope=None):
+        name = name.lower()
+        self._variable(name)        # unknown variables fail like MySQL
+        if name == "autocommit":
+            self.autocommit = bool(int(value))
+            return
+        if name == "foreign_key_checks":
+            value = int(value)
+            self._db.execute(f"PRAGMA foreign_keys = {'ON' if value else 'OFF'}")
+        if scope and scope.upper() == "GLOBAL":
+            self._server.variables[name] = value
+        else:
+            self._session[name] = value
+
+    def _use_statement(self, masked, literals, args, verb):
+        m = re.match(rf"\s*USE\s+({_NAME})\s*$", masked, re.I)
+        if not m:
+            raise _syntax_error(masked)
+        self._use(_ident(m.group(1)))
+        return _Result(rowcount=0)
+
+    def _use(self, database):
+        if database == self._database:
+            return
+        if self._db.in_transaction:
+            raise _unsupported("changing the default database inside a transaction")
+        self._open(database)
+        self._translations.clear()
+        self._declared.clear()
+
+    def _do(self, masked, literals, args, verb):
+        sql = self._translate(re.sub(r"^\s*DO\b", "SELECT", masked, flags=re.I), literals)
+        self._sqlite(sql, args).fetchall()
+        return _Result(rowcount=0)
+
+    def _noop(self, masked, literals, args, verb):
+        return _Result(rowcount=0)
+
+    def _kill(self, masked, literals, args, verb):
+        m = re.match(r"\s*KILL\s+(?:(QUERY|CONNECTION)\s+)?(\d+)\s*$", masked, re.I)
+        if not m:
+            raise _syntax_error(masked)
+        target = self._server.sessions.get(int(m.group(2)))
+        if target is None:
+            raise _error(errorcode.ER_NO_SUCH_THREAD, f"Unknown thread id: {m.group(2)}")
+        if (m.group(1) or "").upper() != "QUERY":
+            target._killed = True
+        target._db.interrupt()
+        if target is self and self._killed:
+            self._close_session()
+            raise _error(errorcode.ER_QUERY_INTERRUPTED, "Query execution was interrupted", "70100")
+        return _Result(rowcount=0)
+
+    def _maintenance(self, masked, literals, args, verb):
+        m = re.match(r"\s*\w+\s+(?:NO_WRITE_TO_BINLOG\s+|LOCAL\s+)?TABLES?\s+(.*?)"
+                     r"(?:\s+(?:QUICK|FAST|MEDIUM|EXTENDED|CHANGED|FOR\s+UPGRADE))*\s*$",
+                     masked, re.I | re.S)
+        if not m:
+            raise _syntax_error(masked)
+        self._commit()
+        operation = verb.lower()
+        rows = []
+        for ref in _split_top(m.group(1)):
+            schema, table = _qualified(ref)
+            schema = self._schema(schema)
+            name = f"{schema}.{table}"
+            if self._table_type(schema, table) is None:
+                rows.append((name, operation, "Error", f"Table '{name}' doesn't exist"))
+                rows.append((name, operation, "status", "Operation failed"))
+                continue
+            if verb in ("ANALYZE", "OPTIMIZE"):
+                self._sqlite(f"ANALYZE {self._alias(schema)}.{_quote(table)}")
+            if verb == "OPTIMIZE":
+                rows.append((name, operation, "note",
+                             "Table does not support optimize, doing recreate + analyze instead"))
+            rows.append((name, operation, "status", "OK"))
+        return _rows_result(("Table", "Op", "Msg_type", "Msg_text"), rows)
+
+    def _load_data(self, masked, literals, args, verb):
+        m = _LOAD_DATA_RE.match(masked)
+        if not m:
+            raise _syntax_error(masked)
+        local, path, duplicates, table, rest = m.groups()
+        if local and not self.allow_local_infile:
+            raise _error(errorcode.CR_LOAD_DATA_LOCAL_INFILE_REJECTED,
+                         "LOAD DATA LOCAL INFILE file request rejected due to restrictions on access.")
+        path = self._operand(path, literals, args)
+        options = _load_options(rest, literals)
+        columns = re.search(r"\(([^()]*)\)\s*(?:SET\b.*)?$", rest, re.S)
+        if re.search(r"\)\s*SET\b", rest, re.I):
+            raise _unsupported("LOAD DATA ... SET")
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as fh:
+                text = fh.read()
+        except OSError:
+            raise _error(errorcode.ER_FILE_NOT_FOUND,
+                         f"Can't get stat of '{path}' (OS errno 2 - No such file or directory)") from None
+        rows = _parse_load_data(text, options)
+        schema, table = _qualified(table)
+        if columns:
+            names = [_ident(c) for c in _split_top(columns.group(1))]
+        else:
+            names = [c["name"] for c in self._describe(self._schema(schema), table)["columns"]]
+        target = f"{self._alias(schema)}.{_quote(table)}"
+        conflict = {"REPLACE": "OR REPLACE ", "IGNORE": "OR IGNORE "}.get((duplicates or "").upper(),
+                                                                           "OR IGNORE " if local else "")
+        sql = (f"INSERT {conflict}INTO {target} ({', '.join(_quote(n) for n in names)}) "
+               f"VALUES ({', '.join('?' * len(names))})")
+        width = len(names)
+        rows = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+        self._begin_implicit()
+        cursor = self._db.executemany(sql, rows)
+        self._server.count("Com_load")
+        self._server.count("Innodb_rows_inserted", cursor.rowcount)
+        skipped = len(rows) - cursor.rowcount
+        if skipped:
+            self._warn(1062, f"{skipped} duplicate rows skipped")
+        return _Result(rowcount=cursor.rowcount, lastrowid=0)
+
+    @staticmethod
+    def _operand(text, literals, args):
+        """The value of a ?, :name or literal-token operand."""
+        token = _TOKEN_RE.fullmatch(text)
+        if token:
+            return literals[int(token.group(1))]
+        if text == "?":
+            return args[0]
+        if text.startswith(":"):
+            return args[text[1:]]
+        return _ident(text)
+
+    def _warn(self, code, message, level="Warning"):
+        self._warnings.append((level, code, message))
+
+    # Catalog
+
+    def _table_type(self, schema, table):
+        """'BASE TABLE', 'VIEW' or None (`schema` already validated)."""
+        if schema == "information_schema":
+            return "SYSTEM VIEW" if table.upper() in _INFORMATION_SCHEMA else None
+        if table.lower().startswith("_standin_"):
+            return None
+        db, alias = self._catalog(schema)
+        row = db.execute(f"SELECT type FROM {alias}.sqlite_master WHERE type IN ('table', 'view') "
+                         "AND name = ? COLLATE NOCASE", (table,)).fetchone()
+        if row is None:
+            return None
+        return "BASE TABLE" if row[0] == "table" else "VIEW"
+
+    def _tables(self, schema):
+        """[(name, 'BASE TABLE' | 'VIEW')] of `schema`, without the stand-in's own tables."""
+        db, alias = self._catalog(schema)
+        rows = db.execute(f"SELECT name, type FROM {alias}.sqlite_master WHERE type IN ('table', 'view') "
+                          "AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' "
+                          "AND name NOT LIKE '\\_standin\\_%' ESCAPE '\\' ORDER BY name").fetchall()
+        return [(name, "BASE TABLE" if kind == "table" else "VIEW") for name, kind in rows]
+
+    def _require_table(self, schema, table, views=True):
+        kind = self._table_type(schema, table)
+        if kind is None or (kind == "VIEW" and not views):
+            raise _error(errorcode.ER_NO_SUCH_TABLE, f"Table '{schema}.{table}' doesn't exist", "42S02")
+        return kind
+
+    def _describe(self, schema, table):
+        """Columns, indexes and constraints of a table or view, as MySQL reports them."""
+        key = (schema, table.lower())
+        info = self._describe_cache.get(key)
+        if info is not None:
+            return info
+        db, alias = self._catalog(schema)
+        row = db.execute(f"SELECT name, type, sql FROM {alias}.sqlite_master "
+                         "WHERE type IN ('table', 'view') AND name = ? COLLATE NOCASE",
+                         (table,)).fetchone()
+        if row is None:
+            return None
+        name, kind, sql = row
+        info = {"name": name, "type": "BASE TABLE" if kind == "table" else "VIEW", "sql": sql,
+                "columns": [], "indexes": [], "primary": [], "checks": [], "fks": [],
+                "autoincrement": None}
+        model = _parse_table_sql(sql) if kind == "table" else None
+        declared = {c["name"].lower(): c for c in model["columns"]} if model else {}
+        for cid, column, decl, notnull, default, pk, hidden in db.execute(
+                f"PRAGMA {alias}.table_xinfo({_quote(name)})"):
+            col = declared.get(column.lower(), {})
+            info["columns"].append(_column_info(column, decl or "", notnull, default, col))
+        if model is None:
+            self._describe_cache[key] = info
+            return info
+        info["primary"] = model["primary"]
+        info["checks"] = model["checks"]
+        info["fks"] = model["fks"]
+        if model["primary"]:
+            info["indexes"].append({"name": "PRIMARY", "unique": True, "type": "BTREE",
+                                    "columns": [(c, "A") for c in model["primary"]], "sqlite": None})
+        for _, index, unique, origin, partial in db.execute(f"PRAGMA {alias}.index_list({_quote(name)})"):
+            if origin == "pk" or not index[:2] in ("i:", "f:"):
+                continue
+            columns = [(c[2], "D" if c[3] else "A") for c in db.execute(
+                f"PRAGMA {alias}.index_xinfo({_quote(index)})") if c[5] and c[2] is not None]
+            info["indexes"].append({"name": _index_name(index), "unique": bool(unique),
+                                    "type": "FULLTEXT" if index.startswith("f:") else "BTREE",
+                                    "columns": columns, "sqlite": index})
+        info["indexes"][1 if model["primary"] else 0:] = sorted(
+            info["indexes"][1 if model["primary"] else 0:], key=lambda i: (not i["unique"], i["name"]))
+        if model["autoincrement"]:
+            info["autoincrement"] = self._next_autoincrement(schema, name)
+        self._describe_cache[key] = info
+        return info
+
+    def _next_autoincrement(self, schema, table):
+        """The id the next insert into `table` gets; read live, since inserts don't clear _describe_cache."""
+        db, alias = self._catalog(schema)
+        seq = None
+        if db.execute(f"SELECT 1 FROM {alias}.sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+            seq = db.execute(f"SELECT seq FROM {alias}.sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        return (seq[0] if seq else 0) + 1
+
+    def _model(self, schema, table):
+        """(SQLite alias, table name, parsed CREATE TABLE, [index dicts]) for ALTER."""
+        self._require_table(schema, table, views=False)
+        info = self._describe(schema, table)
+        model = _parse_table_sql(info["sql"])
+        indexes = [dict(i, columns=[c for c, _ in i["columns"]]) for i in info["indexes"]
+                   if i["name"] != "PRIMARY"]
+        return self._alias(schema), info["name"], model, indexes
+
+    # DDL
+
+    def _ddl(self, foreign_keys=True):
+        """Context manager running one DDL statement atomically."""
+        return _DDLTransaction(self, foreign_keys)
+
+    def _create(self, masked, literals, args, verb):
+        text = _DEFINER_RE.sub(" ", masked)
+        m = re.match(r"\s*CREATE\s+(OR\s+REPLACE\s+)?(TEMPORARY\s+)?(UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?"
+                     r"(DATABASE|SCHEMA|TABLE|INDEX|VIEW|TRIGGER|PROCEDURE|FUNCTION|EVENT|USER|ROLE)\b",
+                     text, re.I)
+        if not m:
+            raise _syntax_error(masked)
+        kind = m.group(4).upper()
+        if kind in ("DATABASE", "SCHEMA"):
+            m = re.match(rf"\s*CREATE\s+\w+\s+(IF\s+NOT\s+EXISTS\s+)?({_NAME})", text, re.I)
+            created = self._server.create_database(_ident(m.group(2)), bool(m.group(1)))
+            if not created:
+                self._warn(errorcode.ER_DB_CREATE_EXISTS,
+                           f"Can't create database '{_ident(m.group(2))}'; database exists", "Note")
+            return _Result(rowcount=int(created))
+        if kind == "TABLE":
+            return self._create_table(text, literals, args, bool(m.group(2)))
+        if kind == "INDEX":
+            m = re.match(rf"\s*CREATE\s+(?:(UNIQUE|FULLTEXT|SPATIAL)\s+)?INDEX\s+({_NAME})"
+                         rf"(?:\s+USING\s+\w+)?\s+ON\s+({_QNAME})\s*(\(.*\))(.*)$", text, re.I | re.S)
+            if not m:
+                raise _syntax_error(masked)
+            clause = f"ADD {m.group(1) or ''} INDEX {m.group(2)} {m.group(4)}"
+            return self._alter_table(m.group(3), clause + m.group(5).replace(" ALGORITHM", ", ALGORITHM")
+                                     .replace(" LOCK", ", LOCK"), literals)
+        if kind == "VIEW":
+            return self._create_view(text, literals, bool(m.group(1)))
+        if kind == "TRIGGER":
+            return self._create_trigger(text, literals)
+        if kind == "PROCEDURE":
+            return self._create_procedure(text, literals)
+        if kind in ("USER", "ROLE"):
+            return _Result(rowcount=0)
+        raise _unsupported(f"CREATE {kind}")
+
+    def _create_table(self, text, literals, args, temporary):
+        m = re.match(rf"\s*CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(IF\s+NOT\s+EXISTS\s+)?({_QNAME})\s*(.*)$",
+                     text, re.I | re.S)
+        if not m:
+            raise _syntax_error(text)
+        if_not_exists, (schema, table), rest = bool(m.group(1)), _qualified(m.group(2)), m.group(3)
+        schema = self._schema(schema)
+        if schema == "information_schema":
+            raise _error(errorcode.ER_DBACCESS_DENIED_ERROR,
+                         "Access denied for user to database 'information_schema'", "42000")
+        if self._table_type(schema, table) is not None and not temporary:
+            if if_not_exists:
+                self._warn(errorcode.ER_TABLE_EXISTS_ERROR, f"Table '{table}' already exists", "Note")
+                return _Result(rowcount=0)
+            raise _error(errorcode.ER_TABLE_EXISTS_ERROR, f"Table '{table}' already exists", "42S01")
+        alias = "temp" if temporary else self._alias(schema)
+        like = re.match(rf"(?:\(\s*)?LIKE\s+({_QNAME})\s*\)?\s*$", rest, re.I)
+        if like:
+            return self._create_like(alias, schema, table, *_qualified(like.group(1)))
+        select = None
+        if rest.startswith("("):
+            end = _close_paren(rest, 0)
+            body, tail = rest[1:end], rest[end + 1:]
+            if re.match(r"\s*(SELECT|WITH)\b", body, re.I):
+                body, tail = None, body
+        else:
+            body, tail = None, rest
+        s = re.search(r"(?:^|\s)(?:(?:IGNORE|REPLACE)\s+)?(?:AS\s+)?((?:SELECT|WITH)\b.*)$", tail, re.I | re.S)
+        if s:
+            select, tail = s.group(1), tail[:s.start()]
+        options = _table_options(tail)
+        # Translate before the DDL transaction: it may need to ATTACH databases.
+        sql = self._translate(select, literals) if select is not None else None
+        if body is None:
+            if select is None:
+                raise _syntax_error(text)
+            with self._ddl():
+                self._sqlite(f"CREATE TABLE {alias}.{_quote(table)} AS {sql}", args)
+            return _Result(rowcount=0)
+        model, indexes = self._table_model(schema, table, body, literals)
+        with self._ddl():
+            self._sqlite(_table_sql(f"{alias}.{_quote(table)}", model))
+            for index in indexes:
+                self._sqlite(_index_sql(alias, table, index))
+            if options.get("auto_increment") and model["autoincrement"]:
+                self._set_sequence(alias, table, int(options["auto_increment"]) - 1)
+            if select is not None:
+                self._sqlite(f"INSERT INTO {alias}.{_quote(table)} {sql}", args)
+        return _Result(rowcount=0)
+
+    def _table_model(self, schema, table, body, literals):
+        """Parse a CREATE TABLE body into (model, [index dicts]), validating it like MySQL."""
+        model = {"columns": [], "primary": [], "checks": [], "fks": [], "autoincrement": False}
+        indexes = []
+        for item in _split_top(body):
+            self._apply_definition(schema, table, model, indexes, item, literals, creating=True)
+        if not model["columns"]:
+            raise _error(errorcode.ER_TABLE_MUST_HAVE_COLUMNS, "A table must have at least 1 column",
+                         "42000")
+        _check_auto_column(model)
+        return model, indexes
+
+    def _apply_definition(self, schema, table, model, indexes, item, literals, creating=False,
+                          position=None):
+        """Add one column or table constraint (MySQL text) to a table model."""
+        item = item.strip()
+        first = item.split(None, 1)[0].upper() if item else ""
+        if first in ("CONSTRAINT", "PRIMARY", "UNIQUE", "FOREIGN", "CHECK"):
+            m = re.match(rf"(?:CONSTRAINT(?:\s+({_NAME}))?\s+)?(PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CHECK)\b",
+                         item, re.I)
+            if not m:
+                raise _syntax_error(item)
+            symbol = _ident(m.group(1)) if m.group(1) else None
+            kind = " ".join(m.group(2).upper().split())
+            rest = item[m.end():]
+            if kind == "PRIMARY KEY":
+                if model["primary"]:
+                    raise _error(errorcode.ER_MULTIPLE_PRI_KEY, "Multiple primary key defined", "42000")
+                rest = re.sub(r"^\s*USING\s+\w+", "", rest, flags=re.I)
+                model["primary"] = self._key_columns(model, rest)
+                for name in model["primary"]:
+                    _find_column(model, name, table)["notnull"] = True
+            elif kind == "UNIQUE":
+                n = re.match(rf"\s*(?:INDEX|KEY)?\s*({_NAME})?\s*(?:USING\s+\w+\s*)?(\(.*\))", rest,
+                             re.I | re.S)
+                if not n:
+                    raise _syntax_error(item)
+                name = _ident(n.group(1)) if n.group(1) else symbol
+                self._add_index(model, indexes, name, self._key_columns(model, n.group(2)), unique=True)
+            elif kind == "FOREIGN KEY":
+                self._add_foreign_key(schema, table, model, indexes, symbol, rest, literals)
+            else:
+                expr = rest[:_close_paren(rest, rest.index("(")) + 1]
+                enforced = not re.search(r"\bNOT\s+ENFORCED\b", rest[len(expr):], re.I)
+                self._add_check(table, model, symbol, expr.strip()[1:-1], literals, enforced)
+            return
+        if first in ("INDEX", "KEY", "FULLTEXT", "SPATIAL"):
+            m = re.match(rf"(?:(FULLTEXT|SPATIAL)\s+)?(?:INDEX|KEY)?\s*({_NAME})?\s*(?:USING\s+\w+\s*)?(\(.*\))",
+                         item, re.I | re.S)
+            if not m:
+                raise _syntax_error(item)
+            kind = (m.group(1) or "").upper()
+            if kind == "SPATIAL":
+                raise _unsupported("SPATIAL indexes")
+            self._add_index(model, indexes, _ident(m.group(2)) if m.group(2) else None,
+                            self._key_columns(model, m.group(3)), fulltext=kind == "FULLTEXT")
+            return
+        column = _parse_column(item, literals, self._rewrite_expression)
+        if any(c["name"].lower() == column["name"].lower() for c in model["columns"]):
+            raise _error(errorcode.ER_DUP_FIELDNAME, f"Duplicate column name '{column['name']}'", "42S21")
+        if position is None:
+            model["columns"].append(column)
+        else:
+            model["columns"].insert(position, column)
+        self._column_constraints(table, model, indexes, column, literals)
+
+    def _column_constraints(self, table, model, indexes, column, literals):
+        """Turn a column's inline PRIMARY KEY / UNIQUE / CHECK into table-level ones."""
+        if column.pop("primary", False):
+            if model["primary"]:
+                raise _error(errorcode.ER_MULTIPLE_PRI_KEY, "Multiple primary key defined", "42000")
+            model["primary"] = [column["name"]]
+            column["notnull"] = True
+        if column.pop("unique", False):
+            self._add_index(model, indexes, None, [column["name"]], unique=True)
+        for expr, symbol, enforced in column.pop("checks", ()):
+            self._add_check(table, model, symbol, expr, literals, enforced)
+        if column.get("enum") is not None:
+            values = ", ".join(_sqlite_literal(v) for v in column["enum"])
+            model["checks"] = [c for c in model["checks"] if c[0] != f"_standin_enum_{column['name']}"]
+            model["checks"].append((f"_standin_enum_{column['name']}",
+                                    f"{_quote(column['name'])} IN ({values})"))
+
+    @staticmethod
+    def _key_columns(model, text):
+        text = text.strip()
+        if not text.startswith("("):
+            raise _syntax_error(text)
+        names = []
+        for part in _split_top(text[1:_close_paren(text, 0)]):
+            m = re.match(rf"\s*({_NAME})\s*(?:\(\s*\d+\s*\))?\s*(?:ASC|DESC)?\s*$", part, re.I)
+            if not m:
+                raise _unsupported("functional key parts")
+            names.append(_find_column(model, _ident(m.group(1)), None)["name"])
+        return names
+
+    def _add_index(self, model, indexes, name, columns, unique=False, fulltext=False):
+        if name is None:
+            name, n = columns[0], 2
+            while any(i["name"].lower() == name.lower() for i in indexes):
+                name, n = f"{columns[0]}_{n}", n + 1
+        elif name.upper() == "PRIMARY" or any(i["name"].lower() == name.lower() for i in indexes):
+            raise _error(errorcode.ER_DUP_KEYNAME, f"Duplicate key name '{name}'", "42000")
+        indexes.append({"name": name, "unique": unique, "type": "FULLTEXT" if fulltext else "BTREE",
+                        "columns": columns, "sqlite": None})
+
+    def _add_check(self, table, model, symbol, expr, literals, enforced=True):
+        if symbol is None:
+            taken = {c[0].lower() for c in model["checks"]}
+            n = 1
+            while f"{table}_chk_{n}".lower() in taken:
+                n += 1
+            symbol = f"{table}_chk_{n}"
+        elif any(c[0].lower() == symbol.lower() for c in model["checks"]):
+            raise _error(errorcode.ER_CHECK_CONSTRAINT_DUP_NAME,
+                         f"Duplicate check constraint name '{symbol}'.")
+        if enforced:
+            model["checks"].append((symbol, self._rewrite_expression(expr, literals)))
+
+    def _add_foreign_key(self, schema, table, model, indexes, symbol, rest, literals):
+        m = re.match(rf"\s*({_NAME})?\s*(\([^()]*\))\s*REFERENCES\s+({_QNAME})\s*(\([^()]*\))(.*)$",
+                     rest, re.I | re.S)
+        if not m:
+            raise _syntax_error(rest)
+        columns = self._key_columns(model, m.group(2))
+        ref_schema, ref_table = _qualified(m.group(3))
+        ref_columns = [_ident(c) for c in _split_top(m.group(4).strip()[1:-1])]
+        rules = " ".join(m.group(5).split()).upper()
+        if not re.fullmatch(r"(?:ON (?:DELETE|UPDATE) (?:CASCADE|RESTRICT|SET NULL|SET DEFAULT|NO ACTION) ?)*",
+                            rules + (" " if rules else "")):
+            raise _syntax_error(m.group(5))
+        if ref_schema not in (None, schema):
+            raise _unsupported("foreign keys across databases")
+        if symbol is None:
+            taken = {fk["name"].lower() for fk in model["fks"]}
+            n = 1
+            while f"{table}_ibfk_{n}".lower() in taken:
+                n += 1
+            symbol = f"{table}_ibfk_{n}"
+        elif any(fk["name"].lower() == symbol.lower() for fk in model["fks"]):
+            raise _error(errorcode.ER_FK_DUP_NAME, f"Duplicate foreign key constraint name '{symbol}'")
+        if ref_table.lower() != table.lower() and self._variable("foreign_key_checks"):
+            if self._table_type(schema, ref_table) != "BASE TABLE":
+                raise _error(errorcode.ER_FK_CANNOT_OPEN_PARENT,
+                             f"Failed to open the referenced table '{ref_table}'")
+            info = self._describe(schema, ref_table)
+            keys = [[c.lower() for c, _ in i["columns"]] for i in info["indexes"]]
+            if not any(k[:len(ref_columns)] == [c.lower() for c in ref_columns] for k in keys):
+                raise _error(errorcode.ER_FK_NO_INDEX_PARENT,
+                             f"Failed to add the foreign key constraint. Missing index for constraint "
+                             f"'{symbol}' in the referenced table '{ref_table}'")
+        if len(columns) != len(ref_columns):
+            raise _error(errorcode.ER_WRONG_FK_DEF, f"Incorrect foreign key definition for '{symbol}': "
+                         "Key reference and table reference don't match", "42000")
+        model["fks"].append({"name": symbol, "columns": columns, "ref_table": ref_table,
+                             "ref_columns": ref_columns, "rules": rules})
+        # InnoDB indexes the referencing columns, creating an index when none starts with them.
+        lowered = [c.lower() for c in columns]
+        keys = [[c.lower() for c in i["columns"]] for i in indexes] + [[c.lower() for c in model["primary"]]]
+        if not any(k[:len(lowered)] == lowered for k in keys):
+            name = _ident(m.group(1)) if m.group(1) else (symbol if symbol and not symbol.startswith(
+                f"{table}_ibfk_") else None)
+            self._add_index(model, indexes, name, columns)
+
+    def _rewrite_expression(self, expr, literals):
+        """A MySQL expression (masked) as SQLite text, for CHECK and DEFAULT clauses."""
+        return _unmask(self._rewrite(expr, literals)[0], literals)
+
+    def _create_like(self, alias, schema, table, source_schema, source):
+        source_schema = self._schema(source_schema)
+        self._require_table(source_schema, source, views=False)
+        info = self._describe(source_schema, source)
+        model = _parse_table_sql(info["sql"])
+        # CREATE TABLE ... LIKE copies indexes and CHECKs (renamed) but not foreign keys.
+        model["fks"] = []
+        prefix = f"{info['name']}_chk_"
+        model["checks"] = [(f"{table}_chk_{name[len(prefix):]}" if name.startswith(prefix) else name, expr)
+                           for name, expr in model["checks"]]
+        with self._ddl():
+            self._sqlite(_table_sql(f"{alias}.{_quote(table)}", model))
+            for index in info["indexes"]:
+                if index["name"] != "PRIMARY":
+                    self._sqlite(_index_sql(alias, table, dict(index, columns=[c for c, _ in index["columns"]])))
+        return _Result(rowcount=0)
+
+    def _set_sequence(self, alias, table, value):
+        self._sqlite(f"DELETE FROM {alias}.sqlite_sequence WHERE name = ?", (table,))
+        self._sqlite(f"INSERT INTO {alias}.sqlite_sequence (name, seq) VALUES (?, ?)", (table, value))
+
+    def _drop(self, masked, literals, args, verb):
+        text = masked
+        m = re.match(r"\s*DROP\s+(TEMPORARY\s+)?(DATABASE|SCHEMA|TABLES?|INDEX|VIEW|TRIGGER|PROCEDURE|"
+                     r"FUNCTION|EVENT|USER|ROLE)\b\s*(IF\s+EXISTS\s+)?(.*?)\s*$", text, re.I | re.S)
+        if not m:
+            raise _syntax_error(masked)
+        kind, if_exists, rest = m.group(2).upper(), bool(m.group(3)), m.group(4)
+        if kind in ("DATABASE", "SCHEMA"):
+            name = _ident(rest)
+            if name.lower() == "information_schema":
+                raise _error(errorcode.ER_DBACCESS_DENIED_ERROR,
+                             "Access denied for user to database 'information_schema'", "42000")
+            tables = len(self._tables(name)) if self._server.database(name) else 0
+            self._catalogs.pop(name, None)
+            if name in self._attached:
+                self._db.execute(f"DETACH DATABASE {_quote(name)}")
+                del self._attached[name]
+            if not self._server.drop_database(name, if_exists):
+                self._warn(errorcode.ER_DB_DROP_EXISTS,
+                           f"Can't drop database '{name}'; database doesn't exist", "Note")
+            if name == self._database:
+                self._open(None)
+            return _Result(rowcount=tables)
+        if kind in ("TABLE", "TABLES"):
+            return self._drop_tables(rest, if_exists, bool(m.group(1)))
+        if kind == "INDEX":
+            m = re.match(rf"({_NAME})\s+ON\s+({_QNAME})(.*)$", rest, re.I | re.S)
+            if not m:
+                raise _syntax_error(masked)
+            options = m.group(3).replace(" ALGORITHM", ", ALGORITHM").replace(" LOCK", ", LOCK")
+            return self._alter_table(m.group(2), f"DROP INDEX {m.group(1)}{options}", literals)
+        if kind == "VIEW":
+            return self._drop_views(rest, if_exists)
+        if kind == "TRIGGER":
+            schema, name = _qualified(rest)
+            schema = self._schema(schema)
+            db, alias = self._catalog(schema)
+            exists = db.execute(f"SELECT 1 FROM {alias}.sqlite_master WHERE type = 'trigger' "
+                                "AND name = ? COLLATE NOCASE", (name,)).fetchone()
+            if not exists:
+                if if_exists:
+                    self._warn(errorcode.ER_TRG_DOES_NOT_EXIST, "Trigger does not exist", "Note")
+                    return _Result(rowcount=0)
+                raise _error(errorcode.ER_TRG_DOES_NOT_EXIST, "Trigger does not exist")
+            with self._ddl():
+                self._sqlite(f"DROP TRIGGER {self._alias(schema)}.{_quote(name)}")
+            return _Result(rowcount=0)
+        if kind == "PROCEDURE":
+            return self._drop_procedure(rest, if_exists)
+        if kind in ("USER", "ROLE"):
+            return _Result(rowcount=0)
+        raise _unsupported(f"DROP {kind}")
+
+    def _drop_tables(self, rest, if_exists, temporary):
+        rest = re.sub(r"\s+(?:RESTRICT|CASCADE)\s*$", "", rest, flags=re.I)
+        targets, missing = [], []
+        for ref in _split_top(rest):
+            schema, table = _qualified(ref)
+            schema = self._schema(schema)
+            kind = self._table_type(schema, table)
+            if temporary:
+                row = self._db.execute("SELECT 1 FROM temp.sqlite_master WHERE type = 'table' "
+                                       "AND name = ? COLLATE NOCASE", (table,)).fetchone()
+                kind = "BASE TABLE" if row else None
+            if kind != "BASE TABLE":
+                missing.append(f"{schema}.{table}")
+            else:
+                targets.append((schema, table))
+        if missing:
+            if not if_exists:
+                raise _error(errorcode.ER_BAD_TABLE_ERROR, f"Unknown table '{','.join(missing)}'", "42S02")
+            for name in missing:
+                self._warn(errorcode.ER_BAD_TABLE_ERROR, f"Unknown table '{name}'", "Note")
+        dropping = {(s, t.lower()) for s, t in targets}
+        if self._variable("foreign_key_checks"):
+            for schema, table in targets:
+                for child, fk in self._referencing(schema, table):
+                    if (schema, child.lower()) not in dropping:
+                        raise _error(errorcode.ER_FK_CANNOT_DROP_PARENT,
+                                     f"Cannot drop table '{table}' referenced by a foreign key "
+                                     f"constraint '{fk['name']}' on table '{child}'.")
+        with self._ddl(foreign_keys=False):
+            for schema, table in targets:
+                alias = "temp" if temporary else self._alias(schema)
+                self._sqlite(f"DROP TABLE {alias}.{_quote(table)}")
+        return _Result(rowcount=0)
+
+    def _referencing(self, schema, table):
+        """[(child table, foreign key)] for foreign keys in `schema` pointing at `table`."""
+        found = []
+        for child, kind in self._tables(schema):
+            if kind != "BASE TABLE" or child.lower() == table.lower():
+                continue
+            for fk in self._describe(schema, child)["fks"]:
+                if fk["ref_table"].lower() == table.lower():
+                    found.append((child, fk))
+        return found
+
+    def _rename(self, masked, literals, args, verb):
+        m = re.match(r"\s*RENAME\s+TABLES?\s+(.*)$", masked, re.I | re.S)
+        if not m:
+            raise _unsupported(masked.split()[1] if len(masked.split()) > 1 else "RENAME")
+        pairs = []
+        for part in _split_top(m.group(1)):
+            p = re.match(rf"\s*({_QNAME})\s+TO\s+({_QNAME})\s*$", part, re.I)
+            if not p:
+                raise _syntax_error(part)
+            pairs.append((_qualified(p.group(1)), _qualified(p.group(2))))
+        # Validate against the names as they will be after each earlier step, then apply atomically.
+        present = {}
+        for (schema, old), (new_schema, new) in pairs:
+            schema, new_schema = self._schema(schema), self._schema(new_schema)
+            if schema != new_schema:
+                raise _unsupported("RENAME TABLE across databases")
+            if present.get((schema, old.lower())) is False or (
+                    (schema, old.lower()) not in present and self._table_type(schema, old) is None):
+                raise _error(errorcode.ER_NO_SUCH_TABLE, f"Table '{schema}.{old}' doesn't exist", "42S02")
+            if present.get((schema, new.lower())) or (
+                    (schema, new.lower()) not in present and self._table_type(schema, new) is not None):
+                raise _error(errorcode.ER_TABLE_EXISTS_ERROR, f"Table '{new}' already exists", "42S01")
+            present[(schema, old.lower())] = False
+            present[(schema, new.lower())] = True
+        with self._ddl(foreign_keys=False):
+            self._db.execute("PRAGMA legacy_alter_table = ON")
+            try:
+                for (schema, old), (_, new) in pairs:
+                    self._sqlite(f"ALTER TABLE {self._alias(schema)}.{_quote(old)} RENAME TO {_quote(new)}")
+            finally:
+                self._db.execute("PRAGMA legacy_alter_table = OFF")
+        return _Result(rowcount=0)
+
+    def _truncate(self, masked, literals, args, verb):
+        m = re.match(rf"\s*TRUNCATE\s+(?:TABLE\s+)?({_QNAME})\s*$", masked, re.I)
+        if not m:
+            raise _syntax_error(masked)
+        schema, table = _qualified(m.group(1))
+        schema = self._schema(schema)
+        self._require_table(schema, table, views=False)
+        if self._variable("foreign_key_checks"):
+            for child, fk in self._referencing(schema, table):
+                raise _error(errorcode.ER_TRUNCATE_ILLEGAL_FK,
+                             f"Cannot truncate a table referenced in a foreign key constraint "
+                             f"(`{schema}`.`{child}`, CONSTRAINT `{fk['name']}`)", "42000")
+        alias = self._alias(schema)
+        with self._ddl(foreign_keys=False):
+            self._sqlite(f"DELETE FROM {alias}.{_quote(table)}")
+            if self._describe(schema, table)["autoincrement"]:
+                self._sqlite(f"DELETE FROM {alias}.sqlite_sequence WHERE name = ?", (table,))
+        return _Result(rowcount=0)
+
+    def _alter(self, masked, literals, args, verb):
+        m = re.match(r"\s*ALTER\s+(?:ONLINE\s+|IGNORE\s+)?(TABLE|DATABASE|SCHEMA|VIEW|USER|EVENT|"
+                     r"PROCEDURE|FUNCTION|INSTANCE)\b\s*(.*)$", _DEFINER_RE.sub(" ", masked), re.I | re.S)
+        if not m:
+            raise _syntax_error(masked)
+        kind = m.group(1).upper()
+        if kind == "TABLE":
+            t = re.match(rf"({_QNAME})\s*(.*)$", m.group(2), re.S)
+            return self._alter_table(t.group(1), t.group(2), literals)
+        if kind == "VIEW":
+            return self._create_view("CREATE OR REPLACE VIEW " + m.group(2), literals, True)
+        if kind in ("DATABASE", "SCHEMA", "USER", "INSTANCE"):
+            return _Result(rowcount=0)
+        raise _unsupported(f"ALTER {kind}")
+
+    def _alter_table(self, target, clauses, literals):
+        schema, table = _qualified(target)
+        schema = self._schema(schema)
+        alias, table, model, indexes = self._model(schema, table)
+        original = _parse_table_sql(self._describe(schema, table)["sql"])
+        renamed_to = None
+        renames = {}                # new column name -> old column name
+        algorithm = lock = None
+        rebuild = False
+        dropped_indexes, added_indexes, renamed_indexes = [], [], []
+        sequence = None
+        instant = True              # every clause is metadata-only for MySQL
+        inplace = True              # no clause changes a column's data type
+        for clause in _split_top(clauses):
+            clause = clause.strip()
+            upper = " ".join(clause.upper().split())
+            m = re.match(r"(ALGORITHM|LOCK)\s*=?\s*(\w+)$", clause, re.I)
+            if m:
+                if m.group(1).upper() == "ALGORITHM":
+                    algorithm = m.group(2).upper()
+                else:
+                    lock = m.group(2).upper()
+                continue
+            if re.match(r"(?:ENGINE|(?:DEFAULT\s+)?(?:CHARACTER\s+SET|CHARSET|COLLATE)|CONVERT\s+TO|COMMENT|"
+                        r"ROW_FORMAT|KEY_BLOCK_SIZE|STATS_\w+|FORCE|ORDER\s+BY|ENABLE\s+KEYS|"
+                        r"DISABLE\s+KEYS)\b", clause, re.I):
+                if upper.startswith(("FORCE", "ENGINE", "CONVERT")):
+                    instant = False
+                continue
+            m = re.match(r"AUTO_INCREMENT\s*=?\s*(\d+)$", clause, re.I)
+            if m:
+                sequence = int(m.group(1)) - 1
+                continue
+            m = re.match(rf"RENAME\s+(?:TO\s+|AS\s+)?({_QNAME})$", clause, re.I)
+            if m and not re.match(r"RENAME\s+(?:COLUMN|INDEX|KEY)\b", clause, re.I):
+                new_schema, renamed_to = _qualified(m.group(1))
+                if self._schema(new_schema) != schema:
+                    raise _unsupported("RENAME TABLE across databases")
+                continue
+            m = re.match(rf"RENAME\s+(INDEX|KEY)\s+({_NAME})\s+TO\s+({_NAME})$", clause, re.I)
+            if m:
+                old, new = _ident(m.group(2)), _ident(m.group(3))
+                index = _find_index(indexes, old)
+                if any(i["name"].lower() == new.lower() for i in indexes):
+                    raise _error(errorcode.ER_DUP_KEYNAME, f"Duplicate key name '{new}'", "42000")
+                renamed_indexes.append((dict(index), new))
+                index["name"] = new
+                continue
+            m = re.match(rf"DROP\s+(?:INDEX|KEY)\s+({_NAME})$", clause, re.I)
+            if m:
+                index = _find_index(indexes, _ident(m.group(1)))
+                for fk in model["fks"]:
+                    if [c.lower() for c in index["columns"][:len(fk["columns"])]] == [
+                            c.lower() for c in fk["columns"]] and not _other_key(indexes, model, index, fk):
+                        raise _error(errorcode.ER_DROP_INDEX_FK, f"Cannot drop index '{index['name']}': "
+                                     "needed in a foreign key constraint")
+                indexes.remove(index)
+                dropped_indexes.append(index)
+                continue
+            m = re.match(r"ADD\s+(?:CONSTRAINT\b.*|PRIMARY\b.*|UNIQUE\b.*|FOREIGN\b.*|CHECK\b.*|"
+                         r"INDEX\b.*|KEY\b.*|FULLTEXT\b.*|SPATIAL\b.*)$", clause, re.I | re.S)
+            if m:
+                before = len(indexes)
+                definition = clause[3:].strip()
+                first = definition.split(None, 1)[0].upper()
+                self._apply_definition(schema, table, model, indexes, definition, literals)
+                if first in ("INDEX", "KEY", "FULLTEXT", "UNIQUE") and len(indexes) > before:
+                    added_indexes.extend(indexes[before:])
+                else:
+                    rebuild = True
+                instant = False     # adding an index is INPLACE at best
+                continue
+            m = re.match(r"ADD\s+(?:COLUMN\s+)?(.*)$", clause, re.I | re.S)
+            if m:
+                definitions = m.group(1).strip()
+                if definitions.startswith("("):
+                    definitions = _split_top(definitions[1:_close_paren(definitions, 0)])
+                else:
+                    definitions = [definitions]
+                for definition in definitions:
+                    definition, position = _column_position(definition, model)
+                    before = len(indexes)
+                    self._apply_definition(schema, table, model, indexes, definition, literals,
+                                           position=position)
+                    if len(indexes) > before:
+                        instant = False
+                rebuild = True
+                continue
+            m = re.match(rf"DROP\s+(?:COLUMN\s+)?({_NAME})$", clause, re.I)
+            if m and _ident(m.group(1)).upper() not in ("PRIMARY",):
+                self._drop_column(table, model, indexes, _ident(m.group(1)), dropped_indexes)
+                rebuild = True
+                continue
+            if upper == "DROP PRIMARY KEY":
+                if not model["primary"]:
+                    raise _error(errorcode.ER_CANT_DROP_FIELD_OR_KEY,
+                                 "Can't DROP 'PRIMARY'; check that column/key exists", "42000")
+                if any(c["autoincrement"] and c["name"] in model["primary"] for c in model["columns"]):
+                    raise _error(errorcode.ER_WRONG_AUTO_KEY, "Incorrect table definition; there can be "
+                                 "only one auto column and it must be defined as a key", "42000")
+                model["primary"] = []
+                rebuild, instant = True, False
+                continue
+            m = re.match(rf"DROP\s+(FOREIGN\s+KEY|CHECK|CONSTRAINT)\s+({_NAME})$", clause, re.I)
+            if m:
+                self._drop_constraint(model, indexes, m.group(1).split()[0].upper(), _ident(m.group(2)),
+                                      dropped_indexes)
+                rebuild = True
+                continue
+            m = re.match(rf"(MODIFY|CHANGE)\s+(?:COLUMN\s+)?(?:({_NAME})\s+(?=[`\w$]+\s+\w))?(.*)$",
+                         clause, re.I | re.S)
+            if m:
+                if m.group(1).upper() == "CHANGE":
+                    if not m.group(2):
+                        raise _syntax_error(clause)
+                    old = _ident(m.group(2))
+                    body = m.group(3)
+                else:
+                    # MODIFY has no old name: the name is part of the definition.
+                    body = clause[m.start(2):] if m.group(2) else m.group(3)
+                    old = _ident(re.match(_NAME, body.strip()).group())
+                previous = _find_column(model, old, table)
+                index = model["columns"].index(previous)
+                model["columns"].remove(previous)
+                # FIRST / AFTER positions count the remaining columns.
+                definition, position = _column_position(body, model)
+                new = _parse_column(definition, literals, self._rewrite_expression)
+                if any(c["name"].lower() == new["name"].lower() for c in model["columns"]):
+                    raise _error(errorcode.ER_DUP_FIELDNAME, f"Duplicate column name '{new['name']}'", "42S21")
+                model["columns"].insert(index if position is None else position, new)
+                if new.get("enum") is None:
+                    model["checks"] = [c for c in model["checks"]
+                                       if c[0] != f"_standin_enum_{previous['name']}"]
+                self._column_constraints(table, model, indexes, new, literals)
+                if new["name"] != previous["name"]:
+                    _rename_column(model, indexes, previous["name"], new["name"])
+                    renames[new["name"]] = renames.pop(previous["name"], previous["name"])
+                if new["type"].upper() != previous["type"].upper():
+                    inplace = instant = False
+                elif new["notnull"] != previous["notnull"] or new["collate"] != previous["collate"]:
+                    instant = False
+                rebuild = True
+                continue
+            m = re.match(rf"RENAME\s+COLUMN\s+({_NAME})\s+TO\s+({_NAME})$", clause, re.I)
+            if m:
+                old, new = _ident(m.group(1)), _ident(m.group(2))
+                column = _find_column(model, old, table)
+                if any(c["name"].lower() == new.lower() for c in model["columns"] if c is not column):
+                    raise _error(errorcode.ER_DUP_FIELDNAME, f"Duplicate column name '{new}'", "42S21")
+                column["name"] = new
+                _rename_column(model, indexes, old, new)
+                renames[new] = renames.pop(old, old)
+                rebuild = True
+                continue
+            m = re.match(rf"ALTER\s+(?:COLUMN\s+)?({_NAME})\s+(SET\s+DEFAULT\s+(.*)|DROP\s+DEFAULT|"
+                         rf"SET\s+(?:VISIBLE|INVISIBLE))$", clause, re.I | re.S)
+            if m:
+                column = _find_column(model, _ident(m.group(1)), table)
+                if m.group(3) is not None:
+                    column["default"] = _parse_column(f"`x` INT DEFAULT {m.group(3)}", literals,
+                                                      self._rewrite_expression)["default"]
+                elif "DROP" in m.group(2).upper():
+                    column["default"] = None
+                rebuild = True
+                continue
+            raise _syntax_error(clause)
+
+        if algorithm == "INSTANT" and not instant:
+            raise _error(errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED,
+                         "ALGORITHM=INSTANT is not supported for this operation. Try ALGORITHM=COPY/INPLACE.",
+                         "0A000")
+        if algorithm == "INPLACE" and not inplace:
+            raise _error(errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED,
+                         "ALGORITHM=INPLACE is not supported for this operation. Try ALGORITHM=COPY.", "0A000")
+        if lock == "NONE" and not inplace:
+            raise _error(errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED,
+                         "LOCK=NONE is not supported for this operation. Try LOCK=SHARED.", "0A000")
+        _check_auto_column(model)
+
+        with self._ddl(foreign_keys=False):
+            if rebuild:
+                self._rebuild(alias, table, original, model, indexes, renames)
+            else:
+                for index in dropped_indexes:
+                    self._sqlite(f"DROP INDEX {alias}.{_quote(index['sqlite'])}")
+                for index, new in renamed_indexes:
+                    self._sqlite(f"DROP INDEX {alias}.{_quote(index['sqlite'])}")
+                    self._sqlite(_index_sql(alias, table, dict(index, name=new)))
+                for index in added_indexes:
+                    self._sqlite(_index_sql(alias, table, index))
+            if sequence is not None and model["autoincrement"]:
+                current = self._next_autoincrement(schema, table) - 1
+                self._set_sequence(alias, table, max(sequence, current))
+            if renamed_to is not None:
+                if self._table_type(schema, renamed_to) is not None:
+                    raise _error(errorcode.ER_TABLE_EXISTS_ERROR, f"Table '{renamed_to}' already exists",
+                                 "42S01")
+                self._db.execute("PRAGMA legacy_alter_table = ON")
+                try:
+                    self._sqlite(f"ALTER TABLE {alias}.{_quote(table)} RENAME TO {_quote(renamed_to)}")
+                finally:
+                    self._db.execute("PRAGMA legacy_alter_table = OFF")
+            if rebuild and self._variable("foreign_key_checks"):
+                if self._db.execute(f"PRAGMA {alias}.foreign_key_check").fetchone():
+                    raise _error(errorcode.ER_NO_REFERENCED_ROW_2, "Cannot add or update a child row: "
+                                 "a foreign key constraint fails", "23000")
+        return _Result(rowcount=0)
+
+    def _drop_column(self, table, model, indexes, name, dropped_indexes):
+        column = None
+        for c in model["columns"]:
+            if c["name"].lower() == name.lower():
+                column = c
+        if column is None:
+            raise _error(errorcode.ER_CANT_DROP_FIELD_OR_KEY,
+                         f"Can't DROP '{name}'; check that column/key exists", "42000")
+        if len(model["columns"]) == 1:
+            raise _error(errorcode.ER_CANT_REMOVE_ALL_FIELDS,
+                         "You can't delete all columns with ALTER TABLE; use DROP TABLE instead", "42000")
+        for fk in model["fks"]:
+            if name.lower() in (c.lower() for c in fk["columns"]):
+                raise _error(errorcode.ER_FK_COLUMN_CANNOT_DROP,
+                             f"Cannot drop column '{name}': needed in a foreign key constraint '{fk['name']}'")
+        pattern = re.compile(rf"(?<![\w$])`?{re.escape(name)}`?(?![\w$])", re.I)
+        for check, expr in model["checks"]:
+            if not check.startswith("_standin_enum_") and pattern.search(_mask(expr, sqlite=True)[0]):
+                raise _error(errorcode.ER_DEPENDENT_BY_CHECK_CONSTRAINT,
+                             f"Check constraint '{check}' uses column '{name}', hence column cannot be "
+                             "dropped or renamed.")
+        model["columns"].remove(column)
+        model["checks"] = [c for c in model["checks"] if c[0] != f"_standin_enum_{column['name']}"]
+        model["primary"] = [c for c in model["primary"] if c.lower() != name.lower()]
+        for index in list(indexes):
+            index["columns"] = [c for c in index["columns"] if c.lower() != name.lower()]
+            if not index["columns"]:
+                indexes.remove(index)
+                dropped_indexes.append(index)
+
+    def _drop_constraint(self, model, indexes, kind, name, dropped_indexes):
+        if kind in ("FOREIGN", "CONSTRAINT"):
+            for fk in model["fks"]:
+                if fk["name"].lower() == name.lower():
+                    model["fks"].remove(fk)
+                    return
+        if kind in ("CHECK", "CONSTRAINT"):
+            for check in model["checks"]:
+                if check[0].lower() == name.lower():
+                    model["checks"].remove(check)
+                    return
+        if kind == "CONSTRAINT":
+            for index in indexes:
+                if index["unique"] and index["name"].lower() == name.lower():
+                    indexes.remove(index)
+                    dropped_indexes.append(index)
+                    return
+        if kind == "CHECK":
+            raise _error(errorcode.ER_CHECK_CONSTRAINT_NOT_FOUND,
+                         f"Check constraint '{name}' is not found in the table.")
+        raise _error(errorcode.ER_CANT_DROP_FIELD_OR_KEY,
+                     f"Can't DROP '{name}'; check that column/key exists", "42000")
+
+    def _rebuild(self, alias, table, original, model, indexes, renames):
+        """SQLite's 12-step ALTER: copy into a new table, drop the old one, rename."""
+        scratch = f"_standin_alter_{table}"
+        target = f"{alias}.{_quote(table)}"
+        triggers = [row[0] for row in self._db.execute(
+            f"SELECT sql FROM {alias}.sqlite_master WHERE type = 'trigger' AND tbl_name = ? COLLATE NOCASE",
+            (table,))]
+        sequence = None
+        if original["autoincrement"] and self._db.execute(
+                f"SELECT 1 FROM {alias}.sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+            sequence = self._db.execute(f"SELECT seq FROM {alias}.sqlite_sequence WHERE name = ?",
+                                        (table,)).fetchone()
+        old_names = {c["name"].lower(): c["name"] for c in original["columns"] if not c["generated"]}
+        pairs = []
+        for column in model["columns"]:
+            source = renames.get(column["name"], column["name"])
+            if not column["generated"] and source.lower() in old_names:
+                pairs.append((column["name"], old_names[source.lower()]))
+        self._sqlite(f"DROP TABLE IF EXISTS {alias}.{_quote(scratch)}")
+        self._sqlite(_table_sql(f"{alias}.{_quote(scratch)}", model))
+        try:
+            self._sqlite(f"INSERT INTO {alias}.{_quote(scratch)} ({', '.join(_quote(n) for n, _ in pairs)}) "
+                         f"SELECT {', '.join(_quote(o) for _, o in pairs)} FROM {target}")
+        except sqlite3.IntegrityError as err:
+            if "NOT NULL" in str(err):
+                raise _error(errorcode.ER_INVALID_USE_OF_NULL, "Invalid use of NULL value", "22004") from None
+            raise
+        self._sqlite(f"DROP TABLE {target}")
+        self._db.execute("PRAGMA legacy_alter_table = ON")
+        try:
+            self._sqlite(f"ALTER TABLE {alias}.{_quote(scratch)} RENAME TO {_quote(table)}")
+        finally:
+            self._db.execute("PRAGMA legacy_alter_table = OFF")
+        for index in indexes:
+            self._sqlite(_index_sql(alias, table, index))
+        for sql in triggers:
+            self._sqlite(_in_schema(sql, alias))
+        if sequence is not None and model["autoincrement"]:
+            self._set_sequence(alias, table, sequence[0])
+
+    def _create_view(self, text, literals, replace):
+        m = re.match(rf"\s*CREATE\s+(?:OR\s+REPLACE\s+)?VIEW\s+(IF\s+NOT\s+EXISTS\s+)?({_QNAME})\s*"
+                     rf"(\([^()]*\))?\s*AS\s+(.*?)(?:\s+WITH\s+(?:CASCADED\s+|LOCAL\s+)?CHECK\s+OPTION)?\s*$",
+                     text, re.I | re.S)
+        if not m:
+            raise _syntax_error(text)
+        schema, view = _qualified(m.group(2))
+        schema = self._schema(schema)
+        kind = self._table_type(schema, view)
+        if kind == "BASE TABLE":
+            if replace:
+                raise _error(errorcode.ER_WRONG_OBJECT, f"'{schema}.{view}' is not VIEW")
+            raise _error(errorcode.ER_TABLE_EXISTS_ERROR, f"Table '{view}' already exists", "42S01")
+        if kind == "VIEW" and not replace:
+            if m.group(1):
+                return _Result(rowcount=0)
+            raise _error(errorcode.ER_TABLE_EXISTS_ERROR, f"Table '{view}' already exists", "42S01")
+        select = self._translate(m.group(4), literals, schema=schema)
+        columns = ""
+        if m.group(3):
+            columns = " (" + ", ".join(_quote(_ident(c)) for c in _split_top(m.group(3).strip()[1:-1])) + ")"
+        alias = self._alias(schema)
+        with self._ddl():
+            if kind == "VIEW":
+                self._sqlite(f"DROP VIEW {alias}.{_quote(view)}")
+            self._sqlite(f"CREATE VIEW {alias}.{_quote(view)}{columns} AS {select}")
+            try:
+                # SQLite resolves a view's tables lazily; MySQL checks them up front.
+                self._sqlite(f"SELECT * FROM {alias}.{_quote(view)} LIMIT 0").fetchall()
+            except sqlite3.OperationalError as err:
+                raise self._mysql_error(err, "SELECT") from None
+        return _Result(rowcount=0)
+
+    def _drop_views(self, rest, if_exists):
+        rest = re.sub(r"\s+(?:RESTRICT|CASCADE)\s*$", "", rest, flags=re.I)
+        targets, missing = [], []
+        for ref in _split_top(rest):
+            schema, view = _qualified(ref)
+            schema = self._schema(schema)
+            if self._table_type(schema, view) == "VIEW":
+                targets.append((schema, view))
+            else:
+                missing.append(f"{schema}.{view}")
+        if missing:
+            if not if_exists:
+                raise _error(errorcode.ER_UNKNOWN_VIEW, f"Unknown view '{','.join(missing)}'", "42S02")
+            for name in missing:
+                self._warn(errorcode.ER_UNKNOWN_VIEW, f"Unknown view '{name}'", "Note")
+        with self._ddl():
+            for schema, view in targets:
+                self._sqlite(f"DROP VIEW {self._alias(schema)}.{_quote(view)}")
+        return _Result(rowcount=0)
+
+    def _create_trigger(self, text, literals):
+        m = re.match(rf"\s*CREATE\s+TRIGGER\s+(IF\s+NOT\s+EXISTS\s+)?({_QNAME})\s+(BEFORE|AFTER)\s+"
+                     rf"(INSERT|UPDATE|DELETE)\s+ON\s+({_QNAME})\s+FOR\s+EACH\s+ROW\s+"
+                     rf"(?:(?:FOLLOWS|PRECEDES)\s+{_NAME}\s+)?(.*?)\s*$", text, re.I | re.S)
+        if not m:
+            raise _syntax_error(text)
+        schema, name = _qualified(m.group(2))
+        table_schema, table = _qualified(m.group(5))
+        schema = self._schema(schema or table_schema)
+        self._require_table(schema, table, views=False)
+        db, alias = self._catalog(schema)
+        if db.execute(f"SELECT 1 FROM {alias}.sqlite_master WHERE type = 'trigger' AND name = ? COLLATE NOCASE",
+                      (name,)).fetchone():
+            if m.group(1):
+                return _Result(rowcount=0)
+            raise _error(errorcode.ER_TRG_ALREADY_EXISTS, "Trigger already exists")
+        body = m.group(6)
+        b = re.match(r"BEGIN\b(.*)\bEND$", body, re.I | re.S)
+        statements = _split_statements(b.group(1)) if b else [body]
+        translated = []
+        for statement in statements:
+            verb = (_VERB_RE.match(statement).group(1) or "").upper()
+            if verb not in ("INSERT", "REPLACE", "UPDATE", "DELETE", "SELECT", "DO"):
+                raise _unsupported(f"{verb} in triggers")
+            if verb == "DO":
+                statement = re.sub(r"^\s*DO\b", "SELECT", statement, flags=re.I)
+            translated.append(self._translate(statement, literals, schema=schema) + ";")
+        alias = self._alias(schema)
+        with self._ddl():
+            self._sqlite(f"CREATE TRIGGER {alias}.{_quote(name)} {m.group(3)} {m.group(4)} ON {_quote(table)} "
+                         f"FOR EACH ROW BEGIN {' '.join(translated)} END")
+        return _Result(rowcount=0)
+
+    # Stored procedures
+
+    def _routine(self, schema, name):
+        """The stored row of procedure `name` as a dict, or None."""
+        db, alias = self._catalog(schema)
+        if not db.execute(f"SELECT 1 FROM {alias}.sqlite_master WHERE name = '_standin_routines'").fetchone():
+            return None
+        row = db.execute(f"SELECT name, type, params, body, definition, created FROM {alias}._standin_routines "
+                         "WHERE name = ? COLLATE NOCASE", (name,)).fetchone()
+        if row is None:
+            return None
+        return {"schema": schema, "name": row[0], "type": row[1], "params": json.loads(row[2]),
+                "body": row[3], "definition": row[4], "created": row[5]}
+
+    def _routines(self, schema):
+        db, alias = self._catalog(schema)
+        if not db.execute(f"SELECT 1 FROM {alias}.sqlite_master WHERE name = '_standin_routines'").fetchone():
+            return []
+        return [self._routine(schema, row[0]) for row in
+                db.execute(f"SELECT name FROM {alias}._standin_routines ORDER BY name")]
+
+    def _create_procedure(self, text, literals):
+        m = re.match(rf"\s*CREATE\s+PROCEDURE\s+(IF\s+NOT\s+EXISTS\s+)?({_QNAME})\s*\(", text, re.I)
+        if not m:
+            raise _syntax_error(text)
+        schema, name = _qualified(m.group(2))
+        schema = self._schema(schema)
+        end = _close_paren(text, m.end() - 1)
+        params = []
+        for part in _split_top(text[m.end():end]):
+            p = re.match(rf"\s*(?:(IN|OUT|INOUT)\s+)?({_NAME})\s+(.+?)\s*$", part, re.I | re.S)
+            if not p:
+                raise _syntax_error(part)
+            params.append([(p.group(1) or "IN").upper(), _ident(p.group(2)),
+                           _unmask(" ".join(p.group(3).split()), literals, mysql=True).lower()])
+        rest = re.sub(r"^\s*(?:(?:COMMENT\s+\x00\d+\x00|LANGUAGE\s+SQL|NOT\s+DETERMINISTIC|DETERMINISTIC|"
+                      r"CONTAINS\s+SQL|NO\s+SQL|READS\s+SQL\s+DATA|MODIFIES\s+SQL\s+DATA|"
+                      r"SQL\s+SECURITY\s+\w+)\s+)*", "", text[end + 1:], flags=re.I)
+        b = re.match(r"\s*BEGIN\b(.*)\bEND\s*$", rest, re.I | re.S)
+        statements = _split_statements(b.group(1)) if b else [rest]
+        for statement in statements:
+            verb_match = _VERB_RE.match(statement)
+            verb = verb_match.group(1).upper() if verb_match else ""
+            if verb in _CONTROL_FLOW or re.match(r"\s*\w+\s*:", statement) or verb not in _HANDLERS:
+                raise _unsupported(f"{verb or statement.strip()[:20]} in stored procedures")
+        body = _unmask(";\n".join(s.strip() for s in statements), literals, mysql=True)
+        if self._routine(schema, name) is not None:
+            if m.group(1):
+                self._warn(errorcode.ER_SP_ALREADY_EXISTS, f"PROCEDURE {name} already exists", "Note")
+                return _Result(rowcount=0)
+            raise _error(errorcode.ER_SP_ALREADY_EXISTS, f"PROCEDURE {name} already exists", "42000")
+        alias = self._alias(schema)
+        created = datetime.datetime.now().replace(microsecond=0).isoformat(" ")
+        with self._ddl():
+            self._sqlite(f"CREATE TABLE IF NOT EXISTS {alias}._standin_routines (name TEXT PRIMARY KEY "
+                         "COLLATE NOCASE, type TEXT, params TEXT, body TEXT, definition TEXT, created TEXT)")
+            self._sqlite(f"INSERT INTO {alias}._standin_routines VALUES (?, 'PROCEDURE', ?, ?, ?, ?)",
+                         (name, json.dumps(params), body, _unmask(text.strip(), literals, mysql=True), created))
+        return _Result(rowcount=0)
+
+    def _drop_procedure(self, rest, if_exists):
+        schema, name = _qualified(rest)
+        schema = self._schema(schema)
+        if self._routine(schema, name) is None:
+            if if_exists:
+                self._warn(errorcode.ER_SP_DOES_NOT_EXIST, f"PROCEDURE {schema}.{name} does not exist", "Note")
+                return _Result(rowcount=0)
+            raise _error(errorcode.ER_SP_DOES_NOT_EXIST, f"PROCEDURE {schema}.{name} does not exist", "42000")
+        with self._ddl():
+            self._sqlite(f"DELETE FROM {self._alias(schema)}._standin_routines WHERE name = ? COLLATE NOCASE",
+                         (name,))
+        return _Result(rowcount=0)
+
+    def _find_routine(self, text):
+        schema, name = _qualified(text)
+        schema = self._schema(schema)
+        routine = self._routine(schema, name)
+        if routine is None:
+            raise _error(errorcode.ER_SP_DOES_NOT_EXIST, f"PROCEDURE {schema}.{name} does not exist", "42000")
+        return routine
+
+    def _call(self, masked, literals, args, verb):
+        m = re.match(rf"\s*CALL\s+({_QNAME})\s*(\(.*\))?\s*$", masked, re.I | re.S)
+        if not m:
+            raise _syntax_error(masked)
+        routine = self._find_routine(m.group(1))
+        expressions = _split_top(m.group(2).strip()[1:-1]) if m.group(2) else []
+        params = routine["params"]
+        if len(expressions) != len(params):
+            raise _error(errorcode.ER_SP_WRONG_NO_OF_ARGS,
+                         f"Incorrect number of arguments for PROCEDURE {routine['schema']}.{routine['name']}; "
+                         f"expected {len(params)}, got {len(expressions)}", "42000")
+        outputs = {}
+        for index, ((mode, _, _), expr) in enumerate(zip(params, expressions)):
+            if mode != "IN":
+                target = re.fullmatch(r"\s*@(`(?:[^`]|``)+`|\x00\d+\x00|[\w$.]+)\s*", expr)
+                if not target:
+                    raise _error(errorcode.ER_SP_NOT_VAR_ARG,
+                                 f"OUT or INOUT argument {index + 1} for routine "
+                                 f"{routine['schema']}.{routine['name']} is not a variable or NEW pseudo-variable "
+                                 "in BEFORE trigger", "42000")
+                name = target.group(1)
+                token = _TOKEN_RE.fullmatch(name)
+                outputs[index] = (literals[int(token.group(1))] if token else _ident(name)).lower()
+        values = []
+        if expressions:
+            sql = self._translate("SELECT " + ", ".join(expressions), literals)
+            values = list(self._sqlite(sql, args).fetchone())
+        results, values = self._run_routine(routine, values)
+        for index, name in outputs.items():
+            self._user_variables[name] = values[index]
+        self._server.count("Com_call_procedure")
+        return results + [_Result(rowcount=max(self._row_count, 0))]
+
+    def _run_routine(self, routine, values):
+        """Run a procedure body; returns (result sets, final parameter values)."""
+        names = [name.lower() for _, name, _ in routine["params"]]
+        local = dict(zip(names, values))
+        for mode, name, _ in routine["params"]:
+            if mode == "OUT":
+                local[name.lower()] = None
+        previous = None
+        if routine["schema"] != self._database:
+            previous = self._database
+            self._use(routine["schema"])
+        results = []
+        try:
+            masked, literals = _mask(routine["body"])
+            for statement in _split_statements(masked):
+                m = _VERB_RE.match(statement)
+                verb = m.group(1).upper()
+                if verb == "SET":
+                    statement = self._set_locals(statement, literals, local)
+                    if statement is None:
+                        continue
+                into = _SELECT_INTO_RE.search(statement) if verb == "SELECT" else None
+                if into:
+                    statement = statement[:into.start()] + " " + statement[into.end():]
+                bound, args = _bind_locals(statement, local)
+                for result in self._statement(bound, list(literals), args):
+                    if result.columns is not None:
+                        rows = list(result.rows)
+                        if into:
+                            targets = [t.strip() for t in _split_top(into.group(1))]
+                            if len(rows) > 1:
+                                raise _error(errorcode.ER_TOO_MANY_ROWS, "Result consisted of more than one row",
+                                             "42000")
+                            for target, value in zip(targets, rows[0] if rows else [None] * len(targets)):
+                                self._assign_local(target, value, literals, local)
+                            continue
+                        results.append(_Result(result.columns, rows))
+        finally:
+            if previous is not None and not self._db.in_transaction:
+                self._use(previous)
+        return results, [local[name] for name in names]
+
+    def _set_locals(self, statement, literals, local):
+        """Apply SET assignments to procedure variables; returns what is left for _set(), or None."""
+        body = re.sub(r"^\s*SET\s+", "", statement, flags=re.I)
+        remaining = []
+        for item in _split_top(body):
+            m = re.match(rf"\s*({_NAME})\s*:?=\s*(.*)$", item, re.S)
+            if m and _ident(m.group(1)).lower() in local:
+                bound, args = _bind_locals(m.group(2), local)
+                local[_ident(m.group(1)).lower()] = self._evaluate(bound, literals, args)
+            else:
+                remaining.append(item)
+        if not remaining:
+            return None
+        return "SET " + ", ".join(remaining)
+
+    def _assign_local(self, target, value, literals, local):
+        if target.startswith("@"):
+            name = target[1:]
+            token = _TOKEN_RE.fullmatch(name)
+            self._user_variables[(literals[int(token.group(1))] if token else _ident(name)).lower()] = value
+        elif _ident(target).lower() in local:
+            local[_ident(target).lower()] = value
+        else:
+            raise _error(errorcode.ER_SP_UNDECLARED_VAR, f"Undeclared variable: {_ident(target)}", "42000")
+
+    def _callproc(self, procname, args):
+        """cursor.callproc(): (result sets, arguments with OUT/INOUT values filled in)."""
+        self._check_open()
+        self.handle_unread_result()
+        self._round_trip()
+        self._sync()
+        routine = self._find_routine(procname)
+        if len(args) != len(routine["params"]):
+            raise _error(errorcode.ER_SP_WRONG_NO_OF_ARGS,
+                         f"Incorrect number of arguments for PROCEDURE {routine['schema']}.{routine['name']}; "
+                         f"expected {len(routine['params'])}, got {len(args)}", "42000")
+        self._server.count("Questions")
+        self._server.count("Com_call_procedure")
+        try:
+            return self._run_routine(routine, list(args))
+        except sqlite3.Error as err:
+            raise self._mysql_error(err, "CALL") from None
+
+    # information_schema, SHOW and EXPLAIN
+
+    def _build_information_schema(self, name):
+        """(Re)fill information_schema.`name` from the catalogs, just before a statement reads it."""
+        columns = _INFORMATION_SCHEMA.get(name)
+        if columns is None:
+            raise _error(errorcode.ER_UNKNOWN_TABLE, f"Unknown table '{name}' in information_schema", "42S02")
+        rows = getattr(self, "_info_" + name.lower())()
+        self._db.execute(f"DROP TABLE IF EXISTS information_schema.{name}")
+        self._db.execute(f"CREATE TABLE information_schema.{name} ({', '.join(columns)})")
+        self._db.executemany(f"INSERT INTO information_schema.{name} VALUES ({', '.join('?' * len(columns))})",
+                             rows)
+
+    def _schemas(self):
+        return ["information_schema"] + self._server.databases()
+
+    def _each_table(self, kinds=("BASE TABLE", "VIEW")):
+        for schema in self._server.databases():
+            for table, kind in self._tables(schema):
+                if kind in kinds:
+                    yield schema, table, self._describe(schema, table)
+
+    def _info_schemata(self):
+        return [("def", schema, "utf8mb4", "utf8mb4_0900_ai_ci", None, "NO") for schema in self._schemas()]
+
+    def _info_tables(self):
+        rows = [("def", "information_schema", name, "SYSTEM VIEW", None, 10, None, 0, 0, 0, 0, 0, 0, None,
+                 None, None, None, "utf8mb3_general_ci", None, "", "") for name in sorted(_INFORMATION_SCHEMA)]
+        for schema, table, info in self._each_table():
+            if info["type"] == "VIEW":
+                rows.append(("def", schema, table, "VIEW", None, None, None, None, None, None, None, None,
+                             None, None, None, None, None, None, None, None, "VIEW"))
+                continue
+            db, alias = self._catalog(schema)
+            count = db.execute(f"SELECT COUNT(*) FROM {alias}.{_quote(table)}").fetchone()[0]
+            if info["autoincrement"] is not None:
+                info = dict(info, autoincrement=self._next_autoincrement(schema, info["name"]))
+            rows.append(("def", schema, table, "BASE TABLE", "InnoDB", 10, "Dynamic", count,
+                         count and 16384 * (count // 100 + 1) // count, 16384 * (count // 100 + 1), 0,
+                         16384 * len(info["indexes"]), 0, info["autoincrement"], None, None, None,
+                         "utf8mb4_0900_ai_ci", None, "", ""))
+        return rows
+
+    def _info_columns(self):
+        rows = []
+        for schema, table, info in self._each_table():
+            keys = _column_keys(info)
+            for position, column in enumerate(info["columns"], 1):
+                rows.append(("def", schema, table, column["name"], position, column["default"],
+                             "YES" if column["nullable"] else "NO", column["data_type"],
+                             column["max_length"], column["octet_length"], column["precision"],
+                             column["scale"], column["datetime_precision"], column["charset"],
+                             column["collation"], column["column_type"], keys.get(column["name"].lower(), ""),
+                             column["extra"], "select,insert,update,references", "",
+                             column["generation"], None))
+        return rows
+
+    def _info_statistics(self):
+        rows = []
+        for schema, table, info in self._each_table(("BASE TABLE",)):
+            nullable = {c["name"].lower(): c["nullable"] for c in info["columns"]}
+            for index in info["indexes"]:
+                for seq, (column, order) in enumerate(index["columns"], 1):
+                    rows.append(("def", schema, table, 0 if index["unique"] else 1, schema, index["name"], seq,
+                                 column, None if index["type"] == "FULLTEXT" else order, None, None, None,
+                                 "YES" if nullable.get(column.lower()) else "", index["type"], "", "", "YES",
+                                 None))
+        return rows
+
+    def _info_table_constraints(self):
+        rows = []
+        for schema, table, info in self._each_table(("BASE TABLE",)):
+            for index in info["indexes"]:
+                if index["unique"]:
+                    kind = "PRIMARY KEY" if index["name"] == "PRIMARY" else "UNIQUE"
+                    rows.append(("def", schema, index["name"], schema, table, kind, "YES"))
+            for fk in info["fks"]:
+                rows.append(("def", schema, fk["name"], schema, table, "FOREIGN KEY", "YES"))
+            for name, _ in info["checks"]:
+                if not name.startswith("_standin_"):
+                    rows.append(("def", schema, name, schema, table, "CHECK", "YES"))
+        return rows
+
+    def _info_key_column_usage(self):
+        rows = []
+        for schema, table, info in self._each_table(("BASE TABLE",)):
+            for index in info["indexes"]:
+                if index["unique"]:
+                    for position, (column, _) in enumerate(index["columns"], 1):
+                        rows.append(("def", schema, index["name"], "def", schema, table, column, position,
+                                     None, None, None, None))
+            for fk in info["fks"]:
+                for position, (column, ref) in enumerate(zip(fk["columns"], fk["ref_columns"]), 1):
+                    rows.append(("def", schema, fk["name"], "def", schema, table, column, position, position,
+                                 schema, fk["ref_table"], ref))
+        return rows
+
+    def _info_check_constraints(self):
+        return [("def", schema, name, f"({_mysql_expression(expr, [c['name'] for c in info['columns']])})")
+                for schema, table, info in self._each_table(("BASE TABLE",))
+                for name, expr in info["checks"] if not name.startswith("_standin_")]
+
+    def _info_referential_constraints(self):
+        rows = []
+        for schema, table, info in self._each_table(("BASE TABLE",)):
+            for fk in info["fks"]:
+                rules = dict(re.findall(r"ON (DELETE|UPDATE) (CASCADE|RESTRICT|SET NULL|SET DEFAULT|NO ACTION)",
+                                        fk["rules"]))
+                parent = self._describe(schema, fk["ref_table"]) if self._table_type(
+                    schema, fk["ref_table"]) else None
+                unique = None
+                for index in parent["indexes"] if parent else ():
+                    if [c.lower() for c, _ in index["columns"]] == [c.lower() for c in fk["ref_columns"]]:
+                        unique = index["name"]
+                rows.append(("def", schema, fk["name"], "def", schema, unique, "NONE",
+                             rules.get("UPDATE", "NO ACTION"), rules.get("DELETE", "NO ACTION"), table,
+                             fk["ref_table"]))
+        return rows
+
+    def _info_views(self):
+        return [("def", schema, table, _view_select(info["sql"]), "NONE", "YES", "root@localhost", "DEFINER",
+                 "utf8mb4", "utf8mb4_0900_ai_ci") for schema, table, info in self._each_table(("VIEW",))]
+
+    def _info_view_table_usage(self):
+        rows = []
+        for schema, view, info in self._each_table(("VIEW",)):
+            used = []
+            for ref in _TABLE_REF_RE.findall(_mask(info["sql"], sqlite=True)[0]):
+                ref_schema, table = _qualified(ref)
+                ref_schema = schema if ref_schema in (None, "main") else ref_schema
+                if table.lower() != view.lower() and (ref_schema, table.lower()) not in used and \
+                        self._server.database(ref_schema) and self._table_type(ref_schema, table):
+                    used.append((ref_schema, table.lower()))
+                    rows.append(("def", schema, view, "def", ref_schema,
+                                 self._describe(ref_schema, table)["name"]))
+        return rows
+
+    def _info_triggers(self):
+        rows = []
+        for schema in self._server.databases():
+            db, alias = self._catalog(schema)
+            for name, table, sql in db.execute(f"SELECT name, tbl_name, sql FROM {alias}.sqlite_master "
+                                               "WHERE type = 'trigger' ORDER BY name"):
+                m = re.search(r"\b(BEFORE|AFTER)\s+(INSERT|UPDATE|DELETE)\b.*?\bFOR\s+EACH\s+ROW\s+(.*)$",
+                              sql, re.I | re.S)
+                rows.append(("def", schema, name, m.group(2).upper(), "def", schema, table, 1, None, m.group(3),
+                             "ROW", m.group(1).upper(), "OLD", "NEW", None, _GLOBAL_VARIABLES["sql_mode"],
+                             "root@localhost", "utf8mb4", "utf8mb4_0900_ai_ci", "utf8mb4_0900_ai_ci"))
+        return rows
+
+    def _info_routines(self):
+        rows = []
+        for schema in self._server.databases():
+            for routine in self._routines(schema):
+                rows.append((routine["name"], "def", schema, routine["name"], routine["type"], "", None, None,
+                             None, None, None, None, None, None, "SQL", routine["body"], None, "SQL", "SQL",
+                             "NO", "CONTAINS SQL", None, "DEFINER", routine["created"], routine["created"],
+                             _GLOBAL_VARIABLES["sql_mode"], "", "root@localhost", "utf8mb4",
+                             "utf8mb4_0900_ai_ci", "utf8mb4_0900_ai_ci"))
+        return rows
+
+    def _info_parameters(self):
+        rows = []
+        for schema in self._server.databases():
+            for routine in self._routines(schema):
+                for position, (mode, name, data_type) in enumerate(routine["params"], 1):
+                    info = _column_info(name, _parse_column(f"`x` {data_type}", [], None)["type"], 0, None, {})
+                    rows.append(("def", schema, routine["name"], position, mode, name, info["data_type"],
+                                 info["max_length"], info["octet_length"], info["precision"], info["scale"],
+                                 info["datetime_precision"], info["charset"], info["collation"],
+                                 info["column_type"], routine["type"]))
+        return rows
+
+    def _info_processlist(self):
+        rows = []
+        for connection_id, session in sorted(self._server.sessions.items()):
+            rows.append((connection_id, session.user, "localhost", session._database,
+                         "Query" if session is self else "Sleep", 0, "executing" if session is self else "",
+                         None))
+        return rows
+
+    def _show(self, masked, literals, args, verb):
+        text = " ".join(masked.split())
+        m = re.match(r"SHOW\s+(.*?)(?:\s+(LIKE)\s+(\S+)|\s+WHERE\s+(.*))?$", text, re.I | re.S)
+        what, like, where = m.group(1), m.group(3), m.group(4)
+        upper = what.upper()
+        pattern = _like_regex(self._operand(like, literals, args)) if like else None
+        if re.fullmatch(r"(?:DATABASES|SCHEMAS)", upper):
+            columns, rows = ["Database"], [(s,) for s in self._schemas()]
+        elif re.fullmatch(r"(?:FULL\s+)?TABLES(?:\s+(?:FROM|IN)\s+\S+)?", upper):
+            s = re.search(rf"(?:FROM|IN)\s+({_NAME})$", what, re.I)
+            schema = self._schema(_ident(s.group(1)) if s else None)
+            full = upper.startswith("FULL")
+            tables = [(n, "SYSTEM VIEW") for n in sorted(_INFORMATION_SCHEMA)] \
+                if schema == "information_schema" else self._tables(schema)
+            columns = [f"Tables_in_{schema}"] + (["Table_type"] if full else [])
+            rows = [(name, kind) if full else (name,) for name, kind in tables]
+        elif re.fullmatch(r"(?:(?:GLOBAL|SESSION|LOCAL)\s+)?VARIABLES", upper):
+            scope = "global" if upper.startswith("GLOBAL") else None
+            names = set(self._server.variables) | (set() if scope else set(self._session))
+            columns = ["Variable_name", "Value"]
+            rows = [(name, _show_value(self._variable(name, scope))) for name in sorted(names)]
+        elif re.fullmatch(r"(?:(?:GLOBAL|SESSION|LOCAL)\s+)?STATUS", upper):
+            columns = ["Variable_name", "Value"]
+            rows = [(name, str(value)) for name, value in self._server.status_rows()]
+        elif re.fullmatch(r"(?:EXTENDED\s+)?(?:INDEX|INDEXES|KEYS)\s+(?:FROM|IN)\s+.*", upper):
+            s = re.match(rf"(?:EXTENDED\s+)?\w+\s+(?:FROM|IN)\s+({_QNAME})(?:\s+(?:FROM|IN)\s+({_NAME}))?$",
+                         what, re.I)
+            schema, table = _qualified(s.group(1))
+            schema = self._schema(_ident(s.group(2)) if s.group(2) else schema)
+            self._require_table(schema, table, views=False)
+            info = self._describe(schema, table)
+            nullable = {c["name"].lower(): c["nullable"] for c in info["columns"]}
+            columns = ["Table", "Non_unique", "Key_name", "Seq_in_index", "Column_name", "Collation",
+                       "Cardinality", "Sub_part", "Packed", "Null", "Index_type", "Comment", "Index_comment",
+                       "Visible", "Expression"]
+            rows = [(info["name"], 0 if index["unique"] else 1, index["name"], seq, column,
+                     None if index["type"] == "FULLTEXT" else order, None, None, None,
+                     "YES" if nullable.get(column.lower()) else "", index["type"], "", "", "YES", None)
+                    for index in info["indexes"] for seq, (column, order) in enumerate(index["columns"], 1)]
+        elif re.fullmatch(r"(?:FULL\s+)?(?:COLUMNS|FIELDS)\s+(?:FROM|IN)\s+.*", upper):
+            s = re.match(rf"(FULL\s+)?\w+\s+(?:FROM|IN)\s+({_QNAME})(?:\s+(?:FROM|IN)\s+({_NAME}))?$", what, re.I)
+            schema, table = _qualified(s.group(2))
+            schema = self._schema(_ident(s.group(3)) if s.group(3) else schema)
+            columns, rows = self._show_columns(schema, table, bool(s.group(1)))
+        elif upper.startswith("CREATE "):
+            columns, rows = self._show_create(what, literals)
+        elif re.fullmatch(r"(?:WARNINGS|ERRORS)(?:\s+LIMIT\s+.*)?", upper):
+            columns = ["Level", "Code", "Message"]
+            rows = [w for w in self._warnings if upper.startswith("WARNINGS") or w[0] == "Error"]
+        elif re.fullmatch(r"COUNT\s*\(\s*\*\s*\)\s+(?:WARNINGS|ERRORS)", upper):
+            columns, rows = ["@@session.warning_count"], [(len(self._warnings),)]
+        elif re.fullmatch(r"(?:FULL\s+)?PROCESSLIST", upper):
+            columns = ["Id", "User", "Host", "db", "Command", "Time", "State", "Info"]
+            rows = self._info_processlist()
+        elif re.fullmatch(r"(?:REPLICA|SLAVE)\s+STATUS(?:\s+.*)?", upper):
+            columns, rows = ["Replica_IO_State", "Source_Host", "Seconds_Behind_Source"], []
+        elif re.fullmatch(r"(?:MASTER|BINARY\s+LOG)\s+STATUS", upper):
+            columns, rows = ["File", "Position", "Binlog_Do_DB", "Binlog_Ignore_DB", "Executed_Gtid_Set"], []
+        elif re.fullmatch(r"(?:BINARY|MASTER)\s+LOGS|REPLICAS|SLAVE\s+HOSTS", upper):
+            columns, rows = ["Log_name", "File_size", "Encrypted"], []
+        elif re.fullmatch(r"ENGINES", upper):
+            columns = ["Engine", "Support", "Comment", "Transactions", "XA", "Savepoints"]
+            rows = [("InnoDB", "DEFAULT", f"SQLite {sqlite3.sqlite_version} stand-in", "YES", "NO", "YES")]
+        elif re.fullmatch(r"TRIGGERS(?:\s+(?:FROM|IN)\s+\S+)?", upper):
+            s = re.search(rf"(?:FROM|IN)\s+({_NAME})$", what, re.I)
+            schema = self._schema(_ident(s.group(1)) if s else None)
+            columns = ["Trigger", "Event", "Table", "Statement", "Timing", "Created", "sql_mode", "Definer",
+                       "character_set_client", "collation_connection", "Database Collation"]
+            rows = [(r[2], r[3], r[6], r[9], r[11], r[14], r[15], r[16], r[17], r[18], r[19])
+                    for r in self._info_triggers() if r[1] == schema]
+        elif re.fullmatch(r"PROCEDURE\s+STATUS", upper):
+            columns = ["Db", "Name", "Type", "Definer", "Modified", "Created", "Security_type", "Comment",
+                       "character_set_client", "collation_connection", "Database Collation"]
+            rows = [(r[2], r[3], r[4], "root@localhost", r[24], r[23], "DEFINER", "", "utf8mb4",
+                     "utf8mb4_0900_ai_ci", "utf8mb4_0900_ai_ci") for r in self._info_routines()]
+        else:
+            raise _syntax_error(masked)
+        if pattern is not None:
+            rows = [row for row in rows if pattern.match(str(row[0]))]
+        if where is not None:
+            rows = self._filter_rows(columns, rows, where, literals, args)
+        return _rows_result(columns, rows)
+
+    def _filter_rows(self, columns, rows, where, literals, args):
+        """Rows of a SHOW result that satisfy its WHERE clause."""
+        table = "information_schema._standin_show"
+        self._db.execute(f"DROP TABLE IF EXISTS {table}")
+        self._db.execute(f"CREATE TABLE {table} ({', '.join(_quote(c) for c in columns)})")
+        self._db.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})", rows)
+        sql = self._translate(f"SELECT * FROM {table} WHERE {where}", literals)
+        return self._sqlite(sql, args).fetchall()
+
+    def _show_columns(self, schema, table, full=False):
+        self._require_table(schema, table)
+        info = self._describe(schema, table)
+        keys = _column_keys(info)
+        rows = []
+        for column in info["columns"]:
+            row = [column["name"], column["column_type"], "YES" if column["nullable"] else "NO",
+                   keys.get(column["name"].lower(), ""), column["default"], column["extra"]]
+            if full:
+                row[2:2] = [column["collation"]]
+                row += ["select,insert,update,references", ""]
+            rows.append(tuple(row))
+        if full:
+            return ["Field", "Type", "Collation", "Null", "Key", "Default", "Extra", "Privileges", "Comment"], rows
+        return ["Field", "Type", "Null", "Key", "Default", "Extra"], rows
+
+    def _show_create(self, what, literals):
+        m = re.match(rf"CREATE\s+(TABLE|VIEW|PROCEDURE|DATABASE|SCHEMA|TRIGGER)\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+                     rf"({_QNAME})$", what, re.I)
+        if not m:
+            raise _syntax_error("SHOW " + what)
+        kind = m.group(1).upper()
+        if kind in ("DATABASE", "SCHEMA"):
+            name = self._schema(_ident(m.group(2)))
+            return ["Database", "Create Database"], [
+                (name, f"CREATE DATABASE {_quote(name)} /*!40100 DEFAULT CHARACTER SET utf8mb4 "
+                       "COLLATE utf8mb4_0900_ai_ci */ /*!80016 DEFAULT ENCRYPTION='N' */")]
+        schema, name = _qualified(m.group(2))
+        schema = self._schema(schema)
+        if kind == "PROCEDURE":
+            routine = self._find_routine(m.group(2))
+            return (["Procedure", "sql_mode", "Create Procedure", "character_set_client", "collation_connection",
+                     "Database Collation"],
+                    [(routine["name"], _GLOBAL_VARIABLES["sql_mode"], routine["definition"], "utf8mb4",
+                      "utf8mb4_0900_ai_ci", "utf8mb4_0900_ai_ci")])
+        if kind == "TRIGGER":
+            db, alias = self._catalog(schema)
+            row = db.execute(f"SELECT name, sql FROM {alias}.sqlite_master WHERE type = 'trigger' "
+                             "AND name = ? COLLATE NOCASE", (name,)).fetchone()
+            if row is None:
+                raise _error(errorcode.ER_TRG_DOES_NOT_EXIST, "Trigger does not exist")
+            return (["Trigger", "sql_mode", "SQL Original Statement", "character_set_client",
+                     "collation_connection", "Database Collation", "Created"],
+                    [(row[0], _GLOBAL_VARIABLES["sql_mode"], row[1], "utf8mb4", "utf8mb4_0900_ai_ci",
+                      "utf8mb4_0900_ai_ci", None)])
+        kind_found = self._require_table(schema, name)
+        info = self._describe(schema, name)
+        if kind_found == "VIEW":
+            sql = (f"CREATE ALGORITHM=UNDEFINED DEFINER=`root`@`localhost` SQL SECURITY DEFINER VIEW "
+                   f"{_quote(info['name'])} AS {_view_select(info['sql'])}")
+            return (["View", "Create View", "character_set_client", "collation_connection"],
+                    [(info["name"], sql, "utf8mb4", "utf8mb4_0900_ai_ci")])
+        if kind == "VIEW":
+            raise _error(errorcode.ER_WRONG_OBJECT, f"'{schema}.{name}' is not VIEW")
+        if info["autoincrement"] is not None:
+            info = dict(info, autoincrement=self._next_autoincrement(schema, info["name"]))
+        return ["Table", "Create Table"], [(info["name"], _create_table_sql(info))]
+
+    def _explain(self, masked, literals, args, verb):
+        m = re.match(r"\s*\w+\s+(?:(ANALYZE)\s+)?(?:FORMAT\s*=\s*(\w+)\s+)?(.*)$", masked, re.I | re.S)
+        analyze, fmt, statement = m.group(1), (m.group(2) or "TRADITIONAL").upper(), m.group(3)
+        inner = _VERB_RE.match(statement)
+        inner_verb = inner.group(1).upper() if inner else ""
+        if inner_verb not in ("SELECT", "WITH", "TABLE", "INSERT", "REPLACE", "UPDATE", "DELETE"):
+            if analyze or m.group(2):
+                raise _syntax_error(statement)
+            # DESCRIBE t / EXPLAIN t [column]
+            d = re.match(rf"\s*({_QNAME})(?:\s+(\S+))?\s*$", statement)
+            if not d:
+                raise _syntax_error(statement)
+            schema, table = _qualified(d.group(1))
+            columns, rows = self._show_columns(self._schema(schema), table)
+            if d.group(2):
+                pattern = _like_regex(self._operand(d.group(2), literals, args))
+                rows = [row for row in rows if pattern.match(row[0])]
+            return _rows_result(columns, rows)
+        if inner_verb == "TABLE":
+            statement = re.sub(r"^\s*TABLE\b", "SELECT * FROM", statement, flags=re.I)
+        if fmt not in ("TRADITIONAL", "JSON", "TREE"):
+            raise _error(errorcode.ER_UNKNOWN_EXPLAIN_FORMAT, f"Unknown EXPLAIN format name: '{fmt}'")
+        plan = self._plan(statement, literals, args)
+        if analyze:
+            if inner_verb not in ("SELECT", "WITH", "TABLE"):
+                raise _unsupported("EXPLAIN ANALYZE of data changes")
+            started = time.perf_counter()
+            produced = len(self._sqlite(self._translate(statement, literals), args).fetchall())
+            elapsed = (time.perf_counter() - started) * 1000
+            return _rows_result(["EXPLAIN"], [(_plan_tree(plan, (elapsed, produced)),)])
+        if fmt == "TREE":
+            return _rows_result(["EXPLAIN"], [(_plan_tree(plan),)])
+        if fmt == "JSON":
+            return _rows_result(["EXPLAIN"], [(json.dumps(_plan_json(plan), indent=2),)])
+        columns = ["id", "select_type", "table", "partitions", "type", "possible_keys", "key", "key_len",
+                   "ref", "rows", "filtered", "Extra"]
+        rows = []
+        for step in plan["tables"]:
+            rows.append((step["select_id"], "SIMPLE" if step["select_id"] == 1 else "SUBQUERY", step["table"],
+                         None, step["access_type"], ",".join(step["possible_keys"]) or None, step["key"],
+                         step["key_length"], step["ref"], step["rows"], step["filtered"],
+                         "; ".join(step["extra"]) or None))
+        if not rows:
+            rows.append((1, inner_verb, None, None, None, None, None, None, None, None, None, "No tables used"))
+        return _rows_result(columns, rows)
+
+    def _plan(self, statement, literals, args):
+        """MySQL-shaped plan steps built from SQLite's EXPLAIN QUERY PLAN."""
+        sql = self._translate(statement, literals)
+        details = self._sqlite("EXPLAIN QUERY PLAN " + sql, args).fetchall()
+        aliases = {}
+        for ref in re.finditer(rf"\b(?:FROM|JOIN|UPDATE|INTO)\s+({_QNAME})(?:\s+(?:AS\s+)?(?!(?:ON|USING|WHERE|"
+                               rf"JOIN|INNER|LEFT|RIGHT|CROSS|NATURAL|GROUP|ORDER|LIMIT|SET|VALUES|HAVING|"
+                               rf"WINDOW|UNION|STRAIGHT_JOIN|FORCE|USE|IGNORE|SELECT)\b)({_NAME}))?",
+                               statement, re.I):
+            schema, table = _qualified(ref.group(1))
+            aliases[(_ident(ref.group(2)) if ref.group(2) else table).lower()] = (schema, table)
+        fulltext = {}
+        for match in _MATCH_RE.finditer(statement):
+            names = [c.strip() for c in match.group(1).split(",")]
+            for schema, table in aliases.values():
+                index = self._fulltext_index(schema, table, [_ident(c.split(".")[-1]) for c in names])
+                if index:
+                    fulltext[table.lower()] = index
+        clause = re.search(r"\bWHERE\s+(.*?)\s*(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bHAVING\b|\bLIMIT\b|$)",
+                           statement, re.I | re.S)
+        where = " ".join(_unmask(clause.group(1), literals, mysql=True).split()) if clause else None
+        words = {w.lower() for w in re.findall(r"[A-Za-z_][\w$]*", re.split(r"\bWHERE\b", statement, 1,
+                                                                            flags=re.I)[-1])}
+        tables, select_id, cost, prefix = [], 1, 0.0, 1.0
+        counts = {}
+        for _, parent, _, detail in details:
+            d = re.match(r"(SCAN|SEARCH)\s+(\S+)(?:\s+AS\s+(\S+))?(?:\s+USING\s+(.*))?$", detail)
+            if d is None:
+                if re.match(r"(?:SCALAR\s+SUBQUERY|CORRELATED|CO-ROUTINE|MATERIALIZE|LIST SUBQUERY)", detail):
+                    select_id += 1
+                if tables and "TEMP B-TREE" in detail:
+                    tables[-1]["extra"].append("Using filesort" if "ORDER BY" in detail else "Using temporary")
+                continue
+            name = d.group(3) or d.group(2)
+            schema, table = aliases.get(name.lower(), (None, name))
+            try:
+                schema = self._schema(schema)
+                info = self._describe(schema, table)
+            except Exception:
+                info = None
+            if info is None:
+                continue        # subquery results and CTEs
+            if (schema, table.lower()) not in counts:
+                db, alias = self._catalog(schema)
+                counts[(schema, table.lower())] = db.execute(
+                    f"SELECT COUNT(*) FROM {alias}.{_quote(info['name'])}").fetchone()[0]
+            total = counts[(schema, table.lower())]
+            using = d.group(4) or ""
+            index = re.search(r"INDEX\s+(\S+)", using)
+            key = _index_name(index.group(1)) if index and index.group(1).startswith(("i:", "f:")) else None
+            if index and index.group(1).startswith("sqlite_autoindex"):
+                key = "PRIMARY"
+            if "PRIMARY KEY" in using:
+                key = "PRIMARY"
+            condition = re.search(r"\((.*)\)\s*$", using)
+            condition = condition.group(1) if condition else ""
+            extra = []
+            if d.group(1) == "SCAN":
+                access = "index" if key else "ALL"
+                rows = total
+                if "COVERING" in using:
+                    extra.append("Using index")
+            elif condition and all("=" in part and not re.search(r"[<>]", part)
+                                   for part in condition.split(" AND ")):
+                unique = key == "PRIMARY" or any(
+                    i["name"] == key and i["unique"] and len(i["columns"]) == condition.count("=")
+                    for i in info["indexes"])
+                access = ("const" if not tables else "eq_ref") if unique else "ref"
+                rows = 1 if unique else max(1, total // 10)
+            else:
+                access = "range"
+                rows = max(1, total // 3)
+            if table.lower() in fulltext and access in ("ALL", "index"):
+                access, key, rows = "fulltext", fulltext[table.lower()], max(1, total // 10)
+                extra.append("Using where; Ft_hints: sorted")
+            possible = [i["name"] for i in info["indexes"] if i["columns"] and i["columns"][0][0].lower() in words]
+            if key and key not in possible:
+                possible.append(key)
+            filtered = 33.33 if where and access in ("ALL", "index", "range") else 100.0
+            if where and access in ("ALL", "range") and not extra:
+                extra.append("Using where")
+            key_columns = next((i["columns"] for i in info["indexes"] if i["name"] == key), [])
+            used = condition.count("?") + condition.count("=") if key else 0
+            produced = rows * filtered / 100
+            read = rows * 0.1 + 0.25 * (rows // 100 + 1)
+            cost += prefix * read
+            prefix *= max(produced, 1)
+            tables.append({"select_id": select_id, "table": name, "schema": schema, "access_type": access,
+                           "possible_keys": possible, "key": key,
+                           "used_key_parts": [c for c, _ in key_columns[:max(used, 1)]] if key else [],
+                           "key_length": str(4 * max(min(used, len(key_columns)), 1)) if key else None,
+                           "ref": "const" if access in ("const", "ref", "eq_ref") else None, "rows": rows,
+                           "filtered": filtered, "produced": produced, "read_cost": read,
+                           "prefix_cost": cost, "extra": extra, "condition": condition,
+                           "columns": [c["name"] for c in info["columns"]]})
+        return {"tables": tables, "cost": cost, "where": where}
+
+    # mysql.connector connection interface
+
+    def _close_session(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._unread_cursor = None
+        for _, db in self._catalogs.values():
+            db.close()
+        self._catalogs = {}
+        try:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            self._db.close()
+        except sqlite3.Error:
+            pass
+        self._server.close_session(self.connection_id)
+
+    @property
+    def database(self):
+        return self._database
+
+    @database.setter
+    def database(self, value):
+        self.cmd_query(f"USE {_quote(value)}")
+
+    def set_database(self, value):
+        self.database = value
+
+    @property
+    def autocommit(self):
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        value = bool(value)
+        if value and not self._autocommit:
+            self._commit()      # SET autocommit = 1 commits the open transaction
+        self._autocommit = value
+
+    @property
+    def in_transaction(self):
+        return not self._closed and self._db.in_transaction
+
+    @property
+    def unread_result(self):
+        return self._unread_cursor is not None
+
+    @property
+    def user(self):
+        return self._config.get("user") or "root"
+
+    @property
+    def server_host(self):
+        return self._config.get("host", "localhost")
+
+    @property
+    def server_port(self):
+        return int(self._config.get("port", 3306))
+
+    @property
+    def charset(self):
+        return "utf8mb4"
+
+    @property
+    def collation(self):
+        return "utf8mb4_0900_ai_ci"
+
+    @property
+    def sql_mode(self):
+        return self._variable("sql_mode")
+
+    @property
+    def warning_count(self):
+        return len(self._warnings)
+
+    @property
+    def server_info(self):
+        return SERVER_VERSION
+
+    @property
+    def server_version(self):
+        return tuple(int(part) for part in SERVER_VERSION.split("-")[0].split("."))
+
+    def get_server_info(self):
+        return self.server_info
+
+    def get_server_version(self):
+        return self.server_version
+
+    def consume_results(self):
+        if self._unread_cursor is not None:
+            self._unread_cursor._consume()
+
+    def handle_unread_result(self):
+        if self._unread_cursor is not None:
+            if not self.can_consume_results:
+                raise InternalError("Unread result found")
+            self.consume_results()
+
+    def is_connected(self):
+        if self._closed or self._killed:
+            return False
+        self._round_trip()
+        return True
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        """Check the session, reconnecting when asked, like mysql.connector's ping()."""
+        if self._closed or self._killed:
+            if not reconnect:
+                self._close_session()
+                raise InterfaceError(msg="Connection to MySQL is not available.", errno=errorcode.CR_SERVER_GONE_ERROR)
+            self.reconnect(attempts, delay)
+        self._round_trip()
+
+    def reconnect(self, attempts=1, delay=0):
+        self._close_session()
+        for attempt in range(max(1, attempts)):
+            try:
+                self._connect(*self._initial)
+                return
+            except InterfaceError:
+                if attempt + 1 >= attempts:
+                    raise
+                time.sleep(delay)
+
+    def close(self):
+        if not self._closed:
+            self._round_trip()
+        self._close_session()
+
+    disconnect = close
+    shutdown = close
+
+    def commit(self):
+        self._check_open()
+        self.handle_unread_result()
+        self._round_trip()
+        try:
+            self._commit()
+        except sqlite3.Error as err:
+            raise self._mysql_error(err, "COMMIT") from None
+
+    def rollback(self):
+        self._check_open()
+        if self._unread_cursor is not None:
+            self.consume_results()
+        self._round_trip()
+        self._rollback()
+
+    def start_transaction(self, consistent_snapshot=False, isolation_level=None, readonly=None):
+        if self.in_transaction:
+            raise ProgrammingError("Transaction already in progress")
+        self._check_open()
+        self.handle_unread_result()
+        self._round_trip()
+        if isolation_level:
+            self._session["transaction_isolation"] = "-".join(isolation_level.upper().split())
+        self._begin()
+
+    def cmd_query(self, query):
+        """Run one statement and discard any rows; returns the affected row count."""
+        results = self._execute(query)
+        for result in results:
+            if result.columns is not None:
+                result.rows = list(result.rows)
+        return results[-1].rowcount if results else 0
+
+    def cmd_reset_connection(self):
+        self.reset_session()
+        return True
+
+    def reset_session(self, user_variables=None, session_variables=None):
+        """Roll back and clear session state, then apply the given variables."""
+        self._check_open()
+        self.handle_unread_result()
+        self._round_trip()
+        self._rollback()
+        self._user_variables = {}
+        self._session = {}
+        self._warnings = []
+        self._server.release_all_locks(self.connection_id)
+        self._db.execute(f"PRAGMA foreign_keys = {'ON' if self._variable('foreign_key_checks') else 'OFF'}")
+        for name, value in (user_variables or {}).items():
+            self._user_variables[name.lower()] = value
+        for name, value in (session_variables or {}).items():
+            self._assign_variable(name, value)
+
+    def cursor(self, buffered=None, raw=None, prepared=None, cursor_class=None, dictionary=None,
+               named_tuple=None):
+        self._check_open()
+        if cursor_class is not None:
+            return cursor_class(self)
+        return SQLiteCursor(self, buffered=bool(buffered), raw=bool(raw), prepared=bool(prepared),
+                            dictionary=bool(dictionary), named_tuple=bool(named_tuple))
+
+
+class SQLiteCursor:
+    """
+    A mysql.connector-compatible cursor over a SQLiteConnection.
+
+    Unbuffered cursors read rows from SQLite as they are fetched and, like
+    the real driver, leave "Unread result found" pending until the last one
+    is read; buffered cursors fetch everything at execute().
+    """
+
+    def __init__(self, connection, buffered=False, raw=False, prepared=False, dictionary=False,
+                 named_tuple=False):
+        self._connection = connection
+        self._buffered = buffered
+        self._raw = raw
+        self._prepared = prepared
+        self._dictionary = dictionary
+        self._named_tuple = named_tuple
+        self._results = []
+        self._stored = []
+        self._reset()
+        self.statement = None
+        self.warnings = None
+        self.arraysize = 1
+
+    def __repr__(self):
+        return f"SQLiteCursor({self.statement!r})" if self.statement else "SQLiteCursor(nothing executed)"
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _reset(self):
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+        self._rows = None
+        self._pending = []
+        self._row_type = None
+
+    @property
+    def with_rows(self):
+        return self.description is not None
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self.description) if self.description else ()
+
+    @property
+    def warning_count(self):
+        return len(self.warnings or ())
+
+    def _load(self, result):
+        """Make `result` the current result set."""
+        self._reset()
+        self.lastrowid = result.lastrowid
+        if result.columns is None:
+            self.rowcount = result.rowcount
+            return
+        rows = result.rows
+        if self._buffered:
+            self._pending = list(rows)
+            self.rowcount = len(self._pending)
+        else:
+            if isinstance(rows, list):
+                self._pending = rows
+            else:
+                # Peek at the first row: it gives the column types for description.
+                first = rows.fetchone()
+                self._pending = [first] if first is not None else []
+                self._rows = rows if first is not None else None
+            if self._pending:
+                self._connection._unread_cursor = self
+        self.description = _description(result.columns, self._pending, result.types)
+
+    def _shape(self, row):
+        if self._raw:
+            row = tuple(_text_value(v) for v in row)
+        if self._dictionary:
+            return dict(zip(self.column_names, row))
+        if self._named_tuple:
+            if self._row_type is None:
+                self._row_type = collections.namedtuple("Row", self.column_names)
+            return self._row_type(*row)
+        return tuple(row)
+
+    def _next_rows(self, size):
+        """Up to `size` raw rows (None: all remaining)."""
+        if self.description is None:
+            raise InterfaceError("No result set to fetch from.")
+        if size is None:
+            rows, self._pending = self._pending, []
+        else:
+            rows, self._pending = self._pending[:size], self._pending[size:]
+        if self._rows is not None and (size is None or len(rows) < size):
+            wanted = None if size is None else size - len(rows)
+            try:
+                more = self._rows.fetchall() if wanted is None else self._rows.fetchmany(wanted)
+            except sqlite3.Error as err:
+                self._finish()
+                raise self._connection._mysql_error(err, "SELECT") from None
+            rows.extend(more)
+            if wanted is None or len(more) < wanted:
+                self._finish()
+        if self._rows is not None and not self._pending:
+            # Read one row ahead, as the driver does: the result counts as read once it hits EOF.
+            following = self._rows.fetchone()
+            if following is None:
+                self._finish()
+            else:
+                self._pending = [following]
+        if self._rows is None and not self._pending:
+            self._finish()
+        if not self._buffered:
+            self.rowcount = max(self.rowcount, 0) + len(rows)
+        self._connection._server.count("Innodb_rows_read", len(rows))
+        return rows
+
+    def _finish(self):
+        self._rows = None
+        if self._connection._unread_cursor is self:
+            self._connection._unread_cursor = None
+
+    def _consume(self):
+        if self._rows is not None:
+            self._rows.fetchall()
+        self._pending = []
+        self._finish()
+
+    def _check(self):
+        if self._connection is None:
+            raise ProgrammingError("Cursor is not connected")
+
+    def execute(self, operation, params=None, multi=False):
+        self._check()
+        if not operation:
+            return None
+        if isinstance(operation, (bytes, bytearray)):
+            operation = operation.decode("utf-8")
+        if self._prepared and "?" in operation:
+            operation = _prepared_sql(operation)
+        self.statement = _statement_text(operation, params)
+        self._stored = []
+        self._results = self._connection._execute(operation, params)
+        self._after()
+        if multi:
+            return self._each()
+        return None
+
+    def _each(self):
+        yield self
+        while self.nextset():
+            yield self
+
+    def _after(self):
+        results, self._results = self._results, []
+        if not results:
+            self._reset()
+            return
+        # Later result sets are buffered: only the current one streams.
+        for result in results[1:]:
+            if result.columns is not None:
+                result.rows = list(result.rows)
+        self._load(results[0])
+        self._results = results[1:]
+        connection = self._connection
+        if connection.get_warnings or connection.raise_on_warnings:
+            self.warnings = list(connection._warnings) or None
+            if connection.raise_on_warnings and self.warnings:
+                level, code, message = self.warnings[0]
+                raise _error(code, message)
+
+    def nextset(self):
+        """Move to the next result set of a multi-statement execute; None when there is none."""
+        if not self._results:
+            return None
+        if self._connection._unread_cursor is self:
+            self._consume()
+        self._load(self._results.pop(0))
+        return True
+
+    def executemany(self, operation, seq_params):
+        self._check()
+        if not operation or not seq_params:
+            return None
+        if isinstance(operation, (bytes, bytearray)):
+            operation = operation.decode("utf-8")
+        if self._prepared and "?" in operation:
+            operation = _prepared_sql(operation)
+        results = self._connection._executemany(operation, seq_params)
+        self.statement = operation
+        if not results:
+            self._reset()
+            return None
+        rowcount = sum(max(r.rowcount, 0) for r in results if r.columns is None)
+        self._results = [results[-1]]
+        self._after()
+        if self.description is None:
+            self.rowcount = rowcount
+            self.lastrowid = next((r.lastrowid for r in results if r.lastrowid), self.lastrowid)
+        return None
+
+    def callproc(self, procname, args=()):
+        """Call a stored procedure; returns `args` with OUT and INOUT values filled in."""
+        self._check()
+        results, values = self._connection._callproc(procname, tuple(args))
+        self._stored = []
+        for result in results:
+            cursor = SQLiteCursor(self._connection, buffered=True, raw=self._raw,
+                                  dictionary=self._dictionary, named_tuple=self._named_tuple)
+            cursor._load(result)
+            self._stored.append(cursor)
+        self._reset()
+        self.statement = f"CALL {procname}"
+        return tuple(values)
+
+    def stored_results(self):
+        return iter(self._stored)
+
+    def fetchone(self):
+        self._check()
+        rows = self._next_rows(1)
+        return self._shape(rows[0]) if rows else None
+
+    def fetchmany(self, size=None):
+        self._check()
+        return [self._shape(row) for row in self._next_rows(size or self.arraysize)]
+
+    def fetchall(self):
+        self._check()
+        if self.description is None:
+            raise InterfaceError("No result set to fetch from.")
+        return [self._shape(row) for row in self._next_rows(None)]
+
+    def fetchwarnings(self):
+        return self.warnings
+
+    def reset(self, free=True):
+        if self._connection is not None and self._connection._unread_cursor is self:
+            self._consume()
+
+    def close(self):
+        if self._connection is None:
+            return False
+        if self._connection._unread_cursor is self:
+            self._connection.handle_unread_result()
+        self._connection = None
+        self._reset()
+        return True
+
+
+def connect(**config):
+    """mysql.connector.connect() for the stand-in: a SQLiteConnection with the same keywords."""
+    return SQLiteConnection(**config)
+
+
+db_pool.register_backend("sqlite", connect)
+
+
+# The numbered scripts that share state run in the same chain, on a fresh server per chain.
+WORKFLOW = [(1, 2), (3,), (4, 10, 11, 12), (5, 6), (7,), (8, 9)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("scripts", nargs="*", type=int, help="script numbers to run (default: 1-12)")
+    args = parser.parse_args()
+    wanted = set(args.scripts or range(1, 13))
+    folder = os.path.dirname(os.path.abspath(__file__))
+    scripts = {int(name.split("_", 1)[0]): os.path.join(folder, name)
+               for name in os.listdir(folder) if re.match(r"\d+_\w+\.py$", name)}
+    os.environ["MYSQL_BACKEND"] = "sqlite"
+    sys.path.insert(0, folder)
+    started = time.perf_counter()
+    for chain in WORKFLOW:
+        chain = [number for number in chain if number in wanted]
+        if not chain:
+            continue
+        db_pool.reset_pool()
+        server = reset_server()
+        if chain[0] != 1:
+            server.create_database("Database1")
+            server.create_database("test_db")
+        for number in chain:
+            begun = time.perf_counter()
+            runpy.run_path(scripts[number], run_name="__main__")
+            print(f"--- {os.path.basename(scripts[number])}: {(time.perf_counter() - begun) * 1000:.1f} ms")
+    db_pool.reset_pool()
+    print(f"--- {len(wanted)} scripts in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Streaming reads, so large result sets never sit in Python memory at once.
+
+The scripts read with cursor.execute(...) followed by cursor.fetchall(),
+which pulls the whole result set into a list. The helpers here keep memory
+bounded instead:
+
+    stream_rows(conn, sql)          -- row by row from an unbuffered cursor
+    stream_batches(conn, sql, 1000) -- lists of up to 1000 rows (fetchmany)
+    keyset_pages(conn, "employees") -- pages of `WHERE id > last ORDER BY id LIMIT n`
+
+    from db_stream import stream_rows
+
+    for row in stream_rows(conn, "SELECT * FROM employees"):
+        print(row)
+
+An unbuffered cursor owns the connection until its result is fully read, so
+don't run other statements on `conn` while iterating stream_rows() or
+stream_batches(); keyset_pages() has no such restriction between pages.
+If a stream is abandoned early the remaining rows are drained from the
+socket; use LIMIT or keyset_pages() for partial reads of huge tables.
+
+A failure part way through a stream (the query being killed, a lost
+connection, ...) is raised as StreamInterrupted, carrying how many rows had
+been delivered and, for keyset paging, the last key seen so the read can be
+resumed with keyset_pages(..., after=exc.last_key).
+"""
+import mysql.connector
+
+
+class StreamInterrupted(mysql.connector.Error):
+    """A streamed read failed after some rows had already been delivered."""
+
+    def __init__(self, cause, rows_read, last_key=None):
+        super().__init__(
+            msg=f"Stream interrupted after {rows_read} rows: {cause}",
+            errno=getattr(cause, "errno", None),
+            sqlstate=getattr(cause, "sqlstate", None),
+        )
+        self.rows_read = rows_read
+        self.last_key = last_key
+
+
+def stream_rows(conn, query, params=None, dictionary=False):
+    """Yield rows one at a time from an unbuffered cursor."""
+    for batch in stream_batches(conn, query, params, batch_size=1000, dictionary=dictionary):
+        yield from batch
+
+
+def stream_batches(conn, query, params=None, batch_size=1000, dictionary=False):
+    """Yield lists of at most `batch_size` rows using fetchmany()."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    cursor = conn.cursor(buffered=False, dictionary=dictionary)
+    rows_read = 0
+    try:
+        try:
+            cursor.execute(query, params)
+            if not cursor.with_rows:
+                return
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                rows_read += len(batch)
+                yield batch
+        except mysql.connector.Error as err:
+            raise StreamInterrupted(err, rows_read) from err
+    finally:
+        _close_stream(conn, cursor)
+
+
+def keyset_pages(conn, table, columns="*", key="id", page_size=10000,
+                 where=None, params=(), after=None):
+    """
+    Yield pages of rows from `table` ordered by the unique, indexed `key`.
+
+    Each page is `SELECT columns FROM table WHERE key > %s ORDER BY key
+    LIMIT page_size`, so every page costs one index seek no matter how deep
+    into the table it is, and at most one page is held in memory. `where`
+    adds an extra filter (with `params` for its placeholders); `after`
+    resumes after a given key value.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    if isinstance(columns, str):
+        column_sql = columns
+    else:
+        column_sql = ", ".join(columns)
+    filters = f" AND ({where})" if where else ""
+    first_query = (
+        f"SELECT {column_sql} FROM `{table}` WHERE 1=1{filters} "
+        f"ORDER BY `{key}` LIMIT {int(page_size)}"
+    )
+    next_query = (
+        f"SELECT {column_sql} FROM `{table}` WHERE `{key}` > %s{filters} "
+        f"ORDER BY `{key}` LIMIT {int(page_size)}"
+    )
+    rows_read = 0
+    last_key = after
+    key_index = None
+    while True:
+        cursor = conn.cursor(buffered=True)
+        try:
+            if last_key is None:
+                cursor.execute(first_query, tuple(params))
+            else:
+                cursor.execute(next_query, (last_key,) + tuple(params))
+            page = cursor.fetchall()
+            if key_index is None:
+                names = list(cursor.column_names)
+                if key not in names:
+                    raise ValueError(f"Key column {key!r} must be among the selected columns")
+                key_index = names.index(key)
+        except mysql.connector.Error as err:
+            raise StreamInterrupted(err, rows_read, last_key) from err
+        finally:
+            cursor.close()
+        if not page:
+            return
+        rows_read += len(page)
+        last_key = page[-1][key_index]
+        yield page
+        if len(page) < page_size:
+            return
+
+
+def keyset_rows(conn, table, **options):
+    """Row-at-a-time view over keyset_pages()."""
+    for page in keyset_pages(conn, table, **options):
+        yield from page
+
+
+def _close_stream(conn, cursor):
+    # Drain whatever is left of an abandoned or failed stream so the
+    # connection can be reused; if that fails the pool discards it on release.
+    try:
+        if conn.unread_result:
+            conn.consume_results()
+    except mysql.connector.Error:
+        pass
+    try:
+        cursor.close()
+    except mysql.connector.Error:
+        pass
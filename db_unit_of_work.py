@@ -0,0 +1,255 @@
+"""
+Unit of work: many small writes, one transaction, one commit.
+
+The scripts commit after nearly every INSERT, UPDATE or DELETE, and with
+innodb_flush_log_at_trx_commit=1 every commit waits for a redo log fsync.
+UnitOfWork runs writes inside one open transaction and commits them as a
+group once the batch is big enough, large enough, or old enough:
+
+    from db_unit_of_work import UnitOfWork
+
+    insert = "INSERT INTO employees (name, age, salary) VALUES (%s, %s, %s)"
+    with UnitOfWork(conn, max_items=500, max_bytes=1 << 20, max_delay=0.05) as unit:
+        for row in rows:
+            if unit.execute(insert, row) is None:
+                print("skipped:", unit.failures[-1])
+    print(unit.stats)
+
+Every write is preceded by a savepoint (the same name each time; MySQL
+replaces it, so no RELEASE is needed). A write that fails, such as a CHECK
+or UNIQUE violation, is rolled back to that savepoint and recorded in
+`failures`, and the rest of the batch commits. Errors that end the whole
+transaction (a deadlock, a lost connection) cannot be isolated. The batch's
+uncommitted writes are lost, counted in stats.lost, and the error is raised.
+
+Writes are not durable until their batch commits. Leaving the `with` block
+normally commits what is pending, and leaving it with an exception rolls the
+pending batch back. The time window is checked when a write arrives and on
+poll(); there is no background thread, because connections are not shared
+between threads.
+"""
+import time
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from db_bulk import estimate_row_bytes
+from db_prepared import statement_cache
+
+SAVEPOINT = "unit_of_work_item"
+
+# Errors after which the server has already rolled back the whole transaction.
+_TRANSACTION_LOST = {errorcode.ER_LOCK_DEADLOCK, errorcode.CR_SERVER_GONE_ERROR,
+                     errorcode.CR_SERVER_LOST}
+
+
+class FailedWrite:
+    """A write rolled back to its savepoint."""
+
+    def __init__(self, sql, params, error):
+        self.sql = sql
+        self.params = params
+        self.error = error
+
+    def __repr__(self):
+        return f"FailedWrite({self.sql!r}, {self.params!r}, error={self.error})"
+
+
+class UnitStats:
+    """Counters for one UnitOfWork."""
+
+    def __init__(self):
+        self.writes = 0
+        self.failed = 0
+        self.lost = 0
+        self.commits = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.commit_seconds = 0.0
+        self.flushes = dict.fromkeys(("count", "bytes", "time", "explicit"), 0)
+
+    @property
+    def writes_per_sec(self):
+        return self.writes / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"UnitStats(writes={self.writes}, failed={self.failed}, lost={self.lost}, "
+            f"commits={self.commits}, bytes={self.bytes}, seconds={self.seconds:.3f}, "
+            f"commit_seconds={self.commit_seconds:.3f}, writes_per_sec={self.writes_per_sec:.1f}, "
+            f"flushes={self.flushes})"
+        )
+
+
+class UnitOfWork:
+    """
+    Coalesce writes on `conn` into group-committed transactions.
+
+    max_items  -- commit after this many writes (successful or failed)
+    max_bytes  -- commit once the statements and parameters sent reach this size
+    max_delay  -- commit once the oldest pending write is this many seconds old
+    isolate    -- savepoint before each write, so one failure doesn't cost the batch;
+                  False saves a round trip per write, but the first failure rolls
+                  back the pending batch and is raised
+    prepared   -- run writes through db_prepared's per-connection statement cache
+    on_error   -- optional callable(FailedWrite), invoked for each isolated failure
+    progress   -- optional callable(stats), invoked after every commit
+    """
+
+    def __init__(self, conn, max_items=500, max_bytes=1 << 20, max_delay=0.05,
+                 isolate=True, prepared=False, on_error=None, progress=None):
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        self.conn = conn
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.isolate = isolate
+        self.on_error = on_error
+        self.progress = progress
+        self.stats = UnitStats()
+        self.failures = []
+        self.lastrowid = None
+        self._statements = statement_cache(conn) if prepared else None
+        self._cursor = None
+        self._pending = 0
+        self._pending_writes = 0
+        self._pending_bytes = 0
+        self._batch_started = None
+
+    @property
+    def pending(self):
+        """Writes run since the last commit."""
+        return self._pending
+
+    def execute(self, sql, params=()):
+        """
+        Run one write in the open batch and return its rowcount, or None when
+        the write failed and was rolled back to its savepoint.
+        """
+        start = time.perf_counter()
+        if self._batch_started is None:
+            if not self.conn.in_transaction:
+                self.conn.start_transaction()
+            self._batch_started = start
+        try:
+            if self.isolate:
+                self._run(f"SAVEPOINT {SAVEPOINT}")
+            cursor = self._write(sql, params)
+        except mysql.connector.Error as err:
+            if not self.isolate or err.errno in _TRANSACTION_LOST or not self._undo_write():
+                self._lose_batch()
+                raise
+            failure = FailedWrite(sql, params, err)
+            self.failures.append(failure)
+            self.stats.failed += 1
+            if self.on_error:
+                self.on_error(failure)
+            rowcount = None
+        else:
+            self.stats.writes += 1
+            self._pending_writes += 1
+            self.lastrowid = cursor.lastrowid
+            rowcount = cursor.rowcount
+        size = len(sql) + estimate_row_bytes(params or ())
+        self._pending += 1
+        self._pending_bytes += size
+        self.stats.bytes += size
+        self.stats.seconds += time.perf_counter() - start
+        self.poll()
+        return rowcount
+
+    def executemany(self, sql, seq_params):
+        """execute() each parameter tuple as its own write; returns how many succeeded."""
+        return sum(self.execute(sql, params) is not None for params in seq_params)
+
+    def poll(self):
+        """Commit the pending batch if it has reached a count, size or age limit."""
+        if not self._pending:
+            return False
+        if self._pending >= self.max_items:
+            reason = "count"
+        elif self.max_bytes and self._pending_bytes >= self.max_bytes:
+            reason = "bytes"
+        elif self.max_delay is not None and time.perf_counter() - self._batch_started >= self.max_delay:
+            reason = "time"
+        else:
+            return False
+        self._commit(reason)
+        return True
+
+    def flush(self):
+        """Commit whatever is pending."""
+        if self._pending:
+            self._commit("explicit")
+
+    def rollback(self):
+        """Discard the pending batch."""
+        if self._batch_started is not None:
+            self.conn.rollback()
+            self.stats.lost += self._pending_writes
+            self._reset()
+
+    def close(self):
+        self.flush()
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.rollback()
+            if self._cursor is not None:
+                self._cursor.close()
+                self._cursor = None
+        return False
+
+    def _write(self, sql, params):
+        if self._statements is not None:
+            return self._statements.execute(sql, params)
+        return self._run(sql, params)
+
+    def _run(self, sql, params=()):
+        if self._cursor is None:
+            self._cursor = self.conn.cursor()
+        self._cursor.execute(sql, params)
+        return self._cursor
+
+    def _undo_write(self):
+        """Roll back to the write's savepoint; False if the transaction went with it."""
+        try:
+            self._run(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+        except mysql.connector.Error:
+            return False
+        return True
+
+    def _commit(self, reason):
+        start = time.perf_counter()
+        self.conn.commit()
+        elapsed = time.perf_counter() - start
+        self.stats.commit_seconds += elapsed
+        self.stats.seconds += elapsed
+        self.stats.commits += 1
+        self.stats.flushes[reason] += 1
+        self._reset()
+        if self.progress:
+            self.progress(self.stats)
+
+    def _lose_batch(self):
+        try:
+            self.conn.rollback()
+        except mysql.connector.Error:
+            pass
+        self.stats.lost += self._pending_writes
+        self._reset()
+
+    def _reset(self):
+        self._pending = 0
+        self._pending_writes = 0
+        self._pending_bytes = 0
+        self._batch_started = None
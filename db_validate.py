@@ -0,0 +1,757 @@
+"""
+Client-side constraint checks for bulk loads.
+
+5_constraints.py finds NOT NULL, UNIQUE, CHECK and FOREIGN KEY violations
+one INSERT at a time, through server errors. In a bulk load a single bad row
+aborts a whole multi-row INSERT. RowValidator reads the table's constraints
+from information_schema and checks entire batches before anything is sent,
+splitting them into accepted rows and rejected rows with reasons:
+
+    from db_validate import RowValidator, load_valid
+
+    validator = RowValidator(conn, "employees", ["name", "email", "age", "salary", "manager_id"])
+    result = validator.validate(rows)
+    for row, reasons in result.rejected:
+        print(row, reasons)         # e.g. ["age: CHECK (`age` >= 18) failed"]
+
+    stats, rejected = load_valid(conn, "employees", columns, rows)   # validate + BulkLoader
+
+Each check runs over the whole batch at once (column by column rather than
+row by row). UNIQUE and FOREIGN KEY checks compare against key sets fetched
+in bulk: the full key set for small tables, or a Bloom filter whose hits
+are confirmed with one IN query per batch for large ones. Keys of accepted
+rows are remembered, so later batches see them too.
+
+CHECK clauses built from comparisons, AND/OR/NOT, IS [NOT] NULL, IN and
+BETWEEN are evaluated client-side; anything else (functions, arithmetic) is
+listed in `unchecked` and left to the server.
+
+A FOREIGN KEY that points back at the table's own AUTO_INCREMENT key (5_constraints.py's
+manager_id) can refer to a row earlier in the load whose id the server has
+not generated yet. A missing parent key is therefore left to the server
+only when it is one of the ids the rows accepted so far will get: from the
+table's next AUTO_INCREMENT value, one @@auto_increment_increment step per
+accepted row. Any other missing key is rejected.
+"""
+import hashlib
+import math
+import re
+from decimal import Decimal, InvalidOperation
+
+from db_bulk import BulkLoader
+from db_stream import stream_rows
+
+_INT_BITS = {"tinyint": 8, "smallint": 16, "mediumint": 24, "int": 32, "integer": 32, "bigint": 64}
+_FLOAT_TYPES = {"float", "double", "real"}
+_TEXT_TYPES = {"char", "varchar", "tinytext", "text", "mediumtext", "longtext"}
+# Above this many rows a key set is tracked with a Bloom filter instead of a Python set.
+_SET_LIMIT = 2_000_000
+
+
+class ValidationResult:
+    """Outcome of validating one batch."""
+
+    def __init__(self):
+        self.accepted = []
+        self.rejected = []
+
+    @property
+    def reasons(self):
+        """{constraint kind: rejected row count}, e.g. {"UNIQUE": 3, "CHECK": 1, "NULL": 2}."""
+        counts = {}
+        for _, reasons in self.rejected:
+            for kind in {reason.split(" ", 2)[1] for reason in reasons}:
+                counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+    def __repr__(self):
+        return f"ValidationResult(accepted={len(self.accepted)}, rejected={len(self.rejected)})"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter for hashable keys."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class KeySet:
+    """
+    The values of `columns` present in `table`, for membership tests in bulk.
+
+    strategy -- "set" (fetch every key), "bloom" (Bloom filter, hits confirmed
+                with an IN query) or "auto" (by the table's estimated size)
+    """
+
+    def __init__(self, conn, table, columns, schema=None, folds=None, strategy="auto"):
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.schema = schema
+        self.folds = folds or [False] * len(self.columns)
+        self._added = set()
+        if strategy == "auto":
+            strategy = "bloom" if _estimated_rows(conn, table, schema) > _SET_LIMIT else "set"
+        if strategy not in ("set", "bloom"):
+            raise ValueError("strategy must be 'set', 'bloom' or 'auto'")
+        self.strategy = strategy
+        column_list = ", ".join(f"`{name}`" for name in self.columns)
+        not_null = " AND ".join(f"`{name}` IS NOT NULL" for name in self.columns)
+        self._qualified = f"`{schema}`.`{table}`" if schema else f"`{table}`"
+        self._select = f"SELECT {column_list} FROM {self._qualified}"
+        keys = (self.fold(row) for row in stream_rows(conn, f"{self._select} WHERE {not_null}"))
+        if strategy == "set":
+            self._known = set(keys)
+            self._bloom = None
+        else:
+            self._known = None
+            self._bloom = BloomFilter(_estimated_rows(conn, table, schema) * 2)
+            for key in keys:
+                self._bloom.add(key)
+
+    def fold(self, values):
+        """Normalize a key the way the column collations compare it."""
+        return tuple(
+            value.casefold() if fold and isinstance(value, str) else value
+            for value, fold in zip(values, self.folds)
+        )
+
+    def add(self, key):
+        self._added.add(key)
+
+    def present(self, keys):
+        """The subset of (folded) `keys` that already exist."""
+        found = {key for key in keys if key in self._added}
+        if self._known is not None:
+            return found | {key for key in keys if key in self._known}
+        candidates = [key for key in set(keys) - found if key in self._bloom]
+        for start in range(0, len(candidates), 1000):
+            chunk = candidates[start:start + 1000]
+            row = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+            column_list = ", ".join(f"`{name}`" for name in self.columns)
+            cursor = self.conn.cursor(buffered=True)
+            cursor.execute(
+                f"{self._select} WHERE ({column_list}) IN ({', '.join([row] * len(chunk))})",
+                [value for key in chunk for value in key],
+            )
+            found |= {self.fold(row) for row in cursor.fetchall()}
+            cursor.close()
+        return found
+
+
+def _current_schema(conn):
+    cursor = conn.cursor(buffered=True)
+    cursor.execute("SELECT DATABASE()")
+    schema = cursor.fetchone()[0]
+    cursor.close()
+    if schema is None:
+        raise ValueError("No database selected")
+    return schema
+
+
+def _estimated_rows(conn, table, schema):
+    cursor = conn.cursor(buffered=True)
+    cursor.execute(
+        "SELECT COALESCE(TABLE_ROWS, 0) FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s",
+        (schema, table),
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    return int(row[0]) if row else 0
+
+
+class _Unsupported(Exception):
+    pass
+
+
+_CHECK_TOKEN_RE = re.compile(
+    r"\s*(?:(`(?:[^`]|``)+`)|(_\w+)?('(?:[^'\\]|\\.|'')*')|(\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)"
+    r"|(<=>|<=|>=|<>|!=|=|<|>|\(|\)|,|-)|([A-Za-z_]\w*))"
+)
+
+
+def _tokenize(clause):
+    tokens, position = [], 0
+    clause = clause.strip()
+    while position < len(clause):
+        match = _CHECK_TOKEN_RE.match(clause, position)
+        if not match or match.end() == position:
+            raise _Unsupported(clause)
+        position = match.end()
+        column, _, string, number, symbol, word = match.groups()
+        if column:
+            tokens.append(("column", column[1:-1].replace("``", "`")))
+        elif string:
+            text = string[1:-1].replace("''", "'")
+            text = re.sub(r"\\(.)", lambda m: {"n": "\n", "t": "\t", "0": "\0"}.get(m.group(1), m.group(1)), text)
+            tokens.append(("value", text))
+        elif number:
+            tokens.append(("value", Decimal(number) if "." in number or "e" in number.lower()
+                           else int(number)))
+        elif symbol:
+            tokens.append(("symbol", symbol))
+        elif word:
+            tokens.append(("word", word.upper()))
+    return tokens
+
+
+def _compare(left, right):
+    """Coerce numeric strings the way MySQL does before comparing with a number."""
+    if isinstance(left, str) and isinstance(right, (int, float, Decimal)) and not isinstance(right, bool):
+        left = _to_number(left)
+    elif isinstance(right, str) and isinstance(left, (int, float, Decimal)) and not isinstance(left, bool):
+        right = _to_number(right)
+    if isinstance(left, float) and isinstance(right, Decimal):
+        right = float(right)
+    elif isinstance(right, float) and isinstance(left, Decimal):
+        left = float(left)
+    return left, right
+
+
+def _to_number(text):
+    try:
+        return Decimal(text.strip())
+    except InvalidOperation:
+        return Decimal(0)
+
+
+_COMPARATORS = {
+    "=": lambda a, b: a == b,
+    "<=>": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+class _CheckParser:
+    """Compile a CHECK clause into fn(row) -> True / False / None (SQL UNKNOWN)."""
+
+    def __init__(self, clause, resolve):
+        self.tokens = _tokenize(clause)
+        self.position = 0
+        self.resolve = resolve
+        self.columns = set()
+
+    def compile(self):
+        fn = self._or()
+        if self.position != len(self.tokens):
+            raise _Unsupported("trailing tokens")
+        return fn
+
+    def _peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def _accept(self, kind, value=None):
+        token = self._peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, kind, value=None):
+        if not self._accept(kind, value):
+            raise _Unsupported(f"expected {value or kind}")
+
+    def _or(self):
+        parts = [self._and()]
+        while self._accept("word", "OR"):
+            parts.append(self._and())
+        if len(parts) == 1:
+            return parts[0]
+
+        def either(row):
+            results = [part(row) for part in parts]
+            if True in results:
+                return True
+            return None if None in results else False
+        return either
+
+    def _and(self):
+        parts = [self._not()]
+        while self._accept("word", "AND"):
+            parts.append(self._not())
+        if len(parts) == 1:
+            return parts[0]
+
+        def both(row):
+            results = [part(row) for part in parts]
+            if False in results:
+                return False
+            return None if None in results else True
+        return both
+
+    def _not(self):
+        if self._accept("word", "NOT"):
+            inner = self._not()
+            return lambda row: None if (value := inner(row)) is None else not value
+        return self._predicate()
+
+    def _predicate(self):
+        left = self._operand()
+        negate = self._accept("word", "NOT")
+        token = self._peek()
+        if token == ("word", "IS") and not negate:
+            self.position += 1
+            is_not = self._accept("word", "NOT")
+            self._expect("word", "NULL")
+            return lambda row: (left(row) is None) != is_not
+        if token == ("word", "IN"):
+            self.position += 1
+            self._expect("symbol", "(")
+            options = [self._operand()]
+            while self._accept("symbol", ","):
+                options.append(self._operand())
+            self._expect("symbol", ")")
+
+            def within(row):
+                value = left(row)
+                if value is None:
+                    return None
+                values = [option(row) for option in options]
+                hit = any(v is not None and _COMPARATORS["="](*_compare(value, v)) for v in values)
+                if hit:
+                    return not negate
+                return None if None in values else negate
+            return within
+        if token == ("word", "BETWEEN"):
+            self.position += 1
+            low = self._operand()
+            self._expect("word", "AND")
+            high = self._operand()
+
+            def between(row):
+                value, lo, hi = left(row), low(row), high(row)
+                if value is None or lo is None or hi is None:
+                    return None
+                inside = (_COMPARATORS[">="](*_compare(value, lo))
+                          and _COMPARATORS["<="](*_compare(value, hi)))
+                return inside != negate
+            return between
+        if negate:
+            raise _Unsupported("NOT without IN/BETWEEN")
+        if token[0] == "symbol" and token[1] in _COMPARATORS:
+            self.position += 1
+            compare = _COMPARATORS[token[1]]
+            null_safe = token[1] == "<=>"
+            right = self._operand()
+
+            def comparison(row):
+                a, b = left(row), right(row)
+                if a is None or b is None:
+                    return (a is None and b is None) if null_safe else None
+                try:
+                    return compare(*_compare(a, b))
+                except TypeError:
+                    return None
+            return comparison
+        # A bare operand used as a boolean (e.g. CHECK (`active`)).
+        return lambda row: None if (value := left(row)) is None else bool(value)
+
+    def _operand(self):
+        kind, value = self._peek()
+        if kind == "symbol" and value == "(":
+            self.position += 1
+            inner = self._or()
+            self._expect("symbol", ")")
+            return inner
+        if kind == "symbol" and value == "-" and self._peek(1)[0] == "value":
+            self.position += 2
+            number = -self.tokens[self.position - 1][1]
+            return lambda row: number
+        self.position += 1
+        if kind == "column":
+            self.columns.add(value)
+            return self.resolve(value)
+        if kind == "value":
+            return lambda row: value
+        if kind == "word" and value in ("NULL", "TRUE", "FALSE"):
+            constant = {"NULL": None, "TRUE": 1, "FALSE": 0}[value]
+            return lambda row: constant
+        raise _Unsupported(f"{kind} {value}")
+
+
+class _Column:
+    __slots__ = ("name", "nullable", "default", "auto", "data_type", "column_type",
+                 "max_length", "precision", "scale", "fold")
+
+
+class RowValidator:
+    """
+    Check rows destined for `table` (values in `columns` order) against its
+    NOT NULL, type/length, CHECK, UNIQUE and FOREIGN KEY constraints.
+
+    schema        -- schema of the table (default: the current database)
+    key_strategy  -- KeySet strategy for UNIQUE and FK lookups
+    """
+
+    def __init__(self, conn, table, columns, schema=None, key_strategy="auto"):
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.schema = schema or _current_schema(conn)
+        self.key_strategy = key_strategy
+        self._index = {name.lower(): i for i, name in enumerate(self.columns)}
+        self.table_columns = self._load_columns()
+        unknown = [name for name in self.columns if name.lower() not in self.table_columns]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {', '.join(unknown)}")
+        missing = [
+            column.name for key, column in self.table_columns.items()
+            if key not in self._index and not column.nullable and column.default is None
+            and not column.auto
+        ]
+        if missing:
+            raise ValueError(f"Columns without a default must be supplied: {', '.join(missing)}")
+        self.unique_keys, self.foreign_keys = self._load_keys()
+        self.checks, self.unchecked = self._load_checks()
+        self._unique_sets = None
+        self._parent_sets = None
+        # FKs onto this table's own server-generated key: name -> (next id, increment).
+        self._generated = None
+        self._accepted_rows = 0
+
+    # Introspection
+
+    def _load_columns(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT COLUMN_NAME, IS_NULLABLE, COLUMN_DEFAULT, EXTRA, DATA_TYPE, COLUMN_TYPE,
+                   CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, COLLATION_NAME
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION
+            """,
+            (self.schema, self.table),
+        )
+        columns = {}
+        for (name, nullable, default, extra, data_type, column_type, max_length,
+             precision, scale, collation) in cursor.fetchall():
+            column = _Column()
+            column.name = name
+            column.nullable = nullable == "YES"
+            column.default = default
+            extra = (extra or "").lower()
+            column.auto = "auto_increment" in extra or "generated" in extra
+            column.data_type = data_type.lower()
+            column.column_type = column_type.lower() if isinstance(column_type, str) else ""
+            column.max_length = max_length
+            column.precision = precision
+            column.scale = scale
+            column.fold = bool(collation) and collation.endswith("_ci")
+            columns[name.lower()] = column
+        cursor.close()
+        if not columns:
+            raise ValueError(f"Table {self.table} not found")
+        return columns
+
+    def _load_keys(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT tc.CONSTRAINT_NAME, tc.CONSTRAINT_TYPE, k.COLUMN_NAME,
+                   k.REFERENCED_TABLE_SCHEMA, k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME
+            FROM information_schema.TABLE_CONSTRAINTS tc
+            JOIN information_schema.KEY_COLUMN_USAGE k
+                ON k.CONSTRAINT_SCHEMA = tc.CONSTRAINT_SCHEMA
+                AND k.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
+                AND k.TABLE_NAME = tc.TABLE_NAME
+            WHERE tc.TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND tc.TABLE_NAME = %s
+                AND tc.CONSTRAINT_TYPE IN ('PRIMARY KEY', 'UNIQUE', 'FOREIGN KEY')
+            ORDER BY tc.CONSTRAINT_NAME, k.ORDINAL_POSITION
+            """,
+            (self.schema, self.table),
+        )
+        unique, foreign = {}, {}
+        for name, kind, column, ref_schema, ref_table, ref_column in cursor.fetchall():
+            if kind == "FOREIGN KEY":
+                fk = foreign.setdefault(name, {"columns": [], "schema": ref_schema,
+                                               "table": ref_table, "ref_columns": []})
+                fk["columns"].append(column)
+                fk["ref_columns"].append(ref_column)
+            else:
+                unique.setdefault(name, []).append(column)
+        cursor.close()
+        return unique, foreign
+
+    def _load_checks(self):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT cc.CONSTRAINT_NAME, cc.CHECK_CLAUSE
+                FROM information_schema.CHECK_CONSTRAINTS cc
+                JOIN information_schema.TABLE_CONSTRAINTS tc
+                    ON tc.CONSTRAINT_SCHEMA = cc.CONSTRAINT_SCHEMA
+                    AND tc.CONSTRAINT_NAME = cc.CONSTRAINT_NAME
+                WHERE tc.TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND tc.TABLE_NAME = %s
+                    AND tc.CONSTRAINT_TYPE = 'CHECK' AND tc.ENFORCED = 'YES'
+                """,
+                (self.schema, self.table),
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        checks, unchecked = [], []
+        for name, clause in rows:
+            clause = clause.decode("utf-8") if isinstance(clause, (bytes, bytearray)) else clause
+            parser = _CheckParser(clause, self._resolver)
+            try:
+                checks.append((name, clause, parser.compile(), parser.columns))
+            except _Unsupported:
+                unchecked.append((name, clause))
+        return checks, unchecked
+
+    def _resolver(self, name):
+        column = self.table_columns.get(name.lower())
+        if column is None:
+            raise _Unsupported(name)
+        index = self._index.get(name.lower())
+        if index is not None:
+            return lambda row: row[index]
+        default = column.default
+        if default is not None and column.data_type not in _TEXT_TYPES:
+            default = _to_number(default)
+        return lambda row: default
+
+    def _key_set(self, table, columns, schema=None):
+        own = table == self.table and schema in (None, self.schema)
+        folds = [own and self.table_columns[c.lower()].fold for c in columns]
+        return KeySet(self.conn, table, columns, schema, folds, self.key_strategy)
+
+    # Validation
+
+    def validate(self, rows):
+        """Validate one batch (a list of rows) and return a ValidationResult."""
+        rows = rows if isinstance(rows, list) else list(rows)
+        reasons = [[] for _ in rows]
+        width = len(self.columns)
+        for i, row in enumerate(rows):
+            if len(row) != width:
+                reasons[i].append(f"row: SHAPE has {len(row)} values, expected {width}")
+        shaped = [i for i, r in enumerate(reasons) if not r]
+        values = list(zip(*(rows[i] for i in shaped))) if shaped else [()] * width
+        for position, name in enumerate(self.columns):
+            self._check_column(self.table_columns[name.lower()], values[position], shaped, reasons)
+        for name, clause, check, _ in self.checks:
+            failed = [i for i in shaped if check(rows[i]) is False]
+            for i in failed:
+                reasons[i].append(f"{name}: CHECK {clause} failed")
+        self._check_keys(rows, reasons)
+        result = ValidationResult()
+        for row, row_reasons in zip(rows, reasons):
+            if row_reasons:
+                result.rejected.append((row, row_reasons))
+            else:
+                result.accepted.append(row)
+        return result
+
+    def validate_batches(self, rows, batch_size=10000):
+        """Yield a ValidationResult per batch of `batch_size` rows from any iterable."""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield self.validate(batch)
+                batch = []
+        if batch:
+            yield self.validate(batch)
+
+    def _check_column(self, column, values, indexes, reasons):
+        name = column.name
+        if not column.nullable:
+            for i, value in zip(indexes, values):
+                if value is None:
+                    reasons[i].append(f"{name}: NULL not allowed")
+        kind = column.data_type
+        if kind in _TEXT_TYPES and column.max_length:
+            limit = column.max_length
+            for i, value in zip(indexes, values):
+                if value is not None and len(value if isinstance(value, str) else str(value)) > limit:
+                    reasons[i].append(f"{name}: LENGTH exceeds {limit} characters")
+        elif kind in _INT_BITS or kind == "decimal" or kind in _FLOAT_TYPES:
+            if kind in _INT_BITS:
+                bits = _INT_BITS[kind]
+                if "unsigned" in column.column_type:
+                    low, high = 0, 2 ** bits - 1
+                else:
+                    low, high = -2 ** (bits - 1), 2 ** (bits - 1) - 1
+            elif kind == "decimal":
+                high = Decimal(10) ** (column.precision - column.scale)
+                low = -high
+            else:
+                low = high = None
+            for i, value in zip(indexes, values):
+                if value is None or isinstance(value, bool):
+                    continue
+                number = value
+                if isinstance(value, str):
+                    try:
+                        number = Decimal(value.strip())
+                    except InvalidOperation:
+                        reasons[i].append(f"{name}: TYPE {value!r} is not a number")
+                        continue
+                if low is None:
+                    continue
+                try:
+                    if kind == "decimal":
+                        out = not (low < number < high)
+                    else:
+                        out = not (low <= round(number) <= high)
+                except TypeError:
+                    reasons[i].append(f"{name}: TYPE {value!r} is not a number")
+                    continue
+                if out:
+                    reasons[i].append(f"{name}: RANGE {value} out of range for {column.column_type}")
+
+    def _check_keys(self, rows, reasons):
+        if self._unique_sets is None:
+            self._unique_sets = {
+                name: (cols, self._key_set(self.table, cols))
+                for name, cols in self.unique_keys.items()
+                if all(c.lower() in self._index for c in cols)
+            }
+            self._parent_sets = {
+                name: (fk, self._key_set(fk["table"], fk["ref_columns"], fk["schema"]))
+                for name, fk in self.foreign_keys.items()
+                if all(c.lower() in self._index for c in fk["columns"])
+            }
+            self._generated = {
+                name: self._next_ids(fk["ref_columns"][0])
+                for name, fk in self.foreign_keys.items()
+                if name in self._parent_sets and self._references_generated(fk)
+            }
+        candidates = [i for i, r in enumerate(reasons) if not r]
+
+        def keys_of(columns, key_set):
+            indexes = [self._index[c.lower()] for c in columns]
+            keys = {}
+            for i in candidates:
+                key = tuple(rows[i][j] for j in indexes)
+                if None not in key:
+                    keys[i] = key_set.fold(key)
+            return keys
+
+        # Existing keys are looked up in bulk, one query (or set probe) per constraint.
+        unique_keys = {name: keys_of(cols, key_set) for name, (cols, key_set) in self._unique_sets.items()}
+        unique_taken = {
+            name: self._unique_sets[name][1].present(list(keys.values()))
+            for name, keys in unique_keys.items()
+        }
+        parent_keys = {}
+        parent_present = {}
+        for name, (fk, key_set) in self._parent_sets.items():
+            keys = keys_of(fk["columns"], key_set)
+            parent_keys[name] = keys
+            parent_present[name] = key_set.present(list(keys.values()))
+
+        # Then rows are accepted in order, so earlier rows in the batch count
+        # as existing for later ones (duplicates, self-referencing parents).
+        for i in candidates:
+            row_reasons = reasons[i]
+            for name, keys in unique_keys.items():
+                key = keys.get(i)
+                if key is not None and key in unique_taken[name]:
+                    row_reasons.append(f"{name}: UNIQUE duplicate {key!r}")
+            for name, keys in parent_keys.items():
+                key = keys.get(i)
+                if key is not None and key not in parent_present[name]:
+                    if self._may_be_generated(name, key):
+                        continue
+                    fk = self.foreign_keys[name]
+                    row_reasons.append(
+                        f"{name}: FOREIGN KEY {key!r} not found in "
+                        f"{fk['table']}({', '.join(fk['ref_columns'])})"
+                    )
+            if row_reasons:
+                continue
+            self._accepted_rows += 1
+            for name, keys in unique_keys.items():
+                key = keys.get(i)
+                if key is not None:
+                    unique_taken[name].add(key)
+                    self._unique_sets[name][1].add(key)
+            # A new row can be the parent of later rows when the FK points back at this table.
+            for name, (fk, key_set) in self._parent_sets.items():
+                if fk["table"] == self.table and fk["schema"] == self.schema:
+                    ref = [self._index.get(c.lower()) for c in fk["ref_columns"]]
+                    if None not in ref:
+                        key = key_set.fold(tuple(rows[i][j] for j in ref))
+                        parent_present[name].add(key)
+                        key_set.add(key)
+
+    def _references_generated(self, fk):
+        """True for a single-column FK onto this table's own AUTO_INCREMENT column, not supplied in rows."""
+        if fk["table"] != self.table or fk["schema"] != self.schema or len(fk["ref_columns"]) != 1:
+            return False
+        ref = fk["ref_columns"][0].lower()
+        column = self.table_columns.get(ref)
+        return column is not None and column.auto and ref not in self._index
+
+    def _next_ids(self, column):
+        """(first id the server will generate, @@auto_increment_increment)."""
+        cursor = self.conn.cursor(buffered=True)
+        cursor.execute(
+            "SELECT AUTO_INCREMENT FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+            (self.schema, self.table),
+        )
+        row = cursor.fetchone()
+        counter = row[0] if row else None
+        cursor.execute(f"SELECT MAX(`{column}`) FROM `{self.schema}`.`{self.table}`")
+        highest = cursor.fetchone()[0] or 0
+        cursor.execute("SELECT @@auto_increment_increment")
+        increment = cursor.fetchone()[0]
+        cursor.close()
+        # TABLES.AUTO_INCREMENT may be cached (information_schema_stats_expiry), never above MAX + 1.
+        return max(counter or 0, highest + 1), int(increment)
+
+    def _may_be_generated(self, name, key):
+        """Whether a missing parent key can be the server-generated id of an accepted row."""
+        if name not in self._generated:
+            return False
+        first, increment = self._generated[name]
+        try:
+            return first <= key[0] < first + self._accepted_rows * increment
+        except TypeError:
+            return False
+
+
+def load_valid(conn, table, columns, rows, batch_size=10000, key_strategy="auto", **options):
+    """
+    Validate rows batch by batch and bulk-load the accepted ones.
+
+    Returns (LoadStats, rejected) where rejected is a list of (row, reasons).
+    Extra options go to BulkLoader.
+    """
+    validator = RowValidator(conn, table, columns, key_strategy=key_strategy)
+    rejected = []
+
+    def accepted():
+        for result in validator.validate_batches(rows, batch_size):
+            rejected.extend(result.rejected)
+            yield from result.accepted
+
+    stats = BulkLoader(conn, table, columns, **options).load(accepted())
+    return stats, rejected
@@ -0,0 +1,8 @@
+-- employees, as created by 3_create_insert_to_drop_table.py and 4_alter_table.py
+CREATE TABLE employees (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    age INT DEFAULT NULL,
+    department VARCHAR(100),
+    salary DECIMAL(10,2) DEFAULT NULL
+);
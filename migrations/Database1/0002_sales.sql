@@ -0,0 +1,6 @@
+-- sales, from 8_views.py and 9_joins.py
+CREATE TABLE sales (
+    employee_id INT,
+    sales_amount DECIMAL(10, 2),
+    FOREIGN KEY (employee_id) REFERENCES employees(id)
+);
@@ -0,0 +1,6 @@
+-- employee_sales, from 8_views.py
+CREATE VIEW employee_sales AS
+SELECT employees.name, employees.department, SUM(sales.sales_amount) AS total_sales
+FROM employees
+JOIN sales ON employees.id = sales.employee_id
+GROUP BY employees.name, employees.department;
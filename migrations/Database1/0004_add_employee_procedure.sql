@@ -0,0 +1,10 @@
+-- AddEmployee, from 10_Stored_Procedure.py
+DELIMITER $$
+
+CREATE PROCEDURE AddEmployee(IN emp_name VARCHAR(100), IN emp_department VARCHAR(100), IN emp_salary DECIMAL(10,2))
+BEGIN
+    INSERT INTO employees (name, department, salary)
+    VALUES (emp_name, emp_department, emp_salary);
+END$$
+
+DELIMITER ;
@@ -0,0 +1,12 @@
+-- AddEmployee with an age argument, from 12_Modify_Delete_Stored_Procedure.py
+DROP PROCEDURE IF EXISTS AddEmployee;
+
+DELIMITER $$
+
+CREATE PROCEDURE AddEmployee(IN emp_name VARCHAR(100), IN emp_department VARCHAR(100), IN emp_salary DECIMAL(10,2), IN emp_age INT)
+BEGIN
+    INSERT INTO employees (name, department, salary, age)
+    VALUES (emp_name, emp_department, emp_salary, emp_age);
+END$$
+
+DELIMITER ;
@@ -0,0 +1,11 @@
+-- employees with every constraint kind, from 5_constraints.py
+CREATE TABLE employees (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE,
+    age INT CHECK (age >= 18),
+    department VARCHAR(100) DEFAULT 'General',
+    salary DECIMAL(10,2) NOT NULL CHECK (salary > 30000),
+    manager_id INT,
+    FOREIGN KEY (manager_id) REFERENCES employees(id)
+);
@@ -0,0 +1,3 @@
+-- The description column and composite index 7_indexes.py expects
+ALTER TABLE employees ADD COLUMN description TEXT;
+CREATE INDEX idx_age_salary ON employees (age, salary);
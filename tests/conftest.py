@@ -0,0 +1,37 @@
+"""
+Tests run against the in-process SQLite stand-in (db_sqlite.py), so they need
+no MySQL server:
+
+    python -m pytest -q
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["MYSQL_BACKEND"] = "sqlite"
+os.environ.pop("MYSQL_SQLITE_PATH", None)
+os.environ.pop("MYSQL_SQLITE_LATENCY", None)
+
+import pytest  # noqa: E402
+
+import db_pool  # noqa: E402
+import db_sqlite  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    """A fresh stand-in server with the scripts' two databases, and an empty db_pool."""
+    db_pool.reset_pool()
+    server = db_sqlite.reset_server()
+    server.create_database("Database1")
+    server.create_database("test_db")
+    yield server
+    db_pool.reset_pool()
+
+
+@pytest.fixture
+def conn(server):
+    """A direct (unpooled) stand-in connection to Database1."""
+    conn = db_sqlite.connect(database="Database1")
+    yield conn
+    conn.close()
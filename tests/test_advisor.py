@@ -0,0 +1,30 @@
+import db_pool
+from db_advisor import IndexAdvisor, WorkloadRecorder
+from db_instrument import Instrumenter, install, uninstall
+
+
+def test_recorder_handles_statements_without_known_tables(server):
+    recorder = WorkloadRecorder()
+    install(Instrumenter([recorder]))
+    try:
+        conn = db_pool.connect("Database1")
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE employees (id INT PRIMARY KEY, department VARCHAR(100))")
+        cursor.execute("CREATE PROCEDURE add_hr(IN emp_id INT) "
+                       "BEGIN INSERT INTO employees VALUES (emp_id, 'HR'); END")
+        cursor.execute("CALL add_hr(%s)", (1,))
+        cursor.execute("CREATE DATABASE IF NOT EXISTS scratch")
+        cursor.execute("DROP DATABASE IF EXISTS scratch")
+        cursor.execute("INSERT INTO employees VALUES (2, 'IT')")
+        conn.commit()
+        cursor.execute("SELECT id FROM employees WHERE department = %s", ("HR",))
+        assert cursor.fetchall() == [(1,)]
+        cursor.close()
+
+        workload = recorder.workload()
+        assert workload.writes["employees"] == 2     # CREATE TABLE and the INSERT; the CALL is unknown
+        # The advisor's own scratch schema is created and dropped through the same recorder.
+        IndexAdvisor(conn, workload).analyze()
+        conn.close()
+    finally:
+        uninstall()
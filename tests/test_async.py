@@ -0,0 +1,49 @@
+import asyncio
+
+import db_async
+from db_async import AsyncPool
+
+
+class FakeConnection:
+    """Just enough of a mysql.connector.aio connection for the pool's bookkeeping."""
+
+    def __init__(self, database=None, **config):
+        self.database = database
+        self.unread_result = False
+        self.in_transaction = False
+
+    async def set_database(self, database):
+        self.database = database
+
+    async def ping(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+async def fake_connect(**config):
+    return FakeConnection(**config)
+
+
+async def databases(pool, *wanted):
+    seen = []
+    for database in wanted:
+        entry = await pool.acquire(database)
+        seen.append(entry.conn.database)
+        await pool.release(entry)
+    return seen
+
+
+def test_acquire_without_database_resets_to_configured_one(monkeypatch):
+    monkeypatch.setattr(db_async.mysql_aio, "connect", fake_connect)
+    pool = AsyncPool(size=1, database="Database1")
+    assert asyncio.run(databases(pool, "test_db", None)) == ["test_db", "Database1"]
+    assert pool.stats["created"] == 1
+
+
+def test_acquire_without_configured_database_opens_fresh_session(monkeypatch):
+    monkeypatch.setattr(db_async.mysql_aio, "connect", fake_connect)
+    pool = AsyncPool(size=1, host="localhost")
+    assert asyncio.run(databases(pool, "test_db", None)) == ["test_db", None]
+    assert pool.stats["created"] == 2 and pool.stats["discarded"] == 1
@@ -0,0 +1,48 @@
+import db_sqlite
+from db_cache import CachedConnection, QueryCache
+
+
+def make_table(conn):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE sales (employee_id INT, sales_amount DECIMAL(10, 2))")
+    cursor.execute("INSERT INTO sales VALUES (1, 100.00)")
+    cursor.close()
+    conn.commit()
+
+
+def test_rolled_back_write_is_not_served_from_the_cache(conn):
+    make_table(conn)
+    other = db_sqlite.connect(database="Database1")
+    cache = QueryCache(ttl=None)
+    writer, reader = CachedConnection(conn, cache), CachedConnection(other, cache)
+
+    writer.execute("INSERT INTO sales VALUES (2, 200.00)")
+    assert len(writer.query("SELECT * FROM sales")) == 2      # own write, not cached
+    reader.query("SELECT * FROM sales")                       # may cache pre-commit rows
+    writer.rollback()
+    assert reader.query("SELECT * FROM sales") == [(1, 100)]
+    assert writer.query("SELECT * FROM sales") == [(1, 100)]
+    other.close()
+
+
+def test_commit_evicts_results_cached_by_other_connections(conn):
+    make_table(conn)
+    other = db_sqlite.connect(database="Database1")
+    cache = QueryCache(ttl=None)
+    writer, reader = CachedConnection(conn, cache), CachedConnection(other, cache)
+
+    writer.execute("UPDATE sales SET sales_amount = 150.00 WHERE employee_id = 1")
+    reader.query("SELECT SUM(sales_amount) FROM sales")
+    writer.commit()
+    assert cache.metrics()["entries"] == 0
+    assert reader.query("SELECT SUM(sales_amount) FROM sales") == [(150,)]
+    other.close()
+
+
+def test_hits_return_a_copy(conn):
+    make_table(conn)
+    db = CachedConnection(conn, QueryCache(ttl=None))
+    rows = db.query("SELECT * FROM sales")
+    rows.append(("tampered",))
+    assert db.query("SELECT * FROM sales") == [(1, 100)]
+    assert db.cache.metrics()["hits"] == 1
@@ -0,0 +1,36 @@
+import os
+
+from db_migrate import Migrator, split_clauses
+from db_schema import column_exists, index_exists
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def test_split_clauses_keeps_parenthesized_commas():
+    assert split_clauses("ADD COLUMN price DECIMAL(10,2), ADD INDEX idx (a, b), DROP COLUMN 'x,y'") == [
+        "ADD COLUMN price DECIMAL(10,2)", "ADD INDEX idx (a, b)", "DROP COLUMN 'x,y'"]
+
+
+def test_step_that_failed_halfway_can_be_rerun(server, conn):
+    assert len(Migrator(MIGRATIONS, databases=["test_db"]).migrate().applied) == 2
+    # As if 0002_employees_search died after its ALTER ran: the ALTER stays, the step is not recorded.
+    cursor = conn.cursor()
+    cursor.execute("USE test_db")
+    cursor.execute("DELETE FROM schema_migrations WHERE version = '0002_employees_search'")
+    cursor.execute("DROP INDEX idx_age_salary ON employees")
+    conn.commit()
+    cursor.close()
+    assert Migrator(MIGRATIONS, databases=["test_db"]).status()["test_db/0002_employees_search"] == "pending"
+
+    report = Migrator(MIGRATIONS, databases=["test_db"]).migrate()
+    assert [step.key for step in report.applied] == ["test_db/0002_employees_search"]
+    assert column_exists(conn, "employees", "description") and index_exists(conn, "employees", "idx_age_salary")
+
+
+def test_alter_keeps_only_clauses_still_missing(server, conn):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE employees (id INT PRIMARY KEY, name VARCHAR(100))")
+    cursor.close()
+    sql = "ALTER TABLE employees ADD COLUMN name VARCHAR(100), ADD age INT, ADD INDEX idx_name (name)"
+    assert Migrator._skip_existing(conn, sql) == sql.replace("ADD COLUMN name VARCHAR(100), ", "")
+    assert Migrator._skip_existing(conn, "ALTER TABLE employees ADD `name` TEXT") is None
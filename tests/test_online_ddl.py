@@ -0,0 +1,58 @@
+import mysql.connector
+import pytest
+
+import db_sqlite
+from db_online_ddl import OnlineAlter
+
+
+def shadow_copy(conn, clause, progress=None):
+    alter = OnlineAlter(conn, "emp", clause, chunk_size=2, chunk_time=0, progress=progress)
+    alter._try_native = lambda algorithm, lock: False     # force the shadow copy
+    return alter.run()
+
+
+def make_table(conn):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE emp (id INT PRIMARY KEY, name VARCHAR(20), age INT)")
+    cursor.executemany("INSERT INTO emp VALUES (%s, %s, %s)",
+                       [(i, f"n{i}", None if i == 3 else 30) for i in range(1, 7)])
+    cursor.close()
+    conn.commit()
+
+
+def rows(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM emp ORDER BY id")
+    result = cursor.fetchall()
+    cursor.close()
+    return result
+
+
+def test_copy_fails_instead_of_coercing_values(conn):
+    make_table(conn)
+    with pytest.raises(mysql.connector.Error) as info:
+        shadow_copy(conn, "MODIFY COLUMN age INT NOT NULL")
+    assert info.value.errno == 1048          # Column 'age' cannot be null
+    assert rows(conn)[2] == (3, "n3", None)
+    cursor = conn.cursor()
+    cursor.execute("SHOW TABLES")
+    assert cursor.fetchall() == [("emp",)]
+    cursor.close()
+
+
+def test_rows_written_by_the_triggers_are_not_copied_again(conn):
+    make_table(conn)
+    other = db_sqlite.connect(database="Database1")
+
+    def progress(report):
+        if report.get("phase") == "copy" and report["copied"] == 2:
+            cursor = other.cursor()
+            cursor.execute("UPDATE emp SET name = 'changed' WHERE id = 5")
+            cursor.close()
+            other.commit()
+
+    result = shadow_copy(conn, "ADD COLUMN email VARCHAR(50) DEFAULT 'x'", progress)
+    assert result["method"] == "COPY"
+    assert rows(conn)[4] == (5, "changed", 30, "x")
+    assert len(rows(conn)) == 6
+    other.close()
@@ -0,0 +1,36 @@
+import pytest
+
+from db_paginate import InvalidToken, Paginator
+
+
+def make_table(conn):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE employees (id INT AUTO_INCREMENT PRIMARY KEY, "
+                   "name VARCHAR(100), department VARCHAR(100))")
+    cursor.executemany("INSERT INTO employees (name, department) VALUES (%s, %s)",
+                       [(f"Employee {i}", "HR" if i % 2 else "IT") for i in range(20)])
+    cursor.close()
+    conn.commit()
+
+
+def listing(conn, department, columns=("id", "name", "department")):
+    return Paginator(conn, "employees", columns=list(columns), page_size=3,
+                     where="department = %s", params=(department,))
+
+
+def test_pages_follow_tokens(conn):
+    make_table(conn)
+    hr = listing(conn, "HR")
+    first = hr.page()
+    second = hr.page(first.next_token)
+    assert [row[0] for row in first.rows + second.rows] == [2, 4, 6, 8, 10, 12]
+    assert hr.page(second.prev_token).rows == first.rows
+
+
+def test_token_from_other_params_or_columns_is_rejected(conn):
+    make_table(conn)
+    token = listing(conn, "HR").page().next_token
+    with pytest.raises(InvalidToken):
+        listing(conn, "IT").page(token)
+    with pytest.raises(InvalidToken):
+        listing(conn, "HR", columns=("id", "name")).page(token)
@@ -0,0 +1,32 @@
+from db_pool import ConnectionPool
+
+
+def current_database(pool, database=None):
+    conn = pool.acquire(database)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DATABASE()")
+        (name,) = cursor.fetchone()
+        cursor.close()
+        return name
+    finally:
+        conn.close()
+
+
+def test_acquire_without_database_resets_to_configured_one(server):
+    pool = ConnectionPool(size=1, database="Database1")
+    try:
+        assert current_database(pool, "test_db") == "test_db"
+        assert current_database(pool) == "Database1"
+        assert pool.stats["created"] == 1
+    finally:
+        pool.close()
+
+
+def test_acquire_without_configured_database_gets_none(server):
+    pool = ConnectionPool(size=1, host="localhost")
+    try:
+        assert current_database(pool, "test_db") == "test_db"
+        assert current_database(pool) is None
+    finally:
+        pool.close()
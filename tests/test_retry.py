@@ -0,0 +1,90 @@
+import mysql.connector
+from mysql.connector import errorcode
+
+from db_retry import Retrier, RetryPolicy
+from db_router import RoutedConnection, Router
+
+
+def lose_connection_once():
+    calls = []
+
+    def work(conn):
+        calls.append(conn)
+        if len(calls) == 1:
+            raise mysql.connector.errors.OperationalError(
+                msg="Lost connection to MySQL server during query", errno=errorcode.CR_SERVER_LOST)
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO employees (name) VALUES ('Jane Smith')")
+        cursor.close()
+
+    return work, calls
+
+
+def test_reconnect_keeps_the_session_routed(server):
+    router = Router([{"host": "127.0.0.1", "port": 3307}], sticky_seconds=0)
+    replica = router.replicas[0]
+    conn = router.connect("Database1")
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE employees (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(100))")
+    cursor.execute("SELECT COUNT(*) FROM employees")
+    assert cursor.fetchall() == [(0,)] and cursor.server == replica.name
+    cursor.close()
+
+    work, calls = lose_connection_once()
+    retrier = Retrier(conn, database="Database1", connect=router.connect,
+                      policy=RetryPolicy(base_delay=0))
+    retrier.transaction(work)
+    assert len(calls) == 2 and retrier.stats.reconnects == 1
+    assert isinstance(retrier.conn, RoutedConnection)
+    # The lost session's replica connection went back to its pool.
+    assert len(replica.pool._idle) == 1
+    retrier.close()
+    router.close()
+
+
+def test_autocommit_work_is_replayed_as_one_transaction(conn):
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE employees (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(100))")
+    cursor.close()
+    conn.autocommit = True
+    calls = []
+
+    def work(conn):
+        calls.append(conn)
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO employees (name) VALUES ('John Doe')")
+        cursor.close()
+        if len(calls) == 1:
+            raise mysql.connector.errors.DatabaseError(
+                msg="Deadlock found when trying to get lock", errno=errorcode.ER_LOCK_DEADLOCK)
+
+    Retrier(conn, policy=RetryPolicy(base_delay=0)).transaction(work)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM employees")
+    assert cursor.fetchall() == [(1,)]
+    cursor.close()
+
+
+def test_routed_writes_use_the_cached_autocommit_flag(server, monkeypatch):
+    router = Router([{"host": "127.0.0.1", "port": 3307}], sticky_seconds=0)
+    conn = router.connect("Database1")
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE employees (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(100))")
+    raw = type(conn.primary.raw_connection)
+    reads = []
+    monkeypatch.setattr(raw, "autocommit", property(lambda self: reads.append(1) or self._autocommit,
+                                                    raw.autocommit.fset))
+    cursor.execute("INSERT INTO employees (name) VALUES ('John Doe')")
+    assert conn.in_transaction
+    conn.commit()
+    cursor.execute("SET SESSION autocommit = 1")
+    cursor.execute("INSERT INTO employees (name) VALUES ('Jane Smith')")
+    assert not conn.in_transaction
+    conn.autocommit = False
+    cursor.execute("INSERT INTO employees (name) VALUES ('Sarah White')")
+    assert conn.in_transaction and not conn.autocommit
+    assert reads == []
+    conn.rollback()
+    cursor.close()
+    conn.close()
+    router.close()
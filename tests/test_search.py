@@ -0,0 +1,23 @@
+from db_search import FullTextSearch
+
+
+def run(conn, sql, params=()):
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    cursor.close()
+
+
+def test_dropped_index_falls_back_to_like_once(conn):
+    run(conn, "CREATE TABLE employees (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(100), "
+              "description TEXT, FULLTEXT INDEX idx_fulltext_description (description))")
+    for name, description in [("John Doe", "Senior software engineer"), ("Jane Smith", "HR manager")]:
+        run(conn, "INSERT INTO employees (name, description) VALUES (%s, %s)", (name, description))
+    search = FullTextSearch(conn, "employees", ["description"], columns=["id", "name"])
+    assert search.search("engineer").used_index
+
+    run(conn, "DROP INDEX idx_fulltext_description ON employees")
+    # A lookup that still reports the index must not send search() round in circles.
+    search.refresh_index = lambda: search.index
+    result = search.search("engineer")
+    assert not result.used_index
+    assert [row[1] for row in result] == ["John Doe"]
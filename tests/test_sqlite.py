@@ -0,0 +1,190 @@
+import datetime
+from decimal import Decimal
+
+import mysql.connector
+import pytest
+from mysql.connector.constants import FieldType
+
+import db_sqlite
+from db_columnar import stream_columnar
+from db_validate import RowValidator
+
+# 5_constraints.py's table.
+EMPLOYEES = """
+CREATE TABLE employees (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE,
+    age INT CHECK (age >= 18),
+    department VARCHAR(100) DEFAULT 'General',
+    salary DECIMAL(10,2) NOT NULL CHECK (salary > 30000),
+    manager_id INT,
+    FOREIGN KEY (manager_id) REFERENCES employees(id)
+)
+"""
+INSERT = "INSERT INTO employees (name, email, age, salary, manager_id) VALUES (%s, %s, %s, %s, %s)"
+
+
+def run(conn, sql, params=()):
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall() if cursor.with_rows else None
+    cursor.close()
+    return rows
+
+
+@pytest.fixture
+def employees(conn):
+    run(conn, EMPLOYEES)
+    run(conn, INSERT, ("John Doe", "john@example.com", 30, 50000, None))
+    conn.commit()
+    return conn
+
+
+def test_auto_increment_defaults_and_types(employees):
+    cursor = employees.cursor()
+    cursor.execute(INSERT, ("Jane Smith", "jane@example.com", 28, 60000, 1))
+    assert cursor.lastrowid == 2
+    cursor.close()
+    row = run(employees, "SELECT id, name, department, salary, manager_id FROM employees WHERE id = 2")
+    assert row == [(2, "Jane Smith", "General", Decimal("60000.00"), 1)]
+    run(employees, "ALTER TABLE employees ADD COLUMN hired DATETIME DEFAULT CURRENT_TIMESTAMP")
+    assert isinstance(run(employees, "SELECT hired FROM employees WHERE id = 2")[0][0], datetime.datetime)
+
+
+@pytest.mark.parametrize("row, errno", [
+    ((None, "a@example.com", 25, 50000, None), 1048),                 # NOT NULL
+    (("Alice", "john@example.com", 29, 55000, None), 1062),           # UNIQUE
+    (("Bob", "bob@example.com", 17, 60000, None), 3819),              # CHECK (age)
+    (("Charlie", "charlie@example.com", 26, 20000, None), 3819),      # CHECK (salary)
+    (("David", "david@example.com", 32, 70000, 999), 1452),           # FOREIGN KEY
+])
+def test_constraint_violations_raise_mysql_errors(employees, row, errno):
+    with pytest.raises(mysql.connector.Error) as info:
+        run(employees, INSERT, row)
+    assert info.value.errno == errno
+    assert run(employees, "SELECT COUNT(*) FROM employees") == [(1,)]
+
+
+def test_update_delete_and_upsert_rowcounts(employees):
+    cursor = employees.cursor()
+    cursor.execute("UPDATE employees SET salary = salary * 1.1 WHERE department = %s", ("General",))
+    assert cursor.rowcount == 1
+    cursor.execute("INSERT INTO employees (id, name, salary) VALUES (1, 'John', 40000) "
+                   "ON DUPLICATE KEY UPDATE name = VALUES(name)")
+    cursor.execute("SELECT name, salary FROM employees")
+    assert cursor.fetchall() == [("John", Decimal("55000.00"))]
+    cursor.execute("DELETE FROM employees WHERE id = 1")
+    assert cursor.rowcount == 1
+    cursor.close()
+
+
+def test_rollback_and_savepoints(employees):
+    employees.start_transaction()
+    run(employees, INSERT, ("Jane Smith", "jane@example.com", 28, 60000, 1))
+    run(employees, "SAVEPOINT item")
+    run(employees, INSERT, ("Emily Johnson", "emily@example.com", 35, 70000, 1))
+    run(employees, "ROLLBACK TO SAVEPOINT item")
+    employees.commit()
+    assert run(employees, "SELECT name FROM employees ORDER BY id") == [("John Doe",), ("Jane Smith",)]
+    run(employees, INSERT, ("Sarah White", "sarah@example.com", 41, 80000, None))
+    employees.rollback()
+    assert run(employees, "SELECT COUNT(*) FROM employees") == [(2,)]
+
+
+def test_alter_table_and_indexes(employees):
+    run(employees, "ALTER TABLE employees ADD COLUMN phone VARCHAR(20) AFTER email")
+    run(employees, "CREATE INDEX idx_department ON employees (department)")
+    columns = [row[0] for row in run(employees, "SHOW COLUMNS FROM employees")]
+    assert columns[:4] == ["id", "name", "email", "phone"]
+    assert "idx_department" in {row[2] for row in run(employees, "SHOW INDEX FROM employees")}
+    run(employees, "ALTER TABLE employees DROP COLUMN phone")
+    run(employees, "DROP INDEX idx_department ON employees")
+    assert "idx_department" not in {row[2] for row in run(employees, "SHOW INDEX FROM employees")}
+
+
+def test_alter_modify_and_change_column(conn):
+    run(conn, "CREATE TABLE emp (id INT PRIMARY KEY, age INT, name VARCHAR(5))")
+    run(conn, "INSERT INTO emp VALUES (1, NULL, 'ab')")
+    run(conn, "ALTER TABLE emp MODIFY COLUMN name VARCHAR(10) NOT NULL")
+    run(conn, "ALTER TABLE emp CHANGE name full_name VARCHAR(12)")
+    create = run(conn, "SHOW CREATE TABLE emp")[0][1]
+    assert "`full_name` varchar(12) DEFAULT NULL" in create
+    with pytest.raises(mysql.connector.Error) as info:
+        run(conn, "ALTER TABLE emp MODIFY age INT NOT NULL")
+    assert info.value.errno == 1138      # Invalid use of NULL value
+
+
+def test_views_joins_and_aggregates(conn):
+    # 8_views.py / 9_joins.py
+    run(conn, "CREATE TABLE employees (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(100), "
+              "department VARCHAR(100))")
+    run(conn, "CREATE TABLE sales (employee_id INT, sales_amount DECIMAL(10, 2), "
+              "FOREIGN KEY (employee_id) REFERENCES employees(id))")
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO employees (name, department) VALUES (%s, %s)",
+                       [("John Doe", "Sales"), ("Jane Smith", "Marketing"), ("Sarah White", "HR")])
+    cursor.executemany("INSERT INTO sales VALUES (%s, %s)", [(1, 1500.50), (1, 99.50), (2, 3000.00)])
+    cursor.close()
+    run(conn, "CREATE OR REPLACE VIEW employee_sales AS "
+              "SELECT employees.name, employees.department, SUM(sales.sales_amount) AS total_sales "
+              "FROM employees JOIN sales ON employees.id = sales.employee_id "
+              "GROUP BY employees.name, employees.department")
+    assert run(conn, "SELECT * FROM employee_sales ORDER BY name") == [
+        ("Jane Smith", "Marketing", Decimal("3000.00")), ("John Doe", "Sales", Decimal("1600.00"))]
+    left = run(conn, "SELECT employees.name, sales.sales_amount FROM employees "
+                     "LEFT JOIN sales ON employees.id = sales.employee_id WHERE sales.employee_id IS NULL")
+    assert left == [("Sarah White", None)]
+    run(conn, "DROP VIEW IF EXISTS employee_sales")
+
+
+def test_stored_procedure_call(conn):
+    run(conn, "CREATE TABLE employees (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(100), "
+              "department VARCHAR(100))")
+    run(conn, "CREATE PROCEDURE AddEmployee(IN emp_name VARCHAR(100), IN emp_department VARCHAR(100)) "
+              "BEGIN INSERT INTO employees (name, department) VALUES (emp_name, emp_department); END")
+    cursor = conn.cursor()
+    cursor.callproc("AddEmployee", ("Alice Green", "HR"))
+    cursor.close()
+    assert run(conn, "SELECT name, department FROM employees") == [("Alice Green", "HR")]
+
+
+def test_unknown_objects_and_syntax_errors(conn):
+    for sql, errno in [("SELECT * FROM missing", 1146), ("SELECT nope FROM information_schema.TABLES", 1054),
+                       ("SELEC 1", 1064)]:
+        with pytest.raises(mysql.connector.Error) as info:
+            run(conn, sql)
+        assert info.value.errno == errno
+    with pytest.raises(mysql.connector.Error) as info:
+        db_sqlite.connect(database="missing")
+    assert info.value.errno == 1049
+
+
+def test_check_clauses_match_mysql_format(employees):
+    clauses = run(employees, "SELECT CONSTRAINT_NAME, CHECK_CLAUSE FROM information_schema.CHECK_CONSTRAINTS "
+                             "ORDER BY CONSTRAINT_NAME")
+    assert clauses == [("employees_chk_1", "(`age` >= 18)"), ("employees_chk_2", "(`salary` > 30000)")]
+    assert "CHECK ((`age` >= 18))" in run(employees, "SHOW CREATE TABLE employees")[0][1]
+    # So db_validate can evaluate them client-side.
+    validator = RowValidator(employees, "employees", ["name", "email", "age", "salary"])
+    assert validator.unchecked == [] and len(validator.checks) == 2
+
+
+def test_description_types_come_from_declared_columns(conn):
+    run(conn, "CREATE TABLE sales (id INT AUTO_INCREMENT PRIMARY KEY, employee_id INT, "
+              "sales_amount DECIMAL(10, 2), note TEXT)")
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO sales (employee_id, sales_amount) VALUES (%s, %s)",
+                       [(None, None), (1, 1500.50), (2, 3000.00)])
+    cursor.execute("SELECT s.id, employee_id, sales_amount AS amount, note, sales_amount + 1 AS plus "
+                   "FROM sales s WHERE id > %s ORDER BY id", (0,))
+    assert [d[1] for d in cursor.description] == [
+        FieldType.LONG, FieldType.LONG, FieldType.NEWDECIMAL, FieldType.BLOB,
+        FieldType.VAR_STRING]        # an expression is typed from its first value, NULL here
+    cursor.fetchall()
+    cursor.close()
+    # db_columnar decodes by type code: every chunk must agree, whatever the leading values.
+    kinds = {tuple(column.kind for column in chunk.columns)
+             for chunk in stream_columnar(conn, "SELECT employee_id, sales_amount FROM sales ORDER BY id",
+                                          chunk_size=1)}
+    assert kinds == {("int64", "decimal")}
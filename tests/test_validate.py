@@ -0,0 +1,76 @@
+from db_bulk import bulk_insert
+from db_validate import RowValidator
+
+# 5_constraints.py's table and rows.
+EMPLOYEES = """
+CREATE TABLE employees (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE,
+    age INT CHECK (age >= 18),
+    department VARCHAR(100) DEFAULT 'General',
+    salary DECIMAL(10,2) NOT NULL CHECK (salary > 30000),
+    manager_id INT,
+    FOREIGN KEY (manager_id) REFERENCES employees(id)
+)
+"""
+COLUMNS = ["name", "email", "age", "department", "salary", "manager_id"]
+VALID = [
+    ("John Doe", "john@example.com", 30, "IT", 50000, None),
+    ("Jane Smith", "jane@example.com", 28, "HR", 60000, 1),
+]
+
+
+def make_table(conn):
+    cursor = conn.cursor()
+    cursor.execute(EMPLOYEES)
+    cursor.close()
+    conn.commit()
+
+
+def test_parent_generated_earlier_in_the_batch_is_accepted(conn):
+    make_table(conn)
+    result = RowValidator(conn, "employees", COLUMNS).validate(VALID)
+    assert result.accepted == VALID
+    assert result.rejected == []
+
+
+def test_missing_parent_below_the_highest_id_is_rejected(conn):
+    make_table(conn)
+    bulk_insert(conn, "employees", COLUMNS, VALID)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM employees WHERE id = 2")
+    cursor.close()
+    conn.commit()
+    validator = RowValidator(conn, "employees", COLUMNS)
+    result = validator.validate([("David White", "david@example.com", 32, "Sales", 70000, 999),
+                                 ("Eve Black", "eve@example.com", 40, "IT", 80000, 2),
+                                 ("Finn Gray", "finn@example.com", 35, "IT", 90000, 1)])
+    assert [row[0] for row in result.accepted] == ["Finn Gray"]
+    reasons = dict((row[0], reasons) for row, reasons in result.rejected)
+    assert reasons["David White"] == ["employees_ibfk_1: FOREIGN KEY (999,) not found in employees(id)"]
+    assert "Eve Black" in reasons
+
+
+def test_missing_parent_after_an_accepted_row_is_rejected(conn):
+    make_table(conn)
+    result = RowValidator(conn, "employees", COLUMNS).validate(
+        [VALID[0], ("David White", "david@example.com", 32, "Sales", 70000, 999)])
+    assert result.accepted == [VALID[0]]
+    assert [row[0] for row, _ in result.rejected] == ["David White"]
+
+
+def test_parent_ids_continue_from_the_auto_increment_counter(conn):
+    make_table(conn)
+    bulk_insert(conn, "employees", COLUMNS, VALID)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM employees WHERE id = 2")
+    cursor.close()
+    conn.commit()
+    # MAX(id) is 1 but the next row gets id 3, so 2 is gone for good and 3 is the first new parent.
+    result = RowValidator(conn, "employees", COLUMNS).validate(
+        [("Eve Black", "eve@example.com", 40, "IT", 80000, 1),
+         ("Finn Gray", "finn@example.com", 35, "IT", 90000, 2),
+         ("Gus Brown", "gus@example.com", 45, "IT", 95000, 3)])
+    assert [row[0] for row in result.accepted] == ["Eve Black", "Gus Brown"]
+    assert [row[0] for row, _ in result.rejected] == ["Finn Gray"]